@@ -30,6 +30,7 @@ from pygpsclient.globals import (
     SPARTN_BASEDATE_CURRENT,
     SPARTN_BASEDATE_DATASTREAM,
 )
+from pygpsclient.headless import HEADLESS_SERIAL, HEADLESS_SOURCES, HeadlessApp
 from pygpsclient.strings import EPILOG
 
 
@@ -102,6 +103,22 @@ def main():
         type=int,
         default=SUPPRESS,
     )
+    ap.add_argument(
+        "--headless",
+        help=(
+            "Run without GUI, reading from specified data source; connection "
+            "and output settings are taken from the configuration file"
+        ),
+        nargs="?",
+        const=HEADLESS_SERIAL,
+        choices=HEADLESS_SOURCES,
+        default=SUPPRESS,
+    )
+    ap.add_argument(
+        "--infile",
+        help="Fully-qualified path to input data file (headless file source only)",
+        default=SUPPRESS,
+    )
     ap.add_argument(
         "--verbosity",
         help=(
@@ -138,6 +155,12 @@ def main():
     for logr in (logger, logger_utils, logger_pyubx2):
         set_logging(logr, verbosity, logtofile)
 
+    source = kwargs.pop("headless", None)
+    in_filepath = kwargs.pop("infile", None)
+    if source is not None:
+        HeadlessApp(**kwargs).run(source, in_filepath)
+        sys.exit()
+
     root = Tk()
     App(root, **kwargs)
     root.mainloop()
@@ -12,6 +12,8 @@ PyGPSClient - Main tkinter application class.
   and assigns to appropriate NMEA, UBX or RTCM protocol handler.
 - Maintains central dictionary of current key navigation data as
   `gnss_status`, for use by user-selectable widgets.
+- Maintains pipelines for any additional GNSS receivers defined in
+  the `devices_l` setting (multi-receiver mode).
 
 Global logging configuration is defined in __main__.py. To enable module
 logging, this and other subsidiary modules can use:
@@ -41,17 +43,18 @@ from sys import executable
 from threading import Thread
 from tkinter import E, Frame, N, PhotoImage, S, Tk, Toplevel, W, font
 
-from pygnssutils import GNSSMQTTClient, GNSSNTRIPClient, MQTTMessage
-from pygnssutils.socket_server import ClientHandler, SocketServer
+from pygnssutils import GNSSMQTTClient, GNSSNTRIPClient
 from pynmeagps import NMEAMessage
 from pyrtcm import RTCMMessage
-from pysbf2 import SBFMessage
 from pyspartn import SPARTNMessage
-from pyubx2 import NMEA_PROTOCOL, POLL, RTCM3_PROTOCOL, UBX_PROTOCOL, UBXMessage
+from pyubx2 import NMEA_PROTOCOL, POLL, UBX_PROTOCOL, UBXMessage
 from serial import SerialException, SerialTimeoutException
 
 from pygpsclient._version import __version__ as VERSION
+from pygpsclient.broadcast_server import BroadcastServer
+from pygpsclient.config_transfer import ConfigTransfer
 from pygpsclient.configuration import Configuration
+from pygpsclient.device_pipeline import DevicePipeline
 from pygpsclient.dialog_state import DialogState
 from pygpsclient.file_handler import FileHandler
 from pygpsclient.globals import (
@@ -78,9 +81,7 @@ from pygpsclient.globals import (
     NTRIP_EVENT,
     OKCOL,
     SBF_PROTOCOL,
-    SOCKSERVER_MAX_CLIENTS,
     SPARTN_EVENT,
-    SPARTN_PROTOCOL,
     THD,
     TTY_EVENT,
     TTY_PROTOCOL,
@@ -90,7 +91,9 @@ from pygpsclient.gnss_status import GNSSStatus
 from pygpsclient.helpers import check_latest
 from pygpsclient.menu_bar import MenuBar
 from pygpsclient.nmea_handler import NMEAHandler
+from pygpsclient.protocol_registry import ProtocolRegistry
 from pygpsclient.rtcm3_handler import RTCM3Handler
+from pygpsclient.sat_history import SatHistory
 from pygpsclient.sbf_handler import SBFHandler
 from pygpsclient.sqlite_handler import DBINMEM, SQLOK, SqliteHandler
 from pygpsclient.stream_handler import StreamHandler
@@ -107,6 +110,8 @@ from pygpsclient.strings import (
     LOADCONFIGOK,
     NOTCONN,
     NOWDGSWARN,
+    SATHISTORYBAD,
+    SATHISTORYOK,
     SAVECONFIGBAD,
     SAVECONFIGOK,
     TITLE,
@@ -114,6 +119,7 @@ from pygpsclient.strings import (
 )
 from pygpsclient.tty_handler import TTYHandler
 from pygpsclient.ubx_handler import UBXHandler
+from pygpsclient.widget_scheduler import WidgetScheduler
 from pygpsclient.widget_state import (
     COL,
     COLSPAN,
@@ -122,6 +128,7 @@ from pygpsclient.widget_state import (
     MAXCOLSPAN,
     MAXROWSPAN,
     MENU,
+    MSGIDS,
     ROW,
     ROWSPAN,
     SHOW,
@@ -163,11 +170,13 @@ class App(Frame):
         self.spartn_inqueue = Queue()  # messages from SPARTN correction rcvr
         self.spartn_outqueue = Queue()  # messages to SPARTN correction rcvr
         self.socket_inqueue = Queue()  # message from socket
-        self.socket_outqueue = Queue()  # message to socket
         self.widget_state = WidgetState()  # widget state
+        self.widget_scheduler = WidgetScheduler(self, self._update_widget)
         self.dialog_state = DialogState()  # dialog state
         self.configuration = Configuration(self)  # configuration state
         self.gnss_status = GNSSStatus()  # holds latest GNSS readings
+        self.sat_history = SatHistory()  # holds per-satellite history
+        self.config_transfer = ConfigTransfer(self)  # sends receiver configuration
         self.file_handler = FileHandler(self)
         self.stream_handler = StreamHandler(self)
         self.spartn_stream_handler = StreamHandler(self)
@@ -179,10 +188,16 @@ class App(Frame):
         self.ntrip_handler = GNSSNTRIPClient(self)
         self.spartn_handler = GNSSMQTTClient(self)
         self.sqlite_handler = SqliteHandler(self)
+        self.protocol_registry = ProtocolRegistry(self)
+        self.devices = []  # additional GNSS receiver pipelines
         self._conn_status = DISCONNECTED
         self._rtk_conn_status = DISCONNECTED
         self._nowidgets = True
         self._last_gui_update = datetime.now()
+        self._gui_update_interval = timedelta(
+            seconds=self.configuration.get("guiupdateinterval_f")
+        )
+        self.configuration.watch("guiupdateinterval_f", self._on_gui_update_interval)
         self._socket_thread = None
         self._socket_server = None
         self._colcount = 0
@@ -196,6 +211,7 @@ class App(Frame):
         _, configerr = self.configuration.loadfile(configfile)
         # load config from CLI arguments & env variables
         self.configuration.loadcli(**kwargs)
+        self.sat_history.retention = self.configuration.get("sathistory_n")
         if configerr == "":
             self.update_widgets()  # set initial widget state
 
@@ -214,6 +230,7 @@ class App(Frame):
                 self.set_status(LOADCONFIGNONE.format(configfile), ERRCOL)
             else:
                 self.set_status(LOADCONFIGBAD.format(configfile, configerr), ERRCOL)
+        self.load_devices()
 
         # initialise widgets
         for value in self.widget_state.state.values():
@@ -286,6 +303,7 @@ class App(Frame):
             self.__master.grid_columnconfigure(col, weight=5)
         for row in range(1, maxrow + 1):
             self.__master.grid_rowconfigure(row, weight=5)
+        self.update_needed_identities()
 
     def _widget_grid(
         self, name: str, col: int, row: int, maxcol: int, maxrow: int, men: int
@@ -364,6 +382,24 @@ class App(Frame):
         self.configuration.set(name, self.widget_state.state[name][VISIBLE])
         self._do_layout()
 
+    def update_needed_identities(self):
+        """
+        Update set of message identities which the stream handler must
+        fully decode when lazy parsing is enabled, i.e. those processed
+        by any protocol handler or required by any visible widget.
+        """
+
+        needed = self.protocol_registry.identities()
+        for wdg in self.widget_state.state.values():
+            if not wdg[VISIBLE]:
+                needed -= set(wdg.get(MSGIDS, ()))
+        if self.widget_state.state[WDGCHART][VISIBLE]:
+            chartids = getattr(
+                self, self.widget_state.state[WDGCHART][FRAME]
+            ).identities
+            needed = None if chartids is None else needed | chartids
+        self.stream_handler.needed_identities = needed
+
     def widget_enable_messages(self, name: str):
         """
         Enable any NMEA, UBX or RTCM messages required by widget.
@@ -468,7 +504,9 @@ class App(Frame):
 
         filename, err = self.configuration.loadfile()
         if err == "":  # load succeeded
+            self.sat_history.retention = self.configuration.get("sathistory_n")
             self.update_widgets()
+            self.load_devices()
             for frm in (
                 self.frm_settings,
                 self.frm_settings.frm_serial,
@@ -486,6 +524,48 @@ class App(Frame):
         else:  # config error
             self.set_status(LOADCONFIGBAD.format(filename), ERRCOL)
 
+    def _on_gui_update_interval(
+        self, name: str, value: float
+    ):  # pylint: disable=unused-argument
+        """
+        Update cached GUI update interval when setting changes.
+
+        :param str name: setting name
+        :param float value: GUI update interval in seconds
+        """
+
+        self._gui_update_interval = timedelta(seconds=value)
+
+    def load_devices(self):
+        """
+        Create pipelines for any additional GNSS receivers defined
+        in configuration.
+        """
+
+        self.stop_devices()
+        self.devices = []
+        for i, entry in enumerate(self.configuration.get("devices_l")):
+            try:
+                self.devices.append(DevicePipeline(self, i + 1, entry))
+            except ValueError as err:
+                self.set_status(str(err), ERRCOL)
+
+    def start_devices(self):
+        """
+        Connect to any additional GNSS receivers.
+        """
+
+        for device in self.devices:
+            device.connect()
+
+    def stop_devices(self):
+        """
+        Disconnect from any additional GNSS receivers.
+        """
+
+        for device in self.devices:
+            device.disconnect()
+
     def save_config(self):
         """
         Save configuration file menu option.
@@ -497,6 +577,17 @@ class App(Frame):
         else:  # save failed
             self.set_status(SAVECONFIGBAD.format(err), ERRCOL)
 
+    def export_sat_history(self):
+        """
+        Export satellite history menu option.
+        """
+
+        count, err = self.file_handler.export_sat_history(self.sat_history)
+        if err == "":
+            self.set_status(SATHISTORYOK.format(count), OKCOL)
+        elif err is not None:  # export failed
+            self.set_status(SATHISTORYBAD.format(err), ERRCOL)
+
     def update_widgets(self):
         """
         Update widget configuration (self.widget_state.state).
@@ -585,8 +676,9 @@ class App(Frame):
                 port,
                 ntripuser,
                 ntrippassword,
-                SOCKSERVER_MAX_CLIENTS,
-                self.socket_outqueue,
+                cfg.get("sockmaxclients_n"),
+                cfg.get("sockbuffersize_n"),
+                cfg.get("socklagpolicy_s"),
             ),
             daemon=True,
         )
@@ -610,7 +702,8 @@ class App(Frame):
         ntripuser: str,
         ntrippassword: str,
         maxclients: int,
-        socketqueue: Queue,
+        bufsize: int,
+        policy: str,
     ):
         """
         THREADED
@@ -619,24 +712,39 @@ class App(Frame):
         :param int ntripmode: 0 = open socket server, 1 = NTRIP server
         :param str host: socket host name (0.0.0.0)
         :param int port: socket port (50010)
-        :param int maxclients: max num of clients (5)
-        :param Queue socketqueue: socket server read queue
+        :param int maxclients: max num of clients (0 = no limit)
+        :param int bufsize: socket server ring buffer size in bytes
+        :param str policy: lagging client policy "drop" or "disconnect"
         """
 
         try:
-            with SocketServer(
+            with BroadcastServer(
                 self,
                 ntripmode,
                 maxclients,
-                socketqueue,
                 (host, port),
-                ClientHandler,
+                bufsize,
+                policy,
                 ntripuser=ntripuser,
                 ntrippassword=ntrippassword,
             ) as self._socket_server:
                 self._socket_server.serve_forever()
         except OSError as err:
             self.set_status(f"Error starting socket server {err}", ERRCOL)
+        finally:
+            self._socket_server = None
+
+    def broadcast(self, raw_data: bytes):
+        """
+        Output raw data to socket server clients, if socket server is
+        running. Called directly from the stream reader thread.
+
+        :param bytes raw_data: raw data
+        """
+
+        server = self._socket_server
+        if server is not None:
+            server.publish(raw_data)
 
     def update_clients(self, clients: int):
         """
@@ -654,6 +762,7 @@ class App(Frame):
 
         self.stop_sockserver_thread()
         self.stream_handler.stop_read_thread()
+        self.stop_devices()
         self.sqlite_handler.close()
         self.file_handler.close_logfile()
         self.file_handler.close_trackfile()
@@ -664,19 +773,20 @@ class App(Frame):
         EVENT TRIGGERED
         Action on <<gnss_read>> event - data available on GNSS queue.
 
+        Drains all messages currently on the queue in a single pass.
+
         :param event event: read event
         """
 
-        try:
-            raw_data, parsed_data = self.gnss_inqueue.get(False)
+        self.stream_handler.clear_read_event()
+        for _ in range(self.gnss_inqueue.qsize()):
+            try:
+                raw_data, parsed_data = self.gnss_inqueue.get(False)
+            except Empty:
+                break
             if raw_data is not None and parsed_data is not None:
                 self.process_data(raw_data, parsed_data)
-            # if socket server is running, output raw data to socket
-            if self.frm_settings.frm_socketserver.socketserving:
-                self.socket_outqueue.put(raw_data)
             self.gnss_inqueue.task_done()
-        except Empty:
-            pass
 
     def on_gnss_eof(self, event):  # pylint: disable=unused-argument
         """
@@ -689,7 +799,7 @@ class App(Frame):
         self.frm_settings.frm_socketserver.socketserving = (
             False  # turn off socket server
         )
-        self._refresh_widgets()
+        self._refresh_widgets(True)
         self.conn_status = DISCONNECTED
         self.set_status(ENDOFFILE, ERRCOL)
 
@@ -704,7 +814,7 @@ class App(Frame):
         self.frm_settings.frm_socketserver.socketserving = (
             False  # turn off socket server
         )
-        self._refresh_widgets()
+        self._refresh_widgets(True)
         self.conn_status = DISCONNECTED
         self.set_status(INACTIVE_TIMEOUT, ERRCOL)
 
@@ -716,7 +826,7 @@ class App(Frame):
         :param event event: <<gnss_error>> event
         """
 
-        self._refresh_widgets()
+        self._refresh_widgets(True)
         self.conn_status = DISCONNECTED
 
     def on_ntrip_read(self, event):  # pylint: disable=unused-argument
@@ -755,46 +865,54 @@ class App(Frame):
         EVENT TRIGGERED
         Action on <<spartn_read>> event - data available on SPARTN queue.
 
+        Drains all messages currently on the queue in a single pass.
+
         :param event event: read event
         """
 
-        try:
-            raw_data, parsed_data = self.spartn_inqueue.get(False)
-            if raw_data is not None and parsed_data is not None:
-                self.send_to_device(raw_data)
-                if self._rtk_conn_status == CONNECTED_SPARTNLB:
-                    source = "LBAND"
-                elif self._rtk_conn_status == CONNECTED_SPARTNIP:
-                    source = "MQTT"
-                else:
-                    source = "OTHER"
-                self.process_data(
-                    raw_data,
-                    parsed_data,
-                    source + ">>",
-                )
-            self.spartn_inqueue.task_done()
-
-        except Empty:
-            pass
-        except (SerialException, SerialTimeoutException) as err:
-            self.set_status(f"Error sending to device {err}", ERRCOL)
+        self.spartn_stream_handler.clear_read_event()
+        if self._rtk_conn_status == CONNECTED_SPARTNLB:
+            source = "LBAND"
+        elif self._rtk_conn_status == CONNECTED_SPARTNIP:
+            source = "MQTT"
+        else:
+            source = "OTHER"
+        for _ in range(self.spartn_inqueue.qsize()):
+            try:
+                raw_data, parsed_data = self.spartn_inqueue.get(False)
+                if raw_data is not None and parsed_data is not None:
+                    self.send_to_device(raw_data)
+                    self.process_data(
+                        raw_data,
+                        parsed_data,
+                        source + ">>",
+                    )
+                self.spartn_inqueue.task_done()
+            except Empty:
+                break
+            except (SerialException, SerialTimeoutException) as err:
+                self.set_status(f"Error sending to device {err}", ERRCOL)
+                break
 
     def on_tty_read(self, event):  # pylint: disable=unused-argument
         """
         EVENT TRIGGERED
         Action on <<tty_read>> event - data available on TTY queue.
 
+        Drains all messages currently on the queue in a single pass.
+
         :param event event: read event
         """
 
-        try:
-            raw_data, parsed_data = self.gnss_inqueue.get(False)
+        self.stream_handler.clear_read_event()
+        for _ in range(self.gnss_inqueue.qsize()):
+            try:
+                raw_data, parsed_data = self.gnss_inqueue.get(False)
+            except Empty:
+                break
             if raw_data is not None:
                 self.process_data(raw_data, parsed_data, TTYMARKER)
             self.gnss_inqueue.task_done()
-        except Empty:
-            pass
 
     def update_ntrip_status(self, status: bool, msgt: tuple = None):
         """
@@ -815,71 +933,75 @@ class App(Frame):
         :rtype: dict
         """
 
+        # may be called from other threads
+        lat, lon, alt, hae, sip, fix, hdop, diffage, diffstation = (
+            self.gnss_status.read(
+                "lat",
+                "lon",
+                "alt",
+                "hae",
+                "sip",
+                "fix",
+                "hdop",
+                "diff_age",
+                "diff_station",
+            )
+        )
         try:
-            sep = self.gnss_status.hae - self.gnss_status.alt
+            sep = hae - alt
         except TypeError:
             sep = 0
         return {
             "connection": self._conn_status,
-            "lat": self.gnss_status.lat,
-            "lon": self.gnss_status.lon,
-            "alt": self.gnss_status.alt,  # hmsl
-            "hae": self.gnss_status.hae,
+            "lat": lat,
+            "lon": lon,
+            "alt": alt,  # hmsl
+            "hae": hae,
             "sep": sep,
-            "sip": self.gnss_status.sip,
-            "fix": self.gnss_status.fix,
-            "hdop": self.gnss_status.hdop,
-            "diffage": self.gnss_status.diff_age,
-            "diffstation": self.gnss_status.diff_station,
+            "sip": sip,
+            "fix": fix,
+            "hdop": hdop,
+            "diffage": diffage,
+            "diffstation": diffstation,
         }
 
-    def process_data(self, raw_data: bytes, parsed_data: object, marker: str = ""):
+    def process_data(
+        self,
+        raw_data: bytes,
+        parsed_data: object,
+        marker: str = "",
+        device: DevicePipeline = None,
+    ):
         """
         Update the various GUI widgets, GPX track and log file.
 
+        Messages from additional receivers are processed by that
+        receiver's own protocol handlers and are shown on the console
+        and written to the datalog, but are not used for the chart,
+        GPX track or database, which follow the main receiver.
+
         :param bytes raw_data: raw message data
         :param object parsed data: NMEAMessage, UBXMessage or RTCMMessage
         :param str marker: string prepended to console entries e.g. "NTRIP>>"
+        :param DevicePipeline device: additional receiver (None = main receiver)
         """
 
         # self.logger.debug(f"data received {parsed_data.identity}")
-        msgprot = 0
-        protfilter = self.configuration.get("protocol_n")
-        if isinstance(parsed_data, NMEAMessage):
-            msgprot = NMEA_PROTOCOL
-        elif isinstance(parsed_data, SBFMessage):
-            msgprot = SBF_PROTOCOL
-        elif isinstance(parsed_data, UBXMessage):
-            msgprot = UBX_PROTOCOL
-        elif isinstance(parsed_data, RTCMMessage):
-            msgprot = RTCM3_PROTOCOL
-        elif isinstance(parsed_data, SPARTNMessage):
-            msgprot = SPARTN_PROTOCOL
-        elif isinstance(parsed_data, MQTTMessage):
-            msgprot = MQTT_PROTOCOL
-        elif isinstance(parsed_data, str):
-            if self.configuration.get("ttyprot_b"):
-                msgprot = TTY_PROTOCOL
-            else:
-                marker = "WARNING>>"
-
-        if msgprot == UBX_PROTOCOL and msgprot & protfilter:
-            self.ubx_handler.process_data(raw_data, parsed_data)
-        elif msgprot == SBF_PROTOCOL and msgprot & protfilter:
-            self.sbf_handler.process_data(raw_data, parsed_data)
-        elif msgprot == NMEA_PROTOCOL and msgprot & protfilter:
-            self.nmea_handler.process_data(raw_data, parsed_data)
-        elif msgprot == RTCM3_PROTOCOL and msgprot & protfilter:
-            self.rtcm_handler.process_data(raw_data, parsed_data)
-        elif msgprot == TTY_PROTOCOL and msgprot & protfilter:
-            self.tty_handler.process_data(raw_data, parsed_data)
-        elif msgprot == SPARTN_PROTOCOL and msgprot & protfilter:
-            pass
-        elif msgprot == MQTT_PROTOCOL:
-            pass
+        cfg = self.configuration.snapshot()
+        protfilter = cfg.protocol_n
+        registry = (
+            self.protocol_registry if device is None else device.protocol_registry
+        )
+        msgprot, handler = registry.lookup(parsed_data)
+        if msgprot == TTY_PROTOCOL and not cfg.ttyprot_b:
+            msgprot, handler = 0, None
+            marker = "WARNING>>"
+
+        if handler is not None and msgprot & protfilter:
+            handler.process_data(raw_data, parsed_data)
 
         # update chart data if chart is visible
-        if self.widget_state.state[WDGCHART][VISIBLE]:
+        if device is None and self.widget_state.state[WDGCHART][VISIBLE]:
             getattr(self, self.widget_state.state[WDGCHART][FRAME]).update_data(
                 parsed_data
             )
@@ -891,21 +1013,24 @@ class App(Frame):
             self._consoledata.append((raw_data, parsed_data, marker))
 
         # periodically update widgets if visible
-        if datetime.now() > self._last_gui_update + timedelta(
-            seconds=self.configuration.get("guiupdateinterval_f")
-        ):
+        if datetime.now() > self._last_gui_update + self._gui_update_interval:
             self._refresh_widgets()
             # update database if enabled
-            if self.configuration.get("database_b"):
+            if cfg.database_b and not cfg.databaseepoch_b:
                 self.sqlite_handler.load_data()
             self._last_gui_update = datetime.now()
 
-        # update GPX track file if enabled
-        if self.configuration.get("recordtrack_b"):
-            self.file_handler.update_gpx_track()
+        if device is None:
+            # update database every navigation epoch if enabled
+            if cfg.database_b and cfg.databaseepoch_b:
+                self.sqlite_handler.load_data(new_epoch=True)
+
+            # update GPX track file if enabled
+            if cfg.recordtrack_b:
+                self.file_handler.update_gpx_track()
 
         # update log file if enabled
-        if self.configuration.get("datalog_b"):
+        if cfg.datalog_b:
             self.file_handler.write_logfile(raw_data, parsed_data)
 
     def send_to_device(self, data: object):
@@ -922,19 +1047,28 @@ class App(Frame):
         ):
             self.gnss_outqueue.put(data)
 
-    def _refresh_widgets(self):
+    def _refresh_widgets(self, force: bool = False):
         """
-        Refresh visible widgets.
+        Refresh visible widgets which are due for refresh.
+
+        :param bool force: refresh all visible widgets now
         """
 
-        for wdg, wdgdata in self.widget_state.state.items():
-            frm = getattr(self, wdgdata[FRAME])
-            if hasattr(frm, "update_frame") and wdgdata[VISIBLE]:
-                if wdg == WDGCONSOLE:
-                    frm.update_frame(self._consoledata)
-                    self._consoledata = []
-                else:
-                    frm.update_frame()
+        self.widget_scheduler.tick(force)
+
+    def _update_widget(self, wdg: str):
+        """
+        Refresh widget (called by widget scheduler).
+
+        :param str wdg: widget name
+        """
+
+        frm = getattr(self, self.widget_state.state[wdg][FRAME])
+        if wdg == WDGCONSOLE:
+            frm.update_frame(self._consoledata)
+            self._consoledata = []
+        else:
+            frm.update_frame()
 
     def _check_update(self):
         """
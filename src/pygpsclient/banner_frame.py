@@ -90,6 +90,8 @@ class BannerFrame(Frame):
         self._diffstat = StringVar()
         self._status = False
         self._show_advanced = False
+        self._lastversion = 0  # gnss_status version last displayed
+        self._lastformat = None  # display format last displayed
 
         self._bgcol = BGCOL
         self._fgcol = FGCOL
@@ -393,19 +395,33 @@ class BannerFrame(Frame):
 
     def update_frame(self):
         """
-        Sets text of banner from GNSSStatus object.
+        Sets text of banner from GNSSStatus object, updating only those
+        elements whose GNSSStatus fields or display format have changed.
         """
 
+        gnss = self.__app.gnss_status
         deg_format = self.__app.configuration.get("degreesformat_s")
         units = self.__app.configuration.get("units_s")
-
-        self._update_time()
-        self._update_pos(deg_format, units)
-        self._update_track(units)
-        self._update_fix()
-        self._update_siv()
-        self._update_dop(units)
-        self._update_dgps(units)
+        since = self._lastversion if self._lastformat == (deg_format, units) else 0
+        self._lastformat = (deg_format, units)
+        self._lastversion = gnss.version
+
+        if gnss.changed(since, "utc"):
+            self._update_time()
+        if gnss.changed(since, "lat", "lon", "alt", "hae"):
+            self._update_pos(deg_format, units)
+        if gnss.changed(since, "speed", "track"):
+            self._update_track(units)
+        if gnss.changed(since, "fix"):
+            self._update_fix()
+        if gnss.changed(since, "siv", "sip"):
+            self._update_siv()
+        if gnss.changed(since, "pdop", "hdop", "vdop", "hacc", "vacc"):
+            self._update_dop(units)
+        if gnss.changed(
+            since, "diff_corr", "diff_age", "diff_station", "rel_pos_length"
+        ):
+            self._update_dgps(units)
 
     def _update_time(self):
         """
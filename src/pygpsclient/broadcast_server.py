@@ -0,0 +1,568 @@
+"""
+broadcast_server.py
+
+Fan-out socket server / NTRIP caster for PyGPSClient application.
+
+Broadcasts raw data from the GNSS receiver to any number of TCP clients
+from a single thread, using non-blocking sockets and a `selectors`
+event loop:
+
+ - raw data is published directly by the stream reader thread into a
+   shared fixed-size ring buffer (a `bytearray` accessed via a
+   `memoryview`), and the server thread is woken via a socket pair.
+ - each client has its own read cursor into the ring buffer, and is
+   sent zero-copy `memoryview` slices of the buffer for as long as its
+   socket will accept them. A client whose socket is full is simply
+   left behind until it becomes writeable again, so a stalled client
+   never delays the others and buffering never grows.
+ - a client which falls more than the buffer size behind (less a
+   safety margin) is dealt with according to the lag policy - either
+   its backlog is dropped (it skips forward to the latest message) or
+   it is disconnected.
+
+Operates in two modes according to the ntripmode setting:
+
+0 - open socket mode - streams GNSS data to any connected client
+    without authentication.
+1 - NTRIP caster mode - responds to NTRIP client authentication,
+    sourcetable and RTCM3 data stream requests.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import logging
+import selectors
+import socket
+from base64 import b64encode
+from collections import namedtuple
+from datetime import datetime, timezone
+from threading import Event
+from time import monotonic
+
+from pygnssutils import RTCMTYPES
+from pygnssutils import version as PYGNSSVERSION
+from pygnssutils.globals import CONNECTED, DISCONNECTED, NTRIP2, PYGPSMP
+from pygnssutils.helpers import ipprot2int
+
+LAG_DISCONNECT = "disconnect"
+LAG_DROP = "drop"
+LAG_MARGIN = 4  # fraction of buffer reserved for data being sent
+LISTEN_BACKLOG = 64
+RECV_SIZE = 4096
+REQUEST_MAX = 8192  # max size of NTRIP request header
+
+ClientStats = namedtuple(
+    "ClientStats", ("address", "connected", "sent", "rate", "lag", "dropped")
+)
+"""
+Socket client statistics - `connected` is the connection duration in
+seconds, `sent` and `dropped` are in bytes, `rate` is the average send
+rate in bytes per second and `lag` is the client's backlog in bytes.
+"""
+
+
+class _Client:
+    """
+    Connected client state.
+    """
+
+    __slots__ = (
+        "sock",
+        "address",
+        "cursor",
+        "streaming",
+        "request",
+        "out",
+        "close",
+        "mask",
+        "start",
+        "sent",
+        "dropped",
+    )
+
+    def __init__(self, sock: socket.socket, address: tuple):
+        """
+        Constructor.
+
+        :param socket.socket sock: client socket
+        :param tuple address: client address
+        """
+
+        self.sock = sock
+        self.address = address
+        self.cursor = 0  # position in ring buffer of next byte to send
+        self.streaming = False
+        self.request = b""  # NTRIP request received so far
+        self.out = b""  # HTTP response awaiting sending
+        self.close = False  # close when response sent
+        self.mask = selectors.EVENT_READ
+        self.start = monotonic()
+        self.sent = 0
+        self.dropped = 0
+
+
+class BroadcastServer:
+    """
+    Fan-out socket server class.
+    """
+
+    def __init__(
+        self,
+        app,
+        ntripmode: int,
+        maxclients: int,
+        address: tuple,
+        bufsize: int,
+        policy: str = LAG_DROP,
+        **kwargs,
+    ):
+        """
+        Constructor.
+
+        :param Frame app: reference to main application class
+        :param int ntripmode: 0 = open socket server, 1 = NTRIP server
+        :param int maxclients: max no of clients allowed (0 = no limit)
+        :param tuple address: (host, port) to listen on
+        :param int bufsize: ring buffer size in bytes
+        :param str policy: lagging client policy "drop" or "disconnect"
+        :param str ipprot: (kwarg) IP protocol family (IPv4, IPv6)
+        :param str ntripversion: (kwarg) NTRIP version ("1.0", "2.0")
+        :param str ntripuser: (kwarg) NTRIP authentication user name
+        :param str ntrippassword: (kwarg) NTRIP authentication password
+        :raises: OSError if unable to listen on address
+        """
+
+        self.__app = app  # Reference to main application class
+        self.logger = logging.getLogger(__name__)
+        self._ntripmode = ntripmode
+        self._maxclients = maxclients
+        self._policy = policy
+        self.ntripversion = kwargs.get("ntripversion", NTRIP2)
+        user = f"{kwargs.get('ntripuser', 'anon')}:{kwargs.get('ntrippassword', 'password')}"
+        self._credentials = b64encode(user.encode("utf-8"))
+        self._size = max(int(bufsize), RECV_SIZE)
+        self._limit = self._size - self._size // LAG_MARGIN  # max client lag
+        self._buf = bytearray(self._size)
+        self._view = memoryview(self._buf)
+        self._head = 0  # total bytes published
+        self._clients = {}  # fileno: _Client
+        self._stop = Event()
+        self._woken = False
+        self._wakeread, self._wakewrite = socket.socketpair()
+        self._wakeread.setblocking(False)
+        self._wakewrite.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._listener = socket.socket(ipprot2int(kwargs.get("ipprot", "IPv4")))
+        try:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._listener.bind(address)
+            self._listener.listen(LISTEN_BACKLOG)
+        except OSError:
+            self.server_close()
+            raise
+        self._listener.setblocking(False)
+        self.server_address = self._listener.getsockname()[0:2]
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wakeread, selectors.EVENT_READ)
+
+    def __enter__(self):
+        """
+        Context manager enter routine.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """
+        Context manager exit routine.
+        """
+
+        self.server_close()
+
+    def publish(self, data: bytes):
+        """
+        Append raw data to ring buffer and wake server thread.
+        Must only be called from a single (e.g. stream reader) thread.
+
+        :param bytes data: raw data
+        """
+
+        size = len(data)
+        if size == 0 or size > self._size // LAG_MARGIN:
+            return
+        pos = self._head % self._size
+        first = min(size, self._size - pos)
+        self._view[pos : pos + first] = data[:first]
+        if first < size:  # wrap around
+            self._view[0 : size - first] = data[first:]
+        self._head += size
+        if not self._woken:
+            self._woken = True
+            try:
+                self._wakewrite.send(b"\x00")
+            except OSError:  # wake already pending or server closed
+                pass
+
+    def serve_forever(self):
+        """
+        Serve clients until shutdown.
+        """
+
+        try:
+            while not self._stop.is_set():
+                for key, mask in self._selector.select():
+                    if key.fileobj is self._listener:
+                        self._accept()
+                    elif key.fileobj is self._wakeread:
+                        try:
+                            while self._wakeread.recv(RECV_SIZE):
+                                pass
+                        except OSError:
+                            pass
+                        # clear flag only once drained, so a wake sent by a
+                        # concurrent publish() is never discarded; data
+                        # published before this point is sent below
+                        self._woken = False
+                    else:
+                        client = self._clients.get(key.fd, None)
+                        if client is None:
+                            continue
+                        if mask & selectors.EVENT_READ:
+                            self._read(client)
+                        if mask & selectors.EVENT_WRITE:
+                            self._write(client)
+                for client in list(self._clients.values()):
+                    if not client.streaming:
+                        continue
+                    if client.mask == selectors.EVENT_READ:
+                        self._write(client)
+                    elif self._head - client.cursor > self._limit:
+                        self._lagging(client)  # blocked and too far behind
+        finally:
+            for client in list(self._clients.values()):
+                self._disconnect(client)
+
+    def shutdown(self):
+        """
+        Stop serving clients (can be called from any thread).
+        """
+
+        self._stop.set()
+        try:
+            self._wakewrite.send(b"\x00")
+        except OSError:
+            pass
+
+    def server_close(self):
+        """
+        Close server sockets.
+        """
+
+        self._selector.close()
+        for sock in (self._listener, self._wakeread, self._wakewrite):
+            sock.close()
+
+    def _accept(self):
+        """
+        Accept new client connection, if within max clients.
+        """
+
+        try:
+            sock, address = self._listener.accept()
+        except OSError:
+            return
+        if self._maxclients and len(self._clients) >= self._maxclients:
+            self.logger.info(
+                f"Request {address} rejected - maximum clients reached "
+                f"{len(self._clients)}/{self._maxclients}."
+            )
+            sock.close()
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _Client(sock, address)
+        self._clients[sock.fileno()] = client
+        self._selector.register(sock, selectors.EVENT_READ)
+        if not self._ntripmode:
+            self._start_stream(client)
+        self._notify(address, CONNECTED)
+
+    def _disconnect(self, client: _Client):
+        """
+        Close client connection.
+
+        :param _Client client: client
+        """
+
+        if self._clients.pop(client.sock.fileno(), None) is None:
+            return
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+        self._notify(client.address, DISCONNECTED)
+
+    def _notify(self, address: tuple, status: int):
+        """
+        Log client connection or disconnection and update client count.
+
+        :param tuple address: client address
+        :param int status: 0 = disconnected, 1 = connected
+        """
+
+        msg = "connected" if status == CONNECTED else "disconnected"
+        clients = len(self._clients)
+        self.logger.info(
+            f"Client {address} {msg}. Total clients {clients}/{self._maxclients}."
+        )
+        if hasattr(self.__app, "update_clients"):
+            self.__app.update_clients(clients)
+
+    def _start_stream(self, client: _Client):
+        """
+        Start streaming from latest position in ring buffer.
+
+        :param _Client client: client
+        """
+
+        client.streaming = True
+        client.cursor = self._head
+
+    def _read(self, client: _Client):
+        """
+        Read data from client - an NTRIP request, or nothing (in which
+        case any data read is discarded).
+
+        :param _Client client: client
+        """
+
+        try:
+            data = client.sock.recv(RECV_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if data == b"":  # client has closed connection
+            self._disconnect(client)
+            return
+        if client.streaming or client.out:
+            return
+        client.request += data
+        if b"\r\n\r\n" not in client.request and len(client.request) < REQUEST_MAX:
+            return
+        stream, client.out = self._process_ntrip_request(client.request)
+        if stream:
+            self._start_stream(client)
+        else:
+            client.close = True
+        self._write(client)
+
+    def _write(self, client: _Client):
+        """
+        Send any pending response and as much buffered data as the
+        client's socket will accept, applying lag policy if the client
+        has fallen too far behind.
+
+        :param _Client client: client
+        """
+
+        blocked = False
+        try:
+            if client.out:
+                sent = client.sock.send(client.out)
+                client.out = client.out[sent:]
+                blocked = client.out != b""
+                if not blocked and client.close:
+                    self._disconnect(client)
+                    return
+            while client.streaming and not blocked and client.cursor < self._head:
+                start = client.cursor
+                if self._head - start > self._limit:
+                    if not self._lagging(client):
+                        return
+                    continue
+                pos = start % self._size
+                end = min(pos + self._head - start, self._size)
+                sent = client.sock.send(self._view[pos:end])
+                if self._head - start > self._size:  # overwritten while sending
+                    self._disconnect(client)
+                    return
+                client.cursor += sent
+                client.sent += sent
+                blocked = sent < end - pos
+        except BlockingIOError:
+            blocked = True
+        except OSError:
+            self._disconnect(client)
+            return
+        mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if blocked else 0)
+        if mask != client.mask:
+            client.mask = mask
+            self._selector.modify(client.sock, mask)
+
+    def _lagging(self, client: _Client) -> bool:
+        """
+        Apply lag policy to client which has fallen too far behind.
+
+        :param _Client client: client
+        :return: True if client is still connected
+        :rtype: bool
+        """
+
+        lag = self._head - client.cursor
+        if self._policy == LAG_DISCONNECT:
+            self.logger.info(f"Client {client.address} disconnected - lagging {lag}")
+            self._disconnect(client)
+            return False
+        self.logger.debug(f"Client {client.address} lagging - dropped {lag}")
+        client.dropped += lag
+        client.cursor = self._head  # skip to latest message boundary
+        return True
+
+    def _process_ntrip_request(self, data: bytes) -> tuple:
+        """
+        Process NTRIP client request.
+
+        :param bytes data: client request
+        :return: tuple of (start stream True/False, HTTP response)
+        :rtype: tuple
+        """
+
+        authorized = False
+        mountpoint = ""
+        for part in data.strip().split(b"\r\n"):
+            if part[0:21] == b"Authorization: Basic ":
+                authorized = part[21:].strip() == self._credentials
+            if part[0:3] == b"GET":
+                get = part.split(b" ")
+                if len(get) > 1:
+                    mountpoint = get[1].decode("utf-8", errors="backslashreplace")
+
+        dat = datetime.now(timezone.utc)
+        http_date = dat.strftime("%a, %d %b %Y %H:%M:%S %Z")
+        server = (
+            f"Server: {PYGPSMP.upper()}_NTRIP_Caster_{PYGNSSVERSION}"
+            f"/of:{dat.strftime('%d %b %Y')}\r\n"
+        )
+        if self.ntripversion == "1.0":
+            v2hdr = ""
+        else:
+            v2hdr = f"Ntrip-Version: Ntrip/2.0\r\n{server}"
+
+        if not authorized:
+            http = (
+                "HTTP/1.1 401 Unauthorized\r\n"
+                f"{v2hdr}"
+                f"Date: {http_date}\r\n"
+                f'WWW-Authenticate: Basic realm="{mountpoint}"\r\n'
+                "Connection: close\r\n\r\n"
+            )
+            return False, http.encode("utf-8")
+        if mountpoint == f"/{PYGPSMP}":  # RTCM3 data stream
+            if self.ntripversion == "1.0":
+                http = "ICY 200 OK\r\n\r\n"
+            else:
+                http = (
+                    "HTTP/1.1 200 OK\r\n"
+                    f"{v2hdr}"
+                    f"Date: {http_date}\r\n"
+                    "Cache-Control: no-store, no-cache, max-age=0\r\n"
+                    "Pragma: no-cache\r\n"
+                    "Connection: close\r\n"
+                    "Content-Type: gnss/data\r\n\r\n"
+                )
+            return True, http.encode("utf-8")
+
+        # otherwise respond with nominal sourcetable
+        lat, lon = self.latlon
+        ipaddr, port = self.server_address
+        pygu = PYGPSMP.upper()
+        rtm = ",".join(f"{key}({val})" for key, val in RTCMTYPES.items())
+        sourcetable = (
+            f"CAS;{ipaddr};{port};{PYGPSMP}/{PYGNSSVERSION};SEMU;0;GBR;{lat};{lon};"
+            "0.0.0.0;0;none\r\n"
+            f"NET;{pygu};SEMU;B;N;none;none;none;none\r\n"
+            f"STR;{PYGPSMP};{pygu};RTCM 3.3;{rtm};"
+            f"2;GPS+GLO+GAL+BDS;{pygu};GBR;{lat};{lon};0;0;{pygu};none;B;N;0;\r\n"
+            "ENDSOURCETABLE\r\n"
+        )
+        if self.ntripversion == "1.0":
+            status = "SOURCETABLE 200 OK\r\n"
+            ctype = "text/plain"
+        else:
+            status = "HTTP/1.1 200 OK\r\n"
+            ctype = "gnss/sourcetable"
+        http = (
+            f"{status}{v2hdr}"
+            f"Date: {http_date}\r\n"
+            "Connection: close\r\n"
+            f"Content-Type: {ctype}\r\n"
+            f"Content-Length: {len(sourcetable)}\r\n\r\n"
+            f"{sourcetable}"
+        )
+        return False, http.encode("utf-8")
+
+    @property
+    def connections(self) -> int:
+        """
+        Getter for number of connected clients.
+
+        :return: number of clients
+        :rtype: int
+        """
+
+        return len(self._clients)
+
+    @property
+    def clients(self) -> list:
+        """
+        Getter for per-client statistics.
+
+        :return: list of ClientStats
+        :rtype: list
+        """
+
+        now = monotonic()
+        stats = []
+        for client in list(self._clients.values()):
+            elapsed = now - client.start
+            stats.append(
+                ClientStats(
+                    client.address,
+                    elapsed,
+                    client.sent,
+                    client.sent / elapsed if elapsed > 0 else 0.0,
+                    self._head - client.cursor if client.streaming else 0,
+                    client.dropped,
+                )
+            )
+        return stats
+
+    @property
+    def ntripmode(self) -> int:
+        """
+        Getter for ntrip mode.
+
+        :return: 0 = open socket server, 1 = ntrip mode
+        :rtype: int
+        """
+
+        return self._ntripmode
+
+    @property
+    def latlon(self) -> tuple:
+        """
+        Get current lat / lon from receiver.
+
+        :return: tuple of (lat, lon)
+        :rtype: tuple
+        """
+
+        if hasattr(self.__app, "gnss_status"):
+            return (self.__app.gnss_status.lat, self.__app.gnss_status.lon)
+        return ("", "")
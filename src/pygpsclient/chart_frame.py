@@ -7,8 +7,9 @@ This emulates a 4-channel "oscilloscope", allowing the user to plot
 up to 4 named data attributes over time. X-axis and Y-axis scale and
 ranges are all configurable.
 
-Plot limited only by the number of data points that can be comfortably
-held in memory.
+Each channel's data is held in a fixed-capacity ring buffer of
+(time, value) samples, and is plotted as a single polyline per channel,
+decimated to the min/max values per pixel of chart width.
 
 Created on 24 Nov 2024
 
@@ -21,6 +22,7 @@ from random import choice
 from time import time
 from tkinter import (
     ALL,
+    HIDDEN,
     NE,
     NORMAL,
     NW,
@@ -48,6 +50,7 @@ from pygpsclient.globals import (
     AreaXY,
 )
 from pygpsclient.helpers import data2xy, fontheight, get_grid, scale_font, time2str
+from pygpsclient.ring_buffer import RingBuffer
 
 MAXCHANS = 4
 RESFONT = 28  # font size relative to widget size
@@ -134,10 +137,12 @@ class ChartviewFrame(Frame):
         self._fonth = 6
         self._xoff = 20  # chart X offset for labels
         self._yoff = 20  # chart Y offset for labels
-        self._chart_data = {}
         self._num_chans = self.chartsettings.get("numchn_n", MAXCHANS)
         if self._num_chans % 2:  # no channels must be even
             self._num_chans += 1
+        self._chart_data = [RingBuffer(DPTRANGE[2]) for _ in range(self._num_chans)]
+        self._plot_id = [None] * self._num_chans  # polyline canvas item ids
+        self._framesize = None  # size of currently drawn grid
         self._plotcols = PLOTCOLS
         self._font = self.__app.font_sm
         self._fonth = fontheight(self._font)
@@ -365,6 +370,27 @@ class ChartviewFrame(Frame):
             self.__app.configuration.set("chartsettings_d", cst)
         except (ValueError, TclError):
             pass
+        self.__app.update_needed_identities()
+
+    @property
+    def identities(self) -> set:
+        """
+        Getter for message identities plotted on chart.
+
+        :return: set of identities, or None if any configured
+            channel has no identity (i.e. may plot any message)
+        :rtype: set
+        """
+
+        idents = set()
+        for chn in range(self._num_chans):
+            if self._data_name[chn].get() == "":
+                continue
+            mid = self._data_id[chn].get()
+            if mid == "":
+                return None
+            idents.add(mid)
+        return idents
 
     def reset(self):
         """
@@ -388,10 +414,12 @@ class ChartviewFrame(Frame):
         Clear data.
         """
 
-        self._chart_data = {}
+        for buf in self._chart_data:
+            buf.clear()
         self._mintim = 1e20
         self._maxtim = 0
         self._can_chartview.delete(ALL)
+        self._framesize = None
         self.update_frame()
 
     def _valid_settings(self) -> bool:
@@ -415,13 +443,14 @@ class ChartviewFrame(Frame):
 
     def init_frame(self):
         """
-        Initialise spectrum chart.
+        Initialise chart grid and channel polylines.
         """
 
         w, h = self.width, self.height
         self._xoff = self._fonth * self._num_chans / 2 + 3  # chart X offset for labels
         self._yoff = self._fonth + 3  # chart Y offset for labels
         self._can_chartview.delete(ALL)
+        self._framesize = (w, h, self._fonth)
 
         # draw grid
         for i, p in enumerate(GRIDSTEPS):
@@ -435,6 +464,18 @@ class ChartviewFrame(Frame):
                 x, 0, x, h - self._yoff, fill=col, tags=AXISTAG
             )
 
+        for chn in range(self._num_chans):
+            self._plot_id[chn] = self._can_chartview.create_line(
+                0,
+                0,
+                0,
+                0,
+                fill=self._plotcols[chn],
+                width=PLOTWID,
+                state=HIDDEN,
+                tags=f"plot_{chn:1d}",
+            )
+
     def update_data(self, parsed_data: object):
         """
         Update chart data from parsed message.
@@ -448,8 +489,6 @@ class ChartviewFrame(Frame):
             maxpoints = DPTRANGE[2]  # 5000
 
         now = round(time(), 0)  # time to nearest second
-        if now not in self._chart_data:
-            self._chart_data[now] = {}
         for chn in range(self._num_chans):
             mid = self._data_id[chn].get()
             name = self._data_name[chn].get()
@@ -487,7 +526,11 @@ class ChartviewFrame(Frame):
                 else:
                     continue
 
-            self._chart_data[now][chn] = val
+            buf = self._chart_data[chn]
+            if buf.capacity != maxpoints:
+                buf.capacity = maxpoints
+            if val is not None:
+                buf.update(now, val)  # one sample per channel per second
 
             # update X axis (time) range
             self._mintim = min(now, self._mintim)
@@ -496,10 +539,6 @@ class ChartviewFrame(Frame):
             # flag if scaled value is out of range
             self.flag_outofrange(chn, val)
 
-        # limit number of data points
-        while len(self._chart_data) > maxpoints:
-            self._chart_data.pop(min(self._chart_data))
-
     def flag_outofrange(self, chn: int, val: float):
         """
         Flag if scaled value is over or under range.
@@ -535,21 +574,21 @@ class ChartviewFrame(Frame):
 
         self._update_plot(self._chart_data)
 
-    def _update_plot(self, data: dict):
+    def _update_plot(self, data: list):
         """
-        Update chart plot with data.
+        Update chart plot with data. The grid is only redrawn if the
+        chart has been resized; each channel's polyline is updated in place.
 
-        :param dict data: list of chart data
-        :param int xrange: number of points
+        :param list data: list of channel ring buffers
         """
 
         if not self._valid_settings():
             return
 
-        mintim = 1e20
-        maxtim = 0
         w, h = self.width, self.height
-        self.init_frame()
+        if self._framesize != (w, h, self._fonth):
+            self.init_frame()
+        plotw = w - self._xoff * 2
 
         # set default ranges for all channels
         minval = [CHARTMINY] * self._num_chans
@@ -566,8 +605,6 @@ class ChartviewFrame(Frame):
 
         # plot each channel's data points
         for chn in range(self._num_chans):
-
-            chncol = self._plotcols[chn]
             minval[chn] = float(self._data_miny[chn].get())
             maxval[chn] = float(self._data_maxy[chn].get())
             scale[chn] = float(self._data_scale[chn].get())
@@ -576,47 +613,22 @@ class ChartviewFrame(Frame):
             # draw Y axis (data value) labels for this channel
             self._draw_yaxis_labels(w, h, bounds, minval[chn], maxval[chn], chn)
 
-            # plot each data point in channel
-            inr = False
-            for tim, channels in data.items():
-                try:
-                    val = channels[chn]
-                except KeyError:
-                    val = None
-
-                if val is None:
-                    continue
-
+            # plot channel's data points, decimated to chart width,
+            # as a single polyline
+            coords = []
+            for tim, val in data[chn].decimate(mintim, maxtim, int(plotw)):
                 if scale[chn] != 1:
                     val /= scale[chn]  # scale data
-
                 # convert datapoint to canvas x,y coordinates
-                x, y = data2xy(
-                    w - self._xoff * 2,
-                    h - self._yoff,
-                    bounds,
-                    tim,
-                    val,
-                    self._xoff,
+                coords.extend(
+                    data2xy(plotw, h - self._yoff, bounds, tim, val, self._xoff)
                 )
-                if x <= self._xoff:
-                    inr = False
-                # plot line
-                if inr:
-                    x2, y2 = x, y
-                    self._can_chartview.create_line(
-                        x1,
-                        y1,
-                        x2,
-                        y2,
-                        fill=chncol,
-                        width=PLOTWID,
-                        tags=f"plot_{chn:1d}",
-                    )
-                    x1, y1 = x2, y2
-                else:
-                    x1, y1 = max(x, self._xoff), y
-                inr = True
+            if len(coords) < 4:  # need at least 2 points for a line
+                self._can_chartview.itemconfigure(self._plot_id[chn], state=HIDDEN)
+            else:
+                self._can_chartview.coords(self._plot_id[chn], coords)
+                self._can_chartview.itemconfigure(self._plot_id[chn], state=NORMAL)
+            self._can_chartview.tag_raise(self._plot_id[chn])
 
     def _draw_xaxis_labels(
         self, w: int, h: int, bounds: AreaXY, mintim: float, maxtim: float
@@ -713,6 +725,7 @@ class ChartviewFrame(Frame):
         w, h = self.width, self.height
 
         self._can_chartview.delete(ALL)
+        self._framesize = None
         self._can_chartview.create_text(
             w / 2,
             h / 2,
@@ -733,8 +746,14 @@ class ChartviewFrame(Frame):
             f"PyGPSClient Chart Data,{time2str(time(),'%Y-%m-%d-%H:%M:%S')},"
             f"Channels,{self._num_chans}\n"
         )
+        # collate channel samples by timestamp
+        rows = {}
+        for chn, buf in enumerate(self._chart_data):
+            for tim, val in buf.items():
+                rows.setdefault(tim, {})[chn] = val
         hdr = True
-        for tim, data in self._chart_data.items():
+        for tim in sorted(rows):
+            data = rows[tim]
             if hdr:
                 csv += "Timestamp"
                 for chn in range(self._num_chans):
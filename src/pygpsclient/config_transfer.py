@@ -0,0 +1,361 @@
+"""
+config_transfer.py
+
+Pipelined configuration transfer engine for PyGPSClient application.
+
+Sends a list of configuration commands to the receiver on a background
+thread, keeping up to `window` commands outstanding at any one time
+rather than waiting a fixed interval after each one, so a transfer
+completes as quickly as the receiver can acknowledge it:
+
+ - UBX CFG SET commands are matched against ACK-ACK / ACK-NAK
+   acknowledgements on message class and ID, and Quectel PQTM commands
+   against `$PQTMxxx,OK` / `$PQTMxxx,ERROR` responses on message ID.
+   The protocol handlers pass all acknowledgements to `acknowledge()`;
+   any which do not match an outstanding command (e.g. those for
+   commands sent from a configuration dialog) are ignored.
+ - a command which is not acknowledged within `timeout` seconds is
+   resent, up to `retries` times, before being counted as failed.
+ - commands which are never acknowledged (e.g. TTY strings, raw bytes,
+   receiver resets) act as barriers - they are sent only once all
+   outstanding commands have been acknowledged, and are followed by a
+   fixed pacing delay.
+
+Progress is reported to an optional callback as a `TransferStatus`.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import logging
+from collections import namedtuple
+from queue import Empty, Queue
+from threading import Condition, Event, Thread
+from time import monotonic
+from typing import Callable
+
+from pynmeagps import NMEAMessage
+from pyubx2 import SET, UBXMessage
+
+from pygpsclient.globals import ASCII, BSR
+
+ACK_RETRIES = 2  # number of times unacknowledged command is resent
+ACK_TIMEOUT = 1.0  # seconds to wait for acknowledgement
+PACE_DELAY = 0.01  # delay after unacknowledged commands in seconds
+PROGRESS_INTERVAL = 0.1  # min interval between progress callbacks in seconds
+TRANSFER_WINDOW = 8  # max number of commands awaiting acknowledgement
+QTM_NOACK = ("QTMSRR", "QTMCOLD", "QTMWARM", "QTMHOT", "QTMVER")
+"""Quectel commands which restart the receiver or are not acknowledged"""
+UBX_CFG = b"\x06"
+UBX_CFG_RST = b"\x04"
+
+TransferStatus = namedtuple(
+    "TransferStatus",
+    ("total", "sent", "acked", "naked", "failed", "retries", "elapsed", "done"),
+)
+"""
+Configuration transfer progress. `sent` counts commands sent at least
+once, `elapsed` is in seconds, `done` is True when the transfer has
+finished or been cancelled.
+"""
+
+
+def ack_key(cmd: object) -> tuple:
+    """
+    Get key identifying the acknowledgement expected for a command.
+
+    :param object cmd: UBXMessage, NMEAMessage, str or bytes
+    :return: key, or None if command is not acknowledged
+    :rtype: tuple
+    """
+
+    if isinstance(cmd, UBXMessage):
+        if cmd.msg_cls == UBX_CFG and cmd.msgmode == SET and cmd.msg_id != UBX_CFG_RST:
+            return ("UBX", cmd.msg_cls[0], cmd.msg_id[0])
+    elif isinstance(cmd, NMEAMessage):
+        if cmd.talker == "P" and cmd.msgID[0:3] == "QTM" and cmd.msgID not in QTM_NOACK:
+            return ("QTM", cmd.msgID)
+    return None
+
+
+class Transfer:
+    """
+    Single configuration transfer, as returned by `ConfigTransfer.send()`.
+    """
+
+    def __init__(self, cmds: list, callback: Callable, delay: float):
+        """
+        Constructor.
+
+        :param list cmds: list of UBXMessage, NMEAMessage, str or bytes
+        :param Callable callback: progress callback taking TransferStatus
+        :param float delay: delay after unacknowledged commands in seconds
+        """
+
+        self.cmds = list(cmds)
+        self.callback = callback
+        self.delay = delay
+        self.cancelled = Event()
+        self.finished = Event()
+        self.start = None  # monotonic time transfer started
+        self.sent = self.acked = self.naked = self.failed = self.retries = 0
+
+    def cancel(self):
+        """
+        Cancel transfer. Commands already sent are not recalled.
+        """
+
+        self.cancelled.set()
+
+    @property
+    def status(self) -> TransferStatus:
+        """
+        Getter for transfer progress.
+
+        :return: progress
+        :rtype: TransferStatus
+        """
+
+        return TransferStatus(
+            len(self.cmds),
+            self.sent,
+            self.acked,
+            self.naked,
+            self.failed,
+            self.retries,
+            0.0 if self.start is None else monotonic() - self.start,
+            self.finished.is_set(),
+        )
+
+
+class ConfigTransfer:
+    """
+    Pipelined configuration transfer engine class.
+    """
+
+    def __init__(
+        self,
+        app,
+        window: int = TRANSFER_WINDOW,
+        timeout: float = ACK_TIMEOUT,
+        retries: int = ACK_RETRIES,
+    ):
+        """
+        Constructor.
+
+        :param Frame app: reference to main tkinter application
+        :param int window: max number of commands awaiting acknowledgement
+        :param float timeout: seconds to wait for acknowledgement
+        :param int retries: number of times unacknowledged command is resent
+        """
+
+        self.__app = app  # Reference to main application class
+        self.logger = logging.getLogger(__name__)
+        self._window = max(window, 1)
+        self._timeout = timeout
+        self._retries = retries
+        self._jobs = Queue()
+        self._cond = Condition()
+        self._outstanding = {}  # index: [ack key, deadline, attempts], in send order
+        self._current = None
+        self._thread = None
+
+    def send(
+        self, cmds: list, callback: Callable = None, delay: float = PACE_DELAY
+    ) -> Transfer:
+        """
+        Queue commands for transfer to receiver. Transfers are
+        processed one at a time, in the order they were queued.
+
+        The callback is invoked on the transfer thread.
+
+        :param list cmds: list of UBXMessage, NMEAMessage, str or bytes
+        :param Callable callback: progress callback taking TransferStatus
+        :param float delay: delay after unacknowledged commands in seconds
+        :return: transfer
+        :rtype: Transfer
+        """
+
+        transfer = Transfer(cmds, callback, delay)
+        self._jobs.put(transfer)
+        if self._thread is None:
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return transfer
+
+    def acknowledge(self, msg: object):
+        """
+        Match acknowledgement from receiver against the oldest
+        outstanding command with the same message class and ID
+        (UBX) or message ID (PQTM). Acknowledgements which do not
+        match any outstanding command are ignored.
+
+        :param object msg: parsed UBX ACK-ACK/ACK-NAK or Quectel PQTM response
+        """
+
+        if isinstance(msg, UBXMessage):
+            if msg.identity not in ("ACK-ACK", "ACK-NAK"):
+                return
+            key = ("UBX", msg.clsID, msg.msgID)
+            ok = msg.identity == "ACK-ACK"
+        elif isinstance(msg, NMEAMessage) and getattr(msg, "status", None) in (
+            "OK",
+            "ERROR",
+        ):
+            key = ("QTM", msg.msgID)
+            ok = msg.status == "OK"
+        else:
+            return
+
+        with self._cond:
+            transfer = self._current
+            if transfer is None:
+                return
+            for idx, (ackkey, _, _) in self._outstanding.items():
+                if ackkey == key:
+                    del self._outstanding[idx]
+                    if ok:
+                        transfer.acked += 1
+                    else:
+                        transfer.naked += 1
+                        self.logger.debug(f"Command {idx} rejected {msg.identity}")
+                    self._cond.notify()
+                    break
+
+    def _send(self, cmd: object):
+        """
+        Send command to receiver.
+
+        :param object cmd: UBXMessage, NMEAMessage, str or bytes
+        """
+
+        if isinstance(cmd, (UBXMessage, NMEAMessage)):
+            cmd = cmd.serialize()
+        elif isinstance(cmd, str):  # TTY ASCII string
+            cmd = cmd.encode(ASCII, errors=BSR)
+        self.__app.send_to_device(cmd)
+
+    def _run(self):
+        """
+        THREADED
+        Process queued transfers.
+        """
+
+        while True:
+            transfer = self._jobs.get()
+            with self._cond:
+                self._current = transfer
+                self._outstanding = {}
+            transfer.start = monotonic()
+            try:
+                self._transfer(transfer)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.logger.error(f"Configuration transfer error {err}")
+            finally:
+                with self._cond:
+                    transfer.failed += len(self._outstanding)
+                    self._outstanding = {}
+                    self._current = None
+                self._finish(transfer)
+
+    @staticmethod
+    def _finish(transfer: Transfer):
+        """
+        Mark transfer as finished and report final progress.
+
+        :param Transfer transfer: transfer
+        """
+
+        transfer.finished.set()
+        if transfer.callback is not None:
+            transfer.callback(transfer.status)
+
+    def _transfer(self, transfer: Transfer):
+        """
+        Send commands, keeping up to `window` commands awaiting
+        acknowledgement, resending any which time out.
+
+        :param Transfer transfer: transfer
+        """
+
+        cmds = transfer.cmds
+        nxt = 0
+        lastreport = 0
+        cond = self._cond
+        while not transfer.cancelled.is_set():
+            now = monotonic()
+            with cond:
+                # resend or abandon commands whose acknowledgement has timed out
+                for idx, entry in list(self._outstanding.items()):
+                    if entry[1] > now:
+                        break  # entries are in deadline order
+                    del self._outstanding[idx]
+                    if entry[2] > self._retries:
+                        transfer.failed += 1
+                        self.logger.debug(f"Command {idx} not acknowledged")
+                        continue
+                    self._outstanding[idx] = [
+                        entry[0],
+                        now + self._timeout,
+                        entry[2] + 1,
+                    ]
+                    transfer.retries += 1
+                    self._send(cmds[idx])
+                outstanding = len(self._outstanding)
+                if nxt == len(cmds) and outstanding == 0:
+                    break
+                key = ack_key(cmds[nxt]) if nxt < len(cmds) else None
+                cansend = nxt < len(cmds) and (
+                    outstanding < self._window
+                    if key is not None
+                    else outstanding == 0  # barrier
+                )
+                if cansend and key is not None:
+                    self._outstanding[nxt] = [key, now + self._timeout, 1]
+                    transfer.sent += 1
+                    self._send(cmds[nxt])
+                    nxt += 1
+                elif not cansend:
+                    deadline = min(e[1] for e in self._outstanding.values())
+                    cond.wait(max(deadline - now, 0))
+            if cansend and key is None:
+                self._send(cmds[nxt])
+                transfer.sent += 1
+                nxt += 1
+                transfer.cancelled.wait(transfer.delay)
+            if transfer.callback is not None and (
+                monotonic() - lastreport >= PROGRESS_INTERVAL
+            ):
+                lastreport = monotonic()
+                transfer.callback(transfer.status)
+
+    def cancel(self):
+        """
+        Cancel current and queued transfers.
+        """
+
+        while True:
+            try:
+                transfer = self._jobs.get_nowait()
+            except Empty:
+                break
+            transfer.cancel()
+            self._finish(transfer)
+        with self._cond:
+            if self._current is not None:
+                self._current.cancel()
+            self._cond.notify()
+
+    @property
+    def busy(self) -> bool:
+        """
+        Getter for transfer in progress.
+
+        :return: True if transfer in progress or queued
+        :rtype: bool
+        """
+
+        return self._current is not None or not self._jobs.empty()
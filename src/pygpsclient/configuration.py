@@ -3,6 +3,13 @@ configuration.py
 
 Class holding all PyGPSClient configuration settings.
 
+Hot-path code (e.g. per-message processing) should read settings via
+`snapshot()`, an immutable named tuple of all settings whose names are
+valid identifiers, which is only rebuilt after a setting has changed.
+Code which maintains caches derived from particular settings (compiled
+filters, formatters, buffers, etc.) can register a callback via
+`watch()` to be told when those settings change.
+
 Created on 18 Apr 2025
 
 :author: semuadmin (Steve Smith)
@@ -11,13 +18,21 @@ Created on 18 Apr 2025
 """
 
 import logging
+from collections import namedtuple
+from keyword import iskeyword
 from os import getenv
+from threading import Lock
+from typing import Callable
 
 from pyubx2 import GET
 from serial import PARITY_NONE
 
 from pygpsclient.globals import (
     CUSTOM,
+    D9S_PP_EU,
+    DB_BATCH_INTERVAL,
+    DB_BATCH_SIZE,
+    DB_SYNCHRONOUS,
     DDD,
     DEFAULT_PASSWORD,
     DEFAULT_REGION,
@@ -25,27 +40,38 @@ from pygpsclient.globals import (
     FORMAT_BINARY,
     FORMAT_PARSED,
     GUI_UPDATE_INTERVAL,
+    LOG_COMPRESS,
+    LOG_FLUSH_INTERVAL,
+    LOG_FLUSH_SIZE,
+    LOG_MAXSIZE,
+    LOG_ROTATE_PERIOD,
     MIN_GUI_UPDATE_INTERVAL,
     MQTTIPMODE,
+    PARSE_WORKERS,
     PASSTHRU,
     RCVR_CONNECTION,
+    READ_BATCH_INTERVAL,
+    READ_BATCH_SIZE,
+    SAT_HISTORY,
     SOCKCLIENT_HOST,
     SOCKCLIENT_PORT,
+    SOCKSERVER_BUFSIZE,
     SOCKSERVER_HOST,
+    SOCKSERVER_MAX_CLIENTS,
     SOCKSERVER_NTRIP_PORT,
     SOCKSERVER_PORT,
     SPARTN_BASEDATE_CURRENT,
     SPARTN_DEFAULT_KEY,
     SPARTN_OUTPORT,
     SPARTN_PPSERVER_URL,
+    TILE_CACHE_SIZE,
     TRACK,
     UMM,
     WORLD,
     ZED_F9,
 )
 from pygpsclient.mapquest import MAP_UPDATE_INTERVAL
-from pygpsclient.spartn_lband_frame import D9S_PP_EU as D9S_PP
-from pygpsclient.widget_state import VISIBLE
+from pygpsclient.widget_defs import VISIBLE
 
 
 class Configuration:
@@ -82,6 +108,11 @@ class Configuration:
             "transient_dialog_b": 1,  # whether pop-up dialogs are on top of main app window
             "guiupdateinterval_f": GUI_UPDATE_INTERVAL,  # GUI widget update interval in seconds
             "mapupdateinterval_n": MAP_UPDATE_INTERVAL,
+            "readbatchinterval_f": READ_BATCH_INTERVAL,  # min interval between stream read events in seconds
+            "readbatchsize_n": READ_BATCH_SIZE,  # max messages queued before read event forced
+            "parseworkers_n": PARSE_WORKERS,  # number of parse worker processes (0 = none)
+            "lazyparse_b": 0,  # only fully decode message identities in use
+            "asyncingest_b": 0,  # read serial & socket streams on shared asyncio loop
             "defaultport_s": RCVR_CONNECTION,
             "protocol_n": 15,
             "nmeaprot_b": 1,
@@ -106,16 +137,30 @@ class Configuration:
             "gpxmapzoom_n": 10,
             "gpxtype_s": TRACK,
             "mqapikey_s": "<=== YOUR MAPQUEST API KEY  ===>",
+            "tilepath_s": "",  # map tile cache directory ("" = home/pygpsclient_tiles)
+            "tileurl_s": "",  # map tile server URL template ("" = offline only)
+            "tileseedpath_s": "",  # local tile directory to pre-seed cache from
+            "tilecachesize_n": TILE_CACHE_SIZE,  # max decoded map tiles held in memory
             "showtrack_b": 0,
             "legend_b": 1,
             "unusedsat_b": 0,
+            "sathistory_n": SAT_HISTORY,  # satellite history retention in seconds (0 = none)
             "datalog_b": 0,
             "logformat_s": FORMAT_BINARY,
             "logpath_s": "",
+            "logflushinterval_f": LOG_FLUSH_INTERVAL,  # max interval between log writes in seconds
+            "logflushsize_n": LOG_FLUSH_SIZE,  # bytes buffered before log write forced
+            "logmaxsize_n": LOG_MAXSIZE,  # log file size before rotation (0 = none)
+            "logrotateperiod_n": LOG_ROTATE_PERIOD,  # log rotation period in seconds (0 = none)
+            "logcompress_s": LOG_COMPRESS,  # compress rotated log files "", "gzip" or "zstd"
             "recordtrack_b": 0,
             "trackpath_s": "",
             "database_b": 0,
             "databasepath_s": "",
+            "databaseepoch_b": 0,  # record every navigation epoch (else every GUI update)
+            "databasebatchsize_n": DB_BATCH_SIZE,  # max rows per database commit
+            "databasebatchinterval_f": DB_BATCH_INTERVAL,  # max interval between commits in seconds
+            "databasesynchronous_s": DB_SYNCHRONOUS,  # OFF, NORMAL, FULL or EXTRA
             # serial port settings from frm_serial
             "serialport_s": "/dev/ttyACM0",
             "bpsrate_n": 9600,
@@ -138,6 +183,9 @@ class Configuration:
             "sockhost_s": SOCKSERVER_HOST,
             "sockport_n": SOCKSERVER_PORT,
             "sockmode_b": 0,
+            "sockmaxclients_n": SOCKSERVER_MAX_CLIENTS,
+            "sockbuffersize_n": SOCKSERVER_BUFSIZE,
+            "socklagpolicy_s": "drop",
             "ntripcasterbasemode_s": "SURVEY IN",
             "ntripcasterrcvrtype_s": ZED_F9,
             "ntripcasteracclimit_f": 100.0,
@@ -195,15 +243,15 @@ class Configuration:
             "lbandclienttimeout_f": 0.1,
             "lbandclientmsgmode_n": GET,
             "lbandclientinactivity_timeout_n": 0,
-            "lbandclientfreq_n": D9S_PP["freq"],
-            "lbandclientschwin_n": D9S_PP["schwin"],
-            "lbandclientsid_n": D9S_PP["sid"],
+            "lbandclientfreq_n": D9S_PP_EU["freq"],
+            "lbandclientschwin_n": D9S_PP_EU["schwin"],
+            "lbandclientsid_n": D9S_PP_EU["sid"],
             "lbandclientdrat_n": 2400,
             "lbandclientusesid_b": 0,
             "lbandclientdescrm_b": 1,
             "lbandclientprescrm_b": 0,
-            "lbandclientdescrminit_n": D9S_PP["descrminit"],
-            "lbandclientunqword_s": D9S_PP["unqword"],
+            "lbandclientdescrminit_n": D9S_PP_EU["descrminit"],
+            "lbandclientunqword_s": D9S_PP_EU["unqword"],
             "lbandclientoutport_s": PASSTHRU,
             "lbandclientdebug_b": 0,
             "scattersettings_d": {
@@ -225,7 +273,15 @@ class Configuration:
             "ttypresets_l": [],
             "usermaps_l": [],
             "colortags_l": [],
+            "devices_l": [],
         }
+        self._fields = tuple(
+            key for key in self._settings if key.isidentifier() and not iskeyword(key)
+        )
+        self._snapclass = namedtuple("ConfigSnapshot", self._fields)
+        self._snapshot = None
+        self._lock = Lock()
+        self._callbacks = {}  # setting name: list of change callbacks
 
     def loadfile(self, filename: str = None) -> tuple:
         """
@@ -299,15 +355,29 @@ class Configuration:
 
     def set(self, name: str, value: object):
         """
-        Set individual value.
+        Set individual value. If the value has changed, the settings
+        snapshot is invalidated and any callbacks watching the setting
+        are invoked (on the calling thread) with the setting name and
+        new value. Dict and list values are always treated as changed,
+        as they may have been updated in place.
 
         :param str name: name of setting
         :param object value: value of setting
         :raises: KeyError if setting does not exist
         """
 
-        _ = self.settings[name]
-        self.settings[name] = value
+        old = self.settings[name]
+        if (
+            type(old) is type(value)
+            and old == value
+            and not isinstance(value, (dict, list))
+        ):
+            return
+        with self._lock:
+            self.settings[name] = value
+            self._snapshot = None
+        for callback in self._callbacks.get(name, ()):
+            callback(name, value)
         # self.logger.debug(f"{name=} {value=}")
 
     def get(self, name: str) -> object:
@@ -322,6 +392,40 @@ class Configuration:
 
         return self.settings[name]
 
+    def snapshot(self) -> tuple:
+        """
+        Get immutable snapshot of settings, with each setting available
+        as an attribute e.g. `snapshot().protocol_n`. The snapshot is
+        cached until a setting changes. Dict and list values are shared
+        with the live settings rather than copied.
+
+        Settings whose names are not valid identifiers (e.g. widget
+        visibility entries such as "Chart Plot") are omitted.
+
+        :return: snapshot
+        :rtype: ConfigSnapshot
+        """
+
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                settings = self._settings
+                snap = self._snapclass._make(settings[key] for key in self._fields)
+                self._snapshot = snap
+        return snap
+
+    def watch(self, name: str, callback: Callable):
+        """
+        Register callback to be invoked whenever a setting changes.
+
+        :param str name: name of setting
+        :param Callable callback: callback taking setting name and new value
+        :raises: KeyError if setting does not exist
+        """
+
+        _ = self.settings[name]
+        self._callbacks.setdefault(name, []).append(callback)
+
     @property
     def settings(self) -> dict:
         """
@@ -5,6 +5,11 @@ Console frame class for PyGPSClient application.
 
 This handles a scrollable text box into which the serial data is printed.
 
+The console is virtualized - incoming messages are held in a bounded
+deque of records, and only those records which are actually visible in
+the text box are formatted and rendered. Color tagging is applied to
+the rendered text in a single compiled regex pass.
+
 *** Remember that tcl indices look like floats but they're not! ***
 ("1.0:, "2.0") signifies "from the first character in
 line 1 (inclusive) to the first character in line 2 (exclusive)"
@@ -17,7 +22,11 @@ Created on 12 Sep 2020
 :license: BSD 3-Clause
 """
 
+import re
+from collections import deque
+from itertools import islice
 from tkinter import END, HORIZONTAL, NONE, VERTICAL, E, Frame, N, S, Scrollbar, Text, W
+from tkinter.font import nametofont
 
 from pyubx2 import hextable
 
@@ -38,6 +47,7 @@ from pygpsclient.strings import HALTTAGWARN
 
 HALT = "HALT"
 CONSOLELINES = 20
+WHEELSTEP = 3  # records scrolled per mouse wheel click
 
 
 class ConsoleFrame(Frame):
@@ -62,11 +72,21 @@ class ConsoleFrame(Frame):
         def_w, def_h = WIDGETU3
         self.width = kwargs.get("width", def_w)
         self.height = kwargs.get("height", def_h)
-        self._colortags = self.__app.configuration.get("colortags_l")
+        self._records = deque(maxlen=self.__app.configuration.get("maxlines_n"))
+        self._seq = 0  # total number of records received
+        self._top = None  # sequence no. of top visible record, None = follow tail
+        self._shown = (0, 0)  # sequence nos. of first and last+1 rendered records
+        self._rendered = None  # state of last render
+        self._consoleformat = None
+        self._tagre = self._haltre = None
+        self._tagnames = {}
         self._body()
         self._do_layout()
         self._attach_events()
         self._halt = ""
+        self._set_colortags("colortags_l", self.__app.configuration.get("colortags_l"))
+        self.__app.configuration.watch("colortags_l", self._set_colortags)
+        self.__app.configuration.watch("maxlines_n", self._set_maxlines)
 
     def _body(self):
         """
@@ -92,17 +112,54 @@ class ConsoleFrame(Frame):
             height=15,
         )
         self.sblogh.config(command=self.txt_console.xview)
-        self.sblogv.config(command=self.txt_console.yview)
+        self.sblogv.config(command=self._on_scroll)
 
         # making the textbox read only and fixed width font
         self.txt_console.configure(state="disabled")
 
-        # set up color tagging
-        for match, color in self._colortags:
-            if color == HALT:
+    def _set_colortags(
+        self, name: str, colortags: list
+    ):  # pylint: disable=unused-argument
+        """
+        Set up color tagging, compiling all search terms into a single
+        regex. Called on initialisation and whenever color tags change.
+
+        :param str name: setting name
+        :param list colortags: list of [string, color] pairs
+        """
+
+        for tag in self._tagnames.values():
+            self.txt_console.tag_delete(tag)
+        self._tagnames = {}
+        self._tagre = self._haltre = None
+        self._rendered = None  # force re-render with new tags
+        halts = []
+        for match, color in colortags:
+            if color.upper() == HALT:  # "HALT" tag terminates stream
+                halts.append(match)
+                self._tagnames[match] = HALT
                 color = ERRCOL
-                match = HALT
-            self.txt_console.tag_config(match, foreground=color)
+            else:
+                self._tagnames[match] = match
+            self.txt_console.tag_config(self._tagnames[match], foreground=color)
+        # longest terms first so that overlapping terms match the longer term
+        terms = sorted(self._tagnames, key=len, reverse=True)
+        if terms:
+            self._tagre = re.compile("|".join(re.escape(t) for t in terms))
+        if halts:
+            self._haltre = re.compile("|".join(re.escape(t) for t in halts))
+
+    def _set_maxlines(
+        self, name: str, maxlines: int
+    ):  # pylint: disable=unused-argument
+        """
+        Resize console record buffer when maximum lines setting changes.
+
+        :param str name: setting name
+        :param int maxlines: max number of records retained
+        """
+
+        self._records = deque(self._records, maxlen=maxlines)
 
     def _do_layout(self):
         """
@@ -119,6 +176,10 @@ class ConsoleFrame(Frame):
         """
 
         self.bind("<Configure>", self._on_resize)
+        self.txt_console.bind("<Configure>", self._on_render)
+        self.txt_console.bind("<MouseWheel>", self._on_wheel)
+        self.txt_console.bind("<Button-4>", self._on_wheel)
+        self.txt_console.bind("<Button-5>", self._on_wheel)
         self.txt_console.bind("<Double-Button-1>", self._on_clipboard)
         self.txt_console.bind("<Double-Button-2>", self._on_clipboard)
         self.txt_console.bind("<Double-Button-3>", self._on_clipboard)
@@ -129,86 +190,201 @@ class ConsoleFrame(Frame):
         Print the latest data stream to the console in raw (NMEA) or
         parsed (key,value pair) format.
 
-        'maxlines' defines the maximum number of scrollable lines that are
-        retained in the text box on a FIFO basis.
+        'maxlines' defines the maximum number of scrollable records that are
+        retained in the console on a FIFO basis.
 
         :param list consoledata: list of tuples (raw, parsed, marker) \
             accumulated since last console update
         """
 
-        con = self.txt_console
-        consoleformat = self.__app.configuration.get("consoleformat_s")
-        colortagging = self.__app.configuration.get("colortag_b")
-        maxlines = self.__app.configuration.get("maxlines_n")
-        autoscroll = self.__app.configuration.get("autoscroll_b")
+        cfg = self.__app.configuration.snapshot()
+        # record is [raw, parsed, marker, formatted text, format of text]
+        self._records.extend(
+            [raw, prs, mrk, None, None] for raw, prs, mrk in consoledata
+        )
+        self._seq += len(consoledata)
+
         self._halt = ""
-        consolestr = ""
-        con.configure(font=FONT_TEXT)
-        for raw_data, parsed_data, marker in consoledata:
-            if consoleformat == FORMAT_BINARY:
-                data = f"{marker}{raw_data}".strip("\n")
-            elif consoleformat == FORMAT_HEXSTR:
-                data = f"{marker}{raw_data.hex()}"
-            elif consoleformat == FORMAT_HEXTAB:
-                con.configure(font=FONT_FIXED)
-                data = hextable(raw_data)
-            elif consoleformat == FORMAT_BOTH:
-                con.configure(font=FONT_FIXED)
-                data = f"{marker}{parsed_data}\n{hextable(raw_data)}"
-            else:
-                data = f"{marker}{parsed_data}"
-            consolestr += data + "\n"
+        if cfg.colortag_b and self._haltre is not None:
+            consoleformat = cfg.consoleformat_s
+            for rec in islice(
+                self._records, max(0, len(self._records) - len(consoledata)), None
+            ):
+                match = self._haltre.search(self._format(rec, consoleformat))
+                if match is not None:
+                    self._halt = match.group()
+                    break
+
+        if cfg.autoscroll_b:
+            self._top = None
+        self._render()
+        if self._halt != "":
+            self._on_halt(None)
+
+    def _format(self, record: list, consoleformat: str) -> str:
+        """
+        Format console record, caching the formatted text in the record.
 
-        numlinesbefore = self.numlines
-        con.configure(state="normal")
-        con.insert(END, consolestr)
+        :param list record: console record
+        :param str consoleformat: console format
+        :return: formatted text
+        :rtype: str
+        """
 
-        if colortagging:
-            self._tag_line(con, numlinesbefore, self.numlines)
-            if self._halt != "":
-                self._on_halt(None)
+        if record[4] == consoleformat:
+            return record[3]
+        raw_data, parsed_data, marker = record[0:3]
+        if consoleformat == FORMAT_BINARY:
+            data = f"{marker}{raw_data}".strip("\n")
+        elif consoleformat == FORMAT_HEXSTR:
+            data = f"{marker}{raw_data.hex()}"
+        elif consoleformat == FORMAT_HEXTAB:
+            data = hextable(raw_data)
+        elif consoleformat == FORMAT_BOTH:
+            data = f"{marker}{parsed_data}\n{hextable(raw_data)}"
+        else:
+            data = f"{marker}{parsed_data}"
+        record[3] = data
+        record[4] = consoleformat
+        return data
+
+    def _visible_lines(self) -> int:
+        """
+        Get number of text lines visible in console.
 
-        while self.numlines > maxlines:
-            con.delete("1.0", "2.0")  # delete top line
+        :return: number of lines
+        :rtype: int
+        """
+
+        con = self.txt_console
+        linespace = nametofont(con.cget("font")).metrics("linespace")
+        return max(con.winfo_height() // max(linespace, 1), 1)
 
-        if autoscroll:
-            con.see("end")
+    def _render(self):
+        """
+        Render visible console records into text box, starting either
+        at the top record (if scrolled) or so as to show the latest records.
+        """
+
+        con = self.txt_console
+        cfg = self.__app.configuration.snapshot()
+        consoleformat = cfg.consoleformat_s
+        colortagging = cfg.colortag_b
+        if consoleformat != self._consoleformat:
+            con.configure(
+                font=(
+                    FONT_FIXED
+                    if consoleformat in (FORMAT_HEXTAB, FORMAT_BOTH)
+                    else FONT_TEXT
+                )
+            )
+            self._consoleformat = consoleformat
+        numrecs = len(self._records)
+        base = self._seq - numrecs  # sequence no. of oldest retained record
+        maxlines = self._visible_lines()
+
+        # find range of records which fill the visible lines
+        texts = []
+        lines = 0
+        if self._top is None:
+            end = numrecs
+            for rec in islice(reversed(self._records), 0, maxlines):
+                if lines >= maxlines:
+                    break
+                texts.append(self._format(rec, consoleformat))
+                lines += texts[-1].count("\n") + 1
+            texts.reverse()
+            start = end - len(texts)
+        else:
+            start = min(max(self._top - base, 0), max(numrecs - 1, 0))
+            for rec in islice(self._records, start, start + maxlines):
+                if lines >= maxlines:
+                    break
+                texts.append(self._format(rec, consoleformat))
+                lines += texts[-1].count("\n") + 1
+            end = start + len(texts)
+        self._shown = (base + start, base + end)
+
+        if numrecs:
+            self.sblogv.set(start / numrecs, end / numrecs)
+        else:
+            self.sblogv.set(0, 1)
+        state = (self._shown, consoleformat, colortagging, maxlines)
+        if state == self._rendered:
+            return
+        self._rendered = state
+
+        text = "\n".join(texts)
+        con.configure(state="normal")
+        con.delete("1.0", END)
+        con.insert(END, text)
+        if colortagging and self._tagre is not None:
+            for match in self._tagre.finditer(text):
+                con.tag_add(
+                    self._tagnames[match.group()],
+                    f"1.0+{match.start()}c",
+                    f"1.0+{match.end()}c",
+                )
         con.configure(state="disabled")
-        self.update_idletasks()
 
-    def _tag_line(self, con, startline: int, endline: int):
+    def _on_render(self, event):  # pylint: disable=unused-argument
+        """
+        Re-render console e.g. after resize.
+
+        :param event event: configure event
         """
-        Highlights any occurrence of tags in line - each tag
-        must be a tuple of (search term, highlight color)
 
-        :param object con: console textbox
-        :param int startline: starting line
-        :param int endline: ending line
-        :param str string: string in console
+        self._rendered = None
+        self._render()
 
+    def _on_scroll(self, *args):
         """
+        Scroll console records in response to scrollbar command.
 
-        for lineidx in range(startline - 1, endline):
-            for match, color in self._colortags:
-                line = con.get(f"{lineidx}.0", END)
-                start = line.find(match)
-                end = start + len(match)
-                if start != -1:  # If search string found in line
-                    if color.upper() == HALT:  # "HALT" tag terminates stream
-                        self._halt = match
-                        match = HALT
-                    con.tag_add(match, f"{lineidx}.{start}", f"{lineidx}.{end}")
+        :param args: ("moveto", fraction) or ("scroll", number, "units"|"pages")
+        """
+
+        numrecs = len(self._records)
+        if numrecs == 0:
+            return
+        base = self._seq - numrecs
+        if args[0] == "moveto":
+            top = base + int(float(args[1]) * numrecs)
+        else:
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(self._shown[1] - self._shown[0] - 1, 1)
+            top = self._shown[0] + step
+        # don't scroll beyond the point where the last page is showing
+        lastpage = self._seq - max(self._shown[1] - self._shown[0], 1)
+        self._top = min(max(top, base), max(lastpage, base))
+        self._render()
+
+    def _on_wheel(self, event) -> str:
+        """
+        Scroll console records in response to mouse wheel.
+
+        :param event event: mouse wheel event
+        :return: "break" to suppress default text widget scrolling
+        :rtype: str
+        """
+
+        if event.num == 4 or event.delta > 0:
+            self._on_scroll("scroll", -WHEELSTEP, "units")
+        else:
+            self._on_scroll("scroll", WHEELSTEP, "units")
+        return "break"
 
     @property
     def numlines(self) -> int:
         """
-        Get number of lines in console.
+        Get number of records retained in console.
 
-        :return: nmber of lines
+        :return: number of records
         :type: int
         """
 
-        return int(self.txt_console.index("end-1c").split(".", 1)[0])
+        return len(self._records)
 
     def _on_halt(self, event):  # pylint: disable=unused-argument
         """
@@ -228,8 +404,11 @@ class ConsoleFrame(Frame):
         :param event event: double click event
         """
 
+        consoleformat = self.__app.configuration.get("consoleformat_s")
         self.__master.clipboard_clear()
-        self.__master.clipboard_append(self.txt_console.get("1.0", END))
+        self.__master.clipboard_append(
+            "\n".join(self._format(rec, consoleformat) for rec in self._records)
+        )
         self.__master.update()
 
     def _on_resize(self, event):  # pylint: disable=unused-argument
@@ -0,0 +1,292 @@
+"""
+device_pipeline.py
+
+DevicePipeline class for PyGPSClient application.
+
+Multi-receiver mode. In addition to the main receiver, PyGPSClient can
+read any number of additional GNSS receivers (e.g. the rover antennas
+of a moving-baseline or multi-antenna rig) concurrently in the same
+process, as defined in the `devices_l` configuration setting.
+
+Each additional receiver has its own pipeline - input and output
+queues, `StreamHandler`, NMEA/UBX/SBF/RTCM3/TTY protocol handlers,
+`GNSSStatus`, `SatHistory` and configuration transfer engine - while
+sharing the main application's configuration, GUI, console, datalog
+and parse worker processes. Messages from each additional receiver
+are shown on the console prefixed with the receiver's name, and its
+current position is overlaid on the map widget.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import logging
+from queue import Empty, Queue
+from types import SimpleNamespace
+
+from pygpsclient.config_transfer import ConfigTransfer
+from pygpsclient.globals import (
+    CONNECTED,
+    CONNECTED_SOCKET,
+    DISCONNECTED,
+    ERRCOL,
+    OKCOL,
+    TTY_PROTOCOL,
+)
+from pygpsclient.gnss_status import GNSSStatus
+from pygpsclient.nmea_handler import NMEAHandler
+from pygpsclient.protocol_registry import ProtocolRegistry
+from pygpsclient.rtcm3_handler import RTCM3Handler
+from pygpsclient.sat_history import SatHistory
+from pygpsclient.sbf_handler import SBFHandler
+from pygpsclient.stream_handler import SettingValue, StreamHandler
+from pygpsclient.strings import ENDOFFILE, INACTIVE_TIMEOUT
+from pygpsclient.tty_handler import TTYHandler
+from pygpsclient.ubx_handler import UBXHandler
+from pygpsclient.widget_defs import HiddenWidgetState
+
+DEVICE_EVENTS = ("read", "eof", "timeout", "error")
+"""Stream events generated for each additional receiver"""
+DEVICE_SOCKET_PROTOCOL = "TCP IPv4"  # default socket protocol
+
+
+def parse_device(entry: list) -> tuple:
+    """
+    Parse `devices_l` configuration entry, in the format
+    `[name, serial port, baud rate]` for serial receivers or
+    `[name, "host:port", protocol]` for socket receivers,
+    where protocol is e.g. "TCP IPv4" or "UDP IPv6" (optional).
+
+    :param list entry: configuration entry
+    :return: tuple of (name, conntype, address, setting)
+    :rtype: tuple
+    :raises: ValueError if entry is invalid
+    """
+
+    if not isinstance(entry, (list, tuple)) or len(entry) not in (2, 3):
+        raise ValueError(f"Invalid device definition {entry}")
+    name, address = str(entry[0]), str(entry[1])
+    setting = entry[2] if len(entry) == 3 else DEVICE_SOCKET_PROTOCOL
+    if isinstance(setting, int):
+        return name, CONNECTED, address, setting
+    host, _, port = address.rpartition(":")
+    if host == "" or not port.isdigit():
+        raise ValueError(f"Invalid device address {address}")
+    return name, CONNECTED_SOCKET, (host.strip("[]"), int(port)), setting
+
+
+class DevicePipeline:
+    """
+    Additional GNSS receiver pipeline class.
+
+    Stands in for the main application as far as this receiver's
+    stream and protocol handlers are concerned.
+    """
+
+    def __init__(self, app, device: int, entry: list):
+        """
+        Constructor.
+
+        :param Frame app: reference to main tkinter application
+        :param int device: device number (1 = first additional receiver)
+        :param list entry: `devices_l` configuration entry
+        :raises: ValueError if entry is invalid
+        """
+
+        self.__app = app  # Reference to main application class
+        self.logger = logging.getLogger(__name__)
+        self.device = device
+        self.name, self._conntype, self._address, self._setting = parse_device(entry)
+        self._events = {evt: f"<<device{device}_{evt}>>" for evt in DEVICE_EVENTS}
+        self.gnss_inqueue = Queue()  # messages from GNSS receiver
+        self.gnss_outqueue = Queue()  # messages to GNSS receiver
+        self.widget_state = HiddenWidgetState()  # no widgets are fed directly
+        # protocol handlers check for socket server config frame
+        self.frm_settings = SimpleNamespace(frm_socketserver=None)
+        self.gnss_status = GNSSStatus()  # holds latest GNSS readings
+        self.sat_history = SatHistory()  # holds per-satellite history
+        self.sat_history.retention = self.configuration.get("sathistory_n")
+        self.config_transfer = ConfigTransfer(self)  # sends receiver configuration
+        self.stream_handler = StreamHandler(self)
+        self.nmea_handler = NMEAHandler(self)
+        self.ubx_handler = UBXHandler(self)
+        self.sbf_handler = SBFHandler(self)
+        self.rtcm_handler = RTCM3Handler(self)
+        self.tty_handler = TTYHandler(self)
+        self.protocol_registry = ProtocolRegistry(self)
+        self.conn_status = DISCONNECTED
+
+        master = self.appmaster
+        master.bind(self._events["read"], self.on_read)
+        master.bind(self._events["eof"], self.on_eof)
+        master.bind(self._events["timeout"], self.on_timeout)
+        master.bind(self._events["error"], self.on_stream_error)
+
+    def connect(self):
+        """
+        Connect to receiver and start reading.
+        """
+
+        self.disconnect()
+        cfg = self.configuration
+        settings = {
+            "protocol": cfg.get("protocol_n") & ~TTY_PROTOCOL,
+            "read_event": self._events["read"],
+            "eof_event": self._events["eof"],
+            "timeout_event": self._events["timeout"],
+            "error_event": self._events["error"],
+            "inqueue": self.gnss_inqueue,
+            "outqueue": self.gnss_outqueue,
+            "conntype": self._conntype,
+            "msgmode": cfg.get("msgmode_n"),
+            "inactivity_timeout": cfg.get("inactivity_timeout_n"),
+            "batch_interval": cfg.get("readbatchinterval_f"),
+            "batch_size": cfg.get("readbatchsize_n"),
+            "parse_workers": cfg.get("parseworkers_n"),
+            "lazy_parse": cfg.get("lazyparse_b"),
+            "async_ingest": cfg.get("asyncingest_b"),
+        }
+        if self._conntype == CONNECTED:
+            settings["serial_settings"] = SimpleNamespace(
+                port=self._address,
+                bpsrate=self._setting,
+                databits=cfg.get("databits_n"),
+                stopbits=cfg.get("stopbits_f"),
+                parity=cfg.get("parity_s"),
+                rtscts=cfg.get("rtscts_b"),
+                xonxoff=cfg.get("xonxoff_b"),
+                timeout=cfg.get("timeout_f"),
+            )
+        else:
+            settings["socket_settings"] = SimpleNamespace(
+                server=SettingValue(self._address[0]),
+                port=SettingValue(self._address[1]),
+                https=SettingValue(0),
+                protocol=SettingValue(self._setting),
+            )
+        self.gnss_status = GNSSStatus()
+        self.stream_handler.needed_identities = (
+            self.__app.stream_handler.needed_identities
+        )
+        self.conn_status = self._conntype
+        self.stream_handler.start_read_thread(self, settings)
+
+    def disconnect(self):
+        """
+        Stop reading from receiver.
+        """
+
+        if self.conn_status != DISCONNECTED:
+            self.conn_status = DISCONNECTED
+            self.stream_handler.stop_read_thread()
+            self.config_transfer.cancel()
+
+    def on_read(self, event):  # pylint: disable=unused-argument
+        """
+        EVENT TRIGGERED
+        Action on read event - data available on receiver queue.
+
+        Drains all messages currently on the queue in a single pass.
+
+        :param event event: read event
+        """
+
+        self.stream_handler.clear_read_event()
+        for _ in range(self.gnss_inqueue.qsize()):
+            try:
+                raw_data, parsed_data = self.gnss_inqueue.get(False)
+            except Empty:
+                break
+            if raw_data is not None and parsed_data is not None:
+                self.__app.process_data(raw_data, parsed_data, f"{self.name}>>", self)
+            self.gnss_inqueue.task_done()
+
+    def on_eof(self, event):  # pylint: disable=unused-argument
+        """
+        EVENT TRIGGERED
+        Action on end of stream event.
+
+        :param event event: eof event
+        """
+
+        if self.conn_status != DISCONNECTED:  # not already disconnected by user
+            self.conn_status = DISCONNECTED
+            self.set_status(ENDOFFILE, ERRCOL)
+
+    def on_timeout(self, event):  # pylint: disable=unused-argument
+        """
+        EVENT TRIGGERED
+        Action on stream inactivity timeout event.
+
+        :param event event: timeout event
+        """
+
+        if self.conn_status != DISCONNECTED:
+            self.conn_status = DISCONNECTED
+            self.set_status(INACTIVE_TIMEOUT, ERRCOL)
+
+    def on_stream_error(self, event):  # pylint: disable=unused-argument
+        """
+        EVENT TRIGGERED
+        Action on stream error event.
+
+        :param event event: error event
+        """
+
+        self.conn_status = DISCONNECTED
+
+    def send_to_device(self, data: object):
+        """
+        Send raw data to receiver.
+
+        :param object data: raw GNSS data (NMEA, UBX, ASCII, RTCM3, SPARTN)
+        """
+
+        if self.conn_status != DISCONNECTED:
+            self.gnss_outqueue.put(data)
+
+    def set_status(self, message: str, color: str = OKCOL):
+        """
+        Display status message prefixed with receiver name.
+
+        :param str message: status message
+        :param str color: status color
+        """
+
+        self.__app.set_status(f"{self.name}: {message}", color)
+
+    def dialog(self, dlg: str) -> None:  # pylint: disable=unused-argument
+        """
+        Configuration dialogs only apply to the main receiver.
+
+        :param str dlg: name of dialog
+        :return: None
+        :rtype: None
+        """
+
+        return None
+
+    @property
+    def appmaster(self) -> object:
+        """
+        Getter for application master (Tk).
+
+        :return: reference to master Tk instance
+        :rtype: Tk
+        """
+
+        return self.__app.appmaster
+
+    @property
+    def configuration(self) -> object:
+        """
+        Getter for shared configuration.
+
+        :return: configuration
+        :rtype: Configuration
+        """
+
+        return self.__app.configuration
@@ -4,7 +4,8 @@ file_handler.py
 Filehandler class for PyGPSClient application.
 
 This handles all the file i/o, including:
-- binary gnss log file
+- binary gnss log file (written by a background thread, with
+  rotation by size and period and optional compression of rotated files)
 - json configuration file save, load and validation
 - datalog export
 - gpx file export
@@ -17,11 +18,14 @@ Created on 16 Sep 2020
 :license: BSD 3-Clause
 """
 
+import gzip
 import json
 import logging
+import shutil
 from datetime import datetime, timedelta
 from pathlib import Path
-from tkinter import filedialog
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
 
 from pyubx2 import hextable
 
@@ -37,13 +41,32 @@ from pygpsclient.globals import (
     GPX_NS,
     GPX_TRACK_INTERVAL,
     HOME,
-    MAXLOGLINES,
+    LOG_BUFSIZE,
+    LOG_COMPRESS,
+    LOG_FLUSH_INTERVAL,
+    LOG_FLUSH_SIZE,
+    LOG_MAXSIZE,
+    LOG_ROTATE_PERIOD,
     XML_HDR,
 )
 from pygpsclient.helpers import set_filename
-from pygpsclient.strings import CONFIGTITLE, GITHUB_URL, SAVETITLE
+from pygpsclient.strings import CONFIGTITLE, GITHUB_URL, SATHISTORYTITLE, SAVETITLE
+
+try:
+    from tkinter import filedialog
+except ImportError:  # no tkinter e.g. headless host
+    filedialog = None
+
+try:
+    import zstandard
+
+    HASZSTD = True
+except ImportError:
+    HASZSTD = False
 
 DEFEXT = ("all files", "*.*")
+GZIP = "gzip"
+ZSTD = "zstd"
 
 
 class FileHandler:
@@ -73,8 +96,17 @@ class FileHandler:
         self._configpath = None
         self._configfile = None
         self._initdir = {}
-        self._lines = 0
+        self._logformat = None
+        self._logbytes = 0
+        self._logopened = None
+        self._logqueue = Queue(maxsize=LOG_BUFSIZE)
+        self._logstop = Event()
+        self._logthread = None
+        self._logdropped = 0
+        self._droplock = Lock()  # guards _logdropped
+        self._compressors = []  # threads compressing rotated logfiles
         self._last_track_update = datetime.fromordinal(1)
+        self._last_track_version = 0  # gnss_status version last recorded
 
     def __del__(self):
         """
@@ -204,6 +236,32 @@ class FileHandler:
         except (OSError, json.JSONDecodeError) as err:
             return str(err)
 
+    def export_sat_history(self, history: object) -> tuple:
+        """
+        Export per-satellite history to CSV file, prompting user for filename.
+
+        :param SatHistory history: per-satellite history store
+        :return: tuple of (number of samples exported, return code
+            "" = success, err str = failure, None = cancelled)
+        :rtype: tuple
+        """
+
+        filename = filedialog.asksaveasfilename(
+            title=SATHISTORYTITLE,
+            initialdir=HOME,
+            initialfile=set_filename("", "sathistory", "csv")[0],
+            filetypes=(
+                ("csv files", "*.csv"),
+                ("all files", "*.*"),
+            ),
+        )
+        if filename in ((), ""):
+            return 0, None  # User cancelled
+        try:
+            return history.export_csv(filename), ""
+        except OSError as err:
+            return 0, str(err)
+
     def set_logfile_path(self, initdir=HOME) -> Path:
         """
         Set file path.
@@ -222,36 +280,89 @@ class FileHandler:
 
     def open_logfile(self) -> int:
         """
-        Open logfile.
+        Open logfile and start background log writer thread.
 
         :return: 0 = error, 1 = ok
         :rtype: int
         """
 
-        # pylint: disable=consider-using-with
-
+        self.close_logfile()
+        cfg = self.__app.configuration
+        self._logpath = cfg.get("logpath_s")
+        self._logformat = cfg.get("logformat_s")
         try:
-            self._logpath = self.__app.configuration.get("logpath_s")
-            self._lines = 0
-            _, self._logname = set_filename(self._logpath, "data", "log")
-            self._logfile = open(self._logname, "a+b")
-            return 1
+            self._new_logfile()
         except FileNotFoundError as err:
             self.__app.set_status(f"{err}", ERRCOL)
             return 0
+        self._logstop.clear()
+        self._logthread = Thread(
+            target=self._log_writer,
+            args=(
+                self._logstop,
+                cfg.get("logflushinterval_f"),
+                cfg.get("logflushsize_n"),
+                cfg.get("logmaxsize_n"),
+                cfg.get("logrotateperiod_n"),
+                cfg.get("logcompress_s"),
+            ),
+            daemon=True,
+        )
+        self._logthread.start()
+        return 1
+
+    def _new_logfile(self):
+        """
+        Open new timestamped logfile. If a logfile (or compressed
+        logfile) with the same timestamp already exists (e.g. after
+        rapid rotation), a numeric suffix is added.
+
+        :raises: FileNotFoundError if log path is invalid
+        """
+
+        # pylint: disable=consider-using-with
+
+        _, logname = set_filename(self._logpath, "data", "log")
+        logpath = Path(logname)
+        i = 0
+        while any(Path(f"{logpath}{ext}").exists() for ext in ("", ".gz", ".zst")):
+            i += 1
+            logpath = logpath.with_name(f"{Path(logname).stem}-{i}.log")
+        self._logname = str(logpath)
+        self._logfile = open(self._logname, "a+b")
+        self._logbytes = 0
+        self._logopened = datetime.now()
 
     def write_logfile(self, raw_data, parsed_data):
         """
-        Append data to log file. Data will be converted to bytes.
+        Queue data for background log writer. Never blocks - if the
+        log writer buffer is full, the data is dropped.
 
-        :param data: data to be logged
+        :param bytes raw_data: raw data
+        :param object parsed_data: parsed data
         """
 
-        if self._logfile is None:
+        if self._logthread is None or not self._logthread.is_alive():
             if not self.open_logfile():
                 return
 
-        lfm = self.__app.configuration.get("logformat_s")
+        try:
+            self._logqueue.put_nowait((raw_data, parsed_data))
+        except Full:
+            with self._droplock:
+                self._logdropped += 1
+
+    def _format_log(self, raw_data, parsed_data) -> list:
+        """
+        Convert data to bytes according to log format.
+
+        :param bytes raw_data: raw data
+        :param object parsed_data: parsed data
+        :return: list of bytes
+        :rtype: list
+        """
+
+        lfm = self._logformat
         data = []
         if lfm in (FORMAT_PARSED, FORMAT_BOTH):
             data.append(parsed_data)
@@ -262,30 +373,151 @@ class FileHandler:
         if lfm in (FORMAT_HEXTAB, FORMAT_BOTH):
             data.append(hextable(raw_data))
 
-        for datum in data:
-            if not isinstance(datum, bytes):
-                datum = (str(datum) + "\r").encode("utf-8")
+        return [
+            datum if isinstance(datum, bytes) else (str(datum) + "\r").encode("utf-8")
+            for datum in data
+        ]
+
+    def _log_writer(
+        self,
+        stopevent: Event,
+        flushinterval: float = LOG_FLUSH_INTERVAL,
+        flushsize: int = LOG_FLUSH_SIZE,
+        maxsize: int = LOG_MAXSIZE,
+        period: int = LOG_ROTATE_PERIOD,
+        compress: str = LOG_COMPRESS,
+    ):
+        """
+        THREADED PROCESS
+        Buffer queued log data and write to logfile in blocks, rotating
+        logfile when maximum size or rotation period is reached. Any
+        remaining data is written when the stop event is set.
+
+        :param Event stopevent: stop event
+        :param float flushinterval: max interval between writes (secs)
+        :param int flushsize: bytes buffered before write is forced
+        :param int maxsize: logfile size before rotation (bytes, 0 = none)
+        :param int period: logfile rotation period (secs, 0 = none)
+        :param str compress: compression of rotated logfiles ("", "gzip", "zstd")
+        """
+
+        buf = []
+        bufsize = 0
+        lastflush = datetime.now()
+        timeout = flushinterval if flushinterval > 0 else LOG_FLUSH_INTERVAL
+        while True:
             try:
-                self._logfile.write(datum)
-                self._logfile.flush()
-                self._lines += 1
-            except ValueError:
+                for datum in self._format_log(*self._logqueue.get(timeout=timeout)):
+                    buf.append(datum)
+                    bufsize += len(datum)
+            except Empty:
                 pass
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.logger.error(f"Error formatting log data {err}")
+            stopping = stopevent.is_set() and self._logqueue.empty()
+            now = datetime.now()
+            if buf and (
+                stopping
+                or bufsize >= flushsize
+                or now >= lastflush + timedelta(seconds=flushinterval)
+            ):
+                try:
+                    self._logfile.write(b"".join(buf))
+                    self._logfile.flush()
+                    self._logbytes += bufsize
+                except (ValueError, OSError) as err:
+                    self.logger.error(f"Error writing logfile {err}")
+                buf = []
+                bufsize = 0
+                lastflush = now
+                with self._droplock:
+                    dropped, self._logdropped = self._logdropped, 0
+                if dropped:
+                    self.logger.warning(f"Log buffer full - {dropped} entries dropped")
+                if not stopping and (
+                    (maxsize and self._logbytes >= maxsize)
+                    or (period and now >= self._logopened + timedelta(seconds=period))
+                ):
+                    try:
+                        self._rotate_logfile(compress)
+                    except Exception as err:  # pylint: disable=broad-exception-caught
+                        self.logger.error(f"Error rotating logfile {err}")
+            if stopping:
+                break
+        try:
+            self._logfile.close()
+        except IOError:
+            pass
+        self._logfile = None
 
-        if self._lines > MAXLOGLINES:
-            self.close_logfile()
-            self.open_logfile()
+    def _rotate_logfile(self, compress: str = ""):
+        """
+        Close current logfile and open a new one. If required, the
+        old logfile is compressed on a separate thread, so the log
+        writer is not held up.
 
-    def close_logfile(self):
+        :param str compress: compression ("", "gzip" or "zstd")
+        """
+
+        oldname = self._logname
+        try:
+            self._logfile.close()
+            self._new_logfile()
+        except (OSError, FileNotFoundError) as err:
+            self.logger.error(f"Error rotating logfile {err}")
+            return
+        if compress not in (GZIP, ZSTD):
+            return
+        self._compressors = [thd for thd in self._compressors if thd.is_alive()]
+        thread = Thread(
+            target=self._compress_logfile, args=(oldname, compress), daemon=True
+        )
+        self._compressors.append(thread)
+        thread.start()
+
+    def _compress_logfile(self, logname: str, compress: str):
         """
-        Close the logfile.
+        THREADED PROCESS
+        Compress rotated logfile, removing the uncompressed file
+        once compression is complete.
+
+        :param str logname: logfile name
+        :param str compress: compression ("gzip" or "zstd")
         """
 
         try:
-            if self._logfile is not None:
-                self._logfile.close()
-        except IOError:
-            pass
+            if compress == GZIP or not HASZSTD:
+                with (
+                    open(logname, "rb") as fin,
+                    gzip.open(f"{logname}.gz", "wb") as fout,
+                ):
+                    shutil.copyfileobj(fin, fout)
+            else:
+                with open(logname, "rb") as fin, open(f"{logname}.zst", "wb") as fout:
+                    zstandard.ZstdCompressor().copy_stream(fin, fout)
+            Path(logname).unlink()
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self.logger.error(f"Error compressing logfile {logname} {err}")
+
+    def close_logfile(self):
+        """
+        Stop background log writer thread, writing any outstanding
+        data to the logfile before closing it.
+        """
+
+        if self._logthread is not None:
+            self._logstop.set()
+            self._logthread.join()
+            self._logthread = None
+            if self._logfile is not None:  # writer thread failed
+                try:
+                    self._logfile.close()
+                except OSError:
+                    pass
+                self._logfile = None
+        for thread in self._compressors:
+            thread.join()
+        self._compressors = []
 
     def set_trackfile_path(self, initdir=HOME) -> Path:
         """
@@ -404,7 +636,8 @@ class FileHandler:
 
     def update_gpx_track(self):
         """
-        Update GPX track with latest valid position readings.
+        Update GPX track with latest valid position readings,
+        if the position or fix have changed since the last update.
         """
 
         gnss_status = self.__app.gnss_status
@@ -418,6 +651,8 @@ class FileHandler:
 
         if datetime.now() > self._last_track_update + timedelta(
             seconds=GPX_TRACK_INTERVAL
+        ) and gnss_status.changed(
+            self._last_track_version, "lat", "lon", "alt", "fix", "diff_corr"
         ):
             today = datetime.now()
             gpstime = gnss_status.utc
@@ -465,6 +700,7 @@ class FileHandler:
                 )
 
             self._last_track_update = datetime.now()
+            self._last_track_version = gnss_status.version
 
     def set_database_path(self, initdir=HOME) -> Path:
         """
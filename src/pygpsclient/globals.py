@@ -18,10 +18,14 @@ from collections import namedtuple
 from datetime import datetime
 from os import path
 from pathlib import Path
-from tkinter import Canvas
 
 from pyubx2 import GET, POLL, SET, SETPOLL
 
+try:
+    from tkinter import Canvas
+except ImportError:  # no tkinter e.g. headless host
+    Canvas = None
+
 Point = namedtuple("Point", ["lat", "lon"])
 # Area convention is minlat, minlon, maxlat, maxlon
 Area = namedtuple("Area", ["lat1", "lon1", "lat2", "lon2"])
@@ -42,7 +46,8 @@ def create_circle(self, x, y, r, **kwargs):
     return self.create_oval(x - r, y - r, x + r, y + r, **kwargs)
 
 
-Canvas.create_circle = create_circle
+if Canvas is not None:
+    Canvas.create_circle = create_circle
 
 HOME = Path.home()
 APPNAME = __name__.split(".", 1)[0]  # i.e. "pygpsclient"
@@ -81,6 +86,9 @@ CONNMODES = {
     4: "socket",
 }
 CRLF = b"\x0d\x0a"
+DB_BATCH_INTERVAL = 5.0  # max interval between database commits (seconds)
+DB_BATCH_SIZE = 100  # max rows per database commit
+DB_SYNCHRONOUS = "NORMAL"  # database synchronous level (OFF, NORMAL, FULL, EXTRA)
 DDD = "DD.D"
 DEFAULT_BUFSIZE = 4096
 DEFAULT_PASSWORD = "password"  # nosec
@@ -141,6 +149,7 @@ GPX_NS = (
     'xsi:schemaLocation="http://www.topografix.com/GPX/1/1 '
     'http://www.topografix.com/GPX/1/1/gpx.xsd"'
 )
+GPX_MAXPOINTS = 20000  # nominal max GPX viewer points retained for display
 GPX_TRACK_INTERVAL = 1  # minimum GPS track update interval (seconds)
 GRIDCOL = "grey40"
 GUI_UPDATE_INTERVAL = 0.5  # GUI widget update interval (seconds)
@@ -217,8 +226,13 @@ IMPORT = "import"
 WORLD = "world"
 LC29H = "Quectel LC29H"
 LG290P = "Quectel LG290P"
+LOG_BUFSIZE = 10000  # max entries queued for background datalog writer
+LOG_COMPRESS = ""  # compression of rotated datalog files ("", "gzip" or "zstd")
+LOG_FLUSH_INTERVAL = 1.0  # max interval between datalog file writes (seconds)
+LOG_FLUSH_SIZE = 65536  # datalog bytes buffered before file write is forced
+LOG_MAXSIZE = 10485760  # datalog file size before rotation (bytes, 0 = none)
+LOG_ROTATE_PERIOD = 0  # datalog file rotation period (seconds, 0 = none)
 MAX_SNR = 60  # upper limit of graphview snr axis
-MAXLOGLINES = 10000  # maximum number of 'lines' per datalog file
 MIN_GUI_UPDATE_INTERVAL = 0.1  # minimum GUI widget update interval (seconds)
 MOSAIC_X5 = "Septentrio Mosaic X5"
 MQAPIKEY = "mqapikey"
@@ -241,11 +255,16 @@ PYPI_URL = "https://pypi.org/pypi/PyGPSClient"
 QUITONERRORDEFAULT = 1
 RCVR_CONNECTION = "USB,UART1"  # default GNSS receiver connection port(s)
 ROMVER_NEW = "23.01"  # min device ROM version using configuration database
+PARSE_POOL_BACKLOG = 64  # max unparsed frames per parse worker process
+PARSE_WORKERS = 0  # number of parse worker processes (0 = parse in read thread)
+READ_BATCH_INTERVAL = 0.0  # minimum interval between stream read events (seconds)
+READ_BATCH_SIZE = 0  # max queued messages before read event forced (0 = no limit)
 READONLY = "readonly"
 RESIZE = "resize"
 ROUTE = "route"
 RXMMSG = "RXM-SPARTN-KEY"
 SAT_EXPIRY = 10  # how long passed satellites are kept in the sky and graph view
+SAT_HISTORY = 3600  # how long per-satellite C/N0 and position history is kept
 SBF_PROTOCOL = 64
 SCREENSCALE = 0.8  # screen resolution scaling factor
 SOCK_NTRIP = "NTRIP CASTER"
@@ -253,8 +272,9 @@ SOCK_SERVER = "SOCKET SERVER"
 SOCKCLIENT_HOST = "localhost"
 SOCKCLIENT_PORT = 50010
 SOCKMODES = (SOCK_SERVER, SOCK_NTRIP)
+SOCKSERVER_BUFSIZE = 262144  # socket server ring buffer size in bytes
 SOCKSERVER_HOST = "0.0.0.0"  # i.e. bind to all host IP addresses
-SOCKSERVER_MAX_CLIENTS = 5
+SOCKSERVER_MAX_CLIENTS = 256  # default max socket server clients (0 = no limit)
 SOCKSERVER_NTRIP_PORT = 2101
 SOCKSERVER_PORT = 50012
 SPARTN_EOF_EVENT = "<<spartn_eof>>"
@@ -273,6 +293,8 @@ SPARTN_SOURCE_LB = 1
 SPONSOR_URL = "https://buymeacoffee.com/semuconsulting"
 SQRT2 = 0.7071067811865476  # square root of 2
 THD = "thd"
+TILE = "tile"
+TILE_CACHE_SIZE = 256  # max decoded map tiles held in memory
 TIME0 = datetime(1970, 1, 1)  # basedate for time()
 TIMEOUTS = (
     "0.1",
@@ -426,3 +448,48 @@ FIXLOOKUP = {
     "PVTGeodetic8": "RTK FLOAT",
     "PVTGeodetic10": "PPP",
 }
+
+# L-Band (PMP) receiver configurations
+PMP_DATARATES = {
+    "B600": 600,
+    "B1200": 1200,
+    "B2400": 2400,
+    "B4800": 4800,
+}
+D9S_FACTORY = {
+    "name": "D9S Factory Default",
+    "freq": 1539812500,
+    "schwin": 2200,
+    "usesid": 1,
+    "sid": 50821,
+    "drat": PMP_DATARATES["B2400"],
+    "descrm": 1,
+    "prescrm": 1,
+    "descrminit": 23560,
+    "unqword": "16238547128276412563",
+}
+D9S_PP_US = {
+    "name": "D9S PointPerfect US",
+    "freq": 1556290000,
+    "schwin": 2200,
+    "usesid": 0,
+    "sid": 21845,
+    "drat": PMP_DATARATES["B2400"],
+    "descrm": 1,
+    "prescrm": 0,
+    "descrminit": 26969,
+    "unqword": "16238547128276412563",
+}
+D9S_PP_EU = {
+    "name": "D9S PointPerfect EU",
+    "freq": 1545260000,
+    "schwin": 2200,
+    "usesid": 0,
+    "sid": 21845,
+    "drat": PMP_DATARATES["B2400"],
+    "descrm": 1,
+    "prescrm": 0,
+    "descrminit": 26969,
+    "unqword": "16238547128276412563",
+}
+D9S_CONFIG = D9S_PP_US  # D9S default configuration
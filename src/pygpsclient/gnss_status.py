@@ -5,6 +5,28 @@ GNSS Status class.
 
 Container for the latest readings from the GNSS receiver.
 
+Fields are held in `__slots__`, and every assignment which changes a
+field's value stamps that field with a new version number from a
+process-wide counter. Consumers can therefore record the `version` they
+last looked at and call `changed(since, *fields)` to do work only when
+the fields they depend on have actually changed - version numbers keep
+increasing even when the status is replaced by a new instance (e.g. on
+reconnection). Dict and list fields are always treated as changed when
+assigned. Updating a dict or list field in place does NOT change its
+version, so handlers must (re)assign the field after updating it.
+
+The status is only updated on the GUI (Tk) thread, and is not locked:
+
+ - `snapshot()` returns an immutable copy of all fields (as a named
+   tuple), cached until a field changes. Dict and list fields are deep
+   copied, so the snapshot never shares mutable objects with the live
+   status. It must only be called on the GUI thread.
+ - `read(*fields)` returns the current values of a few scalar fields
+   and may be called from any thread. The fields are re-read until the
+   version is unchanged across the read, so the values all date from
+   the same moment (though that moment may fall part way through the
+   processing of a message).
+
 Created on 07 Apr 2022
 
 :author: semuadmin (Steve Smith)
@@ -12,20 +34,76 @@ Created on 07 Apr 2022
 :license: BSD 3-Clause
 """
 
+from collections import namedtuple
+from copy import deepcopy
 from datetime import datetime, timezone
+from itertools import count
+
+FIELDS = (
+    "utc",
+    "lat",
+    "lon",
+    "alt",
+    "hae",
+    "speed",
+    "track",
+    "fix",
+    "siv",
+    "sip",
+    "pdop",
+    "hdop",
+    "vdop",
+    "hacc",
+    "vacc",
+    "diff_corr",
+    "diff_age",
+    "diff_station",
+    "base_ecefx",
+    "base_ecefy",
+    "base_ecefz",
+    "rel_pos_heading",
+    "rel_pos_length",
+    "acc_heading",
+    "acc_length",
+    "rel_pos_flags",
+    "gsv_data",
+    "version_data",
+    "sysmon_data",
+    "spectrum_data",
+    "comms_data",
+    "imu_data",
+)
+FIELDIDX = {name: i for i, name in enumerate(FIELDS)}
+
+GNSSSnapshot = namedtuple("GNSSSnapshot", FIELDS + ("version",))
+"""Immutable snapshot of GNSSStatus"""
+
+_versions = count(1)  # process-wide version counter
 
 
 class GNSSStatus:
     """
     GNSS Status class.
     Container for the latest readings from the GNSS receiver.
+
+    Field versions are only updated on assignment. Dict and list fields
+    (e.g. `gsv_data`, `imu_data`) must be reassigned whenever their
+    contents change - e.g. `status.imu_data = {...}` rather than
+    `status.imu_data["roll"] = ...` - otherwise widgets which depend
+    on them will not be refreshed.
     """
 
+    __slots__ = FIELDS + ("_version", "_fieldversions", "_snapshot")
+    _PRIVATE = frozenset(("_version", "_fieldversions", "_snapshot"))
+
     def __init__(self):
         """
         Constructor.
         """
 
+        self._fieldversions = [0] * len(FIELDS)
+        self._version = 0
+        self._snapshot = None
         self.utc = datetime.now(timezone.utc).time().replace(microsecond=0)  # UTC time
         self.lat = 0.0  # latitude as decimal
         self.lon = 0.0  # longitude as decimal
@@ -58,3 +136,96 @@ class GNSSStatus:
         self.spectrum_data = []  # list of spectrum data (spec, spn, res, ctr, pga)
         self.comms_data = {}  # dict of comms port utilisation (tx and rx loads)
         self.imu_data = {}  # dict of imu data (roll, pitch, yaw, status)
+
+    def __setattr__(self, name: str, value: object):
+        """
+        Set field value, updating its version if the value has changed.
+
+        :param str name: field name
+        :param object value: field value
+        :raises: AttributeError if not a valid field
+        """
+
+        idx = FIELDIDX.get(name, None)
+        if idx is None:
+            if name in self._PRIVATE:
+                object.__setattr__(self, name, value)
+                return
+            raise AttributeError(f"'GNSSStatus' object has no field '{name}'")
+        if not isinstance(value, (dict, list)):
+            try:
+                old = getattr(self, name)
+                if type(old) is type(value) and old == value:
+                    return
+            except AttributeError:  # not yet set
+                pass
+        object.__setattr__(self, name, value)
+        version = next(_versions)
+        self._fieldversions[idx] = version
+        self._version = version
+
+    def changed(self, since: int, *fields: str) -> bool:
+        """
+        Check if any of the given fields have changed since a given version.
+
+        :param int since: version last looked at (0 = never)
+        :param str fields: field name(s) (none = any field)
+        :return: True if changed
+        :rtype: bool
+        """
+
+        if not fields:
+            return self._version > since
+        fv = self._fieldversions
+        return any(fv[FIELDIDX[name]] > since for name in fields)
+
+    def snapshot(self) -> GNSSSnapshot:
+        """
+        GUI THREAD ONLY
+        Get immutable snapshot of all fields. Dict and list fields are
+        deep copied, so the snapshot is unaffected by later updates. The
+        snapshot is cached until a field changes.
+
+        :return: snapshot
+        :rtype: GNSSSnapshot
+        """
+
+        snap = self._snapshot
+        if snap is None or snap.version != self._version:
+            vals = []
+            for name in FIELDS:
+                val = getattr(self, name)
+                if isinstance(val, (dict, list)):
+                    val = deepcopy(val)
+                vals.append(val)
+            snap = GNSSSnapshot(*vals, self._version)
+            self._snapshot = snap
+        return snap
+
+    def read(self, *fields: str) -> tuple:
+        """
+        Read current values of the given (scalar) fields from any
+        thread. The fields are re-read until no field has changed
+        during the read.
+
+        :param str fields: field name(s)
+        :return: tuple of field values
+        :rtype: tuple
+        """
+
+        while True:
+            version = self._version
+            vals = tuple(getattr(self, name) for name in fields)
+            if self._version == version:
+                return vals
+
+    @property
+    def version(self) -> int:
+        """
+        Getter for version of most recently changed field.
+
+        :return: version
+        :rtype: int
+        """
+
+        return self._version
@@ -14,7 +14,7 @@ Created on 10 Jan 2023
 
 import logging
 import traceback
-from statistics import mean, median
+from statistics import median
 from tkinter import (
     ALL,
     NE,
@@ -33,10 +33,7 @@ from tkinter import (
     StringVar,
     W,
 )
-from xml.dom import minidom
-from xml.parsers import expat
-
-from pynmeagps import haversine, planar
+from xml.etree.ElementTree import ParseError
 
 from pygpsclient.globals import (
     AXISCOL,
@@ -56,23 +53,16 @@ from pygpsclient.globals import (
     MPS2MPH,
     READONLY,
     ROUTE,
+    TILE,
     TRACK,
     UI,
     UIK,
     UMK,
     WAYPOINT,
-    Area,
     AreaXY,
-    Point,
-    TrackPoint,
-)
-from pygpsclient.helpers import (
-    data2xy,
-    fontheight,
-    get_grid,
-    isot2dt,
-    time2str,
 )
+from pygpsclient.gpx_reader import GPXTrack, read_gpx
+from pygpsclient.helpers import data2xy, fontheight, get_grid, time2str
 from pygpsclient.map_canvas import HYB, MAP, SAT, MapCanvas
 from pygpsclient.strings import (
     DLGGPXERROR,
@@ -86,6 +76,7 @@ from pygpsclient.strings import (
     NA,
 )
 from pygpsclient.toplevel_dialog import ToplevelDialog
+from pygpsclient.track_stats import TrackStats
 
 # profile chart parameters:
 AXIS_XL = 35  # x axis left offset
@@ -148,6 +139,7 @@ class GPXViewerDialog(ToplevelDialog):
         self._mtg = None
         self._mapimg = None
         self._track = None
+        self._stats = None
         self._gpxfile = None
         self._bounds = None
         self._center = None
@@ -223,7 +215,7 @@ class GPXViewerDialog(ToplevelDialog):
         self._lbl_maptype = Label(self._frm_controls, text="Map Type")
         self._spn_maptype = Spinbox(
             self._frm_controls,
-            values=(HYB, SAT, MAP, CUSTOM),
+            values=(HYB, SAT, MAP, CUSTOM, TILE),
             width=7,
             wrap=True,
             textvariable=self._maptype,
@@ -416,89 +408,47 @@ class GPXViewerDialog(ToplevelDialog):
         self._parse_gpx()
 
     def _parse_gpx(self):
+        """
+        Parse GPX file in a single streaming pass.
+        """
 
         if self._gpxfile is None:
             return
         ptyp = GPXTYPES[self._gpxtype.get()]
-        with open(self._gpxfile, "r", encoding="utf-8") as gpx:
-            try:
-                parser = minidom.parse(gpx)
-                trkpts = parser.getElementsByTagName(f"{ptyp}")
-                self._process_track(trkpts, ptyp)
-            except (TypeError, AttributeError, expat.ExpatError) as err:
-                self.set_status(f"{DLGGPXERROR}\n{repr(err)}", ERRCOL)
-                self.logger.error(traceback.format_exc())
+        try:
+            self._process_track(read_gpx(self._gpxfile, ptyp), ptyp)
+        except (KeyError, ValueError, ParseError) as err:
+            self.set_status(f"{DLGGPXERROR}\n{repr(err)}", ERRCOL)
+            self.logger.error(traceback.format_exc())
 
-    def _process_track(self, trkpts: list, ptyp: str):
+    def _process_track(self, track: GPXTrack, ptyp: str):
         """
         Process trackpoint data.
 
-        :param list trk: list of trackpoints
+        :param GPXTrack track: parsed GPX track
         :param str ptyp: element type
         """
 
-        self._rng = len(trkpts)
-        self._no_time = False
-        self._no_ele = False
+        self._rng = track.count
+        self._no_time = track.no_time
+        self._no_ele = track.no_ele
         if self._rng == 0:
             self.set_status(DLGGPXNULL.format(ptyp), ERRCOL)
             return
 
-        minlat = minlon = 400
-        maxlat = maxlon = -400
-        track = []
-        start = end = 0
-        self._dist = 0
-        lat1 = lon1 = 0
-        tm = tim1 = spd = spd1 = 0
-        self._minele = self._minspd = 1e10
-        self._maxele = self._maxspd = -1e20
-        for i, trkpt in enumerate(trkpts):
-            lat = float(trkpt.attributes["lat"].value)
-            lon = float(trkpt.attributes["lon"].value)
-            # establish bounding box
-            minlat = min(minlat, lat)
-            minlon = min(minlon, lon)
-            maxlat = max(maxlat, lat)
-            maxlon = max(maxlon, lon)
-            try:
-                tim = isot2dt(trkpt.getElementsByTagName("time")[0].firstChild.data)
-            except IndexError:  # time element does not exist
-                self._no_time = True
-                tim = tm + i  # use synthetic timestamp if gpx has no time element
-            if i == 0:
-                lat1, lon1, tim1 = lat, lon, tim
-                start = tim
-            else:
-                leg = planar(lat1, lon1, lat, lon)  # m
-                if leg > 1000:
-                    leg = haversine(lat1, lon1, lat, lon) / 1000  # m
-                self._dist += leg
-                if tim > tim1:
-                    spd = leg / (tim - tim1)  # m/s
-                else:
-                    spd = spd1
-                spd1 = spd
-                self._maxspd = max(spd, self._maxspd)
-                self._minspd = min(spd, self._minspd)
-                lat1, lon1, tim1 = lat, lon, tim
-                end = tim
-            try:
-                ele = float(trkpt.getElementsByTagName("ele")[0].firstChild.data)
-                self._maxele = max(ele, self._maxele)
-                self._minele = min(ele, self._minele)
-            except IndexError:  # 'ele' element does not exist
-                self._no_ele = True
-                ele = 0.0
-
-            track.append(TrackPoint(lat, lon, tim, ele, spd))
-
-        self._bounds = Area(minlat, minlon, maxlat, maxlon)
-        self._center = Point((maxlat + minlat) / 2, (maxlon + minlon) / 2)
-        self._elapsed = end - start
-        self._mintim = start
-        self._maxtim = end
+        self._dist = track.dist
+        self._minele, self._maxele = track.minele, track.maxele
+        self._minspd, self._maxspd = track.minspd, track.maxspd
+        self._bounds = track.bounds
+        self._center = track.center
+        self._elapsed = track.elapsed
+        self._mintim = track.start
+        self._maxtim = track.end
         self._track = track
+        # moving time etc. are derived from retained (possibly decimated) points
+        self._stats = TrackStats(
+            track.lat, track.lon, track.tim, None if track.no_ele else track.ele
+        )
 
         self._draw_map()
         self._draw_profile()
@@ -560,7 +510,7 @@ class GPXViewerDialog(ToplevelDialog):
         bounds = self._can_mapview.zoom_bounds(
             self.height, self.width, location, zoom, maptype
         )
-        points = [Point(pnt.lat, pnt.lon) for pnt in self._track]
+        points = self._track.points()
         self._can_mapview.draw_map(
             maptype,
             location=location,
@@ -652,16 +602,8 @@ class GPXViewerDialog(ToplevelDialog):
 
             # plot each track element
             inr = False
-            for pnt in self._track:
-                tim = pnt.tim
-                try:
-                    val = pnt.ele if chn == CHANELE else pnt.spd
-                except KeyError:
-                    val = None
-
-                if val is None:
-                    continue
-
+            vals = self._track.ele if chn == CHANELE else self._track.spd
+            for tim, val in zip(self._track.tim, vals):
                 if scale[chn] != 1:
                     val *= scale[chn]  # scale data
 
@@ -819,27 +761,32 @@ class GPXViewerDialog(ToplevelDialog):
         dst_u, dst_c, ele_u, ele_c, spd_u, spd_c = self._get_units()
 
         if self._elapsed > 3600:
-            elapsed = self._elapsed / 3600
+            elp_c = 1 / 3600
             elp_u = "hours"
         else:
-            elapsed = self._elapsed
+            elp_c = 1
             elp_u = "seconds"
+        moving = (
+            ""
+            if self._no_time
+            else f"; Moving ({elp_u}): {self._stats.moving_time*elp_c:,.2f}"
+        )
         self._info[0].set(
             (
                 f"Track elements: {self._rng:,}; "
                 f"Distance ({dst_u}): {self._dist*dst_c:,.2f}; "
-                f"Elapsed ({elp_u}): {elapsed:,.2f}"
+                f"Elapsed ({elp_u}): {self._elapsed*elp_c:,.2f}{moving}"
             )
         )
 
+        # median is taken from retained (possibly decimated) points
         if self._no_ele:
             ele = NA
         else:
-            elelist = [i.ele * ele_c for i in self._track]
-            ele_median = median(elelist)
-            ele_mean = mean(elelist)
-            ele_min = min(elelist)
-            ele_max = max(elelist)
+            ele_median = median(self._track.ele) * ele_c
+            ele_mean = self._track.meanele * ele_c
+            ele_min = self._minele * ele_c
+            ele_max = self._maxele * ele_c
             ele = (
                 f"({ele_u}) min: {ele_min:,.2f} "
                 f"max: {ele_max:,.2f} "
@@ -851,11 +798,10 @@ class GPXViewerDialog(ToplevelDialog):
         if self._no_time:
             spd = NA
         else:
-            spdlist = [i.spd * spd_c for i in self._track]
-            spd_median = median(spdlist)
-            spd_mean = mean(spdlist)
-            spd_min = min(spdlist)
-            spd_max = max(spdlist)
+            spd_median = median(self._track.spd) * spd_c
+            spd_mean = self._track.meanspd * spd_c
+            spd_min = self._minspd * spd_c
+            spd_max = self._maxspd * spd_c
             spd = (
                 f"({spd_u}) min: {spd_min:,.2f} "
                 f"max: {spd_max:,.2f} "
@@ -0,0 +1,262 @@
+"""
+gpx_reader.py
+
+Streaming GPX reader for PyGPSClient application.
+
+Parses GPX track, route or waypoint elements incrementally via
+`xml.etree.ElementTree.iterparse`, discarding each element once
+processed, and computes track bounds, distance, elapsed time and
+elevation and speed ranges in a single pass.
+
+Point data is held in compact `array` objects. If the number of points
+exceeds twice the `maxpoints` limit, every other stored point is
+discarded and the sampling stride doubled, so memory use remains
+bounded however large the GPX file. Summary statistics other than
+medians are always computed from the full set of points.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from array import array
+from xml.etree.ElementTree import iterparse
+
+from pygpsclient.globals import GPX_MAXPOINTS, Area, Point
+from pygpsclient.helpers import isot2dt
+from pygpsclient.track_stats import leg_distance
+
+
+def _localname(tag: str) -> str:
+    """
+    Strip namespace from element tag.
+
+    :param str tag: tag e.g. "{http://www.topografix.com/GPX/1/1}trkpt"
+    :return: local name e.g. "trkpt"
+    :rtype: str
+    """
+
+    return tag[tag.find("}") + 1 :]
+
+
+class GPXTrack:
+    """
+    GPX track class, holding (decimated) point arrays and
+    summary statistics for the full track.
+    """
+
+    def __init__(self, maxpoints: int = GPX_MAXPOINTS):
+        """
+        Constructor.
+
+        :param int maxpoints: nominal maximum number of points to retain
+        """
+
+        self.maxpoints = maxpoints
+        self.stride = 1  # only every stride'th point is retained
+        self.count = 0  # total number of points in track
+        self.lat = array("d")
+        self.lon = array("d")
+        self.tim = array("d")
+        self.ele = array("d")
+        self.spd = array("d")
+        self.dist = 0.0  # m
+        self.start = self.end = 0.0
+        self.minlat = self.minlon = 400.0
+        self.maxlat = self.maxlon = -400.0
+        self.minele = self.minspd = 1e20
+        self.maxele = self.maxspd = -1e20
+        self.sumele = self.sumspd = 0.0
+        self.no_time = False
+        self.no_ele = False
+        self._last = None  # last point (lat, lon, tim, ele, spd)
+        self._lastkept = False
+
+    def add(self, lat: float, lon: float, tim: float = None, ele: float = None):
+        """
+        Add point to track and update summary statistics.
+
+        :param float lat: latitude
+        :param float lon: longitude
+        :param float tim: timestamp, or None if no time element
+        :param float ele: elevation, or None if no ele element
+        """
+
+        i = self.count
+        if tim is None:
+            self.no_time = True
+            tim = float(i)  # use synthetic timestamp if gpx has no time element
+        if ele is None:
+            self.no_ele = True
+            ele = 0.0
+        else:
+            self.minele = min(ele, self.minele)
+            self.maxele = max(ele, self.maxele)
+        self.sumele += ele
+        self.minlat = min(lat, self.minlat)
+        self.minlon = min(lon, self.minlon)
+        self.maxlat = max(lat, self.maxlat)
+        self.maxlon = max(lon, self.maxlon)
+
+        if self._last is None:
+            spd = 0.0
+            self.start = tim
+        else:
+            lat1, lon1, tim1, _, spd1 = self._last
+            leg = leg_distance(lat1, lon1, lat, lon)  # m
+            self.dist += leg
+            spd = leg / (tim - tim1) if tim > tim1 else spd1  # m/s
+            self.minspd = min(spd, self.minspd)
+            self.maxspd = max(spd, self.maxspd)
+            self.sumspd += spd
+            self.end = tim
+        self._last = (lat, lon, tim, ele, spd)
+
+        self._lastkept = i % self.stride == 0
+        if self._lastkept:
+            self._append(*self._last)
+            if len(self.lat) >= self.maxpoints * 2:
+                self._decimate()
+        self.count += 1
+
+    def _append(self, lat: float, lon: float, tim: float, ele: float, spd: float):
+        """
+        Append point to arrays.
+
+        :param float lat: latitude
+        :param float lon: longitude
+        :param float tim: timestamp
+        :param float ele: elevation
+        :param float spd: speed
+        """
+
+        self.lat.append(lat)
+        self.lon.append(lon)
+        self.tim.append(tim)
+        self.ele.append(ele)
+        self.spd.append(spd)
+
+    def _decimate(self):
+        """
+        Discard every other retained point and double sampling stride.
+        """
+
+        for arr in ("lat", "lon", "tim", "ele", "spd"):
+            setattr(self, arr, getattr(self, arr)[::2])
+        self.stride *= 2
+
+    def finalise(self):
+        """
+        Ensure final point of track is retained.
+        """
+
+        if self._last is not None and not self._lastkept:
+            self._append(*self._last)
+            self._lastkept = True
+
+    def points(self) -> list:
+        """
+        Get retained points as list of Points.
+
+        :return: list of Point(lat, lon)
+        :rtype: list
+        """
+
+        return [Point(lat, lon) for lat, lon in zip(self.lat, self.lon)]
+
+    @property
+    def bounds(self) -> Area:
+        """
+        Getter for track bounds.
+
+        :return: bounding area
+        :rtype: Area
+        """
+
+        return Area(self.minlat, self.minlon, self.maxlat, self.maxlon)
+
+    @property
+    def center(self) -> Point:
+        """
+        Getter for track center.
+
+        :return: center point
+        :rtype: Point
+        """
+
+        return Point((self.maxlat + self.minlat) / 2, (self.maxlon + self.minlon) / 2)
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Getter for elapsed time.
+
+        :return: elapsed time (s)
+        :rtype: float
+        """
+
+        return self.end - self.start
+
+    @property
+    def meanele(self) -> float:
+        """
+        Getter for mean elevation of full track.
+
+        :return: mean elevation (m)
+        :rtype: float
+        """
+
+        return self.sumele / self.count if self.count else 0.0
+
+    @property
+    def meanspd(self) -> float:
+        """
+        Getter for mean speed of full track (excluding first point).
+
+        :return: mean speed (m/s)
+        :rtype: float
+        """
+
+        return self.sumspd / (self.count - 1) if self.count > 1 else 0.0
+
+
+def read_gpx(source: object, ptyp: str = "trkpt", maxpoints: int = GPX_MAXPOINTS):
+    """
+    Read GPX points of specified type in a single streaming pass.
+
+    :param object source: GPX file path or binary file object
+    :param str ptyp: point element type ("trkpt", "rtept" or "wpt")
+    :param int maxpoints: nominal maximum number of points to retain
+    :return: GPX track
+    :rtype: GPXTrack
+    :raises: xml.etree.ElementTree.ParseError if GPX is invalid
+    :raises: KeyError if point has no lat or lon attribute
+    :raises: ValueError if point has invalid time or ele element
+    """
+
+    track = GPXTrack(maxpoints)
+    stack = []
+    for event, elem in iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if _localname(elem.tag) != ptyp:
+            continue
+        tim = ele = None
+        for child in elem:
+            if not child.text:
+                continue
+            name = _localname(child.tag)
+            if name == "time":
+                tim = isot2dt(child.text.strip())
+            elif name == "ele":
+                ele = float(child.text)
+        track.add(float(elem.attrib["lat"]), float(elem.attrib["lon"]), tim, ele)
+        # discard processed element to keep memory use constant
+        if stack:
+            stack[-1].remove(elem)
+    track.finalise()
+    return track
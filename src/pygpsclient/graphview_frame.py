@@ -5,6 +5,12 @@ Graphview frame class for PyGPSClient application.
 
 This handles a frame containing a graph of current satellite reception.
 
+The axes and legend are drawn once (and redrawn only on resize or legend
+toggle), and each satellite is represented by persistent canvas items
+keyed by "gnssId-svid", which are moved or recoloured only when the
+satellite's C/N0 or column position changes, and created or deleted
+only when the satellite rises or sets.
+
 Created on 14 Sep 2020
 
 :author: semuadmin (Steve Smith)
@@ -59,6 +65,9 @@ class GraphviewFrame(Frame):
         self.height = kwargs.get("height", def_h)
         self._font = self.__app.font_vsm
         self._fonth = fontheight(self._font)
+        self._framesize = None  # size of currently drawn axes
+        self._sats = {}  # "gnssId-svid": [rect id, text id, (x1, x2, snr)]
+        self._svfont = None  # current satellite label font
         self._body()
         self._attach_events()
 
@@ -100,7 +109,11 @@ class GraphviewFrame(Frame):
 
         w, h = self.width, self.height
         ticks = int(MAX_SNR / 10)
+        legend = self.__app.configuration.get("legend_b")
         self.can_graphview.delete(ALL)
+        self._framesize = (w, h, self._fonth, legend)
+        self._sats = {}
+        self._svfont = None
         for i in range(ticks, 0, -1):
             y = (h - AXIS_Y) * i / ticks
             self.can_graphview.create_line(
@@ -128,7 +141,7 @@ class GraphviewFrame(Frame):
             font=self._font,
         )
 
-        if self.__app.configuration.get("legend_b"):
+        if legend:
             self._draw_legend()
 
     def _draw_legend(self):
@@ -171,42 +184,93 @@ class GraphviewFrame(Frame):
             return
 
         w, h = self.width, self.height
-        self.init_frame()
+        legend = self.__app.configuration.get("legend_b")
+        if self._framesize != (w, h, self._fonth, legend):
+            self.init_frame()
 
         offset = AXIS_XL + 2
         colwidth = (w - AXIS_XL - AXIS_XR + 1) / siv
         # scale x axis label according to siv
         svfont, _ = scale_font(self.width, 6, siv, 14)
-        for d in sorted(data.values()):  # sort by ascending gnssid, svid
+        fontchanged = svfont != self._svfont
+        self._svfont = svfont
+        for key, d in sorted(data.items(), key=lambda s: s[1]):  # gnssid, svid
             gnssId, prn, _, _, snr = d
             if snr in ("", "0", 0):
                 snr = 1  # show 'place marker' in graph
             else:
                 snr = int(snr)
-            snr_y = int(snr) * (h - AXIS_Y - 1) / MAX_SNR
-            (_, ol_col) = GNSS_LIST[gnssId]
-            prn = f"{int(prn):02}"
-            self.can_graphview.create_rectangle(
-                offset,
-                h - AXIS_Y - 1,
-                offset + colwidth - OL_WID,
-                h - AXIS_Y - 1 - snr_y,
-                outline=ol_col,
-                fill=snr2col(snr),
-                width=OL_WID,
-            )
-            self.can_graphview.create_text(
-                offset + colwidth / 2,
-                h - 10,
-                text=prn,
-                fill=FGCOL,
-                font=svfont,
-                angle=35,
-            )
+            state = (offset, offset + colwidth - OL_WID, snr)
+            sat = self._sats.get(key, None)
+            if sat is None:  # satellite has risen
+                self._sats[key] = self._create_sat(gnssId, f"{int(prn):02}", state)
+            else:
+                if sat[2] != state:
+                    self._move_sat(sat, state)
+                if fontchanged:
+                    self.can_graphview.itemconfigure(sat[1], font=svfont)
             offset += colwidth
 
+        # delete satellites which have set
+        for key in self._sats.keys() - data.keys():
+            rect, text, _ = self._sats.pop(key)
+            self.can_graphview.delete(rect, text)
+
         self.can_graphview.update_idletasks()
 
+    def _create_sat(self, gnssId: int, prn: str, state: tuple) -> list:
+        """
+        Create canvas items for satellite.
+
+        :param int gnssId: GNSS identifier
+        :param str prn: satellite identifier
+        :param tuple state: tuple of (left x, right x, snr)
+        :return: list of [rect id, text id, state]
+        :rtype: list
+        """
+
+        x1, x2, snr = state
+        h = self.height
+        snr_y = snr * (h - AXIS_Y - 1) / MAX_SNR
+        _, ol_col = GNSS_LIST[gnssId]
+        rect = self.can_graphview.create_rectangle(
+            x1,
+            h - AXIS_Y - 1,
+            x2,
+            h - AXIS_Y - 1 - snr_y,
+            outline=ol_col,
+            fill=snr2col(snr),
+            width=OL_WID,
+        )
+        text = self.can_graphview.create_text(
+            (x1 + x2 + OL_WID) / 2,
+            h - 10,
+            text=prn,
+            fill=FGCOL,
+            font=self._svfont,
+            angle=35,
+        )
+        return [rect, text, state]
+
+    def _move_sat(self, sat: list, state: tuple):
+        """
+        Move, resize and/or recolour existing satellite canvas items.
+
+        :param list sat: list of [rect id, text id, previous state]
+        :param tuple state: tuple of (left x, right x, snr)
+        """
+
+        rect, text, (px1, px2, psnr) = sat
+        x1, x2, snr = state
+        h = self.height
+        snr_y = snr * (h - AXIS_Y - 1) / MAX_SNR
+        self.can_graphview.coords(rect, x1, h - AXIS_Y - 1, x2, h - AXIS_Y - 1 - snr_y)
+        if (x1, x2) != (px1, px2):
+            self.can_graphview.coords(text, (x1 + x2 + OL_WID) / 2, h - 10)
+        if snr2col(snr) != snr2col(psnr):
+            self.can_graphview.itemconfigure(rect, fill=snr2col(snr))
+        sat[2] = state
+
     def _on_resize(self, event):  # pylint: disable=unused-argument
         """
         Resize frame
@@ -0,0 +1,538 @@
+"""
+headless.py
+
+Headless (non-GUI) PyGPSClient application class.
+
+Runs the PyGPSClient stream processing pipeline - StreamHandler,
+NMEA/UBX/SBF/RTCM3/TTY protocol handlers, GNSSStatus, datalog,
+GPX track, spatialite database and socket server - without
+a tkinter GUI, for use on hosts with no display.
+
+The stream reader thread places parsed messages on a plain queue
+which is consumed directly by the HeadlessApp read loop; there is no
+tkinter event marshalling.
+
+Invoked from the command line via `pygpsclient --headless`.
+Connection, logging and output settings are taken from the
+json configuration file and any CLI keyword arguments.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import logging
+from datetime import datetime, timedelta
+from queue import Empty, Queue
+from threading import Event, Thread
+from types import SimpleNamespace
+
+from pygpsclient.broadcast_server import BroadcastServer
+from pygpsclient.config_transfer import ConfigTransfer
+from pygpsclient.configuration import Configuration
+from pygpsclient.file_handler import FileHandler
+from pygpsclient.globals import (
+    CONFIGFILE,
+    CONNECTED,
+    CONNECTED_FILE,
+    CONNECTED_SOCKET,
+    DISCONNECTED,
+    ERRCOL,
+    GNSS_EOF_EVENT,
+    GNSS_ERR_EVENT,
+    GNSS_EVENT,
+    GNSS_TIMEOUT_EVENT,
+    HOME,
+    OKCOL,
+    TTY_PROTOCOL,
+)
+from pygpsclient.gnss_status import GNSSStatus
+from pygpsclient.nmea_handler import NMEAHandler
+from pygpsclient.protocol_registry import ProtocolRegistry
+from pygpsclient.rtcm3_handler import RTCM3Handler
+from pygpsclient.sat_history import SatHistory
+from pygpsclient.sbf_handler import SBFHandler
+from pygpsclient.sqlite_handler import DBINMEM, SQLOK, SqliteHandler
+from pygpsclient.stream_handler import SettingValue, StreamHandler
+from pygpsclient.tty_handler import TTYHandler
+from pygpsclient.ubx_handler import UBXHandler
+from pygpsclient.widget_defs import MSGIDS, HiddenWidgetState
+
+HEADLESS_SERIAL = "serial"
+HEADLESS_SOCKET = "socket"
+HEADLESS_FILE = "file"
+HEADLESS_SOURCES = {
+    HEADLESS_SERIAL: CONNECTED,
+    HEADLESS_SOCKET: CONNECTED_SOCKET,
+    HEADLESS_FILE: CONNECTED_FILE,
+}
+QUEUE_TIMEOUT = 0.5  # headless read loop queue timeout (seconds)
+
+
+class HeadlessMaster:
+    """
+    Stand-in for tkinter root (Tk) in headless mode.
+
+    Events generated by the stream handler are dispatched
+    directly to any bound callback in the calling thread.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self._bindings = {}
+
+    def bind(self, event: str, callback: object):
+        """
+        Bind callback to event.
+
+        :param str event: event name e.g. "<<gnss_eof>>"
+        :param object callback: callback function
+        """
+
+        self._bindings[event] = callback
+
+    def event_generate(self, event: str, **kwargs):  # pylint: disable=unused-argument
+        """
+        Invoke any callback bound to event.
+
+        :param str event: event name
+        :param kwargs: ignored tkinter event options e.g. when="tail"
+        """
+
+        callback = self._bindings.get(event, None)
+        if callback is not None:
+            callback(event)
+
+    def update_idletasks(self):
+        """
+        No-op in headless mode.
+        """
+
+
+class HeadlessApp:
+    """
+    Headless PyGPSClient Application Class.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Set up headless application and protocol handlers.
+
+        :param kwargs: optional (CLI) kwargs
+        """
+
+        self.logger = logging.getLogger(__name__)
+        self.__master = HeadlessMaster()
+
+        self.gnss_inqueue = Queue()  # messages from GNSS receiver
+        self.gnss_outqueue = Queue()  # messages to GNSS receiver
+        self.socket_inqueue = Queue()  # message from socket
+        self.widget_state = HiddenWidgetState()  # no widgets in headless mode
+        # protocol handlers check for socket server config frame
+        self.frm_settings = SimpleNamespace(frm_socketserver=None)
+        self.file_handler = FileHandler(self)
+        self.configuration = Configuration(self)  # configuration state
+        self.gnss_status = GNSSStatus()  # holds latest GNSS readings
+        self.sat_history = SatHistory()  # holds per-satellite history
+        self.config_transfer = ConfigTransfer(self)  # sends receiver configuration
+        self.stream_handler = StreamHandler(self)
+        self.nmea_handler = NMEAHandler(self)
+        self.ubx_handler = UBXHandler(self)
+        self.sbf_handler = SBFHandler(self)
+        self.rtcm_handler = RTCM3Handler(self)
+        self.tty_handler = TTYHandler(self)
+        self.sqlite_handler = SqliteHandler(self)
+        self.protocol_registry = ProtocolRegistry(self)
+        self._conn_status = DISCONNECTED
+        self._stopevent = Event()
+        self._eofevent = Event()
+        self._socket_thread = None
+        self._socket_server = None
+        self._last_db_update = datetime.now()
+
+        # load config from json file and CLI arguments & env variables
+        configfile = kwargs.pop("config", CONFIGFILE)
+        _, configerr = self.configuration.loadfile(configfile)
+        if configerr != "":
+            self.set_status(f"Configuration file {configfile}: {configerr}", ERRCOL)
+        self.configuration.loadcli(**kwargs)
+        self.sat_history.retention = self.configuration.get("sathistory_n")
+
+        # only identities processed by protocol handlers need decoding
+        needed = self.protocol_registry.identities()
+        for wdg in self.widget_state.state.values():
+            needed -= set(wdg.get(MSGIDS, ()))
+        self.stream_handler.needed_identities = needed
+
+        self.__master.bind(GNSS_EOF_EVENT, self.on_gnss_eof)
+        self.__master.bind(GNSS_TIMEOUT_EVENT, self.on_gnss_eof)
+        self.__master.bind(GNSS_ERR_EVENT, self.on_stream_error)
+
+    def set_status(self, message: str, color: str = OKCOL):
+        """
+        Log status message.
+
+        :param str message: status message
+        :param str color: status color (ERRCOL = error)
+        """
+
+        if color == ERRCOL:
+            self.logger.error(message)
+        else:
+            self.logger.info(message)
+
+    def set_connection(self, message: str, color: str = OKCOL):
+        """
+        Log connection description.
+
+        :param str message: connection description
+        :param str color: status color
+        """
+
+        self.set_status(message, color)
+
+    def dialog(self, dlg: str) -> None:  # pylint: disable=unused-argument
+        """
+        No dialogs in headless mode.
+
+        :param str dlg: name of dialog
+        :return: None
+        :rtype: None
+        """
+
+        return None
+
+    def reset_gnssstatus(self):
+        """
+        Reset gnss_status e.g. after reconnecting.
+        """
+
+        self.gnss_status = GNSSStatus()
+
+    def update_clients(self, clients: int):
+        """
+        Log number of connected socket server clients.
+
+        :param int clients: no of connected clients
+        """
+
+        self.logger.info(f"Socket server clients: {clients}")
+
+    def _stream_settings(self, source: str, in_filepath: str = None) -> dict:
+        """
+        Build stream handler settings dictionary from configuration.
+
+        :param str source: "serial", "socket" or "file"
+        :param str in_filepath: fully qualified path to input file (file source only)
+        :return: stream handler settings
+        :rtype: dict
+        :raises: ValueError if source is invalid
+        """
+
+        cfg = self.configuration
+        conntype = HEADLESS_SOURCES.get(source, None)
+        if conntype is None:
+            raise ValueError(f"Invalid headless source {source}")
+        settings = {
+            "protocol": cfg.get("protocol_n"),
+            "read_event": GNSS_EVENT,
+            "eof_event": GNSS_EOF_EVENT,
+            "timeout_event": GNSS_TIMEOUT_EVENT,
+            "error_event": GNSS_ERR_EVENT,
+            "inqueue": self.gnss_inqueue,
+            "outqueue": self.gnss_outqueue,
+            "broadcast": self.broadcast,
+            "socket_inqueue": self.socket_inqueue,
+            "conntype": conntype,
+            "msgmode": cfg.get("msgmode_n"),
+            "inactivity_timeout": cfg.get("inactivity_timeout_n"),
+            "batch_interval": cfg.get("readbatchinterval_f"),
+            "batch_size": cfg.get("readbatchsize_n"),
+            "parse_workers": cfg.get("parseworkers_n"),
+            "lazy_parse": cfg.get("lazyparse_b"),
+            "async_ingest": cfg.get("asyncingest_b"),
+        }
+        if conntype == CONNECTED:
+            port = cfg.get("userport_s") or cfg.get("serialport_s")
+            settings["serial_settings"] = SimpleNamespace(
+                port=port,
+                bpsrate=cfg.get("bpsrate_n"),
+                databits=cfg.get("databits_n"),
+                stopbits=cfg.get("stopbits_f"),
+                parity=cfg.get("parity_s"),
+                rtscts=cfg.get("rtscts_b"),
+                xonxoff=cfg.get("xonxoff_b"),
+                timeout=cfg.get("timeout_f"),
+            )
+            connstr = f"{port} @ {cfg.get('bpsrate_n')}"
+        elif conntype == CONNECTED_SOCKET:
+            settings["socket_settings"] = SimpleNamespace(
+                server=SettingValue(cfg.get("sockclienthost_s")),
+                port=SettingValue(cfg.get("sockclientport_n")),
+                https=SettingValue(cfg.get("sockclienthttps_b")),
+                protocol=SettingValue(cfg.get("sockclientprotocol_s")),
+            )
+            connstr = f"{cfg.get('sockclienthost_s')}:{cfg.get('sockclientport_n')}"
+        else:
+            if in_filepath is None:
+                raise ValueError("No input file specified")
+            settings["in_filepath"] = in_filepath
+            connstr = in_filepath
+        self.set_connection(connstr)
+        return settings
+
+    def _start_outputs(self):
+        """
+        Open any datalog, GPX track, database or socket server
+        outputs enabled in configuration.
+        """
+
+        cfg = self.configuration
+        for key in ("logpath_s", "trackpath_s", "databasepath_s"):
+            if cfg.get(key) == "":
+                cfg.set(key, str(HOME))
+        if cfg.get("recordtrack_b"):
+            cfg.set("recordtrack_b", self.file_handler.open_trackfile())
+        if cfg.get("database_b"):
+            rc = SqliteHandler(self).open(dbname=DBINMEM)  # check spatial support
+            if rc == SQLOK:
+                rc = self.sqlite_handler.open(dbpath=cfg.get("databasepath_s"))
+            cfg.set("database_b", int(rc == SQLOK))
+        if cfg.get("sockserver_b"):
+            self.start_sockserver_thread()
+
+    def _stop_outputs(self):
+        """
+        Close any open outputs.
+        """
+
+        self.stop_sockserver_thread()
+        self.sqlite_handler.close()
+        self.file_handler.close_logfile()
+        self.file_handler.close_trackfile()
+
+    def start_sockserver_thread(self):
+        """
+        Start socket server thread.
+        """
+
+        cfg = self.configuration
+        self._socket_thread = Thread(
+            target=self._sockserver_thread,
+            args=(
+                cfg.get("sockmode_b"),
+                cfg.get("sockhost_s"),
+                cfg.get("sockport_n"),
+                cfg.get("ntripcasteruser_s"),
+                cfg.get("ntripcasterpassword_s"),
+                cfg.get("sockmaxclients_n"),
+                cfg.get("sockbuffersize_n"),
+                cfg.get("socklagpolicy_s"),
+            ),
+            daemon=True,
+        )
+        self._socket_thread.start()
+
+    def stop_sockserver_thread(self):
+        """
+        Stop socket server thread.
+        """
+
+        if self._socket_server is not None:
+            self._socket_server.shutdown()
+            self._socket_server = None
+
+    def _sockserver_thread(
+        self,
+        ntripmode: int,
+        host: str,
+        port: int,
+        ntripuser: str,
+        ntrippassword: str,
+        maxclients: int,
+        bufsize: int,
+        policy: str,
+    ):
+        """
+        THREADED
+        Socket Server thread.
+
+        :param int ntripmode: 0 = open socket server, 1 = NTRIP server
+        :param str host: socket host name (0.0.0.0)
+        :param int port: socket port (50010)
+        :param int maxclients: max num of clients (0 = no limit)
+        :param int bufsize: socket server ring buffer size in bytes
+        :param str policy: lagging client policy "drop" or "disconnect"
+        """
+
+        try:
+            with BroadcastServer(
+                self,
+                ntripmode,
+                maxclients,
+                (host, port),
+                bufsize,
+                policy,
+                ntripuser=ntripuser,
+                ntrippassword=ntrippassword,
+            ) as self._socket_server:
+                self._socket_server.serve_forever()
+        except OSError as err:
+            self.set_status(f"Error starting socket server {err}", ERRCOL)
+        finally:
+            self._socket_server = None
+
+    def broadcast(self, raw_data: bytes):
+        """
+        Output raw data to socket server clients, if socket server is
+        running. Called directly from the stream reader thread.
+
+        :param bytes raw_data: raw data
+        """
+
+        server = self._socket_server
+        if server is not None:
+            server.publish(raw_data)
+
+    def run(self, source: str = HEADLESS_SERIAL, in_filepath: str = None) -> int:
+        """
+        Connect to data source and process incoming data until
+        end of file, stream error, inactivity timeout or `stop()`.
+
+        :param str source: "serial", "socket" or "file"
+        :param str in_filepath: fully qualified path to input file (file source only)
+        :return: number of messages processed
+        :rtype: int
+        :raises: ValueError if source is invalid
+        """
+
+        settings = self._stream_settings(source, in_filepath)
+        self._start_outputs()
+        self._stopevent.clear()
+        self._eofevent.clear()
+        self._conn_status = settings["conntype"]
+        self.stream_handler.start_read_thread(self, settings)
+        count = 0
+        try:
+            while not self._stopevent.is_set():
+                try:
+                    raw_data, parsed_data = self.gnss_inqueue.get(timeout=QUEUE_TIMEOUT)
+                except Empty:
+                    if self._eofevent.is_set():
+                        break
+                    continue
+                if raw_data is not None and parsed_data is not None:
+                    self.process_data(raw_data, parsed_data)
+                    count += 1
+                self.gnss_inqueue.task_done()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stream_handler.stop_read_thread()
+            self._conn_status = DISCONNECTED
+            self._stop_outputs()
+        return count
+
+    def stop(self):
+        """
+        Stop processing.
+        """
+
+        self._stopevent.set()
+
+    def on_gnss_eof(self, event):  # pylint: disable=unused-argument
+        """
+        EVENT TRIGGERED
+        Action on end of file or inactivity timeout - process any
+        remaining queued data then stop.
+
+        :param event event: eof or timeout event
+        """
+
+        self.set_status("End of data stream")
+        self._eofevent.set()
+
+    def on_stream_error(self, event):  # pylint: disable=unused-argument
+        """
+        EVENT TRIGGERED
+        Action on stream error.
+
+        :param event event: error event
+        """
+
+        self.set_status("Data stream error", ERRCOL)
+        self._eofevent.set()
+
+    def process_data(
+        self, raw_data: bytes, parsed_data: object, marker: str = ""
+    ):  # pylint: disable=unused-argument
+        """
+        Update GNSS status, GPX track, database and log file.
+
+        :param bytes raw_data: raw message data
+        :param object parsed data: NMEAMessage, UBXMessage or RTCMMessage
+        :param str marker: unused in headless mode
+        """
+
+        cfg = self.configuration.snapshot()
+        msgprot, handler = self.protocol_registry.lookup(parsed_data)
+        if msgprot == TTY_PROTOCOL and not cfg.ttyprot_b:
+            handler = None
+
+        if handler is not None and msgprot & cfg.protocol_n:
+            handler.process_data(raw_data, parsed_data)
+
+        # update database every epoch or periodically if enabled
+        if cfg.database_b:
+            if cfg.databaseepoch_b:
+                self.sqlite_handler.load_data(new_epoch=True)
+            elif datetime.now() > (
+                self._last_db_update + timedelta(seconds=cfg.guiupdateinterval_f)
+            ):
+                self.sqlite_handler.load_data()
+                self._last_db_update = datetime.now()
+
+        # update GPX track file if enabled
+        if cfg.recordtrack_b:
+            self.file_handler.update_gpx_track()
+
+        # update log file if enabled
+        if cfg.datalog_b:
+            self.file_handler.write_logfile(raw_data, parsed_data)
+
+    def send_to_device(self, data: object):
+        """
+        Send raw data to connected device.
+
+        :param object data: raw GNSS data (NMEA, UBX, ASCII, RTCM3, SPARTN)
+        """
+
+        if self._conn_status in (CONNECTED, CONNECTED_SOCKET):
+            self.gnss_outqueue.put(data)
+
+    @property
+    def appmaster(self) -> HeadlessMaster:
+        """
+        Getter for application master.
+
+        :return: reference to headless master instance
+        :rtype: HeadlessMaster
+        """
+
+        return self.__master
+
+    @property
+    def conn_status(self) -> int:
+        """
+        Getter for connection status.
+
+        :return: connection status e.g. 1 = CONNECTED
+        :rtype: int
+        """
+
+        return self._conn_status
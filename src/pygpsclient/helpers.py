@@ -18,8 +18,6 @@ from math import asin, atan, atan2, cos, degrees, pi, radians, sin, sqrt, trunc
 from os import path
 from socket import AF_INET, SOCK_DGRAM, socket
 from time import strftime
-from tkinter import Entry, Tk
-from tkinter.font import Font
 
 from pynmeagps import WGS84_SMAJ_AXIS, haversine
 from pyubx2 import (
@@ -37,6 +35,7 @@ from requests import get
 from pygpsclient.globals import (
     ERRCOL,
     FIXLOOKUP,
+    GLONASS_NMEA,
     GPSEPOCH0,
     MAX_SNR,
     PUBLICIP_URL,
@@ -48,6 +47,13 @@ from pygpsclient.globals import (
     Point,
 )
 from pygpsclient.strings import NA
+from pygpsclient.track_stats import track_bounds
+
+try:
+    from tkinter import Entry, Tk
+    from tkinter.font import Font
+except ImportError:  # no tkinter e.g. headless host
+    Entry = Tk = Font = None
 
 # validation type flags
 MAXPORT = 65535
@@ -539,16 +545,7 @@ def get_track_bounds(track: list) -> tuple:
     :rtype: (Area, Point)
     """
 
-    minlat = minlon = 400
-    maxlat = maxlon = -400
-    for pnt in track:
-        minlat = min(minlat, pnt.lat)
-        minlon = min(minlon, pnt.lon)
-        maxlat = max(maxlat, pnt.lat)
-        maxlon = max(maxlon, pnt.lon)
-    return Area(minlat, minlon, maxlat, maxlon), Point(
-        (maxlat + minlat) / 2, (maxlon + minlon) / 2
-    )
+    return track_bounds([pnt.lat for pnt in track], [pnt.lon for pnt in track])
 
 
 def hsv2rgb(h: float, s: float, v: float) -> str:
@@ -599,6 +596,10 @@ def isot2dt(tim: str) -> float:
 
     if tim[-1] == "Z":  # strip timezone label
         tim = tim[0:-1]
+    try:  # fast path for standard ISO formats
+        return datetime.fromisoformat(tim).timestamp()
+    except ValueError:
+        pass
     if tim[-4] == ".":  # has milliseconds
         tfm = "%Y-%m-%dT%H:%M:%S.%f"
     elif tim[-7] == ".":  # has microseconds
@@ -954,6 +955,39 @@ def rgb2str(r: int, g: int, b: int) -> str:
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
+def sbfsvid2gnss(svid: int) -> tuple:
+    """
+    Convert Septentrio SBF SVID to gnssId and (NMEA-style) svid.
+
+    :param int svid: SBF space vehicle ID
+    :return: tuple of (gnssId, svid), or None if not a recognised GNSS satellite
+    :rtype: tuple
+    """
+
+    if 1 <= svid <= 37:
+        return 0, svid  # GPS
+    if 38 <= svid <= 61 or 63 <= svid <= 68:  # GLONASS (62 = unknown slot)
+        slot = svid - 37 if svid <= 61 else svid - 38
+        return 6, slot + 64 if GLONASS_NMEA else slot
+    if 71 <= svid <= 106:
+        return 2, svid - 70  # Galileo
+    if 120 <= svid <= 140:
+        return 1, svid  # SBAS
+    if 141 <= svid <= 180:
+        return 3, svid - 140  # Beidou
+    if 181 <= svid <= 190:
+        return 5, svid - 180  # QZSS
+    if 191 <= svid <= 197:
+        return 7, svid - 190  # NAVIC
+    if 198 <= svid <= 215:
+        return 1, svid - 57  # SBAS
+    if 216 <= svid <= 222:
+        return 7, svid - 208  # NAVIC
+    if 223 <= svid <= 245:
+        return 3, svid - 182  # Beidou
+    return None
+
+
 def scale_font(
     width: int, basesize: int, txtwidth: int, maxsize: int = 0, fnt: Font = None
 ) -> tuple:
@@ -0,0 +1,397 @@
+"""
+ingest_loop.py
+
+Shared asyncio ingest loop for PyGPSClient application.
+
+Rather than dedicating a thread to each input stream, streams can be
+read by coroutines running on a single asyncio event loop in one
+worker thread (see `StreamHandler`, "async_ingest" setting):
+
+ - `SerialSource` reads a non-blocking serial port, woken by the event
+   loop when the port's file descriptor is readable (or by polling on
+   platforms where serial ports cannot be monitored by the event loop).
+ - `SocketSource` reads a TCP (optionally TLS) or UDP socket using
+   asyncio streams / datagram endpoints.
+ - `FrameBuffer` splits the resulting byte stream into complete NMEA,
+   UBX, SBF and RTCM3 message frames, which are then parsed and passed
+   to the GUI via the stream handler's existing coalesced read event.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import asyncio
+import socket
+import ssl
+from concurrent.futures import Future
+from threading import Lock, Thread
+
+from certifi import where as findcacerts
+from serial import Serial
+
+from pygpsclient.globals import DEFAULT_BUFSIZE
+
+INGEST_HIGH_WATER = 2000  # max unprocessed messages before reads are paused
+INGEST_POLL = 0.05  # max wait for incoming data in seconds
+NMEA_MAX = 1024  # max length of NMEA sentence
+
+UBX_HDR1, UBX_HDR2 = 0xB5, 0x62
+RTCM_HDR = 0xD3
+NMEA_HDRS = (0x24, 0x21)  # "$", "!"
+SBF_HDR2 = 0x40  # "@"
+
+
+class FrameBuffer:
+    """
+    Incremental message framer. Bytes which do not form part of a
+    recognised message frame are discarded.
+    """
+
+    def __init__(self, sbf: bool = False):
+        """
+        Constructor.
+
+        :param bool sbf: recognise SBF rather than UBX frames
+        """
+
+        self._buf = bytearray()
+        self._sbf = sbf
+
+    def feed(self, data: bytes):
+        """
+        Add incoming data to buffer.
+
+        :param bytes data: incoming data
+        """
+
+        self._buf += data
+
+    def _length(self, pos: int) -> int:
+        """
+        Get length of frame starting at position, if known.
+
+        :param int pos: position in buffer
+        :return: frame length, 0 if incomplete or -1 if not a frame
+        :rtype: int
+        """
+
+        buf = self._buf
+        avail = len(buf) - pos
+        hdr = buf[pos]
+        if hdr == UBX_HDR1 and not self._sbf:
+            if avail < 6:
+                return 0
+            if buf[pos + 1] != UBX_HDR2:
+                return -1
+            return (buf[pos + 4] | buf[pos + 5] << 8) + 8
+        if hdr == RTCM_HDR:
+            if avail < 3:
+                return 0
+            if buf[pos + 1] & 0xFC:  # reserved bits must be zero
+                return -1
+            return ((buf[pos + 1] & 0x03) << 8 | buf[pos + 2]) + 6
+        if hdr in NMEA_HDRS:
+            if avail < 2:
+                return 0
+            if buf[pos + 1] == SBF_HDR2:
+                if not self._sbf:
+                    return -1
+                if avail < 8:
+                    return 0
+                length = buf[pos + 6] | buf[pos + 7] << 8
+                return length if length >= 8 and length % 4 == 0 else -1
+            end = buf.find(b"\r\n", pos, pos + NMEA_MAX)
+            if end == -1:
+                return 0 if avail < NMEA_MAX else -1
+            return end + 2 - pos
+        return -1
+
+    def frames(self) -> list:
+        """
+        Extract all complete frames from buffer.
+
+        :return: list of raw message frames
+        :rtype: list
+        """
+
+        buf = self._buf
+        frames = []
+        pos = 0
+        while pos < len(buf):
+            length = self._length(pos)
+            if length == -1:  # resynchronise
+                pos += 1
+                continue
+            if length == 0 or len(buf) - pos < length:
+                break  # wait for rest of frame
+            frames.append(bytes(buf[pos : pos + length]))
+            pos += length
+        del buf[:pos]
+        return frames
+
+
+class SerialSource:
+    """
+    Non-blocking serial port source.
+    """
+
+    def __init__(self, ser: object):
+        """
+        Constructor.
+
+        :param object ser: serial settings (port, bpsrate, databits, etc.)
+        """
+
+        self._settings = ser
+        self._serial = None
+        self._ready = None
+        self._fd = None
+
+    async def open(self):
+        """
+        Open serial port.
+
+        :raises: SerialException
+        """
+
+        ser = self._settings
+        self._serial = Serial(
+            ser.port,
+            ser.bpsrate,
+            bytesize=ser.databits,
+            stopbits=ser.stopbits,
+            parity=ser.parity,
+            xonxoff=ser.xonxoff,
+            rtscts=ser.rtscts,
+            timeout=0,
+        )
+        self._ready = asyncio.Event()
+        try:
+            self._fd = self._serial.fileno()
+            asyncio.get_running_loop().add_reader(self._fd, self._ready.set)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            self._fd = None  # poll instead
+
+    async def read(self, timeout: float) -> bytes:
+        """
+        Read available data, waiting up to timeout for data to arrive.
+
+        :param float timeout: timeout in seconds
+        :return: data, or None if no data available
+        :rtype: bytes
+        :raises: SerialException
+        """
+
+        waiting = self._serial.in_waiting
+        if not waiting:
+            self._ready.clear()
+            if self._fd is None:
+                await asyncio.sleep(timeout)
+            else:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return None
+            waiting = self._serial.in_waiting
+        return self._serial.read(waiting) if waiting else None
+
+    async def write(self, data: bytes):
+        """
+        Write data to serial port.
+
+        :param bytes data: data
+        """
+
+        self._serial.write(data)
+
+    def close(self):
+        """
+        Close serial port.
+        """
+
+        if self._fd is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._fd)
+            except (RuntimeError, ValueError, OSError):
+                pass
+        if self._serial is not None:
+            self._serial.close()
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    """
+    UDP datagram protocol which queues received datagrams.
+    """
+
+    def __init__(self, queue: asyncio.Queue):
+        """
+        Constructor.
+
+        :param asyncio.Queue queue: received datagram queue
+        """
+
+        self._queue = queue
+
+    def datagram_received(self, data: bytes, addr: tuple):
+        """
+        Queue received datagram.
+
+        :param bytes data: datagram
+        :param tuple addr: sender address
+        """
+
+        self._queue.put_nowait(data)
+
+    def error_received(self, exc: Exception):
+        """
+        Pass socket error to reader.
+
+        :param Exception exc: error
+        """
+
+        self._queue.put_nowait(exc)
+
+
+class SocketSource:
+    """
+    TCP / UDP socket source.
+    """
+
+    def __init__(self, server: str, port: int, protocol: str, https: int = 0):
+        """
+        Constructor.
+
+        :param str server: server host name or address
+        :param int port: port
+        :param str protocol: "TCP IPv4", "TCP IPv6", "UDP IPv4" or "UDP IPv6"
+        :param int https: use TLS (TCP only) 0 = No, 1 = Yes
+        """
+
+        self._server = server
+        self._port = port
+        self._family = socket.AF_INET6 if protocol[-4:] == "IPv6" else socket.AF_INET
+        self._udp = protocol[:3] == "UDP"
+        self._https = https
+        self._reader = self._writer = self._transport = self._queue = None
+
+    async def open(self):
+        """
+        Connect to socket server.
+
+        :raises: OSError
+        """
+
+        if self._udp:
+            self._queue = asyncio.Queue()
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self._queue),
+                remote_addr=(self._server, self._port),
+                family=self._family,
+            )
+            self._transport.sendto(b"")  # send empty datagram to establish connection
+        else:
+            context = None
+            if self._https:
+                context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+                context.load_verify_locations(findcacerts())
+            self._reader, self._writer = await asyncio.open_connection(
+                self._server,
+                self._port,
+                family=self._family,
+                ssl=context,
+                server_hostname=self._server if self._https else None,
+            )
+
+    async def read(self, timeout: float) -> bytes:
+        """
+        Read available data, waiting up to timeout for data to arrive.
+
+        :param float timeout: timeout in seconds
+        :return: data, None if no data available, or b"" if connection closed
+        :rtype: bytes
+        :raises: OSError
+        """
+
+        try:
+            if self._udp:
+                data = await asyncio.wait_for(self._queue.get(), timeout)
+                if isinstance(data, Exception):
+                    raise data
+                return data
+            return await asyncio.wait_for(self._reader.read(DEFAULT_BUFSIZE), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def write(self, data: bytes):
+        """
+        Write data to socket.
+
+        :param bytes data: data
+        """
+
+        if self._udp:
+            self._transport.sendto(data)
+        else:
+            self._writer.write(data)
+            await self._writer.drain()
+
+    def close(self):
+        """
+        Close socket.
+        """
+
+        if self._transport is not None:
+            self._transport.close()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class IngestLoop:
+    """
+    Shared asyncio event loop running in a single worker thread.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self._lock = Lock()
+        self._loop = None
+        self._thread = None
+
+    def submit(self, coro) -> Future:
+        """
+        Run coroutine on ingest loop, starting loop if necessary.
+
+        :param coro: coroutine
+        :return: future representing coroutine result
+        :rtype: Future
+        """
+
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = Thread(
+                    target=self._loop.run_forever, name="ingest", daemon=True
+                )
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+
+_ingest = IngestLoop()
+
+
+def ingest_loop() -> IngestLoop:
+    """
+    Get shared ingest loop.
+
+    :return: ingest loop
+    :rtype: IngestLoop
+    """
+
+    return _ingest
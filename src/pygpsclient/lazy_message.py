@@ -0,0 +1,292 @@
+"""
+lazy_message.py
+
+Lightweight identity-only message classes for PyGPSClient application.
+
+When lazy parsing is enabled, UBX and RTCM3 messages whose identities
+are not needed by any protocol handler or visible widget are not
+decoded by the stream reader. Instead, the raw frame is wrapped in a
+LazyUBXMessage or LazyRTCMMessage object, whose identity is derived
+cheaply from the message header. The full decode is deferred until
+something actually reads one of the message's attributes or its string
+representation (e.g. the console or a parsed-format log file), at which
+point the decoded message is cached.
+
+Frames are only wrapped if their checksum (UBX) or CRC (RTCM3) is
+valid; corrupt frames are left to the full parser, which reports them
+as parse errors in the usual way.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from pyrtcm import RTCMReader
+from pyubx2 import UBX_MSGIDS, UBXReader, isvalid_checksum
+
+from pygpsclient.parse_pool import RTCM_HDR, UBX_HDR
+
+UBX_MGA = b"\x13"
+UBX_MGA_DBD = b"\x80"
+CRC24Q_POLY = 0x1864CFB
+
+
+def _crc24q_table() -> tuple:
+    """
+    Build CRC24Q lookup table.
+
+    :return: table of 256 CRC values
+    :rtype: tuple
+    """
+
+    table = []
+    for i in range(256):
+        crc = i << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= CRC24Q_POLY
+        table.append(crc & 0xFFFFFF)
+    return tuple(table)
+
+
+CRC24Q_TABLE = _crc24q_table()
+
+
+class LazyMessage:
+    """
+    Identity-only message base class.
+    """
+
+    __slots__ = ("_raw_data", "_identity", "_msgmode", "_parsed")
+
+    def __init__(self, raw_data: bytes, identity: str, msgmode: int = 0):
+        """
+        Constructor.
+
+        :param bytes raw_data: raw message frame
+        :param str identity: message identity
+        :param int msgmode: message mode (0=GET, 1=SET, 2=POLL)
+        """
+
+        self._raw_data = raw_data
+        self._identity = identity
+        self._msgmode = msgmode
+        self._parsed = None
+
+    def _parse(self) -> object:
+        """
+        Fully decode raw message frame. Implemented by subclasses.
+
+        :return: parsed message
+        :rtype: object
+        """
+
+        raise NotImplementedError
+
+    def decode(self) -> object:
+        """
+        Get fully decoded message, decoding on first call.
+
+        :return: parsed message e.g. UBXMessage
+        :rtype: object
+        """
+
+        if self._parsed is None:
+            self._parsed = self._parse()
+        return self._parsed
+
+    @property
+    def identity(self) -> str:
+        """
+        Getter for message identity (does not trigger decode).
+
+        :return: identity e.g. "RXM-RAWX" or "1077"
+        :rtype: str
+        """
+
+        return self._identity
+
+    @property
+    def decoded(self) -> bool:
+        """
+        Getter for decode status.
+
+        :return: True if message has been decoded
+        :rtype: bool
+        """
+
+        return self._parsed is not None
+
+    def serialize(self) -> bytes:
+        """
+        Get raw message frame (does not trigger decode).
+
+        :return: raw message
+        :rtype: bytes
+        """
+
+        return self._raw_data
+
+    def __getattr__(self, name: str) -> object:
+        """
+        Get attribute from decoded message.
+
+        :param str name: attribute name
+        :return: attribute value
+        :rtype: object
+        """
+
+        if name[0:2] == "__":  # e.g. copy/pickle protocol lookups
+            raise AttributeError(name)
+        return getattr(self.decode(), name)
+
+    def __str__(self) -> str:
+        """
+        String representation of decoded message.
+        """
+
+        return str(self.decode())
+
+    def __repr__(self) -> str:
+        """
+        Machine readable representation of decoded message.
+        """
+
+        return repr(self.decode())
+
+
+class LazyUBXMessage(LazyMessage):
+    """
+    Identity-only UBX message class.
+    """
+
+    __slots__ = ()
+
+    def _parse(self) -> object:
+        """
+        Fully decode raw UBX message frame.
+
+        :return: parsed message
+        :rtype: UBXMessage
+        """
+
+        return UBXReader.parse(self._raw_data, msgmode=self._msgmode)
+
+
+class LazyRTCMMessage(LazyMessage):
+    """
+    Identity-only RTCM3 message class.
+    """
+
+    __slots__ = ()
+
+    def _parse(self) -> object:
+        """
+        Fully decode raw RTCM3 message frame.
+
+        :return: parsed message
+        :rtype: RTCMMessage
+        """
+
+        return RTCMReader.parse(self._raw_data)
+
+
+def ubx_identity(raw_data: bytes) -> str:
+    """
+    Get identity of raw UBX message frame from its header.
+
+    :param bytes raw_data: raw UBX message
+    :return: identity e.g. "RXM-RAWX", or None if unrecognised
+    :rtype: str
+    """
+
+    msgid = raw_data[2:4]
+    # all MGA messages except MGA-DBD are identified by first payload byte
+    if msgid[0:1] == UBX_MGA and msgid[1:2] != UBX_MGA_DBD and len(raw_data) > 8:
+        msgid += raw_data[6:7]
+    return UBX_MSGIDS.get(msgid, None)
+
+
+def rtcm_identity(raw_data: bytes) -> str:
+    """
+    Get identity of raw RTCM3 message frame from its header.
+
+    :param bytes raw_data: raw RTCM3 message
+    :return: identity e.g. "1077", or None if invalid
+    :rtype: str
+    """
+
+    if len(raw_data) < 9:
+        return None
+    mid = raw_data[3] << 4 | raw_data[4] >> 4
+    if mid == 4076:  # proprietary IGS SSR message type
+        subtype = (raw_data[4] & 0x1) << 7 | raw_data[5] >> 1
+        return f"{mid}_{subtype:03d}"
+    return str(mid)
+
+
+def isvalid_crc24q(raw_data: bytes) -> bool:
+    """
+    Validate CRC24Q of raw RTCM3 message frame (table-driven
+    equivalent of `pyrtcm.calc_crc24q`).
+
+    :param bytes raw_data: raw RTCM3 message including CRC
+    :return: True if CRC is valid
+    :rtype: bool
+    """
+
+    crc = 0
+    table = CRC24Q_TABLE
+    for octet in raw_data:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ octet]
+    return crc == 0
+
+
+def is_needed(identity: str, needed: set) -> bool:
+    """
+    Check if message identity (or its 3-character class
+    prefix e.g. "CFG") is in set of needed identities.
+
+    :param str identity: message identity
+    :param set needed: needed identities, or None if all are needed
+    :return: True if needed
+    :rtype: bool
+    """
+
+    return needed is None or identity in needed or identity[0:3] in needed
+
+
+def lazy_message(raw_data: bytes, msgmode: int, needed: set) -> LazyMessage:
+    """
+    Wrap raw UBX or RTCM3 message frame in an identity-only
+    message object if its identity is not needed.
+
+    :param bytes raw_data: raw message frame
+    :param int msgmode: message mode (0=GET, 1=SET, 2=POLL)
+    :param set needed: needed identities, or None if all are needed
+    :return: lazy message, or None if message should be fully parsed
+    :rtype: LazyMessage
+    """
+
+    if needed is None:
+        return None
+    if raw_data[0:2] == UBX_HDR:
+        cls, identity, isvalid = (
+            LazyUBXMessage,
+            ubx_identity(raw_data),
+            isvalid_checksum,
+        )
+    elif raw_data[0] == RTCM_HDR:
+        cls, identity, isvalid = (
+            LazyRTCMMessage,
+            rtcm_identity(raw_data),
+            isvalid_crc24q,
+        )
+    else:
+        return None
+    if identity is None or is_needed(identity, needed) or not isvalid(raw_data):
+        return None
+    return cls(raw_data, identity, msgmode)
@@ -8,6 +8,8 @@ This handles a canvas containing a location map which can be either:
  - one or more fixed offline maps based on user-provided georeferenced
    images e.g. geoTIFF (defaults to Mercator world image).
  - dynamic online map or satellite image accessed via a MapQuest API.
+ - "slippy map" tiles from a local tile cache, optionally populated
+   from an online tile server.
 
 NOTE: The free MapQuest API key is subject to a limit of 15,000
 transactions / month, or roughly 500 / day, so the map updates are only
@@ -26,12 +28,14 @@ Created on 13 Sep 2020
 from http.client import responses
 from io import BytesIO
 from math import sqrt
-from random import randrange
+from os import path
+from threading import Thread
 from tkinter import (
     ALL,
     CENTER,
     Canvas,
     S,
+    W,
 )
 
 from PIL import Image, ImageTk, UnidentifiedImageError
@@ -40,15 +44,19 @@ from requests import ConnectionError as ConnError
 from requests import ConnectTimeout, RequestException, get
 
 from pygpsclient.globals import (
+    APPNAME,
     BGCOL,
     CUSTOM,
     ERRCOL,
+    HOME,
     ICON_END,
     ICON_START,
     IMG_WORLD,
     IMG_WORLD_BOUNDS,
     IMPORT,
+    INFOCOL,
     PNTCOL,
+    TILE,
     WORLD,
     Area,
     AreaXY,
@@ -63,6 +71,7 @@ from pygpsclient.helpers import (
     point_in_bounds,
     scale_font,
 )
+from pygpsclient.map_pyramid import PYRAMID_MIN_PIXELS, MapPyramid, open_image
 from pygpsclient.mapquest import (
     HYB,
     MAP,
@@ -75,6 +84,7 @@ from pygpsclient.strings import (
     DLGGPXOOB,
     MAPCONFIGERR,
     MAPOPENERR,
+    MAPPYRAMIDWAIT,
     NOCONN,
     NOWEBMAPCONN,
     NOWEBMAPFIX,
@@ -82,21 +92,27 @@ from pygpsclient.strings import (
     NOWEBMAPKEY,
     OUTOFBOUNDS,
 )
+from pygpsclient.tile_cache import TileCache
+from pygpsclient.track_buffer import TrackBuffer, simplify
 
 ZOOM = 10
 POSCOL = ERRCOL
 TRK_COL = "magenta"  # color of track
 HACCCOL = "skyblue"
 MARKERCOL = "red"
+DEVICECOL = "blue"  # color of additional receiver markers
 TAG_TRACK = "trak"
 TAG_MARKER = "mark"
 TAG_HACC = "hacc"
 TAG_CLOCK = "clok"
 TAG_LOCATION = "loc"
+TAG_DEVICE = "dev"
 MARKERSIZE = 6
+TRK_TOLERANCE = 1  # max track simplification error in pixels
+TRK_RECORD_TOLERANCE = 5e-6  # recorded track tolerance in degrees of latitude (~0.5m)
 MAX_SIZE = 100000000  # 154,746,100 pixels for PIL/Image
 """Maximum image size allowed by PIL Image library"""
-MAPTYPES = (WORLD, HYB, SAT, MAP, CUSTOM)
+MAPTYPES = (WORLD, HYB, SAT, MAP, CUSTOM, TILE)
 """ Map Types """
 
 
@@ -124,6 +140,7 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
         self._img_end = ImageTk.PhotoImage(Image.open(ICON_END))
         self._img = None
         self._mapimage = None
+        self._pyramid = None
         self._bounds = None
         self._native_bounds = None
         self._track = None
@@ -135,6 +152,7 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
         self._last_bounds = None
         self._lastmaptype = ""
         self._lastmappath = ""
+        self._tilecache = None
         self._font = self.__app.font_sm
         self._fonth = fontheight(self._font)
 
@@ -159,7 +177,7 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
         """
         Draw selected map type on canvas.
 
-        :param str maptype: map type (CUSTOM/IMPORT/MAP/SAT/WORLD)
+        :param str maptype: map type (CUSTOM/IMPORT/MAP/SAT/TILE/WORLD)
         :param Point location: location to draw on map
         :param Point marker: marker to draw on map
         :param list track: track to draw on map
@@ -176,6 +194,8 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
             )
         elif maptype in (MAP, SAT, HYB):
             self._draw_online_map(maptype, location, marker, track, hacc, bounds, zoom)
+        elif maptype == TILE:
+            self._draw_tile_map(location, marker, track, hacc, bounds, zoom)
 
     def _draw_offline_map(
         self,
@@ -210,6 +230,15 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
             self.draw_msg(err, ERRCOL)
             return
 
+        if self._pyramid is not None and not self._pyramid.ready:
+            if self._pyramid.failed:
+                self.draw_msg(
+                    MAPOPENERR.format(path.basename(self._lastmappath)), ERRCOL
+                )
+            else:
+                self.draw_msg(MAPPYRAMIDWAIT, INFOCOL)
+            return
+
         self._lastmaptype = maptype
         self.delete(ALL)
         if (
@@ -218,7 +247,12 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
             or maptype == WORLD
             or self.__app.configuration.get("mapzoom_disabled_b")
         ):
-            image = self._mapimage
+            if self._pyramid is None:
+                image = self._mapimage
+            else:
+                image = self._pyramid.render(
+                    self._bounds, self._bounds, self.width, self.height
+                )
         else:
             image, self._bounds = self._zoom_offline_map(
                 self._mapimage, self._native_bounds, location, zoom
@@ -228,7 +262,9 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
         if image is None:
             self.draw_msg(DLGGPXOOB, ERRCOL)
             return
-        self._img = ImageTk.PhotoImage(image.resize((self.width, self.height)))
+        if image.size != (self.width, self.height):
+            image = image.resize((self.width, self.height))
+        self._img = ImageTk.PhotoImage(image)
         self.create_image(
             self.width / 2, self.height / 2, image=self._img, anchor=CENTER
         )
@@ -253,6 +289,9 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
         Open map image at path, or find first available map image
         from usermaps_l list which includes location.
 
+        Images larger than PYRAMID_MIN_PIXELS are rendered from a tiled
+        pyramid, which is built in the background on first use.
+
         :param str maptype: map type (CUSTOM/IMPORT/WORLD)
         :param Point location: location
         :param str mappath: path to map image, if known
@@ -277,16 +316,43 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
             elif self._lastmappath == mpath:  # don't bother opening again
                 err = ""
             else:
-                self._mapimage = Image.open(mpath)
+                self._open_pyramid(mpath)
                 self._lastmappath = mpath
                 err = ""
         except (ValueError, IndexError):
             err = MAPCONFIGERR
-        except (FileNotFoundError, UnidentifiedImageError):
+        except (OSError, UnidentifiedImageError):
             err = MAPOPENERR.format(mpath.split("/")[-1])
 
         return err
 
+    def _open_pyramid(self, mpath: str):
+        """
+        Open map image, or its tiled pyramid if the image is large,
+        starting a background pyramid build if not already built.
+
+        :param str mpath: path to map image
+        :raises: OSError, UnidentifiedImageError
+        """
+
+        cfg = self.__app.configuration
+        pyramid = MapPyramid(
+            mpath,
+            path.join(HOME, f"{APPNAME}_pyramids"),
+            cfg.get("tilecachesize_n"),
+        )
+        if pyramid.ready:  # no need to open source image
+            self._mapimage = None
+            self._pyramid = pyramid
+            return
+        self._mapimage = open_image(mpath)
+        if self._mapimage.width * self._mapimage.height > PYRAMID_MIN_PIXELS:
+            self._mapimage = None
+            self._pyramid = pyramid
+            Thread(target=pyramid.build, daemon=True).start()
+        else:
+            self._pyramid = None
+
     def _find_offline_map(self, location: Point, bounds: Area) -> str:
         """
         Find first map image with bounds containing location.
@@ -332,6 +398,12 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
 
         zoombounds = self.zoom_bounds(self.height, self.width, location, zoom, CUSTOM)
         self._zoom = zoom
+        if self._pyramid is not None:  # constant-time render from tiles
+            self._zoommin = False
+            return (
+                self._pyramid.render(extents, zoombounds, self.width, self.height),
+                zoombounds,
+            )
         (x1, y1), (x2, y2) = [
             ll2xy(image.width, image.height, extents, pnt)
             for pnt in (
@@ -384,7 +456,7 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
             return
 
         if track is not None:
-            points = track
+            points = list(track)
         elif location is not None:
             points = [
                 location,
@@ -431,29 +503,96 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
 
         self.draw_msg(err, ERRCOL)
 
+    def _draw_tile_map(
+        self,
+        location: Point,
+        marker: Point,
+        track: list,
+        hacc: float,
+        bounds: Area = None,
+        zoom: int = ZOOM,
+    ):
+        """
+        Draw map composited from locally cached slippy-map tiles.
+
+        :param Point location: location to draw on map
+        :param Point marker: marker to draw on map
+        :param list track: track to draw on map
+        :param float hacc: horizontal accuracy in meters
+        :param Area bounds: bounds of map, used if location is unknown
+        :param int zoom: zoom level
+        """
+
+        center = location
+        if center is None and bounds is not None:
+            center = Point(
+                (bounds.lat1 + bounds.lat2) / 2, (bounds.lon1 + bounds.lon2) / 2
+            )
+        if center is None:
+            self.draw_msg(NOWEBMAPFIX, ERRCOL)
+            return
+
+        # tiles not yet cached are left blank until a later redraw
+        image, self._bounds, _ = self.tilecache.render(
+            center, zoom, self.width, self.height
+        )
+        self._lastmaptype = TILE
+        self.delete(ALL)
+        self._img = ImageTk.PhotoImage(image)
+        self.create_image(
+            self.width / 2, self.height / 2, image=self._img, anchor=CENTER
+        )
+
+        if location is not None:
+            self.draw_marker(location, TAG_LOCATION)
+        if marker is not None:
+            self.draw_marker(marker, TAG_MARKER)
+        if track is not None:
+            self.draw_track(track)
+        if location is not None and hacc is not None:
+            self.draw_hacc(location, hacc)
+
     def draw_track(self, track: list):
         """
-        Draw track on canvas.
+        Draw track on canvas. A recorded TrackBuffer is first clipped to
+        the current bounds using its grid index. The track is then
+        simplified to within TRK_TOLERANCE pixels at the current zoom.
 
-        :param list track: list of track points
+        :param list track: list of track points or TrackBuffer
         """
 
         self.delete(TAG_TRACK)
-        i = 0
-        for i, pnt in enumerate(track):
+        if len(track) < 2:
+            return
+        tolerance = self._pixel_tolerance()
+        if isinstance(track, TrackBuffer):
+            runs = [simplify(run, tolerance)[0] for run in track.clip(self._bounds)]
+        else:
+            runs = [simplify(track, tolerance)[0]]
+        for run in runs:
+            coords = []
+            for pnt in run:
+                coords.extend(
+                    ll2xy(
+                        self.width, self.height, self._bounds, Point(pnt.lat, pnt.lon)
+                    )
+                )
+            self.create_line(*coords, fill=TRK_COL, width=3, tags=TAG_TRACK)
+        for pnt, img in ((track[0], self._img_start), (track[-1], self._img_end)):
             x, y = ll2xy(self.width, self.height, self._bounds, Point(pnt.lat, pnt.lon))
-            if i:
-                x2, y2 = x, y
-                self.create_line(x1, y1, x2, y2, fill=TRK_COL, width=3, tags=TAG_TRACK)
-                x1, y1 = x2, y2
-            else:
-                x1, y1 = x, y
-                xstart, ystart = x, y
-        if i:
-            self.create_image(
-                xstart, ystart, image=self._img_start, anchor=S, tags=TAG_TRACK
-            )
-            self.create_image(x2, y2, image=self._img_end, anchor=S, tags=TAG_TRACK)
+            self.create_image(x, y, image=img, anchor=S, tags=TAG_TRACK)
+
+    def _pixel_tolerance(self) -> float:
+        """
+        Get track simplification tolerance for current bounds.
+
+        :return: TRK_TOLERANCE pixels in degrees of latitude
+        :rtype: float
+        """
+
+        if self._bounds is None or self.height < 1:
+            return 0.0
+        return TRK_TOLERANCE * abs(self._bounds.lat2 - self._bounds.lat1) / self.height
 
     def draw_marker(self, marker: Point, markertype: str = TAG_LOCATION):
         """
@@ -498,6 +637,30 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
                 tags=TAG_LOCATION,
             )
 
+    def draw_devices(self, devices: list):
+        """
+        Draw positions of additional receivers on canvas.
+
+        :param list devices: list of (name, Point) tuples
+        """
+
+        self.delete(TAG_DEVICE)
+        if self._bounds is None:
+            return
+        for name, location in devices:
+            x, y = ll2xy(self.width, self.height, self._bounds, location)
+            self.create_circle(
+                x, y, MARKERSIZE / 2, outline=DEVICECOL, fill=DEVICECOL, tags=TAG_DEVICE
+            )
+            self.create_text(
+                x + MARKERSIZE,
+                y,
+                text=name,
+                anchor=W,
+                fill=DEVICECOL,
+                tags=TAG_DEVICE,
+            )
+
     def draw_hacc(self, location: Point, hacc: float):
         """
         Draw horizontal accuracy perimeter on canvas.
@@ -614,6 +777,30 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
             location.lon + xoff,
         )
 
+    @property
+    def tilecache(self) -> TileCache:
+        """
+        Getter for map tile cache, which is created on first use
+        and optionally pre-seeded from a local tile directory.
+
+        :return: tile cache
+        :rtype: TileCache
+        """
+
+        if self._tilecache is None:
+            cfg = self.__app.configuration
+            self._tilecache = TileCache(
+                cfg.get("tilepath_s") or path.join(HOME, f"{APPNAME}_tiles"),
+                cfg.get("tileurl_s"),
+                cfg.get("tilecachesize_n"),
+            )
+            seedpath = cfg.get("tileseedpath_s")
+            if seedpath != "":
+                Thread(
+                    target=self._tilecache.seed, args=(seedpath,), daemon=True
+                ).start()
+        return self._tilecache
+
     @property
     def bounds(self) -> Area:
         """
@@ -637,12 +824,12 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
         return self._marker
 
     @property
-    def track(self) -> list:
+    def track(self) -> TrackBuffer:
         """
         Getter for track.
 
         :return: recorded track
-        :rtype: list or None
+        :rtype: TrackBuffer or None
         """
 
         return self._track
@@ -656,7 +843,7 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
         :rtype: (Area, Point)
         """
 
-        if isinstance(self._track, list):
+        if self._track is not None:
             if len(self._track) > 0:
                 return get_track_bounds(self._track)
         return None, None
@@ -686,7 +873,8 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
     @track.setter
     def track(self, location: Point):
         """
-        Update or reset track list.
+        Update or reset track, which is simplified to within
+        TRK_RECORD_TOLERANCE as it is recorded, independent of zoom.
         Set location to None to reset.
 
         :param Point location: location
@@ -696,15 +884,5 @@ class MapCanvas(Canvas):  # pylint: disable=too-many-ancestors
             self._track = None
             return
         if self._track is None:
-            self._track = []
-
-        if len(self._track) > 0:  # only record if different from previous
-            if round(self._track[-1][0], 8) != round(location.lat, 8) or round(
-                self._track[-1][1], 8
-            ) != round(location.lon, 8):
-                self._track.append(Point(location.lat, location.lon))
-        else:
-            self._track.append(Point(location.lat, location.lon))
-        # limit size of track list
-        while len(self._track) > POINTLIMIT:
-            self._track.pop(randrange(1, len(self._track) - 1))
+            self._track = TrackBuffer(POINTLIMIT, TRK_RECORD_TOLERANCE)
+        self._track.append(location)
@@ -309,6 +309,14 @@ class MapviewFrame(Frame):
         )
         self._bounds = self._can_mapview.bounds
 
+        # overlay positions of any additional receivers
+        devices = []
+        for dev in self.__app.devices:
+            dlat, dlon = dev.gnss_status.lat, dev.gnss_status.lon
+            if dlat not in (None, "") and dlon not in (None, "") and (dlat or dlon):
+                devices.append((dev.name, Point(dlat, dlon)))
+        self._can_mapview.draw_devices(devices)
+
         if self._can_mapview.zoommin:
             self._spn_zoom.config(highlightbackground=ERRCOL, highlightthickness=3)
         else:
@@ -0,0 +1,281 @@
+"""
+map_pyramid.py
+
+Tiled image pyramid for large offline map images in PyGPSClient application.
+
+Large custom map images (e.g. 20,000 x 20,000 pixel orthophotos) are
+too slow and memory hungry to open, crop and resize on every map
+refresh. Instead, a one-time build splits the image into 256 x 256 pixel
+tiles at successively halved resolutions ("levels"), held in an on-disk
+directory tree of the form `{pyramiddir}/{level}/{x}/{y}.png`, with an
+in-memory LRU cache of decoded tiles. Each map redraw then decodes only
+the few tiles intersecting the view at the level closest to the
+display resolution, so redraw time is independent of the source image size.
+
+Each pyramid directory is keyed on the source image's path, size and
+modification time, so a pyramid is rebuilt automatically if the image
+changes. A `pyramid.json` manifest is written only when the build is
+complete.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from hashlib import sha1
+from math import ceil, floor, log2
+from os import makedirs, path, rename, stat
+from shutil import rmtree
+from threading import Lock
+
+from PIL import Image, UnidentifiedImageError
+
+from pygpsclient.globals import TILE_CACHE_SIZE, Area, Point
+from pygpsclient.helpers import ll2xy
+from pygpsclient.tile_cache import TILE_BGCOL, TILE_SIZE
+
+MANIFEST = "pyramid.json"
+PYRAMID_MIN_PIXELS = 4096 * 4096  # images larger than this use a pyramid
+
+_lock = Lock()
+_building = set()  # pyramid directories currently being built
+
+
+def open_image(mpath: str) -> Image:
+    """
+    Open (but do not load) image, bypassing PIL's decompression bomb
+    check, which would otherwise reject very large user map images.
+
+    :param str mpath: path to image
+    :return: image
+    :rtype: Image
+    :raises: OSError, UnidentifiedImageError
+    """
+
+    with _lock:
+        maxpixels = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            return Image.open(mpath)
+        finally:
+            Image.MAX_IMAGE_PIXELS = maxpixels
+
+
+class MapPyramid:
+    """
+    Tiled map image pyramid class.
+    """
+
+    def __init__(self, srcpath: str, cachedir: str, memsize: int = TILE_CACHE_SIZE):
+        """
+        Constructor.
+
+        :param str srcpath: path to source map image
+        :param str cachedir: pyramid cache directory
+        :param int memsize: max number of decoded tiles held in memory
+        :raises: OSError if source image does not exist
+        """
+
+        self.logger = logging.getLogger(__name__)
+        self._srcpath = srcpath
+        st = stat(srcpath)
+        key = f"{path.abspath(srcpath)}|{st.st_size}|{st.st_mtime_ns}"
+        self._dir = path.join(cachedir, sha1(key.encode("utf-8")).hexdigest()[:16])
+        self._memsize = max(memsize, 1)
+        self._tiles = OrderedDict()  # (level, x, y): Image, least recently used first
+        self._size = None  # (width, height) of source image
+        self._levels = 0
+        self.failed = False  # build failed
+
+    @property
+    def ready(self) -> bool:
+        """
+        Getter for pyramid build status.
+
+        :return: True if pyramid is built
+        :rtype: bool
+        """
+
+        if self._size is None:
+            try:
+                with open(path.join(self._dir, MANIFEST), encoding="utf-8") as mfile:
+                    manifest = json.load(mfile)
+                self._size = (manifest["width"], manifest["height"])
+                self._levels = manifest["levels"]
+            except (OSError, ValueError, KeyError):
+                return False
+        return True
+
+    @property
+    def size(self) -> tuple:
+        """
+        Getter for source image size.
+
+        :return: (width, height) in pixels, or None if not built
+        :rtype: tuple
+        """
+
+        return self._size
+
+    @property
+    def levels(self) -> int:
+        """
+        Getter for number of pyramid levels.
+
+        :return: number of levels (0 if not built)
+        :rtype: int
+        """
+
+        return self._levels
+
+    def build(self) -> bool:
+        """
+        Build pyramid from source image, if not already built or being built.
+        Level 0 is the source image at full resolution, and each subsequent
+        level halves the resolution until the image fits in a single tile.
+
+        :return: True if pyramid built
+        :rtype: bool
+        """
+
+        with _lock:
+            if self._dir in _building:
+                return False
+            _building.add(self._dir)
+        tmpdir = f"{self._dir}.tmp"
+        try:
+            if self.ready:
+                return True
+            rmtree(tmpdir, ignore_errors=True)
+            with open_image(self._srcpath) as src:
+                img = src.convert("RGB")
+            width, height = img.size
+            level = 0
+            while True:
+                for x in range(ceil(img.width / TILE_SIZE)):
+                    makedirs(path.join(tmpdir, str(level), str(x)))
+                    for y in range(ceil(img.height / TILE_SIZE)):
+                        img.crop(
+                            (
+                                x * TILE_SIZE,
+                                y * TILE_SIZE,
+                                min((x + 1) * TILE_SIZE, img.width),
+                                min((y + 1) * TILE_SIZE, img.height),
+                            )
+                        ).save(
+                            path.join(tmpdir, str(level), str(x), f"{y}.png"),
+                            compress_level=1,
+                        )
+                level += 1
+                if max(img.size) <= TILE_SIZE:
+                    break
+                img = img.reduce(2)
+            with open(path.join(tmpdir, MANIFEST), "w", encoding="utf-8") as mfile:
+                json.dump(
+                    {
+                        "source": path.abspath(self._srcpath),
+                        "width": width,
+                        "height": height,
+                        "levels": level,
+                    },
+                    mfile,
+                )
+            rename(tmpdir, self._dir)
+            return self.ready
+        except (OSError, UnidentifiedImageError) as err:
+            self.logger.error(f"Unable to build map pyramid {self._srcpath} {err}")
+            self.failed = True
+            rmtree(tmpdir, ignore_errors=True)
+            return False
+        finally:
+            with _lock:
+                _building.discard(self._dir)
+
+    def get(self, level: int, x: int, y: int) -> Image:
+        """
+        Get decoded tile image from memory or disk cache.
+
+        :param int level: pyramid level
+        :param int x: tile x coordinate
+        :param int y: tile y coordinate
+        :return: tile image, or None if not available
+        :rtype: Image
+        """
+
+        key = (level, x, y)
+        img = self._tiles.get(key, None)
+        if img is not None:
+            self._tiles.move_to_end(key)
+            return img
+        tpath = path.join(self._dir, str(level), str(x), f"{y}.png")
+        try:
+            with Image.open(tpath) as tile:
+                img = tile.convert("RGB")
+        except (OSError, UnidentifiedImageError):
+            self.logger.debug(f"Invalid pyramid tile {tpath}")
+            return None
+        self._tiles[key] = img
+        while len(self._tiles) > self._memsize:
+            self._tiles.popitem(last=False)
+        return img
+
+    def render(self, extents: Area, bounds: Area, width: int, height: int) -> Image:
+        """
+        Render map image of given size covering bounds, from the tiles
+        of the pyramid level closest to (but not coarser than) the
+        display resolution. Areas outside the map extents are left blank.
+
+        :param Area extents: native extents of source map image
+        :param Area bounds: bounds of rendered map
+        :param int width: width of rendered map in pixels
+        :param int height: height of rendered map in pixels
+        :return: map image
+        :rtype: Image
+        """
+
+        image = Image.new("RGB", (width, height), TILE_BGCOL)
+        if not self.ready or width < 1 or height < 1:
+            return image
+        sw, sh = self._size
+        (vx1, vy1), (vx2, vy2) = [
+            ll2xy(sw, sh, extents, pnt)
+            for pnt in (
+                Point(bounds.lat2, bounds.lon1),
+                Point(bounds.lat1, bounds.lon2),
+            )
+        ]
+        if vx2 <= vx1 or vy2 <= vy1:
+            return image
+        # source pixels per display pixel determines level
+        scale = min((vx2 - vx1) / width, (vy2 - vy1) / height)
+        level = min(max(floor(log2(scale)), 0) if scale > 0 else 0, self._levels - 1)
+        div = 2**level
+        vx1, vy1, vx2, vy2 = vx1 / div, vy1 / div, vx2 / div, vy2 / div
+        lw, lh = ceil(sw / div), ceil(sh / div)
+        # intersection of view with map image at this level
+        ix1, iy1 = max(floor(vx1), 0), max(floor(vy1), 0)
+        ix2, iy2 = min(ceil(vx2), lw), min(ceil(vy2), lh)
+        if ix2 <= ix1 or iy2 <= iy1:
+            return image
+
+        tx1, ty1 = ix1 // TILE_SIZE, iy1 // TILE_SIZE
+        region = Image.new("RGB", (ix2 - ix1, iy2 - iy1), TILE_BGCOL)
+        for tx in range(tx1, (ix2 - 1) // TILE_SIZE + 1):
+            for ty in range(ty1, (iy2 - 1) // TILE_SIZE + 1):
+                tile = self.get(level, tx, ty)
+                if tile is not None:
+                    region.paste(tile, (tx * TILE_SIZE - ix1, ty * TILE_SIZE - iy1))
+
+        # scale visible region to its position in the rendered map
+        xscale = width / (vx2 - vx1)
+        yscale = height / (vy2 - vy1)
+        dx1, dy1 = round((ix1 - vx1) * xscale), round((iy1 - vy1) * yscale)
+        dx2, dy2 = round((ix2 - vx1) * xscale), round((iy2 - vy1) * yscale)
+        if dx2 > dx1 and dy2 > dy1:
+            image.paste(region.resize((dx2 - dx1, dy2 - dy1)), (dx1, dy1))
+        return image
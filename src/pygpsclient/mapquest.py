@@ -18,6 +18,7 @@ Created on 04 May 2023
 """
 
 from pygpsclient.globals import Area
+from pygpsclient.track_buffer import simplify
 
 # MapQuest API URLS:
 MAPQURL = (
@@ -61,16 +62,11 @@ def compress_track(track: tuple, precision: int = 6, limit: int = POINTLIMIT) ->
     """
 
     # if the number of trackpoints exceeds the MapQuest API limit,
-    # increase step count until the number is within limits
+    # retain only the most geometrically significant points
     points = []
-    stp = 1
-    rng = len(track)
-    while rng / stp > limit:
-        stp += 1
-    for i, p in enumerate(track):
-        if i % stp == 0:
-            points.append(p.lat)
-            points.append(p.lon)
+    for p in simplify(track, limit=limit)[0]:
+        points.append(p.lat)
+        points.append(p.lon)
 
     # compress polygon for MapQuest API
     return mapq_compress(points, precision)
@@ -25,6 +25,7 @@ from pygpsclient.strings import (
     DLGTUBX,
     MENUABOUT,
     MENUEXIT,
+    MENUEXPORTSAT,
     MENUFILE,
     MENUHELP,
     MENULOAD,
@@ -73,6 +74,9 @@ class MenuBar(Menu):
         self.file_menu.add_command(
             label=MENULOAD, underline=5, command=self.__app.load_config
         )
+        self.file_menu.add_command(
+            label=MENUEXPORTSAT, underline=0, command=self.__app.export_sat_history
+        )
         self.file_menu.add_command(
             label=MENUEXIT,
             underline=1,
@@ -19,6 +19,7 @@ Created on 30 Sep 2020
 import logging
 from math import degrees
 from time import time
+from typing import Callable
 
 from pynmeagps import NMEAMessage
 from pyubx2 import itow2utc
@@ -27,6 +28,9 @@ from pygpsclient.globals import SAT_EXPIRY
 from pygpsclient.helpers import fix2desc, kmph2ms, knots2ms, svid2gnssid
 from pygpsclient.strings import DLGTNMEA
 
+QTM_OUTPUT = ("QTMVERNO", "QTMVER", "QTMPVT")
+"""Quectel messages processed ahead of command acknowledgements"""
+
 
 class NMEAHandler:
     """
@@ -48,7 +52,25 @@ class NMEAHandler:
         self._parsed_data = None
         # Holds array of current satellites in view from NMEA GSV sentences
         self.gsv_data = {}
-        self.gsv_log = {}  # Holds cumulative log of all satellites seen
+        self.gsv_log = {}  # Holds log of satellites seen within SAT_EXPIRY
+        # map of message ID to processing function
+        self._dispatch = {
+            "RMC": self._process_RMC,  # Recommended minimum data for GPS
+            "GGA": self._process_GGA,  # GPS Fix Data
+            "GLL": self._process_GLL,  # GPS Lat Lon Data
+            "GNS": self._process_GNS,  # GNSS Fix Data
+            "GSA": self._process_GSA,  # GPS DOP (Dilution of Precision)
+            "VTG": self._process_VTG,  # GPS Vector track and Speed over Ground
+            "GSV": self._process_GSV,  # GPS Satellites in View
+            "ZDA": self._process_ZDA,  # ZDA Time
+            "UBX00": self._process_UBX00,  # proprietary GPS Lat/Lon & Acc
+            "UBX03": self._process_UBX03,  # proprietary satellite status
+            "QTMVERNO": self._process_QTMVERNO,  # LG290P hardware version
+            "QTMVER": self._process_QTMVER,  # LG290P hardware version
+            "QTMPVT": self._process_QTMPVT,  # LG290P pos, vel, trk
+            "QTMSVINSTATUS": self._process_QTMSVINSTATUS,  # LG290P SVIN status
+            "FMI": self._process_FMI,  # Feyman IM19 IMU status
+        }
 
     def process_data(self, raw_data: bytes, parsed_data: object):
         """
@@ -63,44 +85,35 @@ class NMEAHandler:
             if raw_data is None:
                 return
             # self.logger.debug(f"data received {parsed_data.identity}")
-            if parsed_data.msgID == "RMC":  # Recommended minimum data for GPS
-                self._process_RMC(parsed_data)
-            elif parsed_data.msgID == "GGA":  # GPS Fix Data
-                self._process_GGA(parsed_data)
-            elif parsed_data.msgID == "GLL":  # GPS Lat Lon Data
-                self._process_GLL(parsed_data)
-            elif parsed_data.msgID == "GNS":  # GNSS Fix Data
-                self._process_GNS(parsed_data)
-            elif parsed_data.msgID == "GSA":  # GPS DOP (Dilution of Precision)
-                self._process_GSA(parsed_data)
-            elif parsed_data.msgID == "VTG":  # GPS Vector track and Speed over Ground
-                self._process_VTG(parsed_data)
-            elif parsed_data.msgID == "GSV":  # GPS Satellites in View
-                self._process_GSV(parsed_data)
-            elif parsed_data.msgID == "ZDA":  # ZDA Time
-                self._process_ZDA(parsed_data)
-            # proprietary GPS Lat/Lon & Acc
-            elif parsed_data.msgID == "UBX" and parsed_data.msgId == "00":
-                self._process_UBX00(parsed_data)
-            # proprietary GPS Lat/Lon & Acc
-            elif parsed_data.msgID == "UBX" and parsed_data.msgId == "03":
-                self._process_UBX03(parsed_data)
-            elif parsed_data.msgID == "QTMVERNO":  # LG290P hardware version
-                self._process_QTMVERNO(parsed_data)
-            elif parsed_data.msgID == "QTMVER":  # LG290P hardware version
-                self._process_QTMVER(parsed_data)
-            elif parsed_data.msgID == "QTMPVT":  # LG290P pos, vel, trk
-                self._process_QTMPVT(parsed_data)
-            elif parsed_data.msgID[0:3] == "QTM" and hasattr(parsed_data, "status"):
-                self._process_QTMACK(parsed_data)
-            elif parsed_data.msgID == "QTMSVINSTATUS":  # LG290P SVIN status
-                self._process_QTMSVINSTATUS(parsed_data)
-            elif parsed_data.msgID == "FMI":  # Feyman IM19 IMU status
-                self._process_FMI(parsed_data)
+            msgid = parsed_data.msgID
+            if msgid == "UBX":  # proprietary u-blox PUBX,nn
+                msgid += parsed_data.msgId
+            process = self._dispatch.get(msgid, None)
+            # proprietary Quectel command acknowledgements
+            if (
+                msgid[0:3] == "QTM"
+                and msgid not in QTM_OUTPUT
+                and hasattr(parsed_data, "status")
+            ):
+                process = self._process_QTMACK
+            if process is None:  # unhandled message type
+                return
+            process(parsed_data)
 
         except ValueError:
             pass
 
+    def register(self, msgid: str, process: Callable):
+        """
+        Register (or override) the processing function for a given
+        NMEA message ID, e.g. for plugins.
+
+        :param str msgid: message ID e.g. "GGA" (or "UBXnn" for PUBX,nn)
+        :param Callable process: processing function taking parsed message as argument
+        """
+
+        self._dispatch[msgid] = process
+
     def _process_RMC(self, data: NMEAMessage):
         """
         Process RMC sentence - Recommended minimum data for GPS.
@@ -206,12 +219,13 @@ class NMEAHandler:
         This function collates all received GSV data into a single gsv_data array,
         removing any signals that have not been seen for more than a specified
         number of seconds (set in SAT_EXPIRY). This array is then used to
-        populate the graphview and skyview widgets.
+        populate the graphview and skyview widgets. Newly received satellite
+        data is also added to the per-satellite history.
 
         :param pynmeagps.NMEAMessage data: parsed GSV sentence
         """
 
-        show_unused = self.__app.configuration.get("unusedsat_b")
+        show_unused = self.__app.configuration.snapshot().unusedsat_b
         self.gsv_data = {}
         gsv_dict = {}
         now = time()
@@ -242,12 +256,17 @@ class NMEAHandler:
 
         for key, value in gsv_dict.items():
             self.gsv_log[key] = value
+        self.__app.sat_history.update((v[:5] for v in gsv_dict.values()), now)
 
-        for key, (gnssId, svid, elev, azim, cno, lastupdate) in self.gsv_log.items():
+        for key, (gnssId, svid, elev, azim, cno, lastupdate) in list(
+            self.gsv_log.items()
+        ):
+            if now - lastupdate >= SAT_EXPIRY:  # expire passed sats
+                del self.gsv_log[key]
+                continue
             if cno in ("", "0", 0) and not show_unused:  # omit unused sats
                 continue
-            if now - lastupdate < SAT_EXPIRY:  # expire passed sats
-                self.gsv_data[key] = (gnssId, svid, elev, azim, cno)
+            self.gsv_data[key] = (gnssId, svid, elev, azim, cno)
 
         self.__app.gnss_status.siv = len(self.gsv_data)
         self.__app.gnss_status.gsv_data = self.gsv_data
@@ -305,8 +324,9 @@ class NMEAHandler:
         """
         # pylint: disable=consider-using-dict-items
 
-        show_unused = self.__app.configuration.get("unusedsat_b")
+        show_unused = self.__app.configuration.snapshot().unusedsat_b
         self.gsv_data = {}
+        sats = []
         for i in range(data.numSv):
             idx = f"_{i+1:02d}"
             svid = getattr(data, "svid" + idx)
@@ -319,10 +339,12 @@ class NMEAHandler:
                 svid -= 210
             if gnss == 3 and svid > 32:  # Beidou
                 svid -= 32
+            sats.append((gnss, svid, elev, azim, cno))
             if cno in ("", "0", 0) and not show_unused:  # omit unused sats
                 continue
             self.gsv_data[f"{gnss}-{svid}"] = (gnss, svid, elev, azim, cno)
 
+        self.__app.sat_history.update(sats)
         self.__app.gnss_status.siv = len(self.gsv_data)
         self.__app.gnss_status.gsv_data = self.gsv_data
 
@@ -383,6 +405,9 @@ class NMEAHandler:
         :param pynmeagps.NMEAMessage data: parsed QTM*acknowledgement
         """
 
+        # match acknowledgements against any configuration transfer in progress
+        self.__app.config_transfer.acknowledge(data)
+
         if self.__app.dialog(DLGTNMEA) is not None:
             self.__app.dialog(DLGTNMEA).update_pending(data)
 
@@ -416,11 +441,12 @@ class NMEAHandler:
             self.__app.gnss_status.alt = data.alt
             self.__app.gnss_status.sip = data.numSV
             self.__app.gnss_status.diff_age = data.diffAge
-            ims = self.__app.gnss_status.imu_data
-            ims["source"] = data.identity
-            ims["roll"] = round(degrees(data.roll), 4)
-            ims["pitch"] = round(degrees(data.pitch), 4)
-            ims["yaw"] = round(degrees(data.yaw), 4)
-            ims["status"] = data.status
+            self.__app.gnss_status.imu_data = {
+                "source": data.identity,
+                "roll": round(degrees(data.roll), 4),
+                "pitch": round(degrees(data.pitch), 4),
+                "yaw": round(degrees(data.yaw), 4),
+                "status": data.status,
+            }
         except (KeyError, AttributeError):
             pass
@@ -0,0 +1,188 @@
+"""
+parse_pool.py
+
+ParsePool class for PyGPSClient application.
+
+Optional multiprocess parser for high-rate raw measurement streams
+(e.g. RXM-RAWX/RXM-SFRBX at 10 Hz plus RTCM MSM7). When enabled, the
+stream reader thread only frames incoming messages (header, length
+and payload scan) and submits each raw frame to a pool of worker
+processes, which perform the full NMEA, UBX, SBF or RTCM3 decode
+outside the GIL of the main process.
+
+Parsed messages are re-sequenced into arrival order before being
+passed on, so consumers see exactly the same message sequence as
+they would with in-thread parsing.
+
+All ParsePool instances (e.g. one per connected receiver in
+multi-receiver mode) share a single set of worker processes, which is
+shut down when the last instance using it is shut down. Workers are
+started with the "spawn" method rather than forked, as forking a
+multi-threaded tkinter process is unsafe.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from threading import Lock
+
+from pynmeagps import NMEAReader
+from pyrtcm import RTCMReader
+from pysbf2 import SBFReader
+from pyubx2 import UBXReader
+
+from pygpsclient.globals import PARSE_POOL_BACKLOG
+
+UBX_HDR = b"\xb5\x62"
+SBF_HDR = b"\x24\x40"
+RTCM_HDR = 0xD3
+
+_shared = {"executor": None, "users": 0}  # worker processes shared by all pools
+_sharedlock = Lock()
+
+
+def parse_frame(raw_data: bytes, msgmode: int) -> object:
+    """
+    WORKER PROCESS
+    Parse a single raw message frame according to its header.
+
+    Must remain a module-level function so it can be pickled
+    for dispatch to worker processes.
+
+    :param bytes raw_data: raw message frame
+    :param int msgmode: UBX message mode (0=GET, 1=SET, 2=POLL)
+    :return: parsed message, or None if not recognised
+    :rtype: object
+    """
+
+    hdr = raw_data[0:2]
+    if hdr == UBX_HDR:
+        return UBXReader.parse(raw_data, msgmode=msgmode)
+    if hdr == SBF_HDR:
+        return SBFReader.parse(raw_data)
+    if raw_data[0] == RTCM_HDR:
+        return RTCMReader.parse(raw_data)
+    if raw_data[0:1] in (b"$", b"!"):
+        return NMEAReader.parse(raw_data, msgmode=msgmode)
+    return None
+
+
+class ParsePool:
+    """
+    Multiprocess parse pool class.
+    """
+
+    def __init__(self, workers: int, msgmode: int = 0, backlog: int = 0):
+        """
+        Constructor.
+
+        :param int workers: number of worker processes (ignored if
+            another pool has already started the shared workers)
+        :param int msgmode: UBX message mode (0=GET, 1=SET, 2=POLL)
+        :param int backlog: max frames awaiting parse before reader blocks
+            (0 = default of PARSE_POOL_BACKLOG per worker)
+        """
+
+        self.logger = logging.getLogger(__name__)
+        self._msgmode = msgmode
+        self._backlog = backlog if backlog else PARSE_POOL_BACKLOG * workers
+        self._pending = deque()  # (raw_data, future) in arrival order
+        with _sharedlock:
+            if _shared["executor"] is None:
+                _shared["executor"] = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=get_context("spawn")
+                )
+            _shared["users"] += 1
+            self._executor = _shared["executor"]
+
+    def submit(self, raw_data: bytes, parsed_data: object = None):
+        """
+        Submit raw message frame for parsing. If the backlog of
+        unparsed frames is full, blocks until the oldest completes.
+
+        If the message does not need parsing (e.g. it has already been
+        wrapped in a LazyMessage), it is simply sequenced with the others.
+
+        :param bytes raw_data: raw message frame
+        :param object parsed_data: message which needs no further parsing
+        """
+
+        if parsed_data is None:
+            if len(self._pending) >= self._backlog:
+                self._pending[0][1].result()
+            future = self._executor.submit(parse_frame, raw_data, self._msgmode)
+        else:
+            future = Future()
+            future.set_result(parsed_data)
+        self._pending.append((raw_data, future))
+
+    def completed(self, wait: bool = False):
+        """
+        Generator yielding parsed messages in arrival order. Stops at
+        the first frame still being parsed, unless `wait` is True,
+        in which case all outstanding frames are yielded.
+
+        Parse errors raised in worker processes are re-raised here
+        after the failed frame has been removed from the backlog.
+
+        :param bool wait: wait for all outstanding frames
+        :return: tuple of (raw_data, parsed_data)
+        :rtype: tuple
+        """
+
+        while self._pending and (wait or self._pending[0][1].done()):
+            raw_data, future = self._pending.popleft()
+            yield raw_data, future.result()
+
+    def blocking_futures(self, wait: bool = False) -> list:
+        """
+        Get the futures which `submit()` (or, if `wait` is True,
+        `completed(True)`) would currently block on, so that callers
+        on an asyncio event loop can await them without blocking it.
+
+        :param bool wait: include all outstanding frames
+        :return: list of concurrent.futures.Future
+        :rtype: list
+        """
+
+        if wait:
+            return [future for _, future in self._pending if not future.done()]
+        if len(self._pending) >= self._backlog:
+            return [self._pending[0][1]]
+        return []
+
+    @property
+    def pending(self) -> int:
+        """
+        Getter for number of frames awaiting parse.
+
+        :return: number of pending frames
+        :rtype: int
+        """
+
+        return len(self._pending)
+
+    def shutdown(self):
+        """
+        Cancel any outstanding frames and, if no other pool is using
+        them, shut down worker processes.
+        """
+
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        with _sharedlock:
+            if self._executor is None:
+                return
+            _shared["users"] -= 1
+            if _shared["users"] == 0:
+                _shared["executor"] = None
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,137 @@
+"""
+protocol_registry.py
+
+ProtocolRegistry class for PyGPSClient application.
+
+Maps each parsed message class (NMEAMessage, UBXMessage, etc.)
+to its protocol flag and protocol handler, so that incoming
+messages can be dispatched with a single dictionary lookup rather
+than a chain of `isinstance()` checks. Each protocol handler in
+turn maps message identities to processing functions.
+
+Both levels may be extended at runtime, e.g. by plugins::
+
+    app.protocol_registry.register(MyMessage, MY_PROTOCOL, MyHandler(app))
+    app.protocol_registry.register_message(UBXMessage, "TIM-TP", my_function)
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from typing import Callable
+
+from pygnssutils import MQTTMessage
+from pynmeagps import NMEAMessage
+from pyrtcm import RTCMMessage
+from pysbf2 import SBFMessage
+from pyspartn import SPARTNMessage
+from pyubx2 import NMEA_PROTOCOL, RTCM3_PROTOCOL, UBX_PROTOCOL, UBXMessage
+
+from pygpsclient.globals import (
+    MQTT_PROTOCOL,
+    SBF_PROTOCOL,
+    SPARTN_PROTOCOL,
+    TTY_PROTOCOL,
+)
+from pygpsclient.lazy_message import LazyRTCMMessage, LazyUBXMessage
+
+NOHANDLER = (0, None)
+"""Lookup result for unrecognised message classes"""
+
+
+class ProtocolRegistry:
+    """
+    Protocol registry class.
+    """
+
+    def __init__(self, app):
+        """
+        Constructor.
+
+        :param object app: reference to main application, which must
+            already have instantiated its protocol handlers
+        """
+
+        self.__app = app  # Reference to main application class
+
+        # map of parsed message class to (protocol, handler)
+        self._registry = {
+            NMEAMessage: (NMEA_PROTOCOL, self.__app.nmea_handler),
+            SBFMessage: (SBF_PROTOCOL, self.__app.sbf_handler),
+            UBXMessage: (UBX_PROTOCOL, self.__app.ubx_handler),
+            RTCMMessage: (RTCM3_PROTOCOL, self.__app.rtcm_handler),
+            LazyUBXMessage: (UBX_PROTOCOL, self.__app.ubx_handler),
+            LazyRTCMMessage: (RTCM3_PROTOCOL, self.__app.rtcm_handler),
+            SPARTNMessage: (SPARTN_PROTOCOL, None),
+            MQTTMessage: (MQTT_PROTOCOL, None),
+            str: (TTY_PROTOCOL, self.__app.tty_handler),
+        }
+
+    def register(self, msgclass: type, protocol: int, handler: object = None):
+        """
+        Register (or override) the protocol and handler for a
+        given parsed message class.
+
+        :param type msgclass: parsed message class
+        :param int protocol: protocol flag
+        :param object handler: protocol handler implementing `process_data(raw, parsed)`
+        """
+
+        self._registry[msgclass] = (protocol, handler)
+
+    def register_message(self, msgclass: type, identity: str, process: Callable):
+        """
+        Register (or override) the processing function for a given
+        message class and identity.
+
+        :param type msgclass: parsed message class e.g. UBXMessage
+        :param str identity: message identity e.g. "NAV-PVT"
+        :param Callable process: processing function taking parsed message as argument
+        :raises: KeyError if message class has no registered handler
+        """
+
+        _, handler = self._registry[msgclass]
+        if handler is None:
+            raise KeyError(f"No handler registered for {msgclass.__name__}")
+        handler.register(identity, process)
+
+    def identities(self) -> set:
+        """
+        Get set of message identities processed by any registered
+        handler which supports lazy parsing (i.e. has an `identities`
+        property).
+
+        :return: set of identities
+        :rtype: set
+        """
+
+        idents = set()
+        for _, handler in self._registry.values():
+            idents |= getattr(handler, "identities", set())
+        return idents
+
+    def lookup(self, parsed_data: object) -> tuple:
+        """
+        Get protocol and handler for parsed message.
+
+        Message classes not registered directly (e.g. subclasses)
+        are resolved via `isinstance()` once and then cached.
+
+        :param object parsed_data: parsed message
+        :return: tuple of (protocol, handler), or (0, None) if unrecognised
+        :rtype: tuple
+        """
+
+        msgclass = type(parsed_data)
+        result = self._registry.get(msgclass, None)
+        if result is None:
+            result = NOHANDLER
+            for cls, val in list(self._registry.items()):
+                if isinstance(parsed_data, cls):
+                    result = val
+                    break
+            self._registry[msgclass] = result
+        return result
@@ -0,0 +1,194 @@
+"""
+ring_buffer.py
+
+Fixed-capacity time series buffer for PyGPSClient application.
+
+Holds up to `capacity` of the most recent (time, value) samples in
+compact `array` objects, discarding the oldest samples as new ones are
+appended. The retained samples are kept contiguous and in time order,
+so a time window can be located by binary search and sliced at C speed.
+
+Also provides min/max decimation of a time window into a given number
+of buckets (e.g. one per pixel of plot width), so the cost of plotting
+a window is proportional to the plot width rather than the number of
+samples held.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class RingBuffer:
+    """
+    Fixed-capacity (time, value) buffer class.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Constructor.
+
+        :param int capacity: max number of samples retained
+        """
+
+        self._capacity = max(int(capacity), 1)
+        self._tim = array("d")
+        self._val = array("d")
+        self._start = 0  # index of oldest retained sample
+
+    def append(self, tim: float, val: float):
+        """
+        Append sample, discarding the oldest sample if at capacity.
+        Samples must be appended in time order.
+
+        :param float tim: timestamp
+        :param float val: value
+        """
+
+        self._tim.append(tim)
+        self._val.append(val)
+        if len(self._tim) - self._start > self._capacity:
+            self._start += 1
+            self._compact()
+
+    def update(self, tim: float, val: float):
+        """
+        Append sample or, if it has the same timestamp as the most
+        recent sample, replace the most recent sample's value.
+
+        :param float tim: timestamp
+        :param float val: value
+        """
+
+        if len(self) > 0 and self._tim[-1] == tim:
+            self._val[-1] = val
+        else:
+            self.append(tim, val)
+
+    def _compact(self):
+        """
+        Release storage of discarded samples once it reaches capacity, so
+        storage never exceeds twice capacity and compaction is amortised.
+        """
+
+        if self._start >= self._capacity:
+            del self._tim[: self._start]
+            del self._val[: self._start]
+            self._start = 0
+
+    def clear(self):
+        """
+        Discard all samples.
+        """
+
+        self._tim = array("d")
+        self._val = array("d")
+        self._start = 0
+
+    def items(self):
+        """
+        Iterate over retained samples in time order.
+
+        :return: iterator of (time, value) tuples
+        :rtype: iterator
+        """
+
+        return zip(self._tim[self._start :], self._val[self._start :])
+
+    def _window(self, tmin: float, tmax: float) -> tuple:
+        """
+        Get storage index range of samples within time window.
+
+        :param float tmin: start of window
+        :param float tmax: end of window
+        :return: tuple of (lo, hi) indices
+        :rtype: tuple
+        """
+
+        lo = bisect_left(self._tim, tmin, self._start)
+        return lo, bisect_right(self._tim, tmax, lo)
+
+    def decimate(self, tmin: float, tmax: float, buckets: int) -> list:
+        """
+        Get samples within time window, decimated to at most two samples
+        (the minimum and maximum, in time order) per time bucket.
+
+        :param float tmin: start of window
+        :param float tmax: end of window
+        :param int buckets: number of buckets (e.g. plot width in pixels)
+        :return: list of (time, value) tuples
+        :rtype: list
+        """
+
+        tims, vals = self._tim, self._val
+        lo, hi = self._window(tmin, tmax)
+        if hi - lo <= buckets * 2 or tmax <= tmin:
+            return list(zip(tims[lo:hi], vals[lo:hi]))
+
+        points = []
+        span = (tmax - tmin) / buckets
+        for bkt in range(1, buckets + 1):
+            end = (
+                hi if bkt == buckets else bisect_right(tims, tmin + span * bkt, lo, hi)
+            )
+            if end == lo:
+                continue
+            seg = vals[lo:end]
+            vmin, vmax = min(seg), max(seg)
+            imin, imax = seg.index(vmin), seg.index(vmax)
+            for i in sorted({imin, imax}):
+                points.append((tims[lo + i], seg[i]))
+            lo = end
+        return points
+
+    @property
+    def capacity(self) -> int:
+        """
+        Getter for capacity.
+
+        :return: max number of samples retained
+        :rtype: int
+        """
+
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int):
+        """
+        Setter for capacity. If reduced, the oldest
+        samples in excess of the new capacity are discarded.
+
+        :param int capacity: max number of samples retained
+        """
+
+        self._capacity = max(int(capacity), 1)
+        self._start = max(self._start, len(self._tim) - self._capacity)
+        self._compact()
+
+    @property
+    def last(self) -> tuple:
+        """
+        Getter for most recent sample.
+
+        :return: tuple of (time, value), or None if empty
+        :rtype: tuple
+        """
+
+        if len(self) == 0:
+            return None
+        return self._tim[-1], self._val[-1]
+
+    def __len__(self) -> int:
+        """
+        Number of retained samples.
+
+        :return: length
+        :rtype: int
+        """
+
+        return len(self._tim) - self._start
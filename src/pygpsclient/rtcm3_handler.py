@@ -13,6 +13,7 @@ Created on 10 Apr 2022
 """
 
 import logging
+from typing import Callable
 
 from pynmeagps import ecef2llh, haversine
 from pyrtcm import RTCMMessage
@@ -36,6 +37,11 @@ class RTCM3Handler:
 
         self._raw_data = None
         self._parsed_data = None
+        # map of message identity to processing function
+        self._dispatch = {
+            "1005": self._process_1005,
+            "1006": self._process_1005,
+        }
 
     def process_data(self, raw_data: bytes, parsed_data: object):
         """
@@ -50,13 +56,37 @@ class RTCM3Handler:
             if raw_data is None:
                 return
 
-            if parsed_data.identity in ("1005", "1006"):
-                self._process_1005(parsed_data)
+            process = self._dispatch.get(parsed_data.identity, None)
+            if process is None:  # unhandled message type
+                return
+            process(parsed_data)
 
         except ValueError:
             # self.__app.set_status(RTCMVALERROR.format(err), ERRCOL)
             pass
 
+    def register(self, identity: str, process: Callable):
+        """
+        Register (or override) the processing function for a given
+        RTCM3 message identity, e.g. for plugins.
+
+        :param str identity: message identity e.g. "1005"
+        :param Callable process: processing function taking parsed message as argument
+        """
+
+        self._dispatch[identity] = process
+
+    @property
+    def identities(self) -> set:
+        """
+        Getter for RTCM3 message identities processed by this handler.
+
+        :return: set of identities e.g. {"1005", "1006"}
+        :rtype: set
+        """
+
+        return set(self._dispatch)
+
     def _process_1005(self, parsed: RTCMMessage):
         """
         Process 1005/1006 ARP information message.
@@ -0,0 +1,298 @@
+"""
+sat_history.py
+
+Per-satellite history store for PyGPSClient application.
+
+Records C/N0, elevation and azimuth time series for each satellite
+("gnssId-svid") seen over a configurable retention period, e.g. for
+antenna site qualification. Each satellite's series is held in compact
+columnar `array` objects, and samples older than the retention period
+are evicted as new samples arrive, so memory is bounded by the
+retention period rather than the session length.
+
+Running C/N0 totals are maintained per constellation and elevation band
+as samples are added and evicted, so C/N0-vs-elevation mask and
+per-constellation average queries take constant time regardless of
+the number of samples held.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from heapq import merge
+from operator import itemgetter
+from time import time
+
+from pygpsclient.globals import SAT_HISTORY
+
+ELEV_BAND = 5  # width of C/N0 mask elevation bands in degrees
+ELEV_BANDS = 90 // ELEV_BAND + 1  # includes band for 90 degrees
+SWEEP_INTERVAL = 60  # interval between evictions from all satellites in seconds
+CSV_HEADER = "Timestamp,gnssId,svid,elev,azim,cno\n"
+
+
+class SatSeries:
+    """
+    Time series of samples for a single satellite.
+    """
+
+    def __init__(self, gnssId: int, svid: int):
+        """
+        Constructor.
+
+        :param int gnssId: GNSS identifier
+        :param int svid: satellite identifier
+        """
+
+        self.gnssId = gnssId
+        self.svid = svid
+        self.tim = array("d")
+        self.elev = array("f")
+        self.azim = array("f")
+        self.cno = array("f")
+        self.start = 0  # index of oldest retained sample
+
+    def append(self, tim: float, elev: float, azim: float, cno: float):
+        """
+        Append sample.
+
+        :param float tim: timestamp
+        :param float elev: elevation in degrees
+        :param float azim: azimuth in degrees
+        :param float cno: C/N0 in dB-Hz
+        """
+
+        self.tim.append(tim)
+        self.elev.append(elev)
+        self.azim.append(azim)
+        self.cno.append(cno)
+
+    def evict(self, tmin: float) -> range:
+        """
+        Evict samples older than given time.
+
+        :param float tmin: timestamp of oldest sample to retain
+        :return: storage indices of evicted samples
+        :rtype: range
+        """
+
+        start = bisect_left(self.tim, tmin, self.start)
+        evicted = range(self.start, start)
+        self.start = start
+        return evicted
+
+    def compact(self):
+        """
+        Release storage of evicted samples once it exceeds the
+        number of retained samples, so compaction is amortised.
+        """
+
+        if self.start > len(self):
+            for col in (self.tim, self.elev, self.azim, self.cno):
+                del col[: self.start]
+            self.start = 0
+
+    def items(self):
+        """
+        Iterate over retained samples in time order.
+
+        :return: iterator of (time, elev, azim, cno) tuples
+        :rtype: iterator
+        """
+
+        s = self.start
+        return zip(self.tim[s:], self.elev[s:], self.azim[s:], self.cno[s:])
+
+    def __len__(self) -> int:
+        """
+        Number of retained samples.
+
+        :return: length
+        :rtype: int
+        """
+
+        return len(self.tim) - self.start
+
+
+class SatHistory:
+    """
+    Per-satellite history store class.
+    """
+
+    def __init__(self, retention: int = SAT_HISTORY):
+        """
+        Constructor.
+
+        :param int retention: retention period in seconds (0 = none)
+        """
+
+        self.retention = retention
+        self._series = {}  # "gnssId-svid": SatSeries
+        self._cnosum = {}  # gnssId: C/N0 totals by elevation band
+        self._cnocount = {}  # gnssId: sample counts by elevation band
+        self._lastsweep = 0
+
+    def update(self, sats, tim: float = None):
+        """
+        Add samples for one or more satellites and evict any expired samples.
+        Samples with non-numeric elevation or azimuth are ignored.
+
+        :param sats: iterable of (gnssId, svid, elev, azim, cno) tuples
+        :param float tim: timestamp (None = now)
+        """
+
+        if self.retention <= 0:
+            return
+        tim = time() if tim is None else tim
+        tmin = tim - self.retention
+        for gnssId, svid, elev, azim, cno in sats:
+            try:
+                elev = float(elev)
+                azim = float(azim)
+                cno = float(cno) if cno != "" else 0.0
+            except (TypeError, ValueError):
+                continue
+            key = f"{gnssId}-{svid}"
+            series = self._series.get(key, None)
+            if series is None:
+                series = self._series[key] = SatSeries(gnssId, svid)
+            series.append(tim, elev, azim, cno)
+            # total stored values so eviction exactly reverses them
+            self._total(gnssId, series.elev[-1], series.cno[-1], 1)
+            self._evict(series, tmin)
+
+        if tim - self._lastsweep >= SWEEP_INTERVAL:  # satellites which have set
+            self._lastsweep = tim
+            for key, series in list(self._series.items()):
+                self._evict(series, tmin)
+                if len(series) == 0:
+                    del self._series[key]
+
+    def _evict(self, series: SatSeries, tmin: float):
+        """
+        Evict expired samples from satellite series and running totals.
+
+        :param SatSeries series: satellite series
+        :param float tmin: timestamp of oldest sample to retain
+        """
+
+        for i in series.evict(tmin):
+            self._total(series.gnssId, series.elev[i], series.cno[i], -1)
+        series.compact()
+
+    def _total(self, gnssId: int, elev: float, cno: float, inc: int):
+        """
+        Add or remove sample to/from running C/N0 totals.
+        Samples with zero C/N0 (i.e. not tracked) are not totalled.
+
+        :param int gnssId: GNSS identifier
+        :param float elev: elevation in degrees
+        :param float cno: C/N0 in dB-Hz
+        :param int inc: increment (1 to add, -1 to remove)
+        """
+
+        if cno <= 0:
+            return
+        if gnssId not in self._cnosum:
+            self._cnosum[gnssId] = array("d", [0] * ELEV_BANDS)
+            self._cnocount[gnssId] = array("L", [0] * ELEV_BANDS)
+        band = min(max(int(elev // ELEV_BAND), 0), ELEV_BANDS - 1)
+        self._cnosum[gnssId][band] += cno * inc
+        self._cnocount[gnssId][band] += inc
+
+    def cno_mask(self, gnssId: int = None) -> dict:
+        """
+        Get average C/N0 by elevation band over the retention period.
+
+        :param int gnssId: GNSS identifier (None = all constellations)
+        :return: dict of {band lower elevation: average C/N0} for
+            bands with tracked samples
+        :rtype: dict
+        """
+
+        gnss = self._cnosum.keys() if gnssId is None else [gnssId]
+        mask = {}
+        for band in range(ELEV_BANDS):
+            total = sum(self._cnosum[g][band] for g in gnss if g in self._cnosum)
+            count = sum(self._cnocount[g][band] for g in gnss if g in self._cnocount)
+            if count:
+                mask[band * ELEV_BAND] = total / count
+        return mask
+
+    def constellation_averages(self) -> dict:
+        """
+        Get average C/N0 by constellation over the retention period.
+
+        :return: dict of {gnssId: average C/N0} for
+            constellations with tracked samples
+        :rtype: dict
+        """
+
+        avgs = {}
+        for gnssId, totals in self._cnosum.items():
+            count = sum(self._cnocount[gnssId])
+            if count:
+                avgs[gnssId] = sum(totals) / count
+        return avgs
+
+    def series(self, key: str) -> list:
+        """
+        Get retained samples for satellite.
+
+        :param str key: satellite key "gnssId-svid"
+        :return: list of (time, elev, azim, cno) tuples
+        :rtype: list
+        """
+
+        series = self._series.get(key, None)
+        return [] if series is None else list(series.items())
+
+    def export_csv(self, filename: str) -> int:
+        """
+        Export all retained samples, in time order, to CSV file.
+
+        :param str filename: fully qualified path to CSV file
+        :return: number of samples exported
+        :rtype: int
+        :raises: OSError
+        """
+
+        def rows(series):
+            for tim, elev, azim, cno in series.items():
+                yield tim, series.gnssId, series.svid, elev, azim, cno
+
+        count = 0
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write(CSV_HEADER)
+            for tim, gnssId, svid, elev, azim, cno in merge(
+                *(rows(s) for s in self._series.values()), key=itemgetter(0)
+            ):
+                ts = datetime.fromtimestamp(tim, timezone.utc).isoformat()
+                file.write(f"{ts},{gnssId},{svid},{elev:g},{azim:g},{cno:g}\n")
+                count += 1
+        return count
+
+    def clear(self):
+        """
+        Discard all samples.
+        """
+
+        self._series = {}
+        self._cnosum = {}
+        self._cnocount = {}
+
+    def __len__(self) -> int:
+        """
+        Number of satellites held.
+
+        :return: length
+        :rtype: int
+        """
+
+        return len(self._series)
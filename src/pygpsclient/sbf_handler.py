@@ -17,14 +17,17 @@ Created on 19 May 2025
 
 import logging
 from math import degrees
+from typing import Callable
 
 from pysbf2 import SBFMessage, itow2utc
 
 from pygpsclient.globals import ASCII, BSR
-from pygpsclient.helpers import fix2desc
+from pygpsclient.helpers import fix2desc, sbfsvid2gnss
 
 DNUL = -2 * (10**10)
 DNUS = 65535
+DNUE = -32768
+DNUC = 255
 
 
 class SBFHandler:
@@ -48,6 +51,16 @@ class SBFHandler:
         self._parsed_data = None
         # Holds array of current satellites
         self.gsv_data = {}
+        # Holds latest C/N0 of each satellite from MeasEpoch
+        self._cno = {}
+        # map of message identity to processing function
+        self._dispatch = {
+            "MeasEpoch": self._process_MeasEpoch,
+            "PVTGeodetic": self._process_PVTGeodetic,
+            "ReceiverStatus": self._process_ReceiverStatus,
+            "ReceiverSetup": self._process_ReceiverSetup,
+            "SatVisibility": self._process_SatVisibility,
+        }
 
     def process_data(self, raw_data: bytes, parsed_data: object):
         """
@@ -60,12 +73,44 @@ class SBFHandler:
         if raw_data is None:
             return
         # self.logger.debug(f"data received {parsed_data.identity}")
-        if parsed_data.identity == "PVTGeodetic":
-            self._process_PVTGeodetic(parsed_data)
-        elif parsed_data.identity == "ReceiverStatus":
-            self._process_ReceiverStatus(parsed_data)
-        elif parsed_data.identity == "ReceiverSetup":
-            self._process_ReceiverSetup(parsed_data)
+        process = self._dispatch.get(parsed_data.identity, None)
+        if process is None:  # unhandled message type
+            return
+        process(parsed_data)
+
+    def register(self, identity: str, process: Callable):
+        """
+        Register (or override) the processing function for a given
+        SBF message identity, e.g. for plugins.
+
+        :param str identity: message identity e.g. "PVTGeodetic"
+        :param Callable process: processing function taking parsed message as argument
+        """
+
+        self._dispatch[identity] = process
+
+    def _process_MeasEpoch(self, data: SBFMessage):
+        """
+        Process MeasEpoch sentence - Measurement Epoch.
+
+        Records the C/N0 of each satellite's main signal,
+        for use by SatVisibility.
+
+        :param SBFMessage data: MeasEpoch message
+        """
+
+        self._cno = {}
+        for i in range(data.N1):
+            idx = f"_{i+1:02d}"
+            sat = sbfsvid2gnss(getattr(data, "SVID" + idx))
+            cno = getattr(data, "CN0" + idx)
+            if sat is None or cno == DNUC:
+                continue
+            sigidx = getattr(data, "SigIdxLo" + idx)
+            if sigidx == 31:
+                sigidx = getattr(data, "SigIdxHi" + idx) + 32
+            # GPS L1P & L2P C/N0 have no 10 dB-Hz offset
+            self._cno[sat] = cno * 0.25 + (0 if sigidx in (1, 2) else 10)
 
     def _process_PVTGeodetic(self, data: SBFMessage):
         """
@@ -125,3 +170,33 @@ class SBFHandler:
             "\x00", ""
         )
         self.__app.gnss_status.version_data = verdata
+
+    def _process_SatVisibility(self, data: SBFMessage):
+        """
+        Process SatVisibility sentence - Satellite Visibility.
+
+        :param SBFMessage data: SatVisibility message
+        """
+
+        show_unused = self.__app.configuration.snapshot().unusedsat_b
+        self.gsv_data = {}
+        sats = []
+        for i in range(data.N):
+            idx = f"_{i+1:02d}"
+            sat = sbfsvid2gnss(getattr(data, "SVID" + idx))
+            azim = getattr(data, "Azimuth" + idx)
+            elev = getattr(data, "Elevation" + idx)
+            if sat is None or azim == DNUS or elev == DNUE:
+                continue
+            gnssId, svid = sat
+            elev /= 100  # degrees
+            azim /= 100
+            cno = self._cno.get(sat, 0)
+            sats.append((gnssId, svid, elev, azim, cno))
+            if cno == 0 and not show_unused:  # omit unused sats
+                continue
+            self.gsv_data[f"{gnssId}-{svid}"] = (gnssId, svid, elev, azim, int(cno))
+
+        self.__app.sat_history.update(sats)
+        self.__app.gnss_status.siv = len(self.gsv_data)
+        self.__app.gnss_status.gsv_data = self.gsv_data
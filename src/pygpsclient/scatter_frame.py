@@ -9,6 +9,12 @@ the cumulative average position or a fixed reference position.
 The fixed reference position can be stored in the json
 configuration file as `scatterlat_f`/`scatterlon_f`.
 
+The plot is retained-mode - only new points are drawn on each update,
+and all points are only re-projected if the plot bounds change. Mean
+and standard deviation are maintained as Welford running accumulators.
+Once the number of points exceeds HEATMAP_POINTS, they are rendered
+as a 2-D density heatmap image rather than as individual canvas points.
+
 Created 23 March 2023
 
 Completely rewritten by semuadmin 5 Nov 2024 to use bounding
@@ -20,6 +26,10 @@ fixed reference selection.
 :license: BSD 3-Clause
 """
 
+from array import array
+from colorsys import hsv_to_rgb
+from math import log1p, sqrt
+from random import randrange
 from tkinter import (
     ALL,
     HORIZONTAL,
@@ -39,14 +49,7 @@ from tkinter import (
     W,
 )
 
-try:
-    from statistics import fmean, stdev
-
-    HASSTATS = True
-except (ImportError, ModuleNotFoundError):
-    HASSTATS = False
-
-from random import randrange
+from PIL import Image, ImageTk
 
 from pygpsclient.globals import (
     BGCOL,
@@ -77,9 +80,93 @@ FIXCOL = "green2"
 PNTTOPCOL = "red"
 CULLMID = True  # whether to cull random points from middle of array
 FIXINAUTO = False  # whether to include fixed ref point in autorange
-MAXPOINTS = 500
+MAXPOINTS = 50000
 PNT = "pnt"
-STDINT = 10  # standard deviation calculation interval
+TOP = "top"
+HEAT = "heat"
+HEATMAP_POINTS = 1000  # number of points above which heatmap is drawn
+HEATMAP_CELL = 4  # heatmap cell size in pixels
+# heatmap palette - index 0 is transparent, 1-255 graded from blue to red
+HEATMAP_PALETTE = [0, 0, 0] + [
+    round(c * 255)
+    for i in range(1, 256)
+    for c in hsv_to_rgb(0.66 * (1 - i / 255), 1, 1)
+]
+
+
+class RunningStats:
+    """
+    Running mean and standard deviation of lat/lon positions,
+    using Welford's online algorithm.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self.count = 0
+        self._mean = [0.0, 0.0]
+        self._m2 = [0.0, 0.0]  # sums of squared differences from mean
+
+    def add(self, lat: float, lon: float):
+        """
+        Add position to running statistics.
+
+        :param float lat: latitude
+        :param float lon: longitude
+        """
+
+        self.count += 1
+        for i, val in enumerate((lat, lon)):
+            delta = val - self._mean[i]
+            self._mean[i] += delta / self.count
+            self._m2[i] += delta * (val - self._mean[i])
+
+    def remove(self, lat: float, lon: float):
+        """
+        Remove previously added position from running statistics.
+
+        :param float lat: latitude
+        :param float lon: longitude
+        """
+
+        if self.count <= 1:
+            self.count = 0
+            self._mean = [0.0, 0.0]
+            self._m2 = [0.0, 0.0]
+            return
+        self.count -= 1
+        for i, val in enumerate((lat, lon)):
+            delta = val - self._mean[i]
+            self._mean[i] -= delta / self.count
+            self._m2[i] = max(self._m2[i] - delta * (val - self._mean[i]), 0.0)
+
+    @property
+    def mean(self) -> Point:
+        """
+        Getter for mean position.
+
+        :return: mean position, or None if no positions
+        :rtype: Point
+        """
+
+        if self.count == 0:
+            return None
+        return Point(*self._mean)
+
+    @property
+    def stddev(self) -> Point:
+        """
+        Getter for sample standard deviation of positions.
+
+        :return: standard deviation of lat and lon, or None if < 2 positions
+        :rtype: Point
+        """
+
+        if self.count < 2:
+            return None
+        return Point(*(sqrt(m2 / (self.count - 1)) for m2 in self._m2))
 
 
 class ScatterViewFrame(Frame):
@@ -107,7 +194,14 @@ class ScatterViewFrame(Frame):
         self._font = self.__app.font_sm
         self._fonth = fontheight(self._font)
         self._maxpoints = 0
-        self._points = []
+        self._lats = array("d")
+        self._lons = array("d")
+        self._newpoints = 0  # points added since last draw
+        self._stats = RunningStats()
+        self._drawnbounds = None  # bounds at which points were last projected
+        self._heat = None  # heatmap cell counts
+        self._heatsize = (0, 0)  # heatmap width, height in cells
+        self._heatimg = None
         self._average = None
         self._stddev = None
         self._fixed = None
@@ -309,7 +403,12 @@ class ScatterViewFrame(Frame):
         :param Event event: double-click event
         """
 
-        self._points = []
+        self._lats = array("d")
+        self._lons = array("d")
+        self._newpoints = 0
+        self._stats = RunningStats()
+        self._average = self._stddev = None
+        self._heat = None
         self._minlat = 100
         self._minlon = 200
         self._maxlat = -100
@@ -343,6 +442,7 @@ class ScatterViewFrame(Frame):
 
         width, height = self.get_size()
         self.canvas.delete(ALL)
+        self._drawnbounds = None  # points must be redrawn
         self.canvas.create_line(0, height / 2, width, height / 2, fill=FGCOL)
         self.canvas.create_line(width / 2, 0, width / 2, height, fill=FGCOL)
 
@@ -404,48 +504,39 @@ class ScatterViewFrame(Frame):
                 5, y, text=std, fill=PNTCOL, font=lbl_font, anchor=NW, tags=AVG
             )
             y += fh
-        np = len(self._points)
+        np = len(self._lats)
         pts = f"Pts: {np} {'!' if np >= self._maxpoints else ''}"
         self.canvas.create_text(
             5, y, text=pts, fill=PNTCOL, font=lbl_font, anchor=NW, tags=AVG
         )
 
-    def _draw_point(self, position: Point, color: str = PNTCOL, size: int = 2):
+    def _draw_point(
+        self, position: Point, color: str = PNTCOL, size: int = 2, tag: str = PNT
+    ):
         """
         Draw a point on the scatterplot.
 
         :param Point position: The point to draw
         :param str color: point color as string e.g. "orange"
         :param int size: size of circle (2)
+        :param str tag: canvas tag
         """
 
         if not point_in_bounds(self._bounds, position):
             return
 
         x, y = ll2xy(self.width, self.height, self._bounds, position)
-        self.canvas.create_circle(x, y, size, fill=color, outline=color, tags=PNT)
+        self.canvas.create_circle(x, y, size, fill=color, outline=color, tags=tag)
 
     def _set_average(self):
         """
-        Calculate the mean and standard deviation of all the lat/lon
-        pairs visible on the scatter plot. Note that this will make
+        Update the mean and standard deviation of all the lat/lon
+        pairs from the running accumulators. Note that this will make
         for some weird results near poles.
         """
 
-        lp = len(self._points)
-        if HASSTATS and lp > 1:
-            ave_lat = fmean(p.lat for p in self._points)
-            ave_lon = fmean(p.lon for p in self._points)
-            if not lp % STDINT:
-                self._stddev = Point(
-                    stdev(p.lat for p in self._points),
-                    stdev(p.lon for p in self._points),
-                )
-        else:
-            ave_lat = sum(p.lat for p in self._points) / lp
-            ave_lon = sum(p.lon for p in self._points) / lp
-
-        self._average = Point(ave_lat, ave_lon)
+        self._average = self._stats.mean
+        self._stddev = self._stats.stddev
 
     def _set_bounds(self, center: Point):
         """
@@ -462,7 +553,18 @@ class ScatterViewFrame(Frame):
         r = get_point_at_vector(center, distw, 90)
         b = get_point_at_vector(center, disth, 180)
         l = get_point_at_vector(center, distw, 270)
-        self._bounds = Area(b.lat, l.lon, t.lat, r.lon)
+        bounds = Area(b.lat, l.lon, t.lat, r.lon)
+        # ignore sub-pixel movement of center, to avoid re-projecting all points
+        old = self._bounds
+        if (
+            old is not None
+            and self._range == disth
+            and (self.width, self.height) == (cw, ch)
+            and abs(bounds.lat1 - old.lat1) < (old.lat2 - old.lat1) / max(ch, 1)
+            and abs(bounds.lon1 - old.lon1) < (old.lon2 - old.lon1) / max(cw, 1)
+        ):
+            return
+        self._bounds = bounds
         self._range = disth
 
         if self._bounds != self._lastbounds:
@@ -490,24 +592,92 @@ class ScatterViewFrame(Frame):
 
     def _redraw(self):
         """
-        Redraw all the points on the scatter plot.
+        Draw new points on the scatter plot, or re-project all
+        points if the plot bounds have changed.
         """
 
-        if not self._points:
+        if not self._lats or self._bounds is None:
             return
 
-        self.canvas.delete(PNT)
-        lp = len(self._points) - 1
-        for i, pnt in enumerate(self._points):
-            if i == lp:
-                break
-            self._draw_point(pnt, PNTCOL)
+        numpts = len(self._lats)
+        heatmap = numpts > HEATMAP_POINTS
+        if self._bounds != self._drawnbounds or heatmap != (self._heat is not None):
+            # re-project all points
+            self.canvas.delete(PNT, HEAT)
+            self._heat = None
+            self._drawnbounds = self._bounds
+            new = range(numpts)
+        else:
+            new = range(numpts - min(self._newpoints, numpts), numpts)
+        self._newpoints = 0
+
+        if heatmap:
+            if self._heat is None:
+                self._init_heatmap()
+            for i in new:
+                self._bin_point(self._lats[i], self._lons[i], 1)
+            self._draw_heatmap()
+        else:
+            for i in new:
+                self._draw_point(Point(self._lats[i], self._lons[i]), PNTCOL)
+
+        self.canvas.delete(TOP)
         if self._fixed is not None:
-            self._draw_point(self._fixed, FIXCOL, 3)
-        self._draw_point(self._points[-1], PNTTOPCOL)
+            self._draw_point(self._fixed, FIXCOL, 3, TOP)
+        self._draw_point(Point(self._lats[-1], self._lons[-1]), PNTTOPCOL, 2, TOP)
 
         self._draw_stats(self._font)
 
+    def _init_heatmap(self):
+        """
+        Initialise heatmap cell counts for current plot size.
+        """
+
+        gw = -(-self.width // HEATMAP_CELL)
+        gh = -(-self.height // HEATMAP_CELL)
+        self._heatsize = (gw, gh)
+        self._heat = array("L", bytes(gw * gh * array("L").itemsize))
+
+    def _bin_point(self, lat: float, lon: float, inc: int):
+        """
+        Add or remove point to/from heatmap cell counts.
+
+        :param float lat: latitude
+        :param float lon: longitude
+        :param int inc: increment (1 to add, -1 to remove)
+        """
+
+        x, y = ll2xy(self.width, self.height, self._bounds, Point(lat, lon))
+        gw, gh = self._heatsize
+        cx, cy = int(x // HEATMAP_CELL), int(y // HEATMAP_CELL)
+        if 0 <= cx < gw and 0 <= cy < gh:
+            idx = cy * gw + cx
+            self._heat[idx] = max(self._heat[idx] + inc, 0)
+
+    def _draw_heatmap(self):
+        """
+        Draw heatmap cell counts as a single image, graded on a
+        log scale from blue (lowest density) to red (highest).
+        """
+
+        maxcount = max(self._heat)
+        if maxcount == 0:
+            self.canvas.delete(HEAT)
+            return
+        scale = 254 / log1p(maxcount)
+        levels = bytes(int(1 + log1p(c) * scale) if c else 0 for c in self._heat)
+        img = Image.frombytes("P", self._heatsize, levels)
+        img.putpalette(HEATMAP_PALETTE)
+        img.info["transparency"] = 0
+        gw, gh = self._heatsize
+        img = img.convert("RGBA").resize(
+            (gw * HEATMAP_CELL, gh * HEATMAP_CELL), Image.Resampling.NEAREST
+        )
+        self._heatimg = ImageTk.PhotoImage(img)
+        self.canvas.delete(HEAT)
+        self.canvas.create_image(0, 0, image=self._heatimg, anchor=NW, tags=HEAT)
+        self.canvas.tag_lower(HEAT)  # keep grid and labels visible
+
     def update_frame(self):
         """
         Collect scatterplot data and update the plot.
@@ -529,14 +699,17 @@ class ScatterViewFrame(Frame):
         pos = Point(lat, lon)
 
         if (
-            self._points
-            and round(pos.lat, 9) == round(self._points[-1].lat, 9)
-            and round(pos.lon, 9) == round(self._points[-1].lon, 9)
+            self._lats
+            and round(pos.lat, 9) == round(self._lats[-1], 9)
+            and round(pos.lon, 9) == round(self._lons[-1], 9)
         ):
             return  # Don't repeat exactly the last point, to 9dp.
 
-        self._points.append(pos)
-        if len(self._points) > self._maxpoints:
+        self._lats.append(lat)
+        self._lons.append(lon)
+        self._newpoints += 1
+        self._stats.add(lat, lon)
+        if len(self._lats) > self._maxpoints:
             self._limit_points()
 
         self._set_average()
@@ -568,9 +741,13 @@ class ScatterViewFrame(Frame):
         """
 
         if CULLMID:  # cull randomly from middle
-            self._points.pop(randrange(1, len(self._points) - int(MAXPOINTS / 10)))
+            i = randrange(1, len(self._lats) - int(MAXPOINTS / 10))
         else:  # cull from start
-            self._points.pop(0)
+            i = 0
+        lat, lon = self._lats.pop(i), self._lons.pop(i)
+        self._stats.remove(lat, lon)
+        if self._heat is not None and self._drawnbounds == self._bounds:
+            self._bin_point(lat, lon, -1)
 
     def _do_autorange(self, middle: Point):
         """
@@ -607,6 +784,7 @@ class ScatterViewFrame(Frame):
 
         self.width, self.height = self.get_size()
         self._font, self._fonth = scale_font(self.width, 10, 25, 20)
+        self._heat = None  # heatmap size may have changed
         self._init_frame()
         self._redraw()
 
@@ -20,7 +20,6 @@ Created on 23 Jul 2023
 # pylint: disable=unused-argument
 
 import logging
-from time import sleep
 from tkinter import (
     DISABLED,
     NORMAL,
@@ -44,9 +43,8 @@ from pygnssutils import RTCMTYPES
 from pynmeagps import SET, NMEAMessage, ecef2llh, llh2ecef
 from pyubx2 import UBXMessage
 
+from pygpsclient.config_transfer import PACE_DELAY, TransferStatus
 from pygpsclient.globals import (
-    ASCII,
-    BSR,
     DISCONNECTED,
     ERRCOL,
     ICON_CONTRACT,
@@ -171,6 +169,7 @@ class ServerConfigFrame(Frame):
         self._fixed_lon_temp = 0
         self._fixed_hae_temp = 0
         self._pending_confs = {}
+        self._await_restart = False  # await restart after config transfer
         self._quectel_restart = 0  # keep track of Quectel receiver restarts
 
         self._body()
@@ -833,31 +832,41 @@ class ServerConfigFrame(Frame):
             cmds = [
                 cmds,
             ]
-        for cmd in cmds:
-            # self.logger.debug(f"Base Config Message: {cmd}")
-            if isinstance(cmd, (UBXMessage, NMEAMessage)):
-                self.__app.send_to_device(cmd.serialize())
-            elif isinstance(cmd, str):  # TTY ASCII string
-                self.__app.send_to_device(cmd.encode(ASCII, errors=BSR))
-                sleep(delay)  # add delay between each TTY command
-            else:  # raw bytes
-                self.__app.send_to_device(cmd)
 
         if self.receiver_type.get() == ZED_F9:
             # set RTCM and UBX NAV-SVIN message output rate
             rate = 0 if self.base_mode.get() == BASE_DISABLED else 1
             for port in ("USB", "UART1"):
-                msg = self._config_msg_rates(rate, port)
-                self.__app.send_to_device(msg.serialize())
-                msg = config_nmea(self.disable_nmea.get(), port)
-                self.__app.send_to_device(msg.serialize())
-        elif self.receiver_type.get() == LG290P:
-            # poll for confirmation that rcvr has restarted,
-            # then resend configuration commands a 2nd time
-            self._pending_confs[PQTMVER] = SERVERCONFIG
-        elif self.receiver_type.get() == LC29H:
-            # poll for confirmation warm start has finished
-            pass
+                cmds.append(self._config_msg_rates(rate, port))
+                cmds.append(config_nmea(self.disable_nmea.get(), port))
+
+        # send in background, waiting for ACKs where receiver provides them,
+        # otherwise with a delay between each command (longer for TTY commands)
+        if not any(isinstance(cmd, str) for cmd in cmds):
+            delay = PACE_DELAY
+        # LG290P restarts after configuration - once all commands are sent,
+        # poll for confirmation that rcvr has restarted, then resend
+        # configuration commands a 2nd time
+        self._await_restart = self.receiver_type.get() == LG290P
+        self.__app.config_transfer.send(cmds, self._on_config_progress, delay)
+
+    def _on_config_progress(self, status: TransferStatus):
+        """
+        THREADED
+        Log outcome of base station configuration transfer and, if
+        required, await confirmation that receiver has restarted.
+
+        :param TransferStatus status: transfer progress
+        """
+
+        if status.done:
+            self.logger.debug(
+                f"Base configuration {status.sent} of {status.total} sent, "
+                f"{status.acked} ACK, {status.naked} NAK, {status.failed} failed "
+                f"in {status.elapsed:.2f}s"
+            )
+            if self._await_restart and status.sent == status.total:
+                self._pending_confs[PQTMVER] = SERVERCONFIG
 
     def _config_msg_rates(self, rate: int, port_type: str) -> UBXMessage:
         """
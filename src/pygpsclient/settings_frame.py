@@ -116,7 +116,7 @@ from pygpsclient.strings import (
     LBLUBXCONFIG,
 )
 
-MAXLINES = ("200", "500", "1000", "2000", "100")
+MAXLINES = ("200", "500", "1000", "2000", "5000", "10000", "100")
 # initial dimensions adjusted for different widget
 # rendering on different platforms
 if system() == "Linux":  # Wayland
@@ -751,10 +751,16 @@ class SettingsFrame(Frame):
             "error_event": GNSS_ERR_EVENT,
             "inqueue": self.__app.gnss_inqueue,
             "outqueue": self.__app.gnss_outqueue,
+            "broadcast": self.__app.broadcast,
             "socket_inqueue": self.__app.socket_inqueue,
             "conntype": conntype,
             "msgmode": self.frm_serial.msgmode,
             "inactivity_timeout": self.frm_serial.inactivity_timeout,
+            "batch_interval": self.__app.configuration.get("readbatchinterval_f"),
+            "batch_size": self.__app.configuration.get("readbatchsize_n"),
+            "parse_workers": self.__app.configuration.get("parseworkers_n"),
+            "lazy_parse": self.__app.configuration.get("lazyparse_b"),
+            "async_ingest": self.__app.configuration.get("asyncingest_b"),
         }
 
         self.frm_socketserver.set_status(conntype)
@@ -790,6 +796,7 @@ class SettingsFrame(Frame):
             if self.__app.conn_status != DISCONNECTED:
                 self.__app.conn_status = DISCONNECTED
                 self.__app.stream_handler.stop_read_thread()
+                self.__app.stop_devices()
                 return
         else:
             return
@@ -799,6 +806,8 @@ class SettingsFrame(Frame):
         self.__app.conn_status = conntype
         self._reset_frames()
         self.__app.stream_handler.start_read_thread(self.__app, conndict)
+        if conntype in (CONNECTED, CONNECTED_SOCKET):
+            self.__app.start_devices()
 
     def _on_ubx_config(self, *args, **kwargs):  # pylint: disable=unused-argument
         """
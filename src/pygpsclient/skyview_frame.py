@@ -5,6 +5,12 @@ Satview frame class for PyGPSClient application.
 
 This handles a frame containing a 2D plot of satellite visibility.
 
+The axes are drawn once (and redrawn only on resize), and each
+satellite is represented by persistent canvas items keyed by
+"gnssId-svid", which are moved or recoloured only when the satellite's
+elevation, azimuth or C/N0 changes, and created or deleted only when
+the satellite rises or sets.
+
 Created on 13 Sep 2020
 
 :author: semuadmin (Steve Smith)
@@ -12,7 +18,7 @@ Created on 13 Sep 2020
 :license: BSD 3-Clause
 """
 
-from operator import itemgetter
+from bisect import bisect_left
 from tkinter import ALL, BOTH, YES, Canvas, Frame
 
 from pygpsclient.globals import BGCOL, FGCOL, GNSS_LIST, WIDGETU1
@@ -47,6 +53,9 @@ class SkyviewFrame(Frame):
         self.fg_col = FGCOL
         self._font = self.__app.font_vsm
         self._fonth = fontheight(self._font)
+        self._framesize = None  # size of currently drawn axes
+        self._sats = {}  # "gnssId-svid": [circle id, text id, (x, y, r, snr)]
+        self._satorder = []  # satellite keys in current stacking order
         self._body()
         self._attach_events()
 
@@ -77,6 +86,9 @@ class SkyviewFrame(Frame):
         w, h = self.width, self.height
         axis_r = min(h, w) / 18
         self.can_satview.delete(ALL)
+        self._framesize = (w, h, self._fonth)
+        self._sats = {}
+        self._satorder = []
         maxr = min((h / 2), (w / 2)) - axis_r
         for r in (0.2, 0.4, 0.6, 0.8, 1):
             self.can_satview.create_circle(
@@ -104,45 +116,139 @@ class SkyviewFrame(Frame):
 
         data = self.__app.gnss_status.gsv_data
         w, h = self.width, self.height
+        if self._framesize != (w, h, self._fonth):
+            self.init_frame()
         axis_r = min(h, w) / 18
         maxr = min((h / 2), (w / 2)) - axis_r
-        self.init_frame()
+        r = maxr / 10
 
-        for d in sorted(data.values(), key=itemgetter(4)):  # sort by ascending snr
+        order = []
+        for key, d in sorted(data.items(), key=lambda s: s[1][4]):  # ascending snr
             try:
                 gnssId, prn, ele, azi, snr = d
                 ele = int(ele)
                 azi = (int(azi) - 90) % 360  # adjust so north is upwards
                 x, y = cel2cart(ele, azi)
-                x = x * maxr
-                y = y * maxr
+                x = x * maxr + (w / 2)
+                y = y * maxr + (h / 2)
                 if snr == "":
                     snr = 0
                 else:
                     snr = int(snr)
-                (_, ol_col) = GNSS_LIST[gnssId]
                 prn = f"{int(prn):02}"
-                bg_col = snr2col(snr)
-                self.can_satview.create_circle(
-                    x + (w / 2),
-                    y + (h / 2),
-                    (maxr / 10),
-                    outline=ol_col,
-                    fill=bg_col,
-                    width=OL_WID,
-                )
-                self.can_satview.create_text(
-                    x + (w / 2),
-                    y + (h / 2),
-                    text=prn,
-                    fill=col2contrast(bg_col),
-                    font=self._font,
-                )
+                state = (x, y, r, snr)
+                sat = self._sats.get(key, None)
+                if sat is None:  # satellite has risen
+                    self._sats[key] = self._create_sat(gnssId, prn, state)
+                elif sat[2] != state:
+                    self._move_sat(sat, state)
+                order.append(key)
             except ValueError:
                 pass
 
+        # delete satellites which have set
+        for key in self._sats.keys() - set(order):
+            circle, text, _ = self._sats.pop(key)
+            self.can_satview.delete(circle, text)
+
+        if order != self._satorder:
+            self._restack(order)
+
         self.can_satview.update_idletasks()
 
+    def _restack(self, order: list):
+        """
+        Restack satellite canvas items so stronger signals are on top.
+
+        Satellites whose relative stacking order is unchanged (the longest
+        increasing subsequence of their previous positions) are left in
+        place, and only the remainder are moved.
+
+        :param list order: satellite keys in required stacking order
+        """
+
+        prev = {key: i for i, key in enumerate(self._satorder)}
+        tails = []  # previous positions at tail of each subsequence length
+        tailidx = []  # corresponding indices in order
+        parent = [None] * len(order)
+        for i, key in enumerate(order):
+            p = prev.get(key, None)
+            if p is None:  # new satellite
+                continue
+            j = bisect_left(tails, p)
+            parent[i] = tailidx[j - 1] if j else None
+            if j == len(tails):
+                tails.append(p)
+                tailidx.append(i)
+            else:
+                tails[j] = p
+                tailidx[j] = i
+        keep = set()
+        i = tailidx[-1] if tailidx else None
+        while i is not None:
+            keep.add(i)
+            i = parent[i]
+
+        below = None  # text item of satellite immediately below
+        for i, key in enumerate(order):
+            circle, text, _ = self._sats[key]
+            if i not in keep:
+                if below is not None:
+                    self.can_satview.tag_raise(circle, below)
+                elif keep:
+                    self.can_satview.tag_lower(circle, self._sats[order[min(keep)]][0])
+                else:
+                    self.can_satview.tag_raise(circle)
+                self.can_satview.tag_raise(text, circle)
+            below = text
+        self._satorder = order
+
+    def _create_sat(self, gnssId: int, prn: str, state: tuple) -> list:
+        """
+        Create canvas items for satellite.
+
+        :param int gnssId: GNSS identifier
+        :param str prn: satellite identifier
+        :param tuple state: tuple of (x, y, radius, snr)
+        :return: list of [circle id, text id, state]
+        :rtype: list
+        """
+
+        x, y, r, snr = state
+        _, ol_col = GNSS_LIST[gnssId]
+        bg_col = snr2col(snr)
+        circle = self.can_satview.create_circle(
+            x, y, r, outline=ol_col, fill=bg_col, width=OL_WID
+        )
+        text = self.can_satview.create_text(
+            x,
+            y,
+            text=prn,
+            fill=col2contrast(bg_col),
+            font=self._font,
+        )
+        return [circle, text, state]
+
+    def _move_sat(self, sat: list, state: tuple):
+        """
+        Move and/or recolour existing satellite canvas items.
+
+        :param list sat: list of [circle id, text id, previous state]
+        :param tuple state: tuple of (x, y, radius, snr)
+        """
+
+        circle, text, (px, py, pr, psnr) = sat
+        x, y, r, snr = state
+        if (x, y, r) != (px, py, pr):
+            self.can_satview.coords(circle, x - r, y - r, x + r, y + r)
+            self.can_satview.coords(text, x, y)
+        if snr != psnr:
+            bg_col = snr2col(snr)
+            if bg_col != snr2col(psnr):
+                self.can_satview.itemconfigure(circle, fill=bg_col)
+                self.can_satview.itemconfigure(text, fill=col2contrast(bg_col))
+        sat[2] = state
+
     def _on_resize(self, event):  # pylint: disable=unused-argument
         """
         Resize frame
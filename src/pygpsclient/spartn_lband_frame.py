@@ -59,6 +59,7 @@ from pygpsclient.globals import (
     NOPORTS,
     OKCOL,
     PASSTHRU,
+    PMP_DATARATES,
     READONLY,
     SPARTN_EOF_EVENT,
     SPARTN_ERR_EVENT,
@@ -79,50 +80,6 @@ RESERVED1 = b"\x00"
 CFGSET = "CFG-VALGET/SET"
 CFGPOLL = "CFG-VALGET"
 INPORTS = ("I2C", "UART1", "UART2", "USB", "SPI")
-PMP_DATARATES = {
-    "B600": 600,
-    "B1200": 1200,
-    "B2400": 2400,
-    "B4800": 4800,
-}
-D9S_FACTORY = {
-    "name": "D9S Factory Default",
-    "freq": 1539812500,
-    "schwin": 2200,
-    "usesid": 1,
-    "sid": 50821,
-    "drat": PMP_DATARATES["B2400"],
-    "descrm": 1,
-    "prescrm": 1,
-    "descrminit": 23560,
-    "unqword": "16238547128276412563",
-}
-D9S_PP_US = {
-    "name": "D9S PointPerfect US",
-    "freq": 1556290000,
-    "schwin": 2200,
-    "usesid": 0,
-    "sid": 21845,
-    "drat": PMP_DATARATES["B2400"],
-    "descrm": 1,
-    "prescrm": 0,
-    "descrminit": 26969,
-    "unqword": "16238547128276412563",
-}
-D9S_PP_EU = {
-    "name": "D9S PointPerfect EU",
-    "freq": 1545260000,
-    "schwin": 2200,
-    "usesid": 0,
-    "sid": 21845,
-    "drat": PMP_DATARATES["B2400"],
-    "descrm": 1,
-    "prescrm": 0,
-    "descrminit": 26969,
-    "unqword": "16238547128276412563",
-}
-# D9S default configuration
-D9S_CONFIG = D9S_PP_US  # D9S_FACTORY
 
 
 class SpartnLbandDialog(Frame):
@@ -494,6 +451,9 @@ class SpartnLbandDialog(Frame):
             "socket_inqueue": self.__app.socket_inqueue,
             "conntype": CONNECTED,
             "msgmode": self.__app.configuration.get("msgmode_n"),
+            "batch_interval": self.__app.configuration.get("readbatchinterval_f"),
+            "batch_size": self.__app.configuration.get("readbatchsize_n"),
+            "async_ingest": self.__app.configuration.get("asyncingest_b"),
             "serial_settings": self._frm_spartn_serial,
         }
 
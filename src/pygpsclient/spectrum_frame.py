@@ -6,6 +6,11 @@ Spectrum Analysis frame class for PyGPSClient application.
 This handles a frame containing a spectrum analysis chart from
 a MON-SPAN message.
 
+Recent MON-SPAN spectra are retained in a SpectrumHistory ring buffer,
+from which optional min/max-hold and average traces are plotted, or
+which can be displayed as a waterfall (spectrogram) rendered as a
+single image, newest spectrum at the top.
+
 Created on 23 Dec 2022
 
 :author: semuadmin (Steve Smith)
@@ -14,8 +19,10 @@ Created on 23 Dec 2022
 """
 
 import logging
+from colorsys import hsv_to_rgb
 from tkinter import ALL, NW, Canvas, Checkbutton, E, Frame, IntVar, N, S, W
 
+from PIL import Image, ImageTk
 from pyubx2 import UBXMessage
 
 from pygpsclient.globals import (
@@ -29,6 +36,7 @@ from pygpsclient.globals import (
     AreaXY,
 )
 from pygpsclient.helpers import data2xy, fontheight, scale_font, setubxrate, xy2data
+from pygpsclient.spectrum_history import SpectrumHistory
 from pygpsclient.strings import DLGENABLEMONSPAN, DLGNOMONSPAN, DLGWAITMONSPAN
 
 # Graph dimensions
@@ -77,6 +85,14 @@ ACTIVE = ""
 MODEINIT = "init"
 MODELIVE = "live"
 MODESNAP = "snap"
+MODEWATERFALL = "waterfall"
+HOLD_DASH = (2, 2)  # dash pattern for min/max-hold traces
+# waterfall palette graded from dark blue (weakest) to red (strongest)
+WATERFALL_PALETTE = [
+    round(c * 255)
+    for i in range(256)
+    for c in hsv_to_rgb(0.67 * (1 - i / 255), 1, 0.3 + 0.7 * min(i / 64, 1))
+]
 
 
 class SpectrumviewFrame(Frame):
@@ -111,7 +127,12 @@ class SpectrumviewFrame(Frame):
         self._showrf = True
         self._chartpos = None
         self._spectrum_snapshot = []
+        self._history = SpectrumHistory()
+        self._lastrfblocks = None
+        self._wfimg = None  # waterfall image (reference must be retained)
         self._pgaoffset = IntVar()
+        self._waterfall = IntVar()
+        self._showhold = IntVar()
         self._font = self.__app.font_sm
         self._fonth = fontheight(self._font)
         self._body()
@@ -136,9 +157,27 @@ class SpectrumviewFrame(Frame):
             variable=self._pgaoffset,
             anchor=W,
         )
+        self.chk_waterfall = Checkbutton(
+            self,
+            text="Waterfall",
+            fg=PNTCOL,
+            bg=BGCOL,
+            variable=self._waterfall,
+            anchor=W,
+        )
+        self.chk_showhold = Checkbutton(
+            self,
+            text="Hold",
+            fg=PNTCOL,
+            bg=BGCOL,
+            variable=self._showhold,
+            anchor=W,
+        )
         # self.can_spectrumview.pack(fill=BOTH, expand=YES)
         self.can_spectrumview.grid(column=0, row=0, columnspan=3, sticky=(N, S, E, W))
         self.chk_pgaoffset.grid(column=0, row=1, sticky=(W, E))
+        self.chk_waterfall.grid(column=1, row=1, sticky=(W, E))
+        self.chk_showhold.grid(column=2, row=1, sticky=(W, E))
 
     def _attach_events(self):
         """
@@ -160,11 +199,12 @@ class SpectrumviewFrame(Frame):
         w = self.width - offset * 2
         h = self.height - offset
         bounds = AreaXY(self._minhz, self._mindb, self._maxhz, self._maxdb)
+        waterfall = self._waterfall.get()
         self.can_spectrumview.delete(ALL)
 
-        # plot y (dB) axis grid
+        # plot y (dB) axis grid (y axis is time in waterfall mode)
         i = 0
-        for db in range(self._mindb, self._maxdb, TICK_DB):
+        for db in range(self._mindb, self._maxdb if not waterfall else 0, TICK_DB):
             x1, y1 = data2xy(w, h, bounds, self._minhz, db, offset)
             x2, y2 = data2xy(w, h, bounds, self._maxhz, db, offset)
             self.can_spectrumview.create_line(
@@ -225,7 +265,7 @@ class SpectrumviewFrame(Frame):
         self.can_spectrumview.create_text(
             x,
             y,
-            text="dB",
+            text="Time" if waterfall else "dB",
             fill=FGCOL,
             angle=90,
             font=self._font,
@@ -248,6 +288,8 @@ class SpectrumviewFrame(Frame):
         """
 
         self.__app.gnss_status.spectrum_data = []
+        self._history.clear()
+        self._lastrfblocks = None
         self._chartpos = None
         self._pgaoffset.set(0)
         self.can_spectrumview.delete(ALL)
@@ -315,6 +357,13 @@ class SpectrumviewFrame(Frame):
         if len(rfblocks) == 0:
             return
         self._monspan_status = ACTIVE
+        if rfblocks is not self._lastrfblocks:  # new MON-SPAN message
+            self._history.add(rfblocks)
+            self._lastrfblocks = rfblocks
+
+        if self._waterfall.get():
+            self._update_waterfall(rfblocks)
+            return
         self._update_plot(rfblocks)
 
         if self._spectrum_snapshot != []:
@@ -381,23 +430,23 @@ class SpectrumviewFrame(Frame):
                 tags=mode,
             )
 
-            # plot spectrum for this RF block
-            x2 = 5
-            y2 = self.height - 5
-            for n, (hz, db) in enumerate(rfblock):
-                x1, y1 = x2, y2
-                x2, y2 = data2xy(w, h, bounds, hz, db, offset)
-                if n:
-                    self.can_spectrumview.create_line(
-                        x1,
-                        y1,
-                        x2,
-                        y2,
-                        fill=col,
-                        width=OL_WID,
-                        tags=mode,
+            # plot min/max-hold and average traces for this RF block
+            if mode == MODELIVE and self._showhold.get():
+                mins, maxs, avgs = self._history.hold(i)
+                for vals, dash in ((mins, HOLD_DASH), (maxs, HOLD_DASH), (avgs, ())):
+                    self._plot_trace(
+                        w, h, bounds, offset, rfblocks[i], vals, col, dash, mode
                     )
 
+            # plot spectrum for this RF block as a single polyline
+            points = []
+            for hz, db in rfblock:
+                points.extend(data2xy(w, h, bounds, hz, db, offset))
+            if len(points) >= 4:
+                self.can_spectrumview.create_line(
+                    *points, fill=col, width=OL_WID, tags=mode
+                )
+
         # display any flagged chart position
         if self._chartpos is not None:
             x, y, hz, db = self._chartpos
@@ -411,6 +460,107 @@ class SpectrumviewFrame(Frame):
                 tags=mode,
             )
 
+    def _plot_trace(
+        self,
+        w: int,
+        h: int,
+        bounds: AreaXY,
+        offset: int,
+        rfblock: tuple,
+        vals: list,
+        col: str,
+        dash: tuple,
+        mode: str,
+    ):
+        """
+        Plot min/max-hold or average trace for RF block.
+
+        :param int w: plot width
+        :param int h: plot height
+        :param AreaXY bounds: data bounds
+        :param int offset: plot x offset
+        :param tuple rfblock: RF block (spec, spn, res, ctr, pga)
+        :param list vals: trace value for each frequency bin
+        :param str col: trace color
+        :param tuple dash: trace dash pattern
+        :param str mode: plot mode
+        """
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+        _, spn, res, ctr, pga = rfblock
+        pga = pga if self._pgaoffset.get() else 0
+        points = []
+        for i, db in enumerate(vals):
+            hz = int(ctr - (spn / 2) + (res * i))
+            points.extend(data2xy(w, h, bounds, hz, db + pga, offset))
+        if len(points) >= 4:
+            self.can_spectrumview.create_line(
+                *points, fill=col, width=OL_WID, dash=dash, tags=mode
+            )
+
+    def _update_waterfall(self, rfblocks: list):
+        """
+        Update waterfall plot from spectrum history, rendered as a single image
+        with one row per spectrum, newest at the top. Colors are scaled to the
+        range of values in the history.
+
+        :param list rfblocks: array of spectrum rf blocks
+        """
+
+        offset = self._fonth + 4
+        w = self.width - offset * 2
+        h = self.height - offset
+
+        self._mindb = MIN_DB
+        self._maxdb = MAX_DB
+        _, self._minhz, self._maxhz = self._get_limits(rfblocks)
+        bounds = AreaXY(self._minhz, self._mindb, self._maxhz, self._maxdb)
+        self.init_frame()
+        if self._showrf:
+            self._plot_rf_markers(w, h, bounds, offset, MODEWATERFALL)
+
+        imgs = [self._history.image(i) for i in range(self._history.blocks)]
+        imgs = [img for img in imgs if img is not None]
+        if imgs == [] or w < 1 or h < 1:
+            return
+        lo = min(img.getextrema()[0] for img in imgs)
+        hi = max(img.getextrema()[1] for img in imgs)
+        lut = [
+            min(max(round((v - lo) * 255 / max(hi - lo, 1)), 0), 255)
+            for v in range(256)
+        ]
+        rowh = h / self._history.rows
+        wfimg = Image.new("RGBA", (w, max(round(rowh * len(self._history)), 1)))
+        for img, (_, spn, _, ctr, _) in zip(imgs, rfblocks):
+            x1, _ = data2xy(w, h, bounds, ctr - spn / 2, 0)
+            x2, _ = data2xy(w, h, bounds, ctr + spn / 2, 0)
+            img = img.point(lut)
+            img.putpalette(WATERFALL_PALETTE)
+            wfimg.paste(
+                img.convert("RGB").resize(
+                    (max(round(x2 - x1), 1), wfimg.height), Image.Resampling.NEAREST
+                ),
+                (round(x1), 0),
+            )
+        self._wfimg = ImageTk.PhotoImage(wfimg)
+        self.can_spectrumview.create_image(
+            offset, 0, image=self._wfimg, anchor=NW, tags=MODEWATERFALL
+        )
+        self.can_spectrumview.tag_lower(MODEWATERFALL)  # keep grid visible
+
+        # display any flagged chart position
+        if self._chartpos is not None:
+            x, y, hz, _ = self._chartpos
+            self.can_spectrumview.create_text(
+                x,
+                y,
+                text=f"{hz:.3f} GHz",
+                fill=FGCOL,
+                font=self._font,
+                anchor="center",
+                tags=MODEWATERFALL,
+            )
+
     def _plot_rf_markers(self, w: int, h: int, bounds: AreaXY, offset: int, mode: int):
         """
         Plot RF band markers
@@ -0,0 +1,156 @@
+"""
+spectrum_history.py
+
+Spectrum history buffer for PyGPSClient application.
+
+Holds the most recent `rows` MON-SPAN spectra for each RF block in a
+fixed-size ring buffer of bytes (one 256-byte row per spectrum, as the
+MON-SPAN spectrum values are unsigned 8-bit integers), so the history
+can be rendered directly as a waterfall (spectrogram) image, and
+min/max-hold and average traces can be computed for each frequency bin
+using C-level strided slices of the buffer.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from PIL import Image
+
+SPAN_BINS = 256  # number of frequency bins in MON-SPAN spectrum
+WATERFALL_ROWS = 600  # default number of spectra retained per RF block
+
+
+class SpectrumHistory:
+    """
+    Spectrum history ring buffer class.
+    """
+
+    def __init__(self, rows: int = WATERFALL_ROWS):
+        """
+        Constructor.
+
+        :param int rows: number of spectra retained per RF block
+        """
+
+        self._rows = max(int(rows), 1)
+        self.clear()
+
+    def clear(self):
+        """
+        Discard all spectra.
+        """
+
+        self._buf = []  # bytearray of rows x SPAN_BINS per RF block
+        self._layout = None  # (span, res, center) of each RF block
+        self._next = 0  # next row to be written
+        self._count = 0  # number of rows written
+
+    def add(self, rfblocks: list):
+        """
+        Add spectra from MON-SPAN message. If the number of RF blocks
+        or their frequency ranges have changed, history is discarded.
+
+        :param list rfblocks: list of (spec, spn, res, ctr, pga) tuples,
+            one per RF block
+        """
+
+        layout = [(spn, res, ctr) for (_, spn, res, ctr, _) in rfblocks]
+        if layout != self._layout:
+            self.clear()
+            self._layout = layout
+            self._buf = [bytearray(self._rows * SPAN_BINS) for _ in rfblocks]
+        pos = self._next * SPAN_BINS
+        for buf, (spec, _, _, _, _) in zip(self._buf, rfblocks):
+            buf[pos : pos + SPAN_BINS] = bytes(
+                min(max(int(db), 0), 255) for db in spec[:SPAN_BINS]
+            ).ljust(SPAN_BINS, b"\x00")
+        self._next = (self._next + 1) % self._rows
+        self._count = min(self._count + 1, self._rows)
+
+    def _filled(self, block: int) -> memoryview:
+        """
+        Get filled rows of RF block buffer, in storage order.
+
+        :param int block: RF block index
+        :return: filled rows
+        :rtype: memoryview
+        """
+
+        return memoryview(self._buf[block])[: self._count * SPAN_BINS]
+
+    def hold(self, block: int) -> tuple:
+        """
+        Get min-hold, max-hold and average values of each frequency
+        bin over the retained history of an RF block.
+
+        :param int block: RF block index
+        :return: tuple of (mins, maxs, avgs) lists of SPAN_BINS values
+        :rtype: tuple
+        """
+
+        if self._count == 0 or block >= len(self._buf):
+            return [], [], []
+        rows = self._filled(block).tobytes()
+        mins, maxs, avgs = [], [], []
+        for i in range(SPAN_BINS):
+            col = rows[i::SPAN_BINS]
+            mins.append(min(col))
+            maxs.append(max(col))
+            avgs.append(sum(col) / self._count)
+        return mins, maxs, avgs
+
+    def image(self, block: int) -> Image:
+        """
+        Get waterfall image of an RF block's history, one pixel per
+        frequency bin (x) and spectrum (y), newest spectrum at the top.
+
+        :param int block: RF block index
+        :return: 8-bit greyscale ("L") image, or None if no history
+        :rtype: Image
+        """
+
+        if self._count == 0 or block >= len(self._buf):
+            return None
+        buf = self._buf[block]
+        pos = self._next * SPAN_BINS
+        if self._count < self._rows:  # not yet wrapped
+            rows = buf[:pos]
+        else:  # oldest row is at next write position
+            rows = buf[pos:] + buf[:pos]
+        img = Image.frombytes("L", (SPAN_BINS, self._count), bytes(rows))
+        return img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+
+    @property
+    def blocks(self) -> int:
+        """
+        Getter for number of RF blocks.
+
+        :return: number of RF blocks
+        :rtype: int
+        """
+
+        return len(self._buf)
+
+    @property
+    def rows(self) -> int:
+        """
+        Getter for max number of spectra retained per RF block.
+
+        :return: number of rows
+        :rtype: int
+        """
+
+        return self._rows
+
+    def __len__(self) -> int:
+        """
+        Number of spectra retained per RF block.
+
+        :return: length
+        :rtype: int
+        """
+
+        return self._count
@@ -5,6 +5,12 @@ sqlite3 database class for PyGPSClient application.
 
 This handles all the sqlite3 database updates.
 
+Rows are inserted by a dedicated writer thread using parameterized
+`executemany` statements, committed in batches of "databasebatchsize_n"
+rows or every "databasebatchinterval_f" seconds, whichever comes first.
+File databases use WAL journal mode with a configurable synchronous
+level ("databasesynchronous_s").
+
 **NB**: Functionality is subject to the following Python
 environmental criteria:
 
@@ -24,12 +30,22 @@ Created on 13 Sep 2025
 import logging
 import sqlite3
 import traceback
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from os import path
+from queue import Empty, Queue
+from threading import Thread
 
 from pynmeagps import ecef2llh
 
-from pygpsclient.globals import ERRCOL, HOME, INFOCOL, OKCOL
+from pygpsclient.globals import (
+    DB_BATCH_INTERVAL,
+    DB_BATCH_SIZE,
+    DB_SYNCHRONOUS,
+    ERRCOL,
+    HOME,
+    INFOCOL,
+    OKCOL,
+)
 from pygpsclient.helpers import makeval
 from pygpsclient.strings import NA
 
@@ -74,11 +90,17 @@ SQLC1 = (
 SQLI3D = (
     "INSERT INTO {table} (geom, utc, fix, hae, speed, track, siv, sip, pdop, "
     "hdop, vdop, hacc, vacc, diffcorr, diffage, diffstat, baselon, baselat, basehae) "
-    "VALUES (GeomFromText('POINTZ({lon} {lat} {hmsl})', 4326), {utc}, '{fix}', "
-    "{hae}, {speed}, {track}, {siv}, {sip}, {pdop}, {hdop}, {vdop}, {hacc}, "
-    "{vacc}, {diffcorr}, {diffage}, '{diffstat}', {baselon}, {baselat}, {basehae});"
+    "VALUES (MakePointZ(?, ?, ?, 4326), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, "
+    "?, ?, ?);"
 )
-"""SQL for inserting row into table"""
+"""Parameterized SQL for inserting rows into table"""
+
+SQLWAL = "PRAGMA journal_mode=WAL;"
+"""SQL for setting WAL journal mode"""
+SQLSYNC = "PRAGMA synchronous={sync};"
+"""SQL for setting synchronous level (OFF, NORMAL, FULL, EXTRA)"""
+SQLSYNCLEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+"""Valid synchronous levels"""
 
 SQLSEL = (
     "SELECT id, utc, ST_X(geom), ST_Y(geom), ST_Z(geom), fix, hae, speed, track, siv, "
@@ -86,6 +108,30 @@ SQLSEL = (
     "baselat, basehae from {table} {where} ORDER BY utc LIMIT {limit} OFFSET {offset};"
 )
 """SQL for retrieving rows from table"""
+SQLFIELDS = (
+    "utc",
+    "lat",
+    "lon",
+    "alt",
+    "hae",
+    "fix",
+    "speed",
+    "track",
+    "siv",
+    "sip",
+    "pdop",
+    "hdop",
+    "vdop",
+    "hacc",
+    "vacc",
+    "diff_corr",
+    "diff_age",
+    "diff_station",
+    "base_ecefx",
+    "base_ecefy",
+    "base_ecefz",
+)
+"""GNSSStatus fields loaded into table"""
 
 
 class SqliteHandler:
@@ -110,6 +156,9 @@ class SqliteHandler:
         self._dbname = None
         self._connection = None
         self._cursor = None
+        self._rowqueue = Queue()
+        self._writer_thread = None
+        self._lastversion = 0  # gnss_status version last loaded
 
     def _create(
         self,
@@ -162,12 +211,14 @@ class SqliteHandler:
                 db = dbname
                 exists = True
             else:
+                self.close()  # close any existing database
                 db = path.join(dbpath, dbname)
                 exists = path.exists(db)
                 self._db = db
                 self._table = tbname
                 self._dbname = dbname
-            self._connection = sqlite3.connect(db)
+            # connection is subsequently used only by writer thread
+            self._connection = sqlite3.connect(db, check_same_thread=False)
             self._connection.enable_load_extension(True)
             self._connection.load_extension("mod_spatialite")
             if not exists:
@@ -177,6 +228,16 @@ class SqliteHandler:
             if dbname == DBINMEM:
                 self._connection.close()
             else:
+                cfg = self.__app.configuration
+                self._connection.execute(SQLWAL)
+                self._connection.execute(
+                    SQLSYNC.format(
+                        sync=synchronous_level(cfg.get("databasesynchronous_s"))
+                    )
+                )
+                self._start_writer(
+                    cfg.get("databasebatchsize_n"), cfg.get("databasebatchinterval_f")
+                )
                 self.__app.set_status(f"Database {self._db} opened", OKCOL)
             return SQLOK
         except AttributeError as err:
@@ -192,11 +253,92 @@ class SqliteHandler:
             self.logger.debug(traceback.format_exc())
             return SQLERR  # other sqlite error
 
+    def _start_writer(
+        self, batchsize: int = DB_BATCH_SIZE, batchinterval: float = DB_BATCH_INTERVAL
+    ):
+        """
+        Start database writer thread.
+
+        :param int batchsize: max rows per committed batch
+        :param float batchinterval: max interval between commits (secs)
+        """
+
+        self._stop_writer()
+        self._writer_thread = Thread(
+            target=self._writer,
+            args=(
+                self._connection,
+                SQLI3D.format(table=self._table),
+                batchsize,
+                batchinterval,
+            ),
+            daemon=True,
+        )
+        self._writer_thread.start()
+
+    def _stop_writer(self):
+        """
+        Stop database writer thread, committing any outstanding rows.
+        """
+
+        if self._writer_thread is not None:
+            self._rowqueue.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+
+    def _writer(
+        self,
+        connection: sqlite3.Connection,
+        sql: str,
+        batchsize: int,
+        batchinterval: float,
+    ):
+        """
+        THREADED PROCESS
+        Accumulate queued rows and insert them in batches. A None
+        row signals the thread to commit any outstanding rows and stop.
+
+        :param sqlite3.Connection connection: database connection
+        :param str sql: parameterized insert statement
+        :param int batchsize: max rows per committed batch
+        :param float batchinterval: max interval between commits (secs)
+        """
+
+        rows = []
+        lastcommit = datetime.now()
+        stop = False
+        timeout = batchinterval if batchinterval > 0 else DB_BATCH_INTERVAL
+        while not stop:
+            try:
+                row = self._rowqueue.get(timeout=timeout)
+                if row is None:
+                    stop = True
+                else:
+                    rows.append(row)
+            except Empty:
+                pass
+            now = datetime.now()
+            if rows and (
+                stop
+                or len(rows) >= batchsize
+                or now >= lastcommit + timedelta(seconds=batchinterval)
+            ):
+                try:
+                    with connection:  # commits or rolls back batch
+                        connection.executemany(sql, rows)
+                    self.logger.debug(f"Inserted {len(rows)} rows")
+                except sqlite3.Error as err:
+                    self.logger.error(f"SQL error inserting {len(rows)} rows: {err}")
+                    self.logger.debug(traceback.format_exc())
+                rows = []
+                lastcommit = now
+
     def close(self):
         """
-        Close database connection.
+        Close database connection, committing any outstanding rows.
         """
 
+        self._stop_writer()
         if self._connection is not None:
             try:
                 self._connection.cursor()
@@ -204,19 +346,29 @@ class SqliteHandler:
                 return
             self._connection.close()
 
-    def load_data(self, ignore_null: bool = True) -> str:
+    def load_data(self, ignore_null: bool = True, new_epoch: bool = False) -> str:
         """
-        Load current gnss data (from `self.__app.gnss_status`) into database.
+        Queue current gnss data (from `self.__app.gnss_status`) for
+        insertion into database by writer thread, if any of the loaded
+        fields have changed since the last load.
 
         :param bool ignore_null: ignore null position flag
+        :param bool new_epoch: only load data if utc has changed since last load
         :return: result
         :rtype: str
         """
 
+        if self._writer_thread is None:
+            return SQLERR  # database not open
         gnss = self.__app.gnss_status
         if ignore_null and gnss.lat == 0.0 and gnss.lon == 0.0:
             self.logger.debug("Ignored null lat/lon value")
             return SQLOK
+        if new_epoch and not gnss.changed(self._lastversion, "utc"):
+            return SQLOK
+        if not gnss.changed(self._lastversion, *SQLFIELDS):
+            return SQLOK
+        self._lastversion = gnss.version
 
         try:
             baselat, baselon, basehae = ecef2llh(
@@ -224,35 +376,33 @@ class SqliteHandler:
             )
             basehae = 0.0 if basehae == -10000000.0 else basehae
             utc = datetime.combine(datetime.now(timezone.utc).date(), gnss.utc)
-            sql = SQLI3D.format(
-                table=self._table,
-                lon=makeval(gnss.lon),
-                lat=makeval(gnss.lat),
-                hmsl=makeval(gnss.alt),
-                utc=float(utc.strftime("%Y%m%d%H%M%S.%f")),
-                fix=gnss.fix,
-                hae=makeval(gnss.hae),
-                speed=makeval(gnss.speed),
-                track=makeval(gnss.track),
-                siv=makeval(gnss.siv, 0),
-                sip=makeval(gnss.sip, 0),
-                pdop=makeval(gnss.pdop),
-                hdop=makeval(gnss.hdop),
-                vdop=makeval(gnss.vdop),
-                hacc=makeval(gnss.hacc),
-                vacc=makeval(gnss.vacc),
-                diffcorr=makeval(gnss.diff_corr),
-                diffage=makeval(gnss.diff_age, 0),
-                diffstat=makeval(gnss.diff_station, NA),
-                baselon=makeval(baselon),
-                baselat=makeval(baselat),
-                basehae=makeval(basehae),
+            self._rowqueue.put(
+                (
+                    makeval(gnss.lon),
+                    makeval(gnss.lat),
+                    makeval(gnss.alt),
+                    float(utc.strftime("%Y%m%d%H%M%S.%f")),
+                    str(gnss.fix),
+                    makeval(gnss.hae),
+                    makeval(gnss.speed),
+                    makeval(gnss.track),
+                    makeval(gnss.siv, 0),
+                    makeval(gnss.sip, 0),
+                    makeval(gnss.pdop),
+                    makeval(gnss.hdop),
+                    makeval(gnss.vdop),
+                    makeval(gnss.hacc),
+                    makeval(gnss.vacc),
+                    makeval(gnss.diff_corr),
+                    makeval(gnss.diff_age, 0),
+                    makeval(gnss.diff_station, NA),
+                    makeval(baselon),
+                    makeval(baselat),
+                    makeval(basehae),
+                )
             )
-            sql = SQLBEGIN + sql + SQLCOMMIT
-            self._cursor.executescript(sql)
-            self.logger.debug(f"Executed SQL statement {sql}")
             return SQLOK
-        except sqlite3.Error as err:
+        except (TypeError, ValueError) as err:
             self.__app.set_status(f"SQL error: {err}", ERRCOL)
             self.logger.debug(traceback.format_exc())
             return SQLERR
@@ -269,6 +419,20 @@ class SqliteHandler:
         return self._db
 
 
+def synchronous_level(level: str) -> str:
+    """
+    Validate database synchronous level, falling back to the
+    default (NORMAL) if not one of OFF, NORMAL, FULL or EXTRA.
+
+    :param str level: synchronous level
+    :return: valid synchronous level
+    :rtype: str
+    """
+
+    level = str(level).upper()
+    return level if level in SQLSYNCLEVELS else DB_SYNCHRONOUS
+
+
 def retrieve_data(
     dbpath: str = path.join(HOME, DBNAME),
     table: str = TBNAME,
@@ -8,6 +8,29 @@ class to read and parse incoming data from the receiver. It places
 this data on an input message queue and generates a <<read-event>>
 which triggers the main App class to process the data.
 
+Read events are coalesced - while a read event is outstanding (i.e.
+has not yet been acknowledged by the consumer via `clear_read_event()`),
+further messages are queued without generating additional events, and
+the consumer drains all available messages in one pass. Event frequency
+can be further limited via the optional "batch_interval" (seconds) and
+"batch_size" (messages) settings.
+
+For high-rate streams, parsing can optionally be offloaded to a pool of
+worker processes via the "parse_workers" setting, in which case the
+read thread only frames incoming messages (see parse_pool.py).
+
+If the "async_ingest" setting is enabled, serial and socket streams
+are read by a coroutine on a single shared asyncio event loop (see
+ingest_loop.py) rather than by a dedicated thread per stream.
+
+If the "lazy_parse" setting is enabled, UBX and RTCM3 messages whose
+identities are not in `needed_identities` are not decoded at all, but
+passed on as identity-only LazyMessage objects (see lazy_message.py).
+
+If a "broadcast" function is provided in the settings, raw data is
+also passed directly to it from the read thread (e.g. for output to
+socket server clients - see broadcast_server.py).
+
 It also reads any command and poll messages placed on an output
 message queue and sends these to the receiver.
 
@@ -26,19 +49,20 @@ Created on 16 Sep 2020
 :license: BSD 3-Clause
 """
 
+import asyncio
 import logging
 import socket
 import ssl
 from datetime import datetime, timedelta
 from queue import Empty
 from threading import Event, Thread
-from time import sleep
+from time import monotonic, sleep
 
 from certifi import where as findcacerts
 from pynmeagps import NMEAMessageError, NMEAParseError
 from pyrtcm import RTCMMessageError, RTCMParseError
 from pysbf2 import SBF_PROTOCOL as SBF_PROT
-from pysbf2 import SBFReader
+from pysbf2 import SBFMessageError, SBFParseError, SBFReader
 from pyubx2 import (
     ERR_LOG,
     NMEA_PROTOCOL,
@@ -61,10 +85,61 @@ from pygpsclient.globals import (
     DEFAULT_BUFSIZE,
     ERRCOL,
     FILEREAD_INTERVAL,
+    PARSE_WORKERS,
+    READ_BATCH_INTERVAL,
+    READ_BATCH_SIZE,
     SBF_PROTOCOL,
     TTY_PROTOCOL,
     UBXSIMULATOR,
 )
+from pygpsclient.ingest_loop import (
+    INGEST_HIGH_WATER,
+    INGEST_POLL,
+    FrameBuffer,
+    SerialSource,
+    SocketSource,
+    ingest_loop,
+)
+from pygpsclient.lazy_message import lazy_message
+from pygpsclient.parse_pool import ParsePool, parse_frame
+
+PARSE_ERRORS = (
+    UBXMessageError,
+    UBXParseError,
+    NMEAMessageError,
+    NMEAParseError,
+    RTCMMessageError,
+    RTCMParseError,
+    SBFMessageError,
+    SBFParseError,
+)
+
+
+class SettingValue:
+    """
+    Minimal stand-in for a tkinter Variable, for settings
+    objects which are read via `.get()` (e.g. "socket_settings")
+    where no GUI settings frame is available.
+    """
+
+    def __init__(self, value: object):
+        """
+        Constructor.
+
+        :param object value: value
+        """
+
+        self._value = value
+
+    def get(self) -> object:
+        """
+        Get value.
+
+        :return: value
+        :rtype: object
+        """
+
+        return self._value
 
 
 class StreamHandler:
@@ -87,6 +162,11 @@ class StreamHandler:
         self._stream_thread = None
         self._stopevent = Event()
         self._ttyevent = Event()
+        self._readpending = Event()  # read event outstanding
+        self._lastevent = datetime.now()  # time of last read event
+        self._unsignalled = 0  # messages queued since last read event
+        # message identities which must be fully decoded (None = all)
+        self.needed_identities = None
 
     def start_read_thread(self, caller: object, settings: dict):
         """
@@ -97,6 +177,13 @@ class StreamHandler:
         """
 
         self._stopevent.clear()
+        self._readpending.clear()
+        self._unsignalled = 0
+        if self._async_capable(settings):
+            self._stream_thread = ingest_loop().submit(
+                self._read_async(caller, self._stopevent, settings)
+            )
+            return
         self._stream_thread = Thread(
             target=self._read_thread,
             args=(
@@ -108,6 +195,25 @@ class StreamHandler:
         )
         self._stream_thread.start()
 
+    def _async_capable(self, settings: dict) -> bool:
+        """
+        Check if stream can be read on the shared ingest loop rather
+        than a dedicated thread - only serial (other than simulator)
+        and socket streams in parsed (non-TTY) mode.
+
+        :param dict settings: settings dictionary
+        :return: True if stream is to be read on ingest loop
+        :rtype: bool
+        """
+
+        if not settings.get("async_ingest", False):
+            return False
+        if settings["protocol"] & TTY_PROTOCOL:
+            return False
+        if settings["conntype"] == CONNECTED:
+            return settings["serial_settings"].port != UBXSIMULATOR
+        return settings["conntype"] == CONNECTED_SOCKET
+
     def stop_read_thread(self):
         """
         Stop serial reader thread.
@@ -116,6 +222,47 @@ class StreamHandler:
         self._stopevent.set()
         self._stream_thread = None
 
+    def clear_read_event(self):
+        """
+        Acknowledge outstanding read event. Called by the consumer
+        immediately before it drains the input queue, so that any
+        subsequent message will generate a new read event.
+        """
+
+        self._readpending.clear()
+
+    def _post_read_event(self, settings: dict, flush: bool = False):
+        """
+        Generate read event if no event is currently outstanding and
+        the configured batch interval or batch size has been reached.
+
+        The event is appended to the tail of the Tk event queue, so
+        the read thread is not blocked while the consumer processes it.
+
+        :param dict settings: settings dictionary
+        :param bool flush: signal any unsignalled messages regardless of batch limits
+        """
+
+        if self._readpending.is_set():
+            return
+        if flush:
+            if not self._unsignalled:
+                return
+        else:
+            self._unsignalled += 1
+            batchsize = settings.get("batch_size", READ_BATCH_SIZE)
+            if not (
+                (batchsize and self._unsignalled >= batchsize)
+                or datetime.now()
+                >= self._lastevent
+                + timedelta(seconds=settings.get("batch_interval", READ_BATCH_INTERVAL))
+            ):
+                return
+        self._readpending.set()
+        self._unsignalled = 0
+        self._lastevent = datetime.now()
+        self.__master.event_generate(settings["read_event"], when="tail")
+
     def _read_thread(
         self,
         caller,
@@ -231,25 +378,178 @@ class StreamHandler:
                             inactivity_timeout,
                         )
 
-        except EOFError:
+        except (
+            EOFError,
+            TimeoutError,
+            IOError,
+            SerialException,
+            SerialTimeoutException,
+            OSError,
+            AttributeError,
+            socket.gaierror,
+        ) as err:
+            self._stream_ended(caller, stopevent, settings, err)
+
+    def _stream_ended(
+        self, caller: object, stopevent: Event, settings: dict, err: Exception
+    ):
+        """
+        Signal end of stream - end of file, inactivity timeout or
+        stream error.
+
+        :param caller owner: calling object
+        :param Event stopevent: thread stop event
+        :param dict settings: settings dictionary
+        :param Exception err: exception which ended stream
+        """
+
+        if isinstance(err, EOFError):
             stopevent.set()
+            self._post_read_event(settings, True)
             self.__master.event_generate(settings["eof_event"])
-        except TimeoutError:
+        elif isinstance(err, TimeoutError):
             stopevent.set()
+            self._post_read_event(settings, True)
             self.__master.event_generate(settings["timeout_event"])
+        elif not stopevent.is_set():
+            stopevent.set()
+            self.__master.event_generate(settings["error_event"])
+            if hasattr(caller, "set_status"):
+                caller.set_status(str(err), ERRCOL)
+
+    async def _read_async(self, caller: object, stopevent: Event, settings: dict):
+        """
+        INGEST LOOP COROUTINE
+        Connects to selected serial or socket stream and reads it
+        until stop event or stream error, as for `_readloop()`.
+
+        Reads are paused while the consumer has more than
+        INGEST_HIGH_WATER unprocessed messages, so a slow consumer
+        applies backpressure to the stream rather than letting the
+        input queue grow without limit.
+
+        :param caller owner: calling object
+        :param Event stopevent: thread stop event
+        :param dict settings: settings dictionary
+        """
+
+        def _put(raw_data: bytes, parsed_data: object):
+            """
+            Output message to any socket server clients, place it
+            on input queue and signal read event.
+
+            :param bytes raw_data: raw message
+            :param object parsed_data: parsed message
+            """
+
+            if broadcast is not None:
+                broadcast(raw_data)
+            inqueue.put((raw_data, parsed_data))
+            self._post_read_event(settings)
+
+        async def _completed(wait: bool = False):
+            """
+            Output messages parsed by worker processes. Awaits
+            rather than blocks on any frames still being parsed.
+
+            :param bool wait: wait for all outstanding frames
+            """
+
+            futures = pool.blocking_futures(wait)
+            if futures:
+                await asyncio.wait([asyncio.wrap_future(fut) for fut in futures])
+            try:
+                for raw, parsed in pool.completed(wait):
+                    _put(raw, parsed)
+            except PARSE_ERRORS as err:
+                inqueue.put((None, f"Error parsing data stream {err}"))
+                self._post_read_event(settings)
+
+        inqueue = settings["inqueue"]
+        outqueue = settings["outqueue"]
+        broadcast = settings.get("broadcast", None)
+        msgmode = settings["msgmode"]
+        inactivity = settings.get("inactivity_timeout", 0)
+        workers = settings.get("parse_workers", PARSE_WORKERS)
+        lazy = settings.get("lazy_parse", False)
+        framer = FrameBuffer(bool(settings["protocol"] & SBF_PROTOCOL))
+        if settings["conntype"] == CONNECTED:
+            source = SerialSource(settings["serial_settings"])
+        else:
+            soc = settings["socket_settings"]
+            source = SocketSource(
+                soc.server.get(),
+                int(soc.port.get()),
+                soc.protocol.get(),
+                int(soc.https.get()),
+            )
+        pool = None
+        try:
+            await source.open()
+            pool = ParsePool(workers, msgmode) if workers else None
+            lastevent = monotonic()
+            while not stopevent.is_set():
+                while inqueue.qsize() > INGEST_HIGH_WATER and not stopevent.is_set():
+                    self._post_read_event(settings, True)
+                    await asyncio.sleep(INGEST_POLL)
+                data = await source.read(INGEST_POLL)
+                if data == b"":  # connection closed by server
+                    raise EOFError
+                if data is not None:
+                    framer.feed(data)
+                    for raw_data in framer.frames():
+                        try:
+                            parsed_data = (
+                                lazy_message(raw_data, msgmode, self.needed_identities)
+                                if lazy
+                                else None
+                            )
+                            if pool is not None:  # parse in worker process
+                                futures = pool.blocking_futures()
+                                if futures:  # backlog full
+                                    await asyncio.wait(
+                                        [asyncio.wrap_future(fut) for fut in futures]
+                                    )
+                                pool.submit(raw_data, parsed_data)
+                                continue
+                            if parsed_data is None:
+                                parsed_data = parse_frame(raw_data, msgmode)
+                        except PARSE_ERRORS as err:
+                            parsed_data = f"Error parsing data stream {err}"
+                        _put(raw_data, parsed_data)
+                    if pool is not None:
+                        await _completed()
+                    lastevent = monotonic()
+                else:  # no data within poll interval
+                    if pool is not None:
+                        await _completed(True)
+                    self._post_read_event(settings, True)
+                    if inactivity and monotonic() > lastevent + inactivity:
+                        raise TimeoutError
+
+                # write any queued output data to stream
+                while not outqueue.empty():
+                    try:
+                        data = outqueue.get(False)
+                    except Empty:
+                        break
+                    if data is not None:
+                        await source.write(data)
+                    outqueue.task_done()
         except (
-            IOError,
+            EOFError,
+            TimeoutError,
             SerialException,
             SerialTimeoutException,
             OSError,
             AttributeError,
-            socket.gaierror,
+            ValueError,
         ) as err:
-            if not stopevent.is_set():
-                stopevent.set()
-                self.__master.event_generate(settings["error_event"])
-                if hasattr(caller, "set_status"):
-                    caller.set_status(str(err), ERRCOL)
+            self._stream_ended(caller, stopevent, settings, err)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            source.close()
 
     def _readloop(
         self,
@@ -265,6 +565,12 @@ class StreamHandler:
         File streams use a small delay between reads to
         prevent thrashing.
 
+        If "parse_workers" > 0, messages are only framed here and
+        parsed by a ParsePool, which returns them in arrival order.
+
+        If "lazy_parse" is True, messages are only framed here and
+        any whose identity is not needed are wrapped in a LazyMessage.
+
         :param Event stopevent: thread stop event
         :param object stream: serial data stream
         :param dict settings: settings dictionary
@@ -280,9 +586,28 @@ class StreamHandler:
 
             parsed_data = f"Error parsing data stream {err}"
             settings["inqueue"].put((raw_data, parsed_data))
-            self.__master.event_generate(settings["read_event"])
+            self._post_read_event(settings)
+
+        def _put(raw_data: bytes, parsed_data: object):
+            """
+            Output message to any socket server clients, place it
+            on input queue and signal read event.
+
+            :param bytes raw_data: raw message
+            :param object parsed_data: parsed message
+            """
+
+            if broadcast is not None:
+                broadcast(raw_data)
+            settings["inqueue"].put((raw_data, parsed_data))
+            self._post_read_event(settings)
 
         conntype = settings["conntype"]
+        broadcast = settings.get("broadcast", None)
+        workers = settings.get("parse_workers", PARSE_WORKERS)
+        pool = ParsePool(workers, settings["msgmode"]) if workers else None
+        lazy = settings.get("lazy_parse", False)
+        parsing = pool is None and not lazy
 
         if settings["protocol"] & SBF_PROTOCOL:
             # Parsed mode (NMEA, SBF, RTCM3)
@@ -291,6 +616,7 @@ class StreamHandler:
                 protfilter=NMEA_PROTOCOL | SBF_PROT | RTCM3_PROTOCOL,
                 quitonerror=ERR_LOG,
                 bufsize=DEFAULT_BUFSIZE,
+                parsing=parsing,
                 errorhandler=_errorhandler,
             )
         else:
@@ -301,6 +627,7 @@ class StreamHandler:
                 quitonerror=ERR_LOG,
                 bufsize=DEFAULT_BUFSIZE,
                 msgmode=settings["msgmode"],
+                parsing=parsing,
                 errorhandler=_errorhandler,
             )
 
@@ -308,49 +635,67 @@ class StreamHandler:
         parsed_data = None
         lastread = datetime.now()
         lastevent = datetime.now()
-        while not stopevent.is_set():
-            try:
-                if conntype in (CONNECTED, CONNECTED_SOCKET) or (
-                    conntype == CONNECTED_FILE
-                    and datetime.now() > lastread + timedelta(seconds=FILEREAD_INTERVAL)
-                ):
-                    raw_data, parsed_data = ubr.read()
-                    if raw_data is not None:
-                        settings["inqueue"].put((raw_data, parsed_data))
-                        self.__master.event_generate(settings["read_event"])
-                        lastevent = datetime.now()
-                    else:  # timeout or eof
+        try:
+            while not stopevent.is_set():
+                try:
+                    if conntype in (CONNECTED, CONNECTED_SOCKET) or (
+                        conntype == CONNECTED_FILE
+                        and datetime.now()
+                        > lastread + timedelta(seconds=FILEREAD_INTERVAL)
+                    ):
+                        raw_data, parsed_data = ubr.read()
+                        if raw_data is not None:
+                            if not parsing:  # framed only
+                                if lazy:
+                                    parsed_data = lazy_message(
+                                        raw_data,
+                                        settings["msgmode"],
+                                        self.needed_identities,
+                                    )
+                                if pool is not None:  # parse in worker process
+                                    pool.submit(raw_data, parsed_data)
+                                elif parsed_data is None:
+                                    parsed_data = parse_frame(
+                                        raw_data, settings["msgmode"]
+                                    )
+                            if pool is None:
+                                _put(raw_data, parsed_data)
+                            else:
+                                for raw, parsed in pool.completed():
+                                    _put(raw, parsed)
+                            lastevent = datetime.now()
+                        else:  # timeout or eof
+                            if pool is not None:
+                                for raw, parsed in pool.completed(True):
+                                    _put(raw, parsed)
+                            self._post_read_event(settings, True)
+                            if conntype == CONNECTED_FILE:
+                                raise EOFError
+                            if inactivity and datetime.now() > lastevent + timedelta(
+                                seconds=inactivity
+                            ):
+                                raise TimeoutError
                         if conntype == CONNECTED_FILE:
-                            raise EOFError
-                        if inactivity and datetime.now() > lastevent + timedelta(
-                            seconds=inactivity
-                        ):
-                            raise TimeoutError
-                    if conntype == CONNECTED_FILE:
-                        lastread = datetime.now()
-                        self.__master.update_idletasks()
-
-                    # write any queued output data to serial stream
-                    if conntype in (CONNECTED, CONNECTED_SOCKET):
-                        try:
-                            while not settings["outqueue"].empty():
-                                data = settings["outqueue"].get(False)
-                                if data is not None:
-                                    ubr.datastream.write(data)
-                                settings["outqueue"].task_done()
-                        except Empty:
-                            pass
-
-            except (
-                UBXMessageError,
-                UBXParseError,
-                NMEAMessageError,
-                NMEAParseError,
-                RTCMMessageError,
-                RTCMParseError,
-            ) as err:
-                _errorhandler(err)
-                continue
+                            lastread = datetime.now()
+                            self.__master.update_idletasks()
+
+                        # write any queued output data to serial stream
+                        if conntype in (CONNECTED, CONNECTED_SOCKET):
+                            try:
+                                while not settings["outqueue"].empty():
+                                    data = settings["outqueue"].get(False)
+                                    if data is not None:
+                                        ubr.datastream.write(data)
+                                    settings["outqueue"].task_done()
+                            except Empty:
+                                pass
+
+                except PARSE_ERRORS as err:
+                    _errorhandler(err)
+                    continue
+        finally:
+            if pool is not None:
+                pool.shutdown()
 
     def _readlooptty(
         self,
@@ -378,8 +723,9 @@ class StreamHandler:
 
             parsed_data = f"Error parsing data stream {err}"
             settings["inqueue"].put((raw_data, parsed_data))
-            self.__master.event_generate(settings["read_event"])
+            self._post_read_event(settings)
 
+        broadcast = settings.get("broadcast", None)
         raw_data = None
         while not stopevent.is_set():
 
@@ -405,10 +751,14 @@ class StreamHandler:
 
                 # place ascii data on input queue
                 if raw_data != b"":
+                    if broadcast is not None:
+                        broadcast(raw_data)
                     settings["inqueue"].put(
                         (raw_data, raw_data.decode(ASCII, errors=BSR))
                     )
-                    self.__master.event_generate(settings["read_event"])
+                    self._post_read_event(settings)
+                else:
+                    self._post_read_event(settings, True)
 
             except (ValueError, SerialException) as err:
                 _errorhandler(err)
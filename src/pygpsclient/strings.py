@@ -49,6 +49,7 @@ LOADCONFIGOK = "Configuration loaded {}"
 LOADCONFIGNONE = "Configuration file not found {}, using defaults"
 MAPCONFIGERR = "Custom map configuration error"
 MAPOPENERR = "Unable to open custom map:\n{}"
+MAPPYRAMIDWAIT = "Preparing large custom map,\nplease wait..."
 MQTTCONN = "Connecting to MQTT server {}..."
 NMEAVALERROR = "Value error in NMEA message: {}"
 NOCONN = "NO CONNECTION"
@@ -62,6 +63,9 @@ NULLSEND = "Nothing to send"
 OUTOFBOUNDS = "No custom map available for {}"
 OPENFILEERROR = "ERROR! File could not be opened"
 READTITLE = "Select File"
+SATHISTORYBAD = "Satellite history not exported {}"
+SATHISTORYOK = "Satellite history exported, {} samples"
+SATHISTORYTITLE = "Satellite History File"
 SAVECONFIGBAD = "Configuration not saved {}"
 SAVECONFIGOK = "Configuration saved OK"
 SAVEERROR = "ERROR! File could not be saved to specified directory"
@@ -81,6 +85,7 @@ HALTTAGWARN = "HALTED ON USER TAG MATCH: {}"
 MENUABOUT = "About"
 MENUCAN = "Cancel"
 MENUEXIT = "Exit"
+MENUEXPORTSAT = "Export Satellite History"
 MENUFILE = "File"
 MENUHELP = "Help"
 MENULOAD = "Load Configuration"
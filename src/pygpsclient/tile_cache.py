@@ -0,0 +1,318 @@
+"""
+tile_cache.py
+
+Slippy-map tile cache for PyGPSClient application.
+
+Renders maps from standard 256 x 256 pixel Web Mercator ("slippy map")
+tiles held in an on-disk cache directory tree of the form
+`{cachedir}/{zoom}/{x}/{y}.png`, with an in-memory LRU cache of decoded
+tile images. Map redraws are therefore local and work completely
+offline, provided the relevant tiles are in the cache.
+
+If a tile server URL template (e.g. "https://tile.example.com/{z}/{x}/{y}.png")
+is configured, missing tiles, together with a one-tile margin around
+the current view, are fetched into the disk cache by a background
+thread. The cache can also be pre-seeded from any local directory
+tree of tiles in the same `{zoom}/{x}/{y}` layout.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+import logging
+from collections import OrderedDict
+from math import atan, degrees, exp, log, pi, radians, tan
+from os import makedirs, path, replace, scandir
+from queue import Queue
+from shutil import copyfile
+from threading import Lock, Thread
+from time import monotonic
+
+from PIL import Image, UnidentifiedImageError
+from requests import RequestException, get
+
+from pygpsclient.globals import APPNAME, TILE_CACHE_SIZE, Area, Point
+
+TILE_BGCOL = "#3d3d3d"  # i.e. BGCOL "gray24" as understood by PIL
+TILE_SIZE = 256  # pixels
+TILE_EXTS = (".png", ".jpg", ".jpeg")
+TILE_TIMEOUT = 5  # tile server timeout in seconds
+TILE_RETRY = 30  # initial delay before refetching a failed tile in seconds
+TILE_RETRY_MAX = 3600  # max delay before refetching a failed tile in seconds
+MAX_TILE_ZOOM = 19
+MAX_LAT = 85.0511287798  # limit of Web Mercator projection
+
+
+def ll2tile(lat: float, lon: float, zoom: int) -> tuple:
+    """
+    Convert lat/lon to fractional slippy-map tile coordinates.
+
+    :param float lat: latitude
+    :param float lon: longitude
+    :param int zoom: zoom level
+    :return: tuple of (x, y) tile coordinates
+    :rtype: tuple
+    """
+
+    lat = min(max(lat, -MAX_LAT), MAX_LAT)
+    n = 2**zoom
+    x = (lon + 180) / 360 * n
+    y = (1 - log(tan(pi / 4 + radians(lat) / 2)) / pi) / 2 * n
+    return x, y
+
+
+def tile2ll(x: float, y: float, zoom: int) -> Point:
+    """
+    Convert fractional slippy-map tile coordinates to lat/lon.
+
+    :param float x: tile x coordinate
+    :param float y: tile y coordinate
+    :param int zoom: zoom level
+    :return: location
+    :rtype: Point
+    """
+
+    n = 2**zoom
+    lon = x / n * 360 - 180
+    lat = degrees(2 * atan(exp(pi * (1 - 2 * y / n))) - pi / 2)
+    return Point(lat, lon)
+
+
+class TileCache:
+    """
+    Slippy-map tile cache class.
+    """
+
+    def __init__(self, cachedir: str, url: str = "", memsize: int = TILE_CACHE_SIZE):
+        """
+        Constructor.
+
+        :param str cachedir: tile cache directory
+        :param str url: tile server URL template with {z}, {x} and {y}
+            placeholders, or "" for offline use only
+        :param int memsize: max number of decoded tiles held in memory
+        """
+
+        self.logger = logging.getLogger(__name__)
+        self._cachedir = cachedir
+        self._url = url
+        self._memsize = max(memsize, 1)
+        self._tiles = OrderedDict()  # (z, x, y): Image, least recently used first
+        self._pending = set()  # tiles queued for fetch
+        self._failed = {}  # (z, x, y): (retry time, retry delay) of failed tiles
+        self._lock = Lock()
+        self._fetchqueue = Queue()
+        self._fetch_thread = None
+
+    def tile_path(self, z: int, x: int, y: int) -> str:
+        """
+        Get path of cached tile, whatever its image format.
+
+        :param int z: zoom level
+        :param int x: tile x coordinate
+        :param int y: tile y coordinate
+        :return: path to tile, or None if not cached
+        :rtype: str
+        """
+
+        base = path.join(self._cachedir, str(z), str(x), str(y))
+        for ext in TILE_EXTS:
+            if path.exists(base + ext):
+                return base + ext
+        return None
+
+    def get(self, z: int, x: int, y: int) -> Image:
+        """
+        Get decoded tile image from memory or disk cache. If the
+        tile is not cached, it is queued for fetch (where a tile server
+        is configured) and None is returned.
+
+        :param int z: zoom level
+        :param int x: tile x coordinate
+        :param int y: tile y coordinate
+        :return: tile image, or None if not cached
+        :rtype: Image
+        """
+
+        key = (z, x, y)
+        img = self._tiles.get(key, None)
+        if img is not None:
+            self._tiles.move_to_end(key)
+            return img
+        tpath = self.tile_path(z, x, y)
+        if tpath is None:
+            self.fetch(z, x, y)
+            return None
+        try:
+            with Image.open(tpath) as tile:
+                img = tile.convert("RGB")
+        except (OSError, UnidentifiedImageError):
+            self.logger.debug(f"Invalid tile {tpath}")
+            return None
+        self._tiles[key] = img
+        while len(self._tiles) > self._memsize:
+            self._tiles.popitem(last=False)
+        return img
+
+    def render(self, center: Point, zoom: int, width: int, height: int) -> tuple:
+        """
+        Render map image of given size centered on location, from cached
+        tiles. Tiles in a one-tile margin around the map are prefetched.
+
+        :param Point center: center of map
+        :param int zoom: zoom level
+        :param int width: width of map in pixels
+        :param int height: height of map in pixels
+        :return: tuple of (map image, map bounds, number of missing tiles)
+        :rtype: tuple
+        """
+
+        zoom = min(max(zoom, 0), MAX_TILE_ZOOM)
+        n = 2**zoom
+        cx, cy = ll2tile(center.lat, center.lon, zoom)
+        x1 = cx - width / TILE_SIZE / 2  # view edges in tile coordinates
+        y1 = cy - height / TILE_SIZE / 2
+        x2 = x1 + width / TILE_SIZE
+        y2 = y1 + height / TILE_SIZE
+        image = Image.new("RGB", (width, height), TILE_BGCOL)
+        missing = 0
+        for ty in range(int(y1 // 1) - 1, int(y2 // 1) + 2):
+            if not 0 <= ty < n:
+                continue
+            for tx in range(int(x1 // 1) - 1, int(x2 // 1) + 2):
+                inview = x1 - 1 < tx < x2 and y1 - 1 < ty < y2
+                if not inview:
+                    self.fetch(zoom, tx % n, ty)  # prefetch margin
+                    continue
+                tile = self.get(zoom, tx % n, ty)
+                if tile is None:
+                    missing += 1
+                    continue
+                image.paste(
+                    tile,
+                    (round((tx - x1) * TILE_SIZE), round((ty - y1) * TILE_SIZE)),
+                )
+        tl = tile2ll(x1, y1, zoom)
+        br = tile2ll(x2, y2, zoom)
+        return image, Area(br.lat, tl.lon, tl.lat, br.lon), missing
+
+    def fetch(self, z: int, x: int, y: int):
+        """
+        Queue tile for fetch from tile server into disk cache,
+        if a tile server is configured and the tile is not already cached.
+        Tiles which failed to fetch are not requeued until their retry
+        delay has expired, the delay doubling on each failure.
+
+        :param int z: zoom level
+        :param int x: tile x coordinate
+        :param int y: tile y coordinate
+        """
+
+        if self._url == "":
+            return
+        key = (z, x, y)
+        with self._lock:
+            if key in self._pending:
+                return
+            if key in self._failed and monotonic() < self._failed[key][0]:
+                return
+            if self.tile_path(z, x, y) is not None:
+                return
+            self._pending.add(key)
+        if self._fetch_thread is None:
+            self._fetch_thread = Thread(target=self._fetcher, daemon=True)
+            self._fetch_thread.start()
+        self._fetchqueue.put(key)
+
+    def _fetcher(self):
+        """
+        THREADED PROCESS
+        Fetch queued tiles from tile server and save them to disk cache.
+        A None tile signals the thread to stop.
+        """
+
+        headers = {"User-Agent": APPNAME}
+        while True:
+            key = self._fetchqueue.get()
+            if key is None:
+                break
+            z, x, y = key
+            url = self._url.format(z=z, x=x, y=y)
+            try:
+                response = get(url, headers=headers, timeout=TILE_TIMEOUT)
+                response.raise_for_status()
+                ext = path.splitext(url.split("?")[0])[1].lower()
+                tpath = path.join(
+                    self._cachedir,
+                    str(z),
+                    str(x),
+                    str(y) + (ext if ext in TILE_EXTS else TILE_EXTS[0]),
+                )
+                makedirs(path.dirname(tpath), exist_ok=True)
+                with open(tpath + ".tmp", "wb") as outfile:
+                    outfile.write(response.content)
+                replace(tpath + ".tmp", tpath)  # never leave partial tile
+                failed = False
+            except (RequestException, OSError) as err:
+                self.logger.debug(f"Tile fetch error {url} {err}")
+                failed = True
+            with self._lock:
+                self._pending.discard(key)
+                if failed:
+                    _, delay = self._failed.get(key, (0, TILE_RETRY / 2))
+                    delay = min(delay * 2, TILE_RETRY_MAX)
+                    self._failed[key] = (monotonic() + delay, delay)
+                else:
+                    self._failed.pop(key, None)
+
+    def seed(self, srcdir: str) -> int:
+        """
+        Pre-seed disk cache from local directory tree of tiles in
+        {zoom}/{x}/{y}.png format. Tiles already in the cache are not
+        overwritten.
+
+        :param str srcdir: source tile directory
+        :return: number of tiles copied
+        :rtype: int
+        """
+
+        if not path.isdir(srcdir) or path.abspath(srcdir) == path.abspath(
+            self._cachedir
+        ):
+            return 0
+        count = 0
+        for zdir in scandir(srcdir):
+            if not (zdir.is_dir() and zdir.name.isdigit()):
+                continue
+            for xdir in scandir(zdir.path):
+                if not (xdir.is_dir() and xdir.name.isdigit()):
+                    continue
+                for tile in scandir(xdir.path):
+                    y, ext = path.splitext(tile.name)
+                    if not (y.isdigit() and ext.lower() in TILE_EXTS):
+                        continue
+                    if self.tile_path(int(zdir.name), int(xdir.name), int(y)):
+                        continue
+                    dest = path.join(self._cachedir, zdir.name, xdir.name)
+                    makedirs(dest, exist_ok=True)
+                    copyfile(tile.path, path.join(dest, tile.name))
+                    count += 1
+        return count
+
+    def close(self):
+        """
+        Stop tile fetch thread, abandoning any outstanding fetches.
+        """
+
+        if self._fetch_thread is not None:
+            while not self._fetchqueue.empty():
+                self._fetchqueue.get_nowait()
+            self._fetchqueue.put(None)
+            self._fetch_thread = None
+        with self._lock:
+            self._pending.clear()
+            self._failed.clear()
+        self._tiles.clear()
@@ -0,0 +1,299 @@
+"""
+track_buffer.py
+
+Streaming track simplification buffer for PyGPSClient application.
+
+Holds a live track recorded from successive position fixes, simplified
+as it grows so that it never deviates from the recorded positions by
+more than a given fixed tolerance (the map applies its own
+zoom-dependent tolerance when the track is drawn):
+
+ - each new fix is tested against a short "opening window" of
+   uncommitted tail points - if all tail points lie within tolerance of
+   the line from the last committed point to the new fix, the new fix
+   simply extends the window; otherwise the previous fix is committed
+   and the intermediate tail points are dropped. This is O(window) per fix.
+ - if the buffer still exceeds its point limit, it is re-simplified
+   using Douglas-Peucker to half the limit, retaining the most
+   geometrically significant points, and the tolerance is raised
+   accordingly. This is amortised O(log n) per fix.
+
+Committed track segments are held in a simple lat/lon grid index, so
+the segments within a map viewport can be found without scanning the
+whole track.
+
+Distances are measured in degrees of latitude on a local equirectangular
+projection, so a tolerance can be derived directly from the map bounds
+and canvas height.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from heapq import heappop, heappush
+from math import cos, floor, radians
+
+from pygpsclient.globals import Area, Point
+
+GRID_CELL = 0.01  # size of grid index cells in degrees
+LONG_CELLS = 16  # segments spanning more grid cells than this are not gridded
+TAIL_MAX = 32  # max number of uncommitted points in opening window
+
+
+def _seg_dist(
+    px: float, py: float, ax: float, ay: float, bx: float, by: float
+) -> float:
+    """
+    Get squared distance of point from line segment.
+
+    :param float px: point x
+    :param float py: point y
+    :param float ax: segment start x
+    :param float ay: segment start y
+    :param float bx: segment end x
+    :param float by: segment end y
+    :return: squared distance
+    :rtype: float
+    """
+
+    dx, dy = bx - ax, by - ay
+    seglen = dx * dx + dy * dy
+    t = 0 if seglen == 0 else min(max(((px - ax) * dx + (py - ay) * dy) / seglen, 0), 1)
+    ex, ey = px - ax - t * dx, py - ay - t * dy
+    return ex * ex + ey * ey
+
+
+def _farthest(xs: list, ys: list, a: int, b: int) -> tuple:
+    """
+    Find point between indices a and b farthest from segment a-b.
+
+    :param list xs: projected x coordinates
+    :param list ys: projected y coordinates
+    :param int a: segment start index
+    :param int b: segment end index
+    :return: tuple of (squared distance, index)
+    :rtype: tuple
+    """
+
+    ax, ay, bx, by = xs[a], ys[a], xs[b], ys[b]
+    dmax, imax = -1.0, a
+    for i in range(a + 1, b):
+        d = _seg_dist(xs[i], ys[i], ax, ay, bx, by)
+        if d > dmax:
+            dmax, imax = d, i
+    return dmax, imax
+
+
+def _project(track: list) -> tuple:
+    """
+    Project track onto local equirectangular plane, in degrees of latitude.
+
+    :param list track: list of Points
+    :return: tuple of (xs, ys) lists
+    :rtype: tuple
+    """
+
+    coslat = cos(radians(track[0].lat))
+    return [p.lon * coslat for p in track], [p.lat for p in track]
+
+
+def simplify(track: list, tolerance: float = 0.0, limit: int = 0) -> tuple:
+    """
+    Simplify track using Douglas-Peucker, adding the most significant
+    points first until all remaining points lie within tolerance or the
+    point limit is reached.
+
+    :param list track: list of Points
+    :param float tolerance: max deviation in degrees of latitude
+    :param int limit: max number of points (0 = no limit)
+    :return: tuple of (simplified track, max deviation of dropped points)
+    :rtype: tuple
+    """
+
+    n = len(track)
+    if n < 3 or (0 < limit and n <= limit and tolerance <= 0):
+        return list(track), 0.0
+    xs, ys = _project(track)
+    keep = bytearray(n)
+    keep[0] = keep[-1] = 1
+    count = 2
+    tol2 = tolerance * tolerance
+    heap = []
+    d, i = _farthest(xs, ys, 0, n - 1)
+    heappush(heap, (-d, i, 0, n - 1))
+    while heap:
+        d, i, a, b = heap[0]
+        if -d <= tol2 or (0 < limit <= count):
+            break
+        heappop(heap)
+        keep[i] = 1
+        count += 1
+        for a, b in ((a, i), (i, b)):
+            if b - a > 1:
+                d, j = _farthest(xs, ys, a, b)
+                heappush(heap, (-d, j, a, b))
+    dropped = (-heap[0][0]) ** 0.5 if heap else 0.0
+    return [p for p, k in zip(track, keep) if k], dropped
+
+
+class TrackBuffer:
+    """
+    Streaming track simplification buffer class.
+    """
+
+    def __init__(self, limit: int, tolerance: float = 0.0):
+        """
+        Constructor.
+
+        :param int limit: max number of points retained
+        :param float tolerance: min deviation tolerance in degrees of latitude
+        """
+
+        self._limit = max(limit, 4)
+        self._mintol = tolerance
+        self._tol = 0.0  # tolerance raised by re-simplification
+        self._points = []
+        self._coslat = None
+        self._anchor = 0  # index of last committed point
+        self._cells = {}  # (lat cell, lon cell): list of segment indices
+        self._long = []  # indices of segments spanning many cells
+        self._indexed = 0  # number of segments indexed
+
+    @property
+    def tolerance(self) -> float:
+        """
+        Getter for effective deviation tolerance.
+
+        :return: tolerance in degrees of latitude
+        :rtype: float
+        """
+
+        return max(self._mintol, self._tol)
+
+    @tolerance.setter
+    def tolerance(self, tolerance: float):
+        """
+        Setter for minimum deviation tolerance.
+
+        :param float tolerance: tolerance in degrees of latitude
+        """
+
+        self._mintol = tolerance
+
+    def append(self, location: Point):
+        """
+        Add location to track, unless it is the same as the previous one.
+
+        :param Point location: location
+        """
+
+        pnt = Point(location.lat, location.lon)
+        pts = self._points
+        if pts:
+            if round(pts[-1].lat, 8) == round(pnt.lat, 8) and round(
+                pts[-1].lon, 8
+            ) == round(pnt.lon, 8):
+                return
+        else:
+            self._coslat = cos(radians(pnt.lat))
+        if len(pts) - self._anchor > 1:  # test opening window
+            tol = self.tolerance
+            ax, ay = pts[self._anchor].lon * self._coslat, pts[self._anchor].lat
+            bx, by = pnt.lon * self._coslat, pnt.lat
+            if len(pts) - self._anchor > TAIL_MAX or any(
+                _seg_dist(p.lon * self._coslat, p.lat, ax, ay, bx, by) > tol * tol
+                for p in pts[self._anchor + 1 :]
+            ):
+                # previous window is within tolerance of anchor-last chord
+                del pts[self._anchor + 1 : -1]
+                self._anchor = len(pts) - 1
+                self._index()
+        pts.append(pnt)
+        if len(pts) > self._limit:
+            self._points, dropped = simplify(pts, limit=self._limit // 2)
+            self._tol = max(self._tol, dropped)
+            self._anchor = len(self._points) - 1
+            self._cells = {}
+            self._long = []
+            self._indexed = 0
+            self._index()
+
+    def _index(self):
+        """
+        Add newly committed segments to grid index.
+        """
+
+        pts = self._points
+        for i in range(self._indexed, self._anchor):
+            p1, p2 = pts[i], pts[i + 1]
+            r1, r2 = sorted((floor(p1.lat / GRID_CELL), floor(p2.lat / GRID_CELL)))
+            c1, c2 = sorted((floor(p1.lon / GRID_CELL), floor(p2.lon / GRID_CELL)))
+            if (r2 - r1 + 1) * (c2 - c1 + 1) > LONG_CELLS:
+                self._long.append(i)
+                continue
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    self._cells.setdefault((r, c), []).append(i)
+        self._indexed = max(self._indexed, self._anchor)
+
+    def clip(self, bounds: Area) -> list:
+        """
+        Get runs of consecutive track points whose segments lie
+        (at least partly) within bounds.
+
+        :param Area bounds: viewport bounds
+        :return: list of lists of Points
+        :rtype: list
+        """
+
+        pts = self._points
+        if len(pts) < 2:
+            return [pts[:]] if pts else []
+        r1, r2 = floor(bounds.lat1 / GRID_CELL), floor(bounds.lat2 / GRID_CELL)
+        c1, c2 = floor(bounds.lon1 / GRID_CELL), floor(bounds.lon2 / GRID_CELL)
+        segs = set(self._long)
+        for (r, c), cell in self._cells.items():
+            if r1 <= r <= r2 and c1 <= c <= c2:
+                segs.update(cell)
+        segs.update(range(self._anchor, len(pts) - 1))  # uncommitted tail
+        runs = []
+        last = None
+        for i in sorted(segs):
+            if i - 1 == last:
+                runs[-1].append(pts[i + 1])
+            else:
+                runs.append([pts[i], pts[i + 1]])
+            last = i
+        return runs
+
+    def __getitem__(self, idx):
+        """
+        Get track point(s).
+
+        :param idx: index or slice
+        :return: Point or list of Points
+        """
+
+        return self._points[idx]
+
+    def __iter__(self):
+        """
+        Iterate over track points.
+
+        :return: iterator of Points
+        """
+
+        return iter(self._points)
+
+    def __len__(self) -> int:
+        """
+        Number of track points retained.
+
+        :return: length
+        :rtype: int
+        """
+
+        return len(self._points)
@@ -0,0 +1,187 @@
+"""
+track_stats.py
+
+Track statistics engine for PyGPSClient application.
+
+Computes cumulative distance, instantaneous and smoothed speed,
+gradient, moving time and stopped time for a track supplied as
+parallel sequences of latitude, longitude, timestamp and (optionally)
+elevation. Results are held as compact `array` objects, computed in
+whole-array passes (`zip`, `itertools.accumulate`) rather than by
+per-point method calls, so the same results can be re-used for
+profile redraws and unit changes without re-analysis.
+
+Used by GPXViewerDialog, GPXTrack and get_track_bounds, and available
+to any other track tooling.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from array import array
+from itertools import accumulate
+
+from pynmeagps import haversine, planar
+
+from pygpsclient.globals import Area, Point
+
+PLANAR_LIMIT = 1000  # legs longer than this (m) use haversine
+SMOOTH_WINDOW = 5  # default speed smoothing window (points)
+STOP_SPEED = 0.5  # default speed below which track is 'stopped' (m/s)
+
+
+def leg_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Get distance between two points in meters, using a planar
+    approximation for short legs and haversine for longer ones.
+
+    :param float lat1: start latitude
+    :param float lon1: start longitude
+    :param float lat2: end latitude
+    :param float lon2: end longitude
+    :return: distance (m)
+    :rtype: float
+    """
+
+    leg = planar(lat1, lon1, lat2, lon2)
+    if leg > PLANAR_LIMIT:
+        leg = haversine(lat1, lon1, lat2, lon2) * 1000
+    return leg
+
+
+def track_bounds(lats: object, lons: object) -> tuple:
+    """
+    Get bounds and center point of track.
+
+    :param object lats: sequence of latitudes
+    :param object lons: sequence of longitudes
+    :return: bounds of track, center point
+    :rtype: (Area, Point)
+    """
+
+    if len(lats) == 0:
+        return Area(400, 400, -400, -400), Point(0, 0)
+    minlat, maxlat = min(lats), max(lats)
+    minlon, maxlon = min(lons), max(lons)
+    return Area(minlat, minlon, maxlat, maxlon), Point(
+        (maxlat + minlat) / 2, (maxlon + minlon) / 2
+    )
+
+
+def moving_average(vals: object, window: int) -> array:
+    """
+    Centered moving average of sequence, computed from cumulative sums.
+    The window is truncated at either end of the sequence.
+
+    :param object vals: sequence of values
+    :param int window: window size (points)
+    :return: smoothed values
+    :rtype: array
+    """
+
+    n = len(vals)
+    if window <= 1 or n == 0:
+        return array("d", vals)
+    half = window // 2
+    csum = [0.0] + list(accumulate(vals))
+    lows = [max(0, i - half) for i in range(n)]
+    highs = [min(n, i + half + 1) for i in range(n)]
+    return array(
+        "d", ((csum[hi] - csum[lo]) / (hi - lo) for lo, hi in zip(lows, highs))
+    )
+
+
+class TrackStats:
+    """
+    Track statistics class.
+    """
+
+    def __init__(
+        self,
+        lat: object,
+        lon: object,
+        tim: object,
+        ele: object = None,
+        window: int = SMOOTH_WINDOW,
+        stopspeed: float = STOP_SPEED,
+    ):
+        """
+        Constructor.
+
+        :param object lat: sequence of latitudes
+        :param object lon: sequence of longitudes
+        :param object tim: sequence of timestamps (s)
+        :param object ele: sequence of elevations (m), or None
+        :param int window: speed smoothing window (points)
+        :param float stopspeed: speed below which track is 'stopped' (m/s)
+        """
+
+        n = len(lat)
+        head = [0.0] if n else []  # first point has no preceding leg
+        if ele is None:
+            ele = [0.0] * n
+        self.legs = array(
+            "d",
+            head
+            + [
+                leg_distance(lat1, lon1, lat2, lon2)
+                for lat1, lon1, lat2, lon2 in zip(lat, lon, lat[1:], lon[1:])
+            ],
+        )
+        dts = head + [t2 - t1 for t1, t2 in zip(tim, tim[1:])]
+        dele = head + [e2 - e1 for e1, e2 in zip(ele, ele[1:])]
+        self.cumdist = array("d", accumulate(self.legs))
+        self.spd = self._speeds(self.legs, dts)
+        self.smoothspd = moving_average(self.spd, window)
+        self.gradient = array(
+            "d", (de * 100 / lg if lg else 0.0 for de, lg in zip(dele, self.legs))
+        )  # %
+        self.moving_time = sum(
+            dt for dt, spd in zip(dts, self.spd) if dt > 0 and spd >= stopspeed
+        )
+        self.elapsed = tim[-1] - tim[0] if n else 0.0
+        self.stopped_time = self.elapsed - self.moving_time
+
+    @staticmethod
+    def _speeds(legs: object, dts: object) -> array:
+        """
+        Get instantaneous speed at each point. Where time does not
+        advance, the previous point's speed is carried forward.
+
+        :param object legs: per-point leg distances (m)
+        :param object dts: per-point time deltas (s)
+        :return: speeds (m/s)
+        :rtype: array
+        """
+
+        spds = array("d")
+        spd = 0.0
+        for leg, dt in zip(legs, dts):
+            spd = leg / dt if dt > 0 else spd
+            spds.append(spd)
+        return spds
+
+    @property
+    def dist(self) -> float:
+        """
+        Getter for total distance.
+
+        :return: distance (m)
+        :rtype: float
+        """
+
+        return self.cumdist[-1] if len(self.cumdist) else 0.0
+
+    @property
+    def moving_speed(self) -> float:
+        """
+        Getter for average moving speed.
+
+        :return: speed (m/s)
+        :rtype: float
+        """
+
+        return self.dist / self.moving_time if self.moving_time else 0.0
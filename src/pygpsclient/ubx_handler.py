@@ -16,13 +16,14 @@ Created on 30 Sep 2020
 """
 
 import logging
+from typing import Callable
 
 from pyubx2 import UBXMessage, itow2utc
 
 from pygpsclient.globals import GLONASS_NMEA, UTF8
 from pygpsclient.helpers import corrage2int, fix2desc, ned2vector, svid2gnssid
 from pygpsclient.strings import DLGTSPARTN, DLGTUBX, NA
-from pygpsclient.widget_state import VISIBLE, WDGSPECTRUM, WDGSYSMON
+from pygpsclient.widget_defs import VISIBLE, WDGSPECTRUM, WDGSYSMON
 
 
 class UBXHandler:
@@ -46,6 +47,42 @@ class UBXHandler:
         self._parsed_data = None
         # Holds array of current satellites in view from NMEA GSV or UBX NAV-SVINFO sentences
         self.gsv_data = {}
+        # map of message identity to processing function
+        self._dispatch = {
+            "ESF-ALG": self._process_ESF_ALG,
+            "HNR-ATT": self._process_HNR_ATT,
+            "HNR-PVT": self._process_HNR_PVT,
+            "NAV-ATT": self._process_NAV_ATT,
+            "NAV-DOP": self._process_NAV_DOP,
+            "NAV2-DOP": self._process_NAV_DOP,
+            "NAV-POSLLH": self._process_NAV_POSLLH,
+            "NAV-HPPOSLLH": self._process_NAV_POSLLH,
+            "NAV-PVT": self._process_NAV_PVT,
+            "NAV2-PVT": self._process_NAV_PVT,
+            "NAV-PVAT": self._process_NAV_PVAT,
+            "NAV-RELPOSNED": self._process_NAV_RELPOSNED,
+            "NAV-SAT": self._process_NAV_SAT,
+            "NAV2-SAT": self._process_NAV_SAT,
+            "NAV-STATUS": self._process_NAV_STATUS,
+            "NAV2-STATUS": self._process_NAV_STATUS,
+            "NAV-SVIN": self._process_NAV_SVIN,
+            "NAV-SVINFO": self._process_NAV_SVINFO,
+            "NAV-SOL": self._process_NAV_SOL,
+            "NAV-VELNED": self._process_NAV_VELNED,
+            "MON-COMMS": self._process_MON_COMMS,
+            "MON-SPAN": self._process_MON_SPAN,
+            "MON-SYS": self._process_MON_SYS,
+            "MON-VER": self._process_MONVER,
+            "RXM-RTCM": self._process_RXM_RTCM,
+            "RXM-PMP": self._process_RXM_PMP,
+            "RXM-SPARTN-KEY": self._process_RXM_SPARTN_KEY,
+        }
+        # map of message class prefix to processing function,
+        # for message types not in the identity map
+        self._dispatch_prefix = {
+            "ACK": self._process_ACK,
+            "CFG": self._process_ACK,
+        }
 
     def process_data(self, raw_data: bytes, parsed_data: object):
         """
@@ -58,52 +95,40 @@ class UBXHandler:
         if raw_data is None:
             return
         # self.logger.debug(f"data received {parsed_data.identity}")
-        if parsed_data.identity[0:3] in ("ACK", "CFG"):
-            self._process_ACK(parsed_data)
-        elif parsed_data.identity == "ESF-ALG":
-            self._process_ESF_ALG(parsed_data)
-        elif parsed_data.identity == "HNR-ATT":
-            self._process_HNR_ATT(parsed_data)
-        elif parsed_data.identity == "HNR-PVT":
-            self._process_HNR_PVT(parsed_data)
-        elif parsed_data.identity == "NAV-ATT":
-            self._process_NAV_ATT(parsed_data)
-        elif parsed_data.identity in ("NAV-DOP", "NAV2-DOP"):
-            self._process_NAV_DOP(parsed_data)
-        elif parsed_data.identity in ("NAV-POSLLH", "NAV-HPPOSLLH"):
-            self._process_NAV_POSLLH(parsed_data)
-        elif parsed_data.identity in ("NAV-PVT", "NAV2-PVT"):
-            self._process_NAV_PVT(parsed_data)
-        elif parsed_data.identity == "NAV-PVAT":
-            self._process_NAV_PVAT(parsed_data)
-        elif parsed_data.identity == "NAV-RELPOSNED":
-            self._process_NAV_RELPOSNED(parsed_data)
-        elif parsed_data.identity in ("NAV-SAT", "NAV2-SAT"):
-            self._process_NAV_SAT(parsed_data)
-        elif parsed_data.identity in ("NAV-STATUS", "NAV2-STATUS"):
-            self._process_NAV_STATUS(parsed_data)
-        elif parsed_data.identity == "NAV-SVIN":
-            self._process_NAV_SVIN(parsed_data)
-        elif parsed_data.identity == "NAV-SVINFO":
-            self._process_NAV_SVINFO(parsed_data)
-        elif parsed_data.identity == "NAV-SOL":
-            self._process_NAV_SOL(parsed_data)
-        elif parsed_data.identity == "NAV-VELNED":
-            self._process_NAV_VELNED(parsed_data)
-        elif parsed_data.identity == "MON-COMMS":
-            self._process_MON_COMMS(parsed_data)
-        elif parsed_data.identity == "MON-SPAN":
-            self._process_MON_SPAN(parsed_data)
-        elif parsed_data.identity == "MON-SYS":
-            self._process_MON_SYS(parsed_data)
-        elif parsed_data.identity == "MON-VER":
-            self._process_MONVER(parsed_data)
-        elif parsed_data.identity == "RXM-RTCM":
-            self._process_RXM_RTCM(parsed_data)
-        elif parsed_data.identity == "RXM-PMP":
-            self._process_RXM_PMP(parsed_data)
-        elif parsed_data.identity == "RXM-SPARTN-KEY":
-            self._process_RXM_SPARTN_KEY(parsed_data)
+        identity = parsed_data.identity
+        process = self._dispatch.get(identity, None)
+        if process is None:
+            process = self._dispatch_prefix.get(identity[0:3], None)
+            if process is None:  # unhandled message type
+                return
+        process(parsed_data)
+
+    def register(self, identity: str, process: Callable, prefix: bool = False):
+        """
+        Register (or override) the processing function for a given
+        UBX message identity, e.g. for plugins.
+
+        :param str identity: message identity e.g. "NAV-PVT" (or prefix e.g. "ACK")
+        :param Callable process: processing function taking parsed message as argument
+        :param bool prefix: identity is a 3-character class prefix
+        """
+
+        if prefix:
+            self._dispatch_prefix[identity[0:3]] = process
+        else:
+            self._dispatch[identity] = process
+
+    @property
+    def identities(self) -> set:
+        """
+        Getter for UBX message identities (and class prefixes)
+        processed by this handler.
+
+        :return: set of identities e.g. {"NAV-PVT", "ACK", ...}
+        :rtype: set
+        """
+
+        return set(self._dispatch) | set(self._dispatch_prefix)
 
     def _process_ACK(self, msg: UBXMessage):
         """
@@ -112,6 +137,9 @@ class UBXHandler:
         :param UBXMessage msg: UBX config message
         """
 
+        # match ACKs against any configuration transfer in progress
+        self.__app.config_transfer.acknowledge(msg)
+
         if self.__app.dialog(DLGTUBX) is not None:
             self.__app.dialog(DLGTUBX).update_pending(msg)
 
@@ -294,14 +322,17 @@ class UBXHandler:
         self.__app.gnss_status.speed = data.gSpeed / 1000  # m/s
         self.__app.gnss_status.sip = data.numSV
         self.__app.gnss_status.hae = data.height / 1000  # meters
-        ims = self.__app.gnss_status.imu_data
-        ims["source"] = data.identity
-        ims["roll"] = data.vehRoll
-        ims["pitch"] = data.vehPitch
-        ims["yaw"] = data.vehHeading
-        ims["status"] = (
-            (data.vehRollValid << 3) + (data.vehPitchValid << 2) + data.vehHeadingValid
-        )
+        self.__app.gnss_status.imu_data = {
+            "source": data.identity,
+            "roll": data.vehRoll,
+            "pitch": data.vehPitch,
+            "yaw": data.vehHeading,
+            "status": (
+                (data.vehRollValid << 3)
+                + (data.vehPitchValid << 2)
+                + data.vehHeadingValid
+            ),
+        }
 
     def _process_NAV_VELNED(self, data: UBXMessage):
         """
@@ -325,8 +356,9 @@ class UBXHandler:
         :param UBXMessage data: NAV-SAT parsed message
         """
 
-        show_unused = self.__app.configuration.get("unusedsat_b")
+        show_unused = self.__app.configuration.snapshot().unusedsat_b
         self.gsv_data = {}
+        sats = []
         num_siv = int(data.numSvs)
 
         for i in range(num_siv):
@@ -339,10 +371,12 @@ class UBXHandler:
             elev = getattr(data, "elev" + idx)
             azim = getattr(data, "azim" + idx)
             cno = getattr(data, "cno" + idx)
+            sats.append((gnssId, svid, elev, azim, cno))
             if cno == 0 and not show_unused:  # omit unused sats
                 continue
             self.gsv_data[f"{gnssId}-{svid}"] = (gnssId, svid, elev, azim, cno)
 
+        self.__app.sat_history.update(sats)
         self.__app.gnss_status.siv = len(self.gsv_data)
         self.__app.gnss_status.gsv_data = self.gsv_data
 
@@ -380,8 +414,9 @@ class UBXHandler:
         :param UBXMessage data: NAV-SVINFO parsed message
         """
 
-        show_unused = self.__app.configuration.get("unusedsat_b")
+        show_unused = self.__app.configuration.snapshot().unusedsat_b
         self.gsv_data = {}
+        sats = []
         num_siv = int(data.numCh)
 
         for i in range(num_siv):
@@ -391,10 +426,12 @@ class UBXHandler:
             elev = getattr(data, "elev" + idx)
             azim = getattr(data, "azim" + idx)
             cno = getattr(data, "cno" + idx)
+            sats.append((gnssId, svid, elev, azim, cno))
             if cno == 0 and not show_unused:  # omit unused sats
                 continue
             self.gsv_data[f"{gnssId}-{svid}"] = (gnssId, svid, elev, azim, cno)
 
+        self.__app.sat_history.update(sats)
         self.__app.gnss_status.gsv_data = self.gsv_data
 
     def _process_NAV_SOL(self, data: UBXMessage):
@@ -545,12 +582,13 @@ class UBXHandler:
         :param UBXMessage data: ESF-ALG message
         """
 
-        ims = self.__app.gnss_status.imu_data
-        ims["source"] = data.identity
-        ims["roll"] = data.roll
-        ims["pitch"] = data.pitch
-        ims["yaw"] = data.yaw
-        ims["status"] = data.status
+        self.__app.gnss_status.imu_data = {
+            "source": data.identity,
+            "roll": data.roll,
+            "pitch": data.pitch,
+            "yaw": data.yaw,
+            "status": data.status,
+        }
 
     def _process_NAV_ATT(self, data: UBXMessage):
         """
@@ -559,12 +597,13 @@ class UBXHandler:
         :param UBXMessage data: NAV_ATT message
         """
 
-        ims = self.__app.gnss_status.imu_data
-        ims["source"] = data.identity
-        ims["roll"] = data.roll
-        ims["pitch"] = data.pitch
-        ims["yaw"] = data.heading
-        ims["status"] = ""
+        self.__app.gnss_status.imu_data = {
+            "source": data.identity,
+            "roll": data.roll,
+            "pitch": data.pitch,
+            "yaw": data.heading,
+            "status": "",
+        }
 
     def _process_HNR_ATT(self, data: UBXMessage):
         """
@@ -573,9 +612,10 @@ class UBXHandler:
         :param UBXMessage data: HNR_ATT message
         """
 
-        ims = self.__app.gnss_status.imu_data
-        ims["source"] = data.identity
-        ims["roll"] = data.roll
-        ims["pitch"] = data.pitch
-        ims["yaw"] = data.heading
-        ims["status"] = ""
+        self.__app.gnss_status.imu_data = {
+            "source": data.identity,
+            "roll": data.roll,
+            "pitch": data.pitch,
+            "yaw": data.heading,
+            "status": "",
+        }
@@ -37,6 +37,7 @@ from pyubx2 import (
     val2bytes,
 )
 
+from pygpsclient.config_transfer import PROGRESS_INTERVAL, TransferStatus
 from pygpsclient.globals import (
     ERRCOL,
     HOME,
@@ -94,6 +95,7 @@ class UBX_Recorder_Frame(Frame):
         self._rec_status = STOP
         self._configfile = None
         self._stop_event = Event()
+        self._transfer = None
         self._bg = self.cget("bg")  # default background color
         self._configfile = None
         self._configpath = None
@@ -353,16 +355,47 @@ class UBX_Recorder_Frame(Frame):
 
         if self._rec_status == STOP:
             self._rec_status = PLAY
-            i = 0
-            for i, msg in enumerate(self._cmds_stored):
-                self._update_activity(f"{i} Sending {msg.identity}")
-                self.__app.send_to_device(msg.serialize())
-                sleep(0.01)
+            self._update_activity(f"Sending {len(self._cmds_stored)} commands...")
+            self._transfer = self.__app.config_transfer.send(self._cmds_stored)
+            self._poll_progress()
+        elif self._rec_status == PLAY:  # stop sending
+            self._transfer.cancel()
+        self._update_status()
+
+    def _poll_progress(self):
+        """
+        Poll configuration transfer progress from the GUI thread
+        until the transfer is done.
+        """
+
+        try:
+            status = self._transfer.status
+            self._update_progress(status)
+            if not status.done:
+                self.after(int(PROGRESS_INTERVAL * 1000), self._poll_progress)
+        except TclError:  # if dialog closed during transfer
+            pass
+
+    def _update_progress(self, status: TransferStatus):
+        """
+        Update activity label with configuration transfer progress.
+
+        :param TransferStatus status: transfer progress
+        """
+
+        rate = status.sent / status.elapsed if status.elapsed > 0 else 0
+        if status.done:
             self._update_activity(
-                f"{i + 1} command{'s' if i > 0 else ''} sent to device"
+                f"{status.sent} of {status.total} sent, {status.acked} ACK, "
+                f"{status.naked} NAK, {status.failed} failed, {status.elapsed:.1f}s"
             )
             self._rec_status = STOP
-        self._update_status()
+            self._update_status()
+        else:
+            self._update_activity(
+                f"{status.sent} of {status.total} sent, {status.acked} ACK, "
+                f"{rate:.0f} cmds/s"
+            )
 
     def _on_record(self):
         """
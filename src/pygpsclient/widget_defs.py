@@ -0,0 +1,85 @@
+"""
+widget_defs.py
+
+Widget names and widget state keys for PyGPSClient application.
+
+These are held separately from `widget_state.py`, which imports
+every widget frame class, so that modules which only need to
+refer to widgets (e.g. the protocol handlers and the headless
+application) do not import the tkinter GUI.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+COL = "COL"
+COLSPAN = "colspan"
+DEFAULT = "def"
+DEPENDS = "dep"
+HIDE = "Hide"
+INTERVAL = "ivl"
+MAXCOLSPAN = 4  # max no of widget columns
+MAXROWSPAN = 4  # max no of widget rows
+MENU = "men"
+MSGIDS = "ids"
+RESET = "rst"
+ROW = "row"
+ROWSPAN = "rowspan"
+SHOW = "Show"
+STICKY = "sty"
+VISIBLE = "vis"
+WDGBANNER = "Banner"
+WDGCONSOLE = "Console"
+WDGLEVELS = "Levels"
+WDGMAP = "Map"
+WDGROVER = "Rover Plot"
+WDGSATS = "Satellites"
+WDGSCATTER = "Scatter Plot"
+WDGSETTINGS = "Settings"
+WDGSPECTRUM = "Spectrum"
+WDGSTATUS = "Status"
+WDGSYSMON = "System Monitor"
+WDGCHART = "Chart Plot"
+WDGIMUMON = "IMU Monitor"
+
+WIDGETS = (
+    WDGBANNER,
+    WDGSETTINGS,
+    WDGSTATUS,
+    WDGCONSOLE,
+    WDGSATS,
+    WDGLEVELS,
+    WDGMAP,
+    WDGSPECTRUM,
+    WDGSCATTER,
+    WDGROVER,
+    WDGCHART,
+    WDGSYSMON,
+    WDGIMUMON,
+)
+"""All widget names, in widget_state order"""
+
+WIDGET_MSGIDS = {
+    WDGSPECTRUM: ("MON-SPAN",),
+    WDGSYSMON: ("MON-SYS", "MON-COMMS"),
+}
+"""Message identities consumed only by a given widget (its MSGIDS entry)"""
+
+
+class HiddenWidgetState:
+    """
+    Widget state for an application with no widgets (e.g. headless
+    mode or an additional receiver) - all widgets are hidden.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        self.state = {
+            wdg: {VISIBLE: False, MSGIDS: WIDGET_MSGIDS.get(wdg, ())} for wdg in WIDGETS
+        }
@@ -0,0 +1,143 @@
+"""
+widget_scheduler.py
+
+Widget refresh scheduler for PyGPSClient application.
+
+On each GUI update tick, decides which visible widgets are due for a
+refresh, based on two optional entries in each widget's `widget_state`:
+
+ - INTERVAL - the widget's minimum interval between refreshes in
+   seconds (i.e. its maximum refresh rate), for widgets which are
+   expensive to redraw.
+ - DEPENDS - the `GNSSStatus` fields the widget displays; if none of
+   them have changed since the widget's last refresh, the refresh is
+   skipped.
+
+Due widgets are then refreshed in order, but if the next refresh would
+(based on a smoothed measure of its previous refresh times) take the
+current tick beyond FRAME_BUDGET, the remaining widgets are deferred to
+a subsequent idle callback, so that no single callback blocks the
+GUI for long.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: 2020 semuadmin
+:license: BSD 3-Clause
+"""
+
+from time import monotonic, perf_counter
+from typing import Callable
+
+from pygpsclient.globals import FRAME
+from pygpsclient.widget_state import DEPENDS, INTERVAL, VISIBLE
+
+FRAME_BUDGET = 0.05  # max time spent refreshing widgets per callback in seconds
+COST_WEIGHT = 0.25  # weight of latest refresh time in smoothed refresh time
+
+
+class WidgetScheduler:
+    """
+    Widget refresh scheduler class.
+    """
+
+    def __init__(self, app, update: Callable):
+        """
+        Constructor.
+
+        :param Frame app: reference to main tkinter application
+        :param Callable update: function to refresh named widget
+        """
+
+        self.__app = app  # Reference to main application class
+        self._update = update
+        self._last = {}  # widget: (time, gnss_status version) of last refresh
+        self._cost = {}  # widget: smoothed refresh time in seconds
+        self._pending = []  # widgets due for refresh, in order
+        self._scheduled = False  # idle callback scheduled
+
+    def tick(self, force: bool = False):
+        """
+        Queue visible widgets which are due for refresh and start
+        refreshing them.
+
+        :param bool force: refresh all visible widgets now, regardless
+            of interval, dependencies or frame budget
+        """
+
+        now = monotonic()
+        gnss = self.__app.gnss_status
+        for wdg, wdgdata in self.__app.widget_state.state.items():
+            if not wdgdata[VISIBLE]:
+                self._last.pop(wdg, None)  # refresh as soon as shown
+                continue
+            if wdg in self._pending or not hasattr(
+                getattr(self.__app, wdgdata[FRAME]), "update_frame"
+            ):
+                continue
+            last = self._last.get(wdg, None)
+            if not force and last is not None:
+                tim, version = last
+                if now - tim < wdgdata.get(INTERVAL, 0):
+                    continue
+                depends = wdgdata.get(DEPENDS, None)
+                if depends is not None and not gnss.changed(version, *depends):
+                    continue
+            self._pending.append(wdg)
+
+        if force:
+            while self._pending:
+                self._refresh(self._pending.pop(0))
+        else:
+            self._run()
+
+    def _run(self):
+        """
+        Refresh queued widgets until frame budget is exhausted, deferring
+        any remaining widgets to an idle callback. At least one widget
+        is refreshed on each call.
+        """
+
+        self._scheduled = False
+        start = perf_counter()
+        ran = False
+        while self._pending:
+            wdg = self._pending[0]
+            spent = perf_counter() - start
+            if ran and spent + self._cost.get(wdg, 0) > FRAME_BUDGET:
+                break
+            self._pending.pop(0)
+            if self.__app.widget_state.state[wdg][VISIBLE]:
+                self._refresh(wdg)
+                ran = True
+
+        if self._pending and not self._scheduled:
+            self._scheduled = True
+            self.__app.appmaster.after_idle(self._run)
+
+    def _refresh(self, wdg: str):
+        """
+        Refresh widget and record its refresh time.
+
+        :param str wdg: widget name
+        """
+
+        version = self.__app.gnss_status.version
+        start = perf_counter()
+        self._update(wdg)
+        cost = perf_counter() - start
+        self._cost[wdg] = self._cost.get(wdg, cost) * (1 - COST_WEIGHT) + (
+            cost * COST_WEIGHT
+        )
+        self._last[wdg] = (monotonic(), version)
+
+    @property
+    def pending(self) -> list:
+        """
+        Getter for widgets awaiting refresh.
+
+        :return: list of widget names
+        :rtype: list
+        """
+
+        return list(self._pending)
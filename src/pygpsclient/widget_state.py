@@ -10,10 +10,19 @@ To add a new widget to PyGPSClient:
 should implement `init_frame()` and `update_frame()` functions.
 2. If the widget requires certain UBX messages to be enabled,
 implement an `enable_messages(status)` function.
-3. Add an entry to the foot of the self.__app.widget_state.state dictionary.
+3. Add the widget name to `widget_defs.py` and an entry to the foot of
+the self.__app.widget_state.state dictionary.
 4. If the widget requires data not already in the `app.gnss_status`
 data dictionary, add the requisite data items to the `GNSSStatus`
-class definition and update `ubx_handler` to populate them.
+`FIELDS` tuple and class definition and update `ubx_handler` to populate
+them. List the fields the widget displays in its DEPENDS entry, so that
+it is only refreshed when they change.
+5. If the widget is expensive to redraw, set a minimum refresh INTERVAL
+(in seconds) in its entry.
+6. If the widget is the only consumer of certain message identities,
+list them in `widget_defs.WIDGET_MSGIDS` and the widget's MSGIDS entry,
+so that (with lazy parsing enabled) they are only decoded while the
+widget is visible.
 
 Created on 30 Apr 2023
 
@@ -38,33 +47,38 @@ from pygpsclient.skyview_frame import SkyviewFrame
 from pygpsclient.spectrum_frame import SpectrumviewFrame
 from pygpsclient.status_frame import StatusFrame
 from pygpsclient.sysmon_frame import SysmonFrame
-
-COL = "COL"
-COLSPAN = "colspan"
-DEFAULT = "def"
-HIDE = "Hide"
-MAXCOLSPAN = 4  # max no of widget columns
-MAXROWSPAN = 4  # max no of widget rows
-MENU = "men"
-RESET = "rst"
-ROW = "row"
-ROWSPAN = "rowspan"
-SHOW = "Show"
-STICKY = "sty"
-VISIBLE = "vis"
-WDGBANNER = "Banner"
-WDGCONSOLE = "Console"
-WDGLEVELS = "Levels"
-WDGMAP = "Map"
-WDGROVER = "Rover Plot"
-WDGSATS = "Satellites"
-WDGSCATTER = "Scatter Plot"
-WDGSETTINGS = "Settings"
-WDGSPECTRUM = "Spectrum"
-WDGSTATUS = "Status"
-WDGSYSMON = "System Monitor"
-WDGCHART = "Chart Plot"
-WDGIMUMON = "IMU Monitor"
+from pygpsclient.widget_defs import (  # pylint: disable=unused-import
+    COL,
+    COLSPAN,
+    DEFAULT,
+    DEPENDS,
+    HIDE,
+    INTERVAL,
+    MAXCOLSPAN,
+    MAXROWSPAN,
+    MENU,
+    MSGIDS,
+    RESET,
+    ROW,
+    ROWSPAN,
+    SHOW,
+    STICKY,
+    VISIBLE,
+    WDGBANNER,
+    WDGCHART,
+    WDGCONSOLE,
+    WDGIMUMON,
+    WDGLEVELS,
+    WDGMAP,
+    WDGROVER,
+    WDGSATS,
+    WDGSCATTER,
+    WDGSETTINGS,
+    WDGSPECTRUM,
+    WDGSTATUS,
+    WDGSYSMON,
+    WIDGET_MSGIDS,
+)
 
 
 class WidgetState:
@@ -125,12 +139,14 @@ class WidgetState:
                 CLASS: SkyviewFrame,
                 FRAME: "frm_satview",
                 VISIBLE: True,
+                DEPENDS: ("gsv_data",),
             },
             WDGLEVELS: {
                 DEFAULT: True,
                 CLASS: GraphviewFrame,
                 FRAME: "frm_graphview",
                 VISIBLE: True,
+                DEPENDS: ("gsv_data",),
             },
             WDGMAP: {
                 DEFAULT: True,
@@ -138,12 +154,15 @@ class WidgetState:
                 FRAME: "frm_mapview",
                 VISIBLE: True,
                 RESET: True,
+                INTERVAL: 1,
             },
             WDGSPECTRUM: {
                 CLASS: SpectrumviewFrame,
                 FRAME: "frm_spectrumview",
                 VISIBLE: False,
                 RESET: True,
+                MSGIDS: WIDGET_MSGIDS[WDGSPECTRUM],
+                DEPENDS: ("spectrum_data",),
             },
             WDGSCATTER: {
                 CLASS: ScatterViewFrame,
@@ -166,11 +185,15 @@ class WidgetState:
                 CLASS: SysmonFrame,
                 FRAME: "frm_sysmon",
                 VISIBLE: False,
+                MSGIDS: WIDGET_MSGIDS[WDGSYSMON],
+                DEPENDS: ("sysmon_data", "comms_data"),
+                INTERVAL: 1,
             },
             WDGIMUMON: {
                 CLASS: IMUFrame,
                 FRAME: "frm_imumon",
                 VISIBLE: False,
+                DEPENDS: ("imu_data",),
             },
             # add any new widgets here
         }
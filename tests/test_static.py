@@ -8,14 +8,44 @@ Static method tests for pygpsclient.helpers
 
 # pylint: disable=missing-docstring
 
+import gzip
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
 import unittest
+from base64 import b64encode
+from contextlib import closing
 from datetime import datetime
+from io import BytesIO
+from os import environ, pathsep
+from pathlib import Path
+from threading import Thread
+from time import sleep
+
+from PIL import Image
+from pynmeagps import GET, SET, NMEAMessage
+from pyrtcm import RTCMReader
+from pysbf2 import SBFMessage
+from pyspartn import SPARTNMessage
+from pyubx2 import (
+    NMEA_PROTOCOL,
+    RTCM3_PROTOCOL,
+    UBX_PROTOCOL,
+    UBXMessage,
+    UBXReader,
+)
 
-from pynmeagps import SET, NMEAMessage
-from pyubx2 import UBXMessage, UBXReader
-
+from pygpsclient.broadcast_server import LAG_DISCONNECT, LAG_DROP, BroadcastServer
+from pygpsclient.config_transfer import ConfigTransfer, ack_key
 from pygpsclient.configuration import Configuration
-from pygpsclient.globals import Area, AreaXY, Point, TrackPoint
+from pygpsclient.device_pipeline import DevicePipeline, parse_device
+from pygpsclient.file_handler import FileHandler
+from pygpsclient.globals import GPX_NS, TTY_PROTOCOL, Area, AreaXY, Point, TrackPoint
+from pygpsclient.gnss_status import GNSSStatus
+from pygpsclient.gpx_reader import read_gpx
+from pygpsclient.headless import HeadlessApp, HeadlessMaster
 from pygpsclient.helpers import (
     area_in_bounds,
     bitsval,
@@ -53,6 +83,7 @@ from pygpsclient.helpers import (
     pos2iso6709,
     publicip,
     reorder_range,
+    sbfsvid2gnss,
     secs2unit,
     snr2col,
     str2rgb,
@@ -66,17 +97,51 @@ from pygpsclient.helpers import (
     xy2data,
     xy2ll,
 )
+from pygpsclient.ingest_loop import FrameBuffer
+from pygpsclient.lazy_message import (
+    LazyRTCMMessage,
+    LazyUBXMessage,
+    is_needed,
+    lazy_message,
+    rtcm_identity,
+    ubx_identity,
+)
+from pygpsclient.map_canvas import TRK_RECORD_TOLERANCE
+from pygpsclient.map_pyramid import MapPyramid
 from pygpsclient.mapquest import (
+    POINTLIMIT,
     compress_track,
     format_mapquest_request,
     mapq_compress,
     mapq_decompress,
 )
+from pygpsclient.nmea_handler import NMEAHandler
+from pygpsclient.parse_pool import ParsePool, parse_frame
+from pygpsclient.protocol_registry import ProtocolRegistry
+from pygpsclient.ring_buffer import RingBuffer
+from pygpsclient.rtcm3_handler import RTCM3Handler
+from pygpsclient.sat_history import SatHistory
+from pygpsclient.sbf_handler import SBFHandler
+from pygpsclient.scatter_frame import RunningStats
+from pygpsclient.spectrum_history import SpectrumHistory
+from pygpsclient.sqlite_handler import SqliteHandler, synchronous_level
+from pygpsclient.stream_handler import StreamHandler
+from pygpsclient.tile_cache import TILE_RETRY, TileCache, ll2tile, tile2ll
+from pygpsclient.track_buffer import TrackBuffer, simplify
+from pygpsclient.track_stats import TrackStats, leg_distance
+from pygpsclient.tty_handler import TTYHandler
+from pygpsclient.ubx_handler import UBXHandler
+from pygpsclient.widget_scheduler import WidgetScheduler
 from pygpsclient.widget_state import (
     DEFAULT,
     FRAME,
     MENU,
     VISIBLE,
+    WDGBANNER,
+    WDGCONSOLE,
+    WDGLEVELS,
+    WDGMAP,
+    WDGSATS,
     WidgetState,
 )
 
@@ -112,7 +177,7 @@ class StaticTest(unittest.TestCase):
         self.assertEqual(cfg.get("lbandclientdrat_n"), 2400)
         self.assertEqual(cfg.get("userport_s"), "")
         self.assertEqual(cfg.get("spartnport_s"), "")
-        self.assertEqual(len(cfg.settings), 143)
+        self.assertEqual(len(cfg.settings), 166)
         kwargs = {"userport": "/dev/ttyACM0", "spartnport": "/dev/ttyACM1"}
         cfg.loadcli(**kwargs)
         self.assertEqual(cfg.get("userport_s"), "/dev/ttyACM0")
@@ -122,6 +187,24 @@ class StaticTest(unittest.TestCase):
         self.assertEqual(cfg.get("userport_s"), "/dev/ttyACM2")
         self.assertEqual(cfg.get("spartnport_s"), "/dev/ttyACM3")
 
+    def testconfigsnapshot(self):
+        cfg = Configuration(DummyApp())
+        snap = cfg.snapshot()
+        self.assertEqual((snap.bpsrate_n, snap.Map), (9600, True))
+        self.assertFalse(hasattr(snap, "Chart Plot"))
+        self.assertIs(cfg.snapshot(), snap)  # cached until changed
+        res = []
+        cfg.watch("bpsrate_n", lambda name, val: res.append((name, val)))
+        cfg.set("bpsrate_n", 9600)  # unchanged
+        self.assertIs(cfg.snapshot(), snap)
+        cfg.set("bpsrate_n", 115200)
+        self.assertEqual(res, [("bpsrate_n", 115200)])
+        self.assertEqual((snap.bpsrate_n, cfg.snapshot().bpsrate_n), (9600, 115200))
+        cfg.set("colortags_l", cfg.get("colortags_l"))  # lists always changed
+        self.assertIsNot(cfg.snapshot(), snap)
+        with self.assertRaises(KeyError):
+            cfg.watch("xbpsrate_n", print)
+
     def testloadfile(self):
 
         cfg = Configuration(DummyApp())
@@ -235,6 +318,25 @@ class StaticTest(unittest.TestCase):
             res = svid2gnssid(svid)
             self.assertEqual(res, EXPECTED_RESULT[i])
 
+    def testsbfsvid2gnss(self):
+        EXPECTED_RESULT = [
+            (0, 28),
+            (6, 65),
+            (6, 94),
+            (2, 12),
+            (1, 131),
+            (3, 22),
+            (5, 3),
+            (7, 9),
+            (3, 41),
+            None,
+            None,
+        ]
+        svids = (28, 38, 68, 82, 131, 162, 183, 217, 223, 62, 110)
+        for i, svid in enumerate(svids):
+            res = sbfsvid2gnss(svid)
+            self.assertEqual(res, EXPECTED_RESULT[i])
+
     def testcol2contrast(self):
         res = col2contrast("#ff0000")
         self.assertEqual(res, "white")
@@ -430,8 +532,8 @@ class StaticTest(unittest.TestCase):
         ]
         encoded = compress_track(points)
         self.assertEqual(encoded, "gvw{dBjwmdCvkdnArqpAvho[fciQnibk@w`f_@wibiCf}dH")
-        encoded = compress_track(points, limit=3)
-        self.assertEqual(encoded, "gvw{dBjwmdCnutjBzuzSg__}Aob`V")
+        encoded = compress_track(points, limit=3)  # start, turn, end
+        self.assertEqual(encoded, "gvw{dBjwmdC~_xvC{ijJwibiCf}dH")
 
     def testbytes2unit(self):  # test bytes2unit
         blist = [123, 5365, 97467383, 1982864663735305, 15234, 3, 0]
@@ -958,6 +1060,899 @@ class StaticTest(unittest.TestCase):
         self.assertAlmostEqual(center.lat, 53.367617, 7)
         self.assertAlmostEqual(center.lon, -1.815437, 7)
 
+    def testgnssstatus(self):
+        status = GNSSStatus()
+        ver = status.version
+        self.assertGreater(ver, 0)
+        self.assertFalse(status.changed(ver))
+        status.lat = 0.0  # unchanged value
+        status.lon = 0  # changed type
+        self.assertFalse(status.changed(ver, "lat"))
+        self.assertTrue(status.changed(ver, "lat", "lon"))
+        ver = status.version
+        status.gsv_data = status.gsv_data  # may have been updated in place
+        self.assertTrue(status.changed(ver, "gsv_data"))
+        self.assertFalse(status.changed(ver, "lat", "lon"))
+        status.gsv_data["0-1"] = (0, 1, 45, 180, 40)
+        snap = status.snapshot()
+        self.assertIs(status.snapshot(), snap)  # cached
+        status.lat = 53.1
+        status.gsv_data["0-2"] = (0, 2, 30, 90, 35)
+        self.assertEqual((snap.lat, len(snap.gsv_data)), (0.0, 1))
+        self.assertEqual(status.snapshot().lat, 53.1)
+        spec = [1, 2, 3]
+        status.spectrum_data = [(spec, 256, 0, 0, 0)]
+        snap = status.snapshot()
+        spec.append(4)  # nested values are not shared
+        self.assertEqual(snap.spectrum_data[0][0], [1, 2, 3])
+        status.lon = -2.1
+        self.assertEqual(status.read("lat", "lon"), (53.1, -2.1))
+        with self.assertRaises(AttributeError):
+            status.latitude = 53.1
+        ver = status.version
+        self.assertGreater(GNSSStatus().version, ver)  # versions are monotonic
+
+    def testwidgetscheduler(self):
+        class DummyFrame:
+            def __init__(self, delay=0):
+                self.delay = delay
+
+            def update_frame(self):
+                sleep(self.delay)
+
+        class DummyMaster:
+            def __init__(self):
+                self.idle = []
+
+            def after_idle(self, func):
+                self.idle.append(func)
+
+        app = DummyApp()
+        app.appmaster = DummyMaster()
+        app.gnss_status = GNSSStatus()
+        for wdg, wdgdata in app.widget_state.state.items():
+            setattr(app, wdgdata[FRAME], DummyFrame())
+        app.frm_banner.delay = 0.06  # exceeds frame budget
+        app.frm_settings = app.frm_status = object()  # no update_frame
+        refreshed = []
+
+        def update(wdg):
+            getattr(app, app.widget_state.state[wdg][FRAME]).update_frame()
+            refreshed.append(wdg)
+
+        sched = WidgetScheduler(app, update)
+        visible = [WDGBANNER, WDGCONSOLE, WDGSATS, WDGLEVELS, WDGMAP]
+        sched.tick()
+        self.assertEqual(refreshed, [WDGBANNER])  # remainder deferred
+        self.assertEqual(sched.pending, visible[1:])
+        app.appmaster.idle.pop()()
+        self.assertEqual((refreshed, sched.pending), (visible, []))
+        app.frm_banner.delay = 0
+        refreshed.clear()
+        sched.tick()  # map within interval, gsv_data unchanged
+        self.assertEqual(refreshed, [WDGBANNER, WDGCONSOLE])
+        refreshed.clear()
+        app.gnss_status.gsv_data = {}
+        app.widget_state.state[WDGCONSOLE][VISIBLE] = False
+        sched.tick()
+        self.assertEqual(refreshed, [WDGBANNER, WDGSATS, WDGLEVELS])
+        refreshed.clear()
+        app.widget_state.state[WDGCONSOLE][VISIBLE] = True
+        sched.tick(True)
+        self.assertEqual(refreshed, visible)
+
+    def testconfigtransfer(self):
+        class DummyRcvr:
+            def __init__(self):
+                self.sent = []
+                self.unacked = []
+
+            def send_to_device(self, data):
+                self.sent.append(data)
+                if len(self.sent) != 2:  # lose ACK for 2nd command
+                    self.unacked.append(data)
+
+        rcvr = DummyRcvr()
+        xfer = ConfigTransfer(rcvr, window=4, timeout=0.05, retries=1)
+        cmds = [UBXMessage.config_set(1, 0, [("CFG_RATE_MEAS", i)]) for i in range(6)]
+        cmds += [
+            UBXMessage("CFG", "CFG-MSG", SET, msgClass=1, msgID=7, rateUART1=1),
+            NMEAMessage("P", "QTMSAVEPAR", SET),
+            "erst,soft,config\r\n",
+        ]
+        self.assertEqual(ack_key(cmds[0]), ("UBX", 6, 0x8A))
+        self.assertEqual(ack_key(cmds[7]), ("QTM", "QTMSAVEPAR"))
+        self.assertIsNone(ack_key(NMEAMessage("P", "QTMSRR", SET)))
+        self.assertIsNone(ack_key(cmds[8]))
+        progress = []
+        transfer = xfer.send(cmds, progress.append, 0)
+        # ACKs for commands not in transfer are left alone
+        xfer.acknowledge(UBXMessage("ACK", "ACK-ACK", 0, clsID=6, msgID=0))
+        xfer.acknowledge(NMEAMessage("P", "QTMCFGMSGRATE", GET, payload=["OK"]))
+        acks = {
+            b"\x06\x8a": UBXMessage("ACK", "ACK-ACK", 0, clsID=6, msgID=0x8A),
+            b"\x06\x01": UBXMessage("ACK", "ACK-NAK", 0, clsID=6, msgID=1),
+        }
+        for _ in range(100):
+            if transfer.finished.wait(0.01):
+                break
+            while rcvr.unacked:  # acknowledge in order received
+                data = rcvr.unacked.pop(0)
+                if data[0:1] == b"$":
+                    ack = NMEAMessage("P", "QTMSAVEPAR", GET, payload=["OK"])
+                else:
+                    ack = acks.get(data[2:4], None)
+                if ack is not None:
+                    xfer.acknowledge(ack)
+        status = progress[-1]
+        self.assertTrue(status.done)
+        self.assertEqual(
+            status[:6], (9, 9, 7, 1, 0, 1)
+        )  # total, sent, acked, naked, failed, retries
+        self.assertEqual(len(rcvr.sent), 10)
+        self.assertEqual(rcvr.sent[-1], b"erst,soft,config\r\n")
+        self.assertFalse(xfer.busy)
+
+    def testbroadcastserver(self):
+        app = DummyApp()
+        app.gnss_status = GNSSStatus()
+        srv = BroadcastServer(app, 0, 2, ("127.0.0.1", 0), 8192, LAG_DROP)
+        socks = [socket.create_connection(srv.server_address) for _ in range(3)]
+        sleep(0.1)
+        for _ in range(3):
+            srv._accept()
+        self.assertEqual(srv.connections, 2)  # 3rd client rejected
+        fast, slow = srv._clients.values()
+        msg = bytes(range(200)) * 5
+        for _ in range(4):
+            srv.publish(msg)
+            srv._write(fast)
+        data = b""
+        while len(data) < 4000:
+            data += socks[0].recv(8192)
+        self.assertEqual(data, msg * 4)
+        self.assertEqual(
+            srv.clients[1][2:], (0, 0.0, 4000, 0)
+        )  # sent, rate, lag, dropped
+        for _ in range(4):
+            srv.publish(msg)
+        srv._write(slow)  # lag exceeds 3/4 buffer, so backlog dropped
+        self.assertEqual(srv.clients[1][4:], (0, 8000))
+        srv._policy = LAG_DISCONNECT
+        for _ in range(8):
+            srv.publish(msg)
+        srv._write(fast)  # wrapped 1.5 times around buffer, so disconnected
+        self.assertEqual(srv.connections, 1)
+        srv.ntripversion = "1.0"
+        auth = b"Authorization: Basic " + b64encode(b"anon:password")
+        stream, resp = srv._process_ntrip_request(b"GET /pygnssutils HTTP/1.1\r\n\r\n")
+        self.assertEqual((stream, resp[:25]), (False, b"HTTP/1.1 401 Unauthorized"))
+        stream, resp = srv._process_ntrip_request(b"GET / HTTP/1.1\r\n" + auth)
+        self.assertEqual((stream, resp[:18]), (False, b"SOURCETABLE 200 OK"))
+        self.assertTrue(resp.endswith(b"ENDSOURCETABLE\r\n"))
+        stream, resp = srv._process_ntrip_request(
+            b"GET /pygnssutils HTTP/1.1\r\n" + auth
+        )
+        self.assertEqual((stream, resp), (True, b"ICY 200 OK\r\n\r\n"))
+        for sock in socks:
+            sock.close()
+        srv.server_close()
+
+    def testframebuffer(self):
+        rtcm = (
+            b"\xd3\x00\x13>\xd0\x00\x03\x8aX\xd9I<\x87/4\x10\x9d\x07\xd6\xafH Z\xd7\xf7"
+        )
+        ubx = UBXMessage("NAV", "NAV-PVT", 0, lat=53.1, numSV=12).serialize()
+        nmea = NMEAMessage("GN", "GGA", 0, lat=51.2).serialize()
+        msgs = [ubx, nmea, rtcm] * 20
+        data = b"junk\xb5\x00\xd3\xff" + b"".join(msgs) + b"\xb5\x62\x01"
+        fb = FrameBuffer()
+        res = []
+        for i in range(0, len(data), 37):  # feed in arbitrary chunks
+            fb.feed(data[i : i + 37])
+            res += fb.frames()
+        self.assertEqual(res, msgs)
+        self.assertEqual(fb._buf, b"\xb5\x62\x01")  # incomplete frame retained
+        sbf = SBFMessage("PVTGeodetic", Latitude=0.9, Longitude=-0.03).serialize()
+        fb = FrameBuffer(sbf=True)
+        fb.feed(nmea + sbf + rtcm)
+        self.assertEqual(fb.frames(), [nmea, sbf, rtcm])
+
+    def testdevicepipeline(self):
+        self.assertEqual(
+            parse_device(["rover1", "/dev/ttyACM1", 38400]),
+            ("rover1", 1, "/dev/ttyACM1", 38400),
+        )
+        self.assertEqual(
+            parse_device(["rover2", "[::1]:50010", "UDP IPv6"]),
+            ("rover2", 2, ("::1", 50010), "UDP IPv6"),
+        )
+        with self.assertRaises(ValueError):
+            parse_device(["rover3", "localhost"])
+        app = DummyApp()
+        app.appmaster = HeadlessMaster()
+        app.configuration = Configuration(app)
+        app.stream_handler = StreamHandler(app)
+        res = []
+
+        def process_data(raw_data, parsed_data, marker, device):
+            _, handler = device.protocol_registry.lookup(parsed_data)
+            handler.process_data(raw_data, parsed_data)
+            res.append((marker, parsed_data.identity))
+
+        app.process_data = process_data
+        srv = socket.create_server(("127.0.0.1", 0))
+        dev = DevicePipeline(app, 1, ["rover", f"127.0.0.1:{srv.getsockname()[1]}"])
+        dev.connect()
+        conn, _ = srv.accept()
+        msg = UBXMessage("NAV", "NAV-PVT", 0, lat=53.1, lon=-2.1, numSV=12)
+        conn.sendall(msg.serialize())
+        for _ in range(50):
+            if res:
+                break
+            sleep(0.1)
+        self.assertEqual(res, [("rover>>", "NAV-PVT")])
+        self.assertEqual((dev.gnss_status.lat, dev.gnss_status.sip), (53.1, 12))
+        dev.send_to_device(b"POLL")
+        conn.sendall(msg.serialize())  # output is sent after next read
+        self.assertEqual(conn.recv(4), b"POLL")
+        dev.disconnect()
+        conn.close()
+        srv.close()
+
+    def testasyncingest(self):  # shared asyncio ingest loop with parse workers
+        app = DummyApp()
+        app.appmaster = HeadlessMaster()
+        app.configuration = Configuration(app)
+        app.configuration.set("asyncingest_b", 1)
+        app.configuration.set("parseworkers_n", 1)
+        app.stream_handler = StreamHandler(app)
+        res = []
+
+        def process_data(raw_data, parsed_data, marker, device):
+            res.append(parsed_data.numSV)
+
+        app.process_data = process_data
+        srv = socket.create_server(("127.0.0.1", 0))
+        port = srv.getsockname()[1]
+        dev = DevicePipeline(app, 1, ["rover", f"127.0.0.1:{port}"])
+        dev.connect()
+        conn, _ = srv.accept()
+        for i in range(20):
+            conn.sendall(UBXMessage("NAV", "NAV-PVT", 0, numSV=i).serialize())
+        for _ in range(100):
+            if len(res) == 20:
+                break
+            sleep(0.1)
+        self.assertEqual(res, list(range(20)))  # in arrival order
+        dev.disconnect()
+        conn.close()
+        srv.close()
+        errors = []
+        dev = DevicePipeline(app, 2, ["rover", f"127.0.0.1:{port}"])
+        app.appmaster.bind(dev._events["error"], errors.append)
+        dev.connect()  # connection refused
+        for _ in range(50):
+            if errors:
+                break
+            sleep(0.1)
+        self.assertEqual(errors, [dev._events["error"]])
+        dev.disconnect()
+
+    def testsqlitewriter(self):  # writer thread against plain sqlite3 database
+        self.assertEqual(synchronous_level("full"), "FULL")
+        self.assertEqual(synchronous_level("OFF; DROP TABLE x"), "NORMAL")
+        self.assertEqual(synchronous_level(None), "NORMAL")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dbname = str(Path(tmpdir) / "test.sqlite")
+            with sqlite3.connect(dbname) as conn:
+                conn.execute("CREATE TABLE t (id INTEGER);")
+            conn.close()
+
+            def _count():
+                with closing(sqlite3.connect(dbname)) as reader:
+                    return reader.execute("SELECT COUNT(*) FROM t;").fetchone()[0]
+
+            def _start(batchsize, batchinterval):
+                sql = SqliteHandler(DummyApp())
+                sql._connection = sqlite3.connect(dbname, check_same_thread=False)
+                sql._writer_thread = Thread(
+                    target=sql._writer,
+                    args=(
+                        sql._connection,
+                        "INSERT INTO t VALUES (?);",
+                        batchsize,
+                        batchinterval,
+                    ),
+                    daemon=True,
+                )
+                sql._writer_thread.start()
+                return sql
+
+            sql = _start(3, 60)  # commit in batches of 3 rows
+            for i in range(4):
+                sql._rowqueue.put((i,))
+            for _ in range(50):
+                if _count() == 3:
+                    break
+                sleep(0.1)
+            sleep(0.2)
+            self.assertEqual(_count(), 3)  # 4th row awaits next batch
+            sql.close()
+            self.assertEqual(_count(), 4)  # outstanding row flushed on close
+            sql = _start(100, 0.2)  # commit every 0.2 seconds
+            sql._rowqueue.put((5,))
+            for _ in range(50):
+                if _count() == 5:
+                    break
+                sleep(0.1)
+            self.assertEqual(_count(), 5)
+            sql.close()
+
+    def testreadevent(self):  # read events are coalesced per batch
+        class DummyMaster:
+            def __init__(self):
+                self.events = []
+
+            def event_generate(self, event, **kwargs):
+                self.events.append(event)
+
+        app = DummyApp()
+        app.appmaster = DummyMaster()
+        sh = StreamHandler(app)
+        settings = {"read_event": "<<read>>", "batch_size": 3, "batch_interval": 60}
+        for _ in range(2):
+            sh._post_read_event(settings)
+        self.assertEqual(app.appmaster.events, [])  # batch not yet full
+        for _ in range(10):
+            sh._post_read_event(settings)
+        sh._post_read_event(settings, True)
+        self.assertEqual(app.appmaster.events, ["<<read>>"])  # one per batch
+        sh.clear_read_event()  # consumer drains queue
+        sh._post_read_event(settings, True)
+        self.assertEqual(len(app.appmaster.events), 1)  # nothing to signal
+        sh._post_read_event(settings)
+        sh._post_read_event(settings, True)
+        self.assertEqual(len(app.appmaster.events), 2)  # re-armed after clear
+        sh._post_read_event(settings, True)
+        self.assertEqual(len(app.appmaster.events), 2)
+
+    def testheadless(self):  # headless mode with file source
+        infile = str(Path(__file__).parent / "pygpsdata-nav.log")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            app = HeadlessApp(config=str(Path(tmpdir) / "none.json"))
+            app.configuration.set("datalog_b", 1)
+            app.configuration.set("logpath_s", tmpdir)
+            self.assertEqual(app.run("file", infile), 100)
+            self.assertEqual(round(app.gnss_status.lat, 4), 53.1049)
+            self.assertEqual(app.gnss_status.sip, 12)
+            logs = list(Path(tmpdir).glob("*.log"))
+            self.assertEqual(len(logs), 1)
+            with open(logs[0], "rb") as stream:
+                self.assertEqual(len(list(UBXReader(stream))), 100)
+            with open(infile, "rb") as stream:
+                self.assertEqual(logs[0].read_bytes(), stream.read())
+        with self.assertRaises(ValueError):
+            app.run("file")  # no input file
+
+    def testheadlessnotk(self):  # headless mode on Python without tkinter
+        script = (
+            "import sys\n"
+            "sys.modules['tkinter'] = None\n"  # i.e. import tkinter fails
+            "from pygpsclient.headless import HeadlessApp\n"
+        )
+        res = subprocess.run(
+            [sys.executable, "-c", script],
+            env=dict(environ, PYTHONPATH=pathsep.join(sys.path)),
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        self.assertEqual(res.returncode, 0, res.stderr)
+
+    def testprotocolregistry(self):
+        app = DummyApp()
+        app.gnss_status = GNSSStatus()
+        app.configuration = Configuration(app)
+        app.nmea_handler = NMEAHandler(app)
+        app.ubx_handler = UBXHandler(app)
+        app.sbf_handler = SBFHandler(app)
+        app.rtcm_handler = RTCM3Handler(app)
+        app.tty_handler = TTYHandler(app)
+        reg = ProtocolRegistry(app)
+        msg = UBXMessage("NAV", "NAV-PVT", 0, lat=53.1, lon=-2.1, numSV=12)
+        prot, handler = reg.lookup(msg)
+        self.assertEqual(prot, UBX_PROTOCOL)
+        self.assertEqual(handler, app.ubx_handler)
+        handler.process_data(msg.serialize(), msg)
+        self.assertEqual(app.gnss_status.lat, 53.1)
+        self.assertEqual(app.gnss_status.sip, 12)
+        msg = NMEAMessage("GN", "GGA", 0, lat=51.2, lon=-1.3, numSV=9)
+        prot, handler = reg.lookup(msg)
+        self.assertEqual(prot, NMEA_PROTOCOL)
+        handler.process_data(msg.serialize(), msg)
+        self.assertEqual(app.gnss_status.lat, 51.2)
+        acks = []
+        app.nmea_handler._process_QTMACK = acks.append
+        msg = NMEAMessage("P", "QTMSVINSTATUS", GET, payload=["OK"])
+        app.nmea_handler.process_data(msg.serialize(), msg)
+        self.assertEqual(acks, [msg])  # acknowledgement, not survey-in status
+        self.assertEqual(reg.lookup(b"xxx"), (0, None))
+        self.assertEqual(reg.lookup("text"), (TTY_PROTOCOL, app.tty_handler))
+        res = []
+        reg.register_message(UBXMessage, "NAV-CLOCK", res.append)
+        msg = UBXMessage("NAV", "NAV-CLOCK", 0, clkB=123)
+        app.ubx_handler.process_data(msg.serialize(), msg)
+        self.assertEqual(res, [msg])
+        with self.assertRaises(KeyError):
+            reg.register_message(SPARTNMessage, "SPARTN-1X-OCB-GPS", res.append)
+
+    def testimudata(self):  # IMU data is reassigned, not updated in place
+        app = DummyApp()
+        app.gnss_status = GNSSStatus()
+        app.configuration = Configuration(app)
+        handler = UBXHandler(app)
+        ims = app.gnss_status.imu_data
+        ver = app.gnss_status.version
+        msg = UBXMessage("NAV", "NAV-ATT", 0, roll=1.5, pitch=-2.5, heading=90)
+        handler.process_data(msg.serialize(), msg)
+        self.assertTrue(app.gnss_status.changed(ver, "imu_data"))
+        self.assertEqual(app.gnss_status.imu_data["yaw"], 90)
+        self.assertEqual(ims, {})
+
+    def testparsepool(self):
+        msgs = [
+            UBXMessage("NAV", "NAV-PVT", 0, lat=53.1, numSV=i) for i in range(20)
+        ] + [NMEAMessage("GN", "GGA", 0, lat=51.2, numSV=i) for i in range(20)]
+        msgs.append(
+            RTCMReader.parse(
+                b"\xd3\x00\x13>\xd0\x00\x03\x8aX\xd9I<\x87/4\x10\x9d\x07\xd6\xafH Z\xd7\xf7"
+            )
+        )
+        pool = ParsePool(2, backlog=8)
+        res = []
+        for msg in msgs:
+            pool.submit(msg.serialize())
+            self.assertLessEqual(pool.pending, 9)
+            res += list(pool.completed())
+        self.assertLessEqual(len(pool.blocking_futures(True)), pool.pending)
+        res += list(pool.completed(True))
+        self.assertEqual(pool.blocking_futures(True), [])
+        pool.shutdown()
+        self.assertEqual(pool.pending, 0)
+        self.assertEqual([raw for raw, _ in res], [msg.serialize() for msg in msgs])
+        self.assertEqual(
+            [str(parsed) for _, parsed in res],
+            [str(parse_frame(msg.serialize(), 0)) for msg in msgs],
+        )
+        self.assertEqual(res[19][1].numSV, 19)
+        self.assertEqual(res[40][1].identity, "1005")
+        self.assertIsNone(parse_frame(b"xxx", 0))
+
+    def testlazymessage(self):
+        rtcm = (
+            b"\xd3\x00\x13>\xd0\x00\x03\x8aX\xd9I<\x87/4\x10\x9d\x07\xd6\xafH Z\xd7\xf7"
+        )
+        ubx = UBXMessage("NAV", "NAV-PVT", 0, lat=53.1, numSV=12).serialize()
+        mga = UBXMessage("MGA", "MGA-GPS-EPH", 1, type=1, svId=3).serialize()
+        nmea = NMEAMessage("GN", "GGA", 0, lat=51.2).serialize()
+        self.assertEqual(ubx_identity(ubx), "NAV-PVT")
+        self.assertEqual(ubx_identity(mga), "MGA-GPS-EPH")
+        self.assertEqual(ubx_identity(b"\xb5b\xff\xff\x00\x00"), None)
+        self.assertEqual(rtcm_identity(rtcm), "1005")
+        self.assertTrue(is_needed("CFG-VALGET", {"ACK", "CFG"}))
+        self.assertFalse(is_needed("RXM-RAWX", {"ACK", "CFG"}))
+        self.assertTrue(is_needed("RXM-RAWX", None))
+        self.assertIsNone(lazy_message(ubx, 0, None))
+        self.assertIsNone(lazy_message(ubx, 0, {"NAV-PVT"}))
+        self.assertIsNone(lazy_message(nmea, 0, set()))
+        msg = lazy_message(ubx, 0, {"NAV-SAT"})
+        self.assertIsInstance(msg, LazyUBXMessage)
+        self.assertEqual(msg.identity, "NAV-PVT")
+        self.assertEqual(msg.serialize(), ubx)
+        self.assertFalse(msg.decoded)
+        self.assertEqual(msg.numSV, 12)
+        self.assertTrue(msg.decoded)
+        self.assertEqual(str(msg), str(UBXReader.parse(ubx)))
+        msg = lazy_message(rtcm, 0, set())
+        self.assertIsInstance(msg, LazyRTCMMessage)
+        self.assertEqual(msg.DF002, 1005)
+        # corrupt frames are left to full parser
+        self.assertIsNone(lazy_message(ubx[:-1] + b"\x00", 0, {"NAV-SAT"}))
+        self.assertIsNone(lazy_message(rtcm[:-1] + b"\x00", 0, set()))
+        app = DummyApp()
+        app.gnss_status = GNSSStatus()
+        app.nmea_handler = NMEAHandler(app)
+        app.ubx_handler = UBXHandler(app)
+        app.sbf_handler = SBFHandler(app)
+        app.rtcm_handler = RTCM3Handler(app)
+        app.tty_handler = TTYHandler(app)
+        reg = ProtocolRegistry(app)
+        idents = reg.identities()
+        self.assertIn("NAV-PVT", idents)
+        self.assertIn("ACK", idents)
+        self.assertIn("1005", idents)
+        self.assertNotIn("RXM-RAWX", idents)
+        self.assertEqual(reg.lookup(msg), (RTCM3_PROTOCOL, app.rtcm_handler))
+
+    def testlogwriter(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            app = DummyApp()
+            app.configuration = Configuration(app)
+            app.configuration.set("logpath_s", tmpdir)
+            app.configuration.set("logformat_s", "Parsed")
+            app.configuration.set("logmaxsize_n", 5000)
+            app.configuration.set("logflushsize_n", 1000)
+            app.configuration.set("logcompress_s", "gzip")
+            fh = FileHandler(app)
+            msgs = [
+                UBXMessage("NAV", "NAV-PVT", 0, lat=53.1, numSV=i) for i in range(30)
+            ]
+            self.assertEqual(fh.open_logfile(), 1)
+            for msg in msgs:
+                fh.write_logfile(msg.serialize(), msg)
+            fh.close_logfile()
+            data = b""
+            # sort on timestamp and rotation suffix e.g. pygpsdata-20261018024554-1.log
+            for logfile in sorted(
+                Path(tmpdir).iterdir(),
+                key=lambda f: [
+                    int(n) for n in (f.name.split(".")[0].split("-") + ["0"])[1:3]
+                ],
+            ):
+                if logfile.suffix == ".gz":
+                    with gzip.open(logfile, "rb") as infile:
+                        data += infile.read()
+                else:
+                    data += logfile.read_bytes()
+            self.assertGreater(len(list(Path(tmpdir).glob("*.log.gz"))), 1)
+            self.assertEqual(data, b"".join((str(m) + "\r").encode() for m in msgs))
+
+    def testlogwritererrors(self):  # log writer survives errors
+        class BadMessage:
+            def __str__(self):
+                raise ValueError("corrupt")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            app = DummyApp()
+            app.configuration = Configuration(app)
+            app.configuration.set("logpath_s", tmpdir)
+            app.configuration.set("logformat_s", "Parsed")
+            fh = FileHandler(app)
+            msg = UBXMessage("NAV", "NAV-PVT", 0, lat=53.1, numSV=12)
+            fh.write_logfile(msg.serialize(), msg)
+            fh.write_logfile(b"xxx", BadMessage())
+            fh.write_logfile(msg.serialize(), msg)
+            sleep(0.1)
+            self.assertTrue(fh._logthread.is_alive())
+            fh._logstop.set()  # writer stops unexpectedly
+            fh._logthread.join()
+            fh.write_logfile(msg.serialize(), msg)  # writer is restarted
+            self.assertTrue(fh._logthread.is_alive())
+            fh.close_logfile()
+            data = b"".join(f.read_bytes() for f in Path(tmpdir).glob("*.log"))
+            self.assertEqual(data, ((str(msg) + "\r") * 3).encode())
+
+    def testreadgpx(self):
+        pts = "".join(
+            f'<trkpt lat="{53 + i * 0.0001:.4f}" lon="-2.0000">'
+            f"<ele>{100 + i % 7}</ele><time>2026-10-18T12:{i // 60:02d}:{i % 60:02d}Z</time></trkpt>"
+            for i in range(1000)
+        )
+        gpx = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f"<gpx {GPX_NS}><metadata><time>2026-10-18T11:00:00Z</time></metadata>"
+            f"<trk><trkseg>{pts}</trkseg></trk></gpx>"
+        ).encode("utf-8")
+        trk = read_gpx(BytesIO(gpx), "trkpt", maxpoints=100)
+        self.assertEqual(trk.count, 1000)
+        self.assertLess(len(trk.lat), 200)
+        self.assertEqual(trk.lat[0], 53.0)
+        self.assertEqual(trk.lat[-1], 53.0999)  # final point always retained
+        self.assertEqual(len(trk.lat), len(trk.tim))
+        self.assertAlmostEqual(trk.dist, 11120.8, 1)
+        self.assertEqual(trk.elapsed, 999)
+        self.assertEqual((trk.minele, trk.maxele), (100, 106))
+        self.assertAlmostEqual(trk.meanele, 102.997, 3)
+        self.assertAlmostEqual(trk.maxspd, 11.132, 3)
+        self.assertEqual(trk.bounds, Area(53.0, -2.0, 53.0999, -2.0))
+        self.assertFalse(trk.no_time or trk.no_ele)
+        trk = read_gpx(BytesIO(gpx), "wpt")
+        self.assertEqual(trk.count, 0)
+
+    def testtrackstats(self):
+        lat = [53.0, 53.0001, 53.0002, 53.0002, 53.0003, 53.0004]
+        lon = [-2.0] * 6
+        tim = [0.0, 1.0, 2.0, 12.0, 13.0, 14.0]
+        ele = [100.0, 101.0, 102.0, 102.0, 100.0, 100.0]
+        stats = TrackStats(lat, lon, tim, ele, window=3)
+        self.assertEqual(len(stats.cumdist), 6)
+        self.assertAlmostEqual(stats.dist, 44.528, 3)
+        self.assertEqual(stats.legs[3], 0)
+        self.assertAlmostEqual(stats.spd[1], 11.132, 3)
+        self.assertEqual(stats.spd[3], 0)
+        self.assertAlmostEqual(stats.smoothspd[3], 11.132 * 2 / 3, 3)
+        self.assertAlmostEqual(stats.gradient[1], 8.983, 3)
+        self.assertAlmostEqual(stats.gradient[4], -17.966, 3)
+        self.assertEqual(stats.gradient[3], 0)
+        self.assertEqual((stats.elapsed, stats.moving_time), (14.0, 4.0))
+        self.assertEqual(stats.stopped_time, 10.0)
+        self.assertAlmostEqual(stats.moving_speed, 11.132, 3)
+        self.assertAlmostEqual(leg_distance(53, -2, 54, -2), 111319.491, 3)
+        stats = TrackStats([], [], [])
+        self.assertEqual((stats.dist, stats.moving_time), (0, 0))
+
+    def testringbuffer(self):
+        buf = RingBuffer(10)
+        self.assertEqual((len(buf), buf.last), (0, None))
+        for i in range(25):
+            buf.append(float(i), float(i * 2))
+        self.assertEqual(len(buf), 10)
+        self.assertEqual(list(buf.items())[0], (15.0, 30.0))
+        self.assertEqual(buf.last, (24.0, 48.0))
+        self.assertLessEqual(len(buf._tim), 20)  # storage bounded
+        buf.capacity = 4
+        self.assertEqual([t for t, _ in buf.items()], [21.0, 22.0, 23.0, 24.0])
+        buf.update(24.0, 50.0)  # same timestamp replaces value
+        buf.update(25.0, 52.0)
+        self.assertEqual(list(buf.items())[-2:], [(24.0, 50.0), (25.0, 52.0)])
+        self.assertEqual(len(buf), 4)
+        buf = RingBuffer(10000)
+        for i in range(10000):
+            buf.append(i / 10, (i % 100) - (200 if i == 5055 else 0))
+        pts = buf.decimate(0, 1000, 100)
+        self.assertLessEqual(len(pts), 200)
+        self.assertEqual(min(v for _, v in pts), -145)  # spike preserved
+        self.assertEqual(max(v for _, v in pts), 99)
+        self.assertEqual(pts, sorted(pts))  # in time order
+        self.assertEqual(len(buf.decimate(10, 12, 100)), 21)  # not decimated
+        buf.clear()
+        self.assertEqual(len(buf), 0)
+
+    def testsathistory(self):
+        hist = SatHistory(100)
+        for t in range(200):  # two satellites, one rising, one unused
+            hist.update(
+                [(0, 5, t / 4, 90, 20 + t // 10), (2, 11, 45, 180, "")], 1000 + t
+            )
+        self.assertEqual(len(hist), 2)
+        self.assertEqual(len(hist.series("0-5")), 101)  # earlier samples evicted
+        self.assertEqual(hist.series("0-5")[0], (1099.0, 24.75, 90.0, 29.0))
+        self.assertEqual(
+            hist.cno_mask(),
+            {20: 29.0, 25: 30.5, 30: 32.5, 35: 34.5, 40: 36.5, 45: 38.5},
+        )
+        self.assertEqual(hist.cno_mask(2), {})  # unused satellite not totalled
+        self.assertAlmostEqual(hist.constellation_averages()[0], 34.445545, 6)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = Path(tmpdir) / "sathistory.csv"
+            self.assertEqual(hist.export_csv(fname), 202)
+            with open(fname, encoding="utf-8") as csvfile:
+                lines = csvfile.readlines()
+        self.assertEqual(lines[0], "Timestamp,gnssId,svid,elev,azim,cno\n")
+        self.assertEqual(lines[1], "1970-01-01T00:18:19+00:00,0,5,24.75,90,29\n")
+        self.assertEqual(lines[-1], "1970-01-01T00:19:59+00:00,2,11,45,180,0\n")
+        hist.update([], 1400)  # all samples expired
+        self.assertEqual((len(hist), hist.cno_mask()), (0, {}))
+        hist = SatHistory(0)  # disabled
+        hist.update([(0, 5, 30, 90, 40)], 1000)
+        self.assertEqual(len(hist), 0)
+
+    def testgsvexpiry(self):
+        app = DummyApp()
+        app.gnss_status = GNSSStatus()
+        app.configuration = Configuration(app)
+        app.sat_history = SatHistory()
+        nmh = NMEAHandler(app)
+        nmh.gsv_log["0-7"] = (0, 7, 30, 100, "40", 0)  # long expired
+        msg = NMEAMessage(
+            "GP",
+            "GSV",
+            GET,
+            numMsg=1,
+            msgNum=1,
+            numSV=1,
+            svid_01=5,
+            elv_01=30,
+            az_01=100,
+            cno_01=40,
+        )
+        nmh.process_data(msg.serialize(), msg)
+        self.assertEqual(list(nmh.gsv_log), ["0-5"])
+        self.assertEqual(list(app.gnss_status.gsv_data), ["0-5"])
+        self.assertEqual(app.sat_history.series("0-5")[0][1:], (30.0, 100.0, 40.0))
+
+    def testsbfsatvisibility(self):
+        app = DummyApp()
+        app.gnss_status = GNSSStatus()
+        app.configuration = Configuration(app)
+        app.sat_history = SatHistory()
+        sbh = SBFHandler(app)
+        msgs = (
+            SBFMessage(
+                "MeasEpoch",
+                N1=2,
+                SB1Length=20,
+                SB2Length=12,
+                SVID_01=5,
+                CN0_01=140,
+                SVID_02=75,
+                CN0_02=120,
+                SigIdxLo_02=17,
+            ),
+            SBFMessage(
+                "SatVisibility",
+                N=3,
+                SBLength=8,
+                SVID_01=5,
+                Azimuth_01=12345,
+                Elevation_01=4500,
+                SVID_02=75,
+                Azimuth_02=100,
+                Elevation_02=-200,
+                SVID_03=40,
+                Azimuth_03=9000,
+                Elevation_03=1000,
+            ),
+        )
+        for msg in msgs:
+            sbh.process_data(msg.serialize(), msg)
+        self.assertEqual(
+            app.gnss_status.gsv_data,
+            {"0-5": (0, 5, 45.0, 123.45, 45), "2-5": (2, 5, -2.0, 1.0, 40)},
+        )
+        self.assertEqual(app.sat_history.series("6-67")[0][1:], (10.0, 90.0, 0.0))
+
+    def testrunningstats(self):
+        stats = RunningStats()
+        self.assertEqual((stats.count, stats.mean, stats.stddev), (0, None, None))
+        lats = [53.1, 53.3, 53.2, 53.6, 53.15]
+        lons = [-2.1, -2.0, -2.4, -2.2, -2.25]
+        for lat, lon in zip(lats, lons):
+            stats.add(lat, lon)
+        self.assertEqual(stats.count, 5)
+        self.assertAlmostEqual(stats.mean.lat, 53.27, 9)
+        self.assertAlmostEqual(stats.mean.lon, -2.19, 9)
+        self.assertAlmostEqual(stats.stddev.lat, 0.19874606914351792, 9)
+        self.assertAlmostEqual(stats.stddev.lon, 0.15165750888103102, 9)
+        for lat, lon in zip(lats[:2], lons[:2]):  # e.g. culled points
+            stats.remove(lat, lon)
+        self.assertEqual(stats.count, 3)
+        self.assertAlmostEqual(stats.mean.lat, 53.31666666666667, 9)
+        self.assertAlmostEqual(stats.mean.lon, -2.283333333333333, 9)
+        self.assertAlmostEqual(stats.stddev.lat, 0.24664414311581298, 9)
+        self.assertAlmostEqual(stats.stddev.lon, 0.10408329997330651, 9)
+        for lat, lon in zip(lats[2:], lons[2:]):
+            stats.remove(lat, lon)
+        self.assertEqual((stats.count, stats.mean, stats.stddev), (0, None, None))
+
+    def testmappyramid(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Image.new("RGB", (1000, 600), (0, 0, 255))
+            src.paste((255, 0, 0), (0, 0, 500, 300))  # NW quadrant red
+            srcpath = str(Path(tmpdir) / "map.png")
+            src.save(srcpath)
+            pyramid = MapPyramid(srcpath, str(Path(tmpdir) / "pyramid"), 8)
+            self.assertFalse(pyramid.ready)
+            self.assertTrue(pyramid.build())
+            self.assertEqual((pyramid.size, pyramid.levels), ((1000, 600), 3))
+            self.assertEqual(pyramid.get(2, 0, 0).size, (250, 150))
+            self.assertEqual(pyramid.get(0, 3, 2).size, (232, 88))
+            self.assertIsNone(pyramid.get(0, 4, 0))
+            extents = Area(50.0, -2.0, 51.0, 0.0)
+            img = pyramid.render(extents, extents, 100, 60)
+            self.assertEqual(img.size, (100, 60))
+            self.assertEqual(img.getpixel((10, 10)), (255, 0, 0))
+            self.assertEqual(img.getpixel((90, 50)), (0, 0, 255))
+            # zoomed to NW corner, extending beyond map extents
+            img = pyramid.render(extents, Area(50.5, -2.5, 51.5, -0.5), 200, 200)
+            self.assertEqual(img.getpixel((30, 30)), (61, 61, 61))
+            self.assertEqual(img.getpixel((120, 150)), (255, 0, 0))
+            # new instance finds existing pyramid
+            self.assertTrue(MapPyramid(srcpath, str(Path(tmpdir) / "pyramid")).ready)
+
+    def testtrackbuffer(self):
+        zigzag = [Point(50 + i * 0.001, -2 + (i % 2) * 0.0005) for i in range(9)]
+        track, dropped = simplify(zigzag, limit=5)
+        self.assertEqual((len(track), track[0], track[-1]), (5, zigzag[0], zigzag[-1]))
+        self.assertAlmostEqual(dropped, 0.0002566, 6)
+        line = [Point(50 + i * 0.001, -2 + i * 0.001) for i in range(100)]
+        self.assertEqual(simplify(line, 0.00001)[0], [line[0], line[-1]])
+        buf = TrackBuffer(50, 0.00001)
+        for pnt in line + line[-1:]:  # duplicate ignored
+            buf.append(pnt)
+        self.assertEqual(len(buf), 7)  # committed every TAIL_MAX points + tail
+        self.assertEqual((buf[0], buf[-1]), (line[0], line[-1]))
+        buf = TrackBuffer(50)
+        for i in range(200):  # square wave exceeds limit
+            buf.append(Point(51 + (i // 5 % 2) * 0.001, i * 0.001))
+        self.assertLessEqual(len(buf), 50)
+        self.assertGreater(buf.tolerance, 0)
+        self.assertEqual(buf[-1], Point(51.001, 0.199))
+        runs = buf.clip(Area(50.9, 0.05, 51.1, 0.0999))  # indexed run + tail
+        self.assertEqual(len(runs), 2)
+        self.assertTrue(all(0.03 < p.lon < 0.12 for p in runs[0]))
+        self.assertEqual(len(buf.clip(Area(50.9, -0.1, 51.1, 0.3))), 1)
+        buf = TrackBuffer(POINTLIMIT, TRK_RECORD_TOLERANCE)  # as recorded by map
+        zigzag = [Point(53 + i * 0.00002, -2 + (i % 2) * 0.0001) for i in range(450)]
+        for pnt in zigzag:  # 1km zig-zag retained regardless of zoom
+            buf.append(pnt)
+        self.assertEqual(list(buf), zigzag)
+
+    def testspectrumhistory(self):
+        hist = SpectrumHistory(4)
+        self.assertEqual(
+            (len(hist), hist.image(0), hist.hold(0)), (0, None, ([], [], []))
+        )
+        for i in range(6):
+            spec = [i * 10 + (100 if j == 7 else 0) for j in range(256)]
+            hist.add([(spec, 128000000, 500000, 1583000000, 54)] * 2)
+        self.assertEqual((len(hist), hist.blocks), (4, 2))
+        mins, maxs, avgs = hist.hold(1)
+        self.assertEqual((mins[0], maxs[0], avgs[0]), (20, 50, 35))
+        self.assertEqual((mins[7], maxs[7], avgs[7]), (120, 150, 135))
+        img = hist.image(0)
+        self.assertEqual((img.size, img.mode), ((256, 4), "L"))
+        self.assertEqual([img.getpixel((0, y)) for y in range(4)], [50, 40, 30, 20])
+        hist.add([([0] * 256, 64000000, 500000, 1236000000, 54)])  # new layout
+        self.assertEqual((len(hist), hist.blocks), (1, 1))
+        hist.clear()
+        self.assertEqual(len(hist), 0)
+
+    def testtilecache(self):
+        x, y = ll2tile(53.0, -2.0, 10)
+        self.assertAlmostEqual(x, 506.311, 3)
+        self.assertAlmostEqual(y, 333.570, 3)
+        pnt = tile2ll(x, y, 10)
+        self.assertAlmostEqual(pnt.lat, 53.0, 9)
+        self.assertAlmostEqual(pnt.lon, -2.0, 9)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            seeddir = Path(tmpdir) / "seed"
+            for tx in range(4):
+                for ty in range(4):
+                    Path(seeddir / "2" / str(tx)).mkdir(parents=True, exist_ok=True)
+                    Image.new("RGB", (256, 256), (tx * 60, ty * 60, 0)).save(
+                        seeddir / "2" / str(tx) / f"{ty}.png"
+                    )
+            cache = TileCache(str(Path(tmpdir) / "cache"), memsize=4)
+            self.assertEqual(cache.seed(str(seeddir)), 16)
+            self.assertEqual(cache.seed(str(seeddir)), 0)  # already cached
+            img, bounds, missing = cache.render(Point(0, 0), 2, 512, 512)
+            self.assertEqual((img.size, missing), ((512, 512), 0))
+            self.assertAlmostEqual(bounds.lon1, -90, 6)
+            self.assertAlmostEqual(bounds.lon2, 90, 6)
+            self.assertAlmostEqual(bounds.lat2, 66.513, 3)
+            self.assertEqual(img.getpixel((10, 10)), (60, 60, 0))
+            self.assertEqual(img.getpixel((500, 500)), (120, 120, 0))
+            self.assertEqual(len(cache._tiles), 4)
+            img, _, missing = cache.render(Point(0, 170), 2, 512, 512)
+            self.assertEqual(missing, 0)  # wraps at antimeridian
+            self.assertEqual(img.getpixel((500, 10)), (0, 60, 0))
+            self.assertEqual(len(cache._tiles), 4)  # LRU evicted
+            img, _, missing = cache.render(Point(0, 0), 3, 256, 256)
+            self.assertEqual(missing, 4)
+            cache.close()
+            cache = TileCache(
+                str(Path(tmpdir) / "cache"), "http://127.0.0.1:9/{z}/{x}/{y}.png"
+            )
+            cache.fetch(5, 1, 1)
+            for _ in range(50):  # wait for fetch to fail
+                if (5, 1, 1) in cache._failed:
+                    break
+                sleep(0.1)
+            retry, delay = cache._failed[(5, 1, 1)]
+            self.assertEqual(delay, TILE_RETRY)
+            cache.fetch(5, 1, 1)  # not requeued until retry delay expires
+            self.assertEqual(cache._pending, set())
+            cache._failed[(5, 1, 1)] = (retry - TILE_RETRY, delay)
+            cache.fetch(5, 1, 1)
+            for _ in range(50):  # wait for refetch to fail
+                if cache._failed[(5, 1, 1)][1] != delay:
+                    break
+                sleep(0.1)
+            self.assertEqual(cache._failed[(5, 1, 1)][1], TILE_RETRY * 2)  # backoff
+            cache.close()
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']